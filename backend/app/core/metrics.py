@@ -0,0 +1,229 @@
+"""
+Prometheus metrics (API + Celery workers)
+
+Counters and histograms of the webhook, batching, agent, retrieval, moderation
+and outbound send paths. With PROMETHEUS_MULTIPROC_DIR set, every process
+(uvicorn workers, Celery prefork children) writes its samples to files in that
+directory and the exporter merges them:
+- API: GET /metrics (app.main)
+- Celery worker node: HTTP exporter on CELERY_METRICS_PORT (started by
+  app.workers.celery_app at worker init)
+
+Use one directory per exporter (the API, each worker node) and empty it when
+the exporter starts, before any metric is written.
+"""
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Buckets (seconds)
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+# The batch window is 8 s (MessageBatcher.batch_window_seconds)
+WAIT_BUCKETS = (1.0, 2.0, 4.0, 6.0, 8.0, 9.0, 10.0, 12.0, 15.0, 20.0, 30.0, 60.0)
+
+WEBHOOK_ACK_SECONDS = Histogram(
+    "socialsync_webhook_ack_seconds",
+    "Platform webhook POST, request received to response started",
+    ["platform"],
+    buckets=FAST_BUCKETS,
+)
+BATCH_WAIT_SECONDS = Histogram(
+    "socialsync_batch_wait_seconds",
+    "First message of a DM batch to start of its processing",
+    ["platform"],
+    buckets=WAIT_BUCKETS,
+)
+BATCH_PROCESSING_SECONDS = Histogram(
+    "socialsync_batch_processing_seconds",
+    "Processing of a due conversation, batch read to reply sent",
+    ["platform", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+BATCH_CONVERSATIONS = Counter(
+    "socialsync_batch_conversations",
+    "Due conversations handled by the batch scanner",
+    ["outcome"],
+)
+ANSWER_CACHE_HITS = Counter(
+    "socialsync_answer_cache_hits",
+    "Batches answered from the semantic answer cache",
+)
+SCANNER_SCANS = Counter(
+    "socialsync_scanner_scans",
+    "Batch scanner passes",
+)
+SCANNER_ERRORS = Counter(
+    "socialsync_scanner_errors",
+    "Batch scanner passes that failed",
+)
+SCANNER_LAST_SCAN = Gauge(
+    "socialsync_scanner_last_scan_timestamp_seconds",
+    "Unix time of the last batch scanner pass",
+    multiprocess_mode="max",
+)
+AGENT_STAGE_SECONDS = Histogram(
+    "socialsync_agent_stage_seconds",
+    "RAG agent graph node latency",
+    ["stage"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "socialsync_llm_tokens",
+    "LLM tokens reported by the provider",
+    ["model", "type"],
+)
+LLM_CALLS = Counter(
+    "socialsync_llm_calls",
+    "LLM calls made by the LLM router, per model",
+    ["model", "purpose", "outcome"],
+)
+LLM_HEDGES = Counter(
+    "socialsync_llm_hedges",
+    "Hedged LLM calls started after a latency budget was exceeded",
+    ["model", "purpose"],
+)
+LLM_BREAKER_OPEN = Gauge(
+    "socialsync_llm_breaker_open",
+    "1 while the circuit breaker of a model is open",
+    ["model"],
+    multiprocess_mode="max",
+)
+RETRIEVAL_SECONDS = Histogram(
+    "socialsync_retrieval_seconds",
+    "Unified search latency (faq, docs, total)",
+    ["source"],
+    buckets=FAST_BUCKETS,
+)
+MODERATION_SECONDS = Histogram(
+    "socialsync_moderation_seconds",
+    "OpenAI moderation call latency",
+    ["outcome"],
+    buckets=FAST_BUCKETS,
+)
+ESCALATION_NOTIFICATIONS = Counter(
+    "socialsync_escalation_notifications",
+    "Escalation outbox rows handled by the notifier",
+    ["outcome"],
+)
+ESCALATION_EMAILS = Counter(
+    "socialsync_escalation_emails",
+    "Escalation emails sent (one escalation, or a digest of several)",
+    ["kind"],
+)
+OUTBOUND_SEND_SECONDS = Histogram(
+    "socialsync_outbound_send_seconds",
+    "Platform send API latency (DM replies, comment replies)",
+    ["platform", "kind", "outcome"],
+    buckets=FAST_BUCKETS,
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str):
+    """Observe the duration of the block, exceptions included"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        (histogram.labels(**labels) if labels else histogram).observe(elapsed)
+
+
+def timed_stage(stage: str, node: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a LangGraph node so that each run is observed in AGENT_STAGE_SECONDS"""
+
+    @functools.wraps(node)
+    def wrapper(state):
+        with timed(AGENT_STAGE_SECONDS, stage=stage):
+            return node(state)
+
+    return wrapper
+
+
+def record_llm_tokens(model: str, message: Any) -> None:
+    """Count the input/output tokens of an AI message (usage_metadata)"""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    LLM_TOKENS.labels(model=model, type="input").inc(int(usage.get("input_tokens") or 0))
+    LLM_TOKENS.labels(model=model, type="output").inc(int(usage.get("output_tokens") or 0))
+
+
+class WebhookAckTimer:
+    """
+    ASGI middleware: latency of the webhook POSTs up to the start of the
+    response, i.e. what Meta waits for before its delivery timeout
+    """
+
+    def __init__(self, app, paths: dict):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        platform = None
+        if scope["type"] == "http" and scope.get("method") == "POST":
+            platform = self.paths.get(scope.get("path"))
+        if platform is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                WEBHOOK_ACK_SECONDS.labels(platform=platform).observe(
+                    time.perf_counter() - start
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+def get_registry() -> CollectorRegistry:
+    """Registry to export: merged process files in multiprocess mode"""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Prometheus text exposition of the metrics, with its content type"""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: Optional[int] = None) -> bool:
+    """Start the HTTP exporter of a Celery worker node (CELERY_METRICS_PORT)"""
+    port = port or int(os.getenv("CELERY_METRICS_PORT", "0") or 0)
+    if not port:
+        return False
+    start_http_server(port, registry=get_registry())
+    logger.info(f"[METRICS] Worker exporter listening on :{port}")
+    return True
+
+
+def mark_process_dead(pid: Optional[int]) -> None:
+    """Drop the live gauges of an exited process (prefork child recycling)"""
+    if MULTIPROC_DIR and pid:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,221 @@
+"""
+Reply latency tracing (webhook → batch → agent → platform send)
+
+Two views of the same stages:
+- OpenTelemetry spans exported over OTLP/HTTP to a collector, when
+  TRACING_ENABLED. The trace starts in the webhook router (webhook_trace),
+  its W3C context is stored in the Redis batch payload (inject_context) and
+  the batch scanner continues it (continue_trace). Root spans are sampled at
+  TRACING_SAMPLE_RATIO, children follow their parent.
+- LatencyBreakdown: stage durations of one DM reply, collected in memory
+  whatever the tracing setting and stored per conversation by the scanner
+  (app/services/latency_breakdown.py).
+
+stage() feeds both. Disabled tracing and no breakdown: no OpenTelemetry import,
+stage() only reads two context variables.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+OTLP_TRACES_ENDPOINT = os.getenv(
+    "OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "socialsync-backend")
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+# Start of the webhook request being handled (perf_counter), see webhook_trace
+_webhook_started_at: ContextVar[Optional[float]] = ContextVar("webhook_started_at", default=None)
+
+
+class LatencyBreakdown:
+    """Stage durations (ms) of one reply; stages run more than once add up"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()  # Agent nodes and searches run in threads
+
+    def add(self, stage_name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + elapsed_ms
+            self.counts[stage_name] = self.counts.get(stage_name, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stages": {name: round(ms, 1) for name, ms in self.stages.items()},
+                "counts": dict(self.counts),
+            }
+
+
+_breakdown: ContextVar[Optional[LatencyBreakdown]] = ContextVar("latency_breakdown", default=None)
+
+
+def _get_tracer():
+    """Tracer, created on first use (after the fork of Celery pool processes)"""
+    global _tracer
+    if _tracer is not None or not TRACING_ENABLED:
+        return _tracer
+
+    with _tracer_lock:
+        if _tracer is None:
+            from opentelemetry import trace
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+            provider = TracerProvider(
+                resource=Resource.create({"service.name": SERVICE_NAME}),
+                sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)),
+            )
+            provider.add_span_processor(
+                BatchSpanProcessor(OTLPSpanExporter(endpoint=OTLP_TRACES_ENDPOINT))
+            )
+            trace.set_tracer_provider(provider)
+            _tracer = trace.get_tracer("socialsync")
+            logger.info(
+                f"[TRACING] OTLP export to {OTLP_TRACES_ENDPOINT} "
+                f"(service={SERVICE_NAME}, sample_ratio={TRACING_SAMPLE_RATIO})"
+            )
+    return _tracer
+
+
+def _clean_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextmanager
+def webhook_trace(platform: str):
+    """Root span of a webhook request; the trace id is created here"""
+    token = _webhook_started_at.set(time.perf_counter())
+    try:
+        tracer = _get_tracer()
+        if tracer is None:
+            yield
+            return
+        with tracer.start_as_current_span(
+            f"webhook.{platform}", attributes={"messaging.system": platform}
+        ):
+            yield
+    finally:
+        _webhook_started_at.reset(token)
+
+
+def webhook_elapsed_ms() -> Optional[float]:
+    """Time since the start of the current webhook request (None outside one)"""
+    started_at = _webhook_started_at.get()
+    if started_at is None:
+        return None
+    return (time.perf_counter() - started_at) * 1000
+
+
+def inject_context() -> Optional[Dict[str, str]]:
+    """W3C trace context of the current span, to store with queued work"""
+    tracer = _get_tracer()
+    if tracer is None:
+        return None
+    from opentelemetry import propagate, trace
+
+    if not trace.get_current_span().get_span_context().is_sampled:
+        return None
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier or None
+
+
+def current_trace_id() -> Optional[str]:
+    if _get_tracer() is None:
+        return None
+    from opentelemetry import trace
+
+    span_context = trace.get_current_span().get_span_context()
+    return format(span_context.trace_id, "032x") if span_context.is_valid else None
+
+
+@contextmanager
+def continue_trace(name: str, carrier: Optional[Dict[str, str]] = None, **attributes: Any):
+    """Span continuing the trace of `carrier` (new root trace without one)"""
+    tracer = _get_tracer()
+    if tracer is None:
+        yield
+        return
+    from opentelemetry import propagate
+
+    parent = propagate.extract(carrier) if carrier else None
+    with tracer.start_as_current_span(
+        name, context=parent, attributes=_clean_attributes(attributes)
+    ):
+        yield
+
+
+@contextmanager
+def collect_breakdown():
+    """Collect the stage() durations of the enclosed work in a LatencyBreakdown"""
+    breakdown = LatencyBreakdown()
+    token = _breakdown.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _breakdown.reset(token)
+
+
+@contextmanager
+def stage(name: str, **attributes: Any):
+    """Time a stage: child span (if traced) + entry of the current breakdown"""
+    breakdown = _breakdown.get()
+    tracer = _get_tracer()
+    if tracer is None and breakdown is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        if tracer is None:
+            yield
+        else:
+            with tracer.start_as_current_span(name, attributes=_clean_attributes(attributes)):
+                yield
+    finally:
+        if breakdown is not None:
+            breakdown.add(name, (time.perf_counter() - start) * 1000)
+
+
+def record_stage(name: str, start_epoch: float, end_epoch: float, **attributes: Any) -> None:
+    """Stage that already happened (e.g. the batch window), wall-clock bounds"""
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown.add(name, max(end_epoch - start_epoch, 0.0) * 1000)
+
+    tracer = _get_tracer()
+    if tracer is not None:
+        span = tracer.start_span(
+            name,
+            start_time=int(start_epoch * 1e9),
+            attributes=_clean_attributes(attributes),
+        )
+        span.end(end_time=int(max(end_epoch, start_epoch) * 1e9))
+
+
+def traced_node(name: str, node: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a LangGraph node in stage(`agent.<name>`)"""
+
+    @functools.wraps(node)
+    def wrapper(state):
+        with stage(f"agent.{name}"):
+            return node(state)
+
+    return wrapper
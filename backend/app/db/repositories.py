@@ -0,0 +1,127 @@
+"""
+Async repositories for the hot tables
+
+The webhook and batch scanner paths run on an event loop; the sync client of
+get_db() blocks it for a full PostgREST round trip on every call. These
+repositories wrap get_async_db() (service role, bypasses RLS) with the few
+queries those paths need, one method per query.
+
+Sync callers (Celery tasks, LangGraph nodes running in threads) keep using
+get_db().
+"""
+from typing import Any, Dict, List, Optional
+
+from supabase import AsyncClient
+
+from app.db.session import get_async_db
+
+
+class _AsyncRepository:
+    table: str
+
+    async def _client(self) -> AsyncClient:
+        return await get_async_db()
+
+    async def _query(self):
+        return (await self._client()).table(self.table)
+
+    @staticmethod
+    def _first(rows: Optional[List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        return rows[0] if rows else None
+
+
+class ConversationRepository(_AsyncRepository):
+    """Table conversations"""
+
+    table = "conversations"
+
+    async def find_latest_id(
+        self, social_account_id: str, customer_identifier: str
+    ) -> Optional[str]:
+        """Most recent conversation of a customer on a social account"""
+        res = await (
+            (await self._query())
+            .select("id")
+            .eq("social_account_id", social_account_id)
+            .eq("customer_identifier", customer_identifier)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        row = self._first(res.data)
+        return str(row["id"]) if row and row.get("id") else None
+
+    async def create(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        res = await (await self._query()).insert(payload).execute()
+        return self._first(res.data)
+
+    async def get_ai_mode(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """{"ai_mode": ...} of a conversation, None if it does not exist"""
+        res = await (
+            (await self._query())
+            .select("ai_mode")
+            .eq("id", conversation_id)
+            .limit(1)
+            .execute()
+        )
+        return self._first(res.data)
+
+    async def update(self, conversation_id: str, payload: Dict[str, Any]) -> None:
+        await (await self._query()).update(payload).eq("id", conversation_id).execute()
+
+
+class ConversationMessageRepository(_AsyncRepository):
+    """Table conversation_messages"""
+
+    table = "conversation_messages"
+
+    async def insert(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        res = await (await self._query()).insert(payload).execute()
+        return self._first(res.data)
+
+    async def delete(self, message_id: str) -> bool:
+        res = await (await self._query()).delete().eq("id", message_id).execute()
+        return bool(res.data)
+
+
+class SocialAccountRepository(_AsyncRepository):
+    """Table social_accounts"""
+
+    table = "social_accounts"
+
+    async def get_active_by_platform_account(
+        self, platform: str, account_id: str
+    ) -> Optional[Dict[str, Any]]:
+        res = await (
+            (await self._query())
+            .select("*")
+            .eq("platform", platform)
+            .eq("account_id", account_id)
+            .eq("is_active", True)
+            .limit(1)
+            .execute()
+        )
+        return self._first(res.data)
+
+
+class AISettingsRepository(_AsyncRepository):
+    """Table ai_settings"""
+
+    table = "ai_settings"
+
+    async def get_by_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        res = await (
+            (await self._query())
+            .select("*")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return self._first(res.data)
+
+
+# Instances globales
+conversations_repo = ConversationRepository()
+conversation_messages_repo = ConversationMessageRepository()
+social_accounts_repo = SocialAccountRepository()
+ai_settings_repo = AISettingsRepository()
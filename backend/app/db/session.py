@@ -1,3 +1,5 @@
+import asyncio
+import weakref
 from supabase import create_client, Client, acreate_client, AsyncClient
 from app.core.config import get_settings
 from fastapi import Request, HTTPException
@@ -9,7 +11,11 @@ supabase: Client = create_client(
     settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY
 )
 
-_async_supabase: AsyncClient | None = None
+# One async client per event loop: its HTTP connections are bound to the loop
+# that created them (Celery tasks may run several loops in one process)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def get_db() -> Client:
@@ -26,29 +32,32 @@ async def get_async_db() -> AsyncClient:
     """
     Returns the async Supabase client for high-performance async operations.
 
-    The client is created lazily on first call and reused for subsequent calls.
+    The client is created lazily on first call in each event loop and reused
+    for subsequent calls in that loop.
     This client uses service role key and bypasses RLS - use with caution!
 
     Returns:
         AsyncClient: Async Supabase client instance
     """
-    global _async_supabase
-    if _async_supabase is None:
-        _async_supabase = await acreate_client(
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = await acreate_client(
             settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY
         )
-    return _async_supabase
+        # Another coroutine may have created one meanwhile: keep the first
+        client = _async_clients.setdefault(loop, client)
+    return client
 
 
 async def close_async_db():
     """
-    Closes the async Supabase client connection.
+    Closes the async Supabase client of the current event loop.
     Should be called during application shutdown.
     """
-    global _async_supabase
-    if _async_supabase is not None:
-        await _async_supabase.close()
-        _async_supabase = None
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
 
 
 def get_authenticated_db(request: Request) -> Client:
@@ -1,9 +1,11 @@
 import logging
+import time
 from typing import Dict, Any, Optional
 from contextvars import ContextVar
 from dataclasses import dataclass, field
 
 from app.services.credits_service import CreditsService
+from app.services.usage_metering import EntitlementSnapshot, usage_meter
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +29,11 @@ class CreditTracker:
     Tracker for counting AI calls and managing credit deductions by batch.
 
     This tracker maintains the state of AI calls during the processing of a request
-    and deducts credits only at the end of the batch (after the final response).
+    and records the usage only at the end of the batch (after the final response).
+
+    Entitlements are loaded once per batch (EntitlementSnapshot): the checks of
+    track_ai_call run in memory, and finalize_batch counts the usage in Redis
+    (usage_meter), flushed to Postgres by app.workers.metering.
     """
 
     def __init__(self, user_id: str, credits_service: CreditsService):
@@ -36,6 +42,13 @@ class CreditTracker:
         self.calls: list[AICallInfo] = []
         self.total_cost = 0.0
         self.final_response_sent = False
+        self.snapshot: Optional[EntitlementSnapshot] = None
+
+    async def get_snapshot(self) -> EntitlementSnapshot:
+        """Entitlements of the user, loaded on the first call of the batch"""
+        if self.snapshot is None:
+            self.snapshot = await usage_meter.load_snapshot(self.user_id, self.credits_service)
+        return self.snapshot
 
     @classmethod
     def get_current(cls) -> Optional['CreditTracker']:
@@ -58,27 +71,24 @@ class CreditTracker:
             bool: True if the call can be performed, False if limit reached
         """
         try:
-            feature_access = await self.credits_service.get_feature_access(self.user_id)
-            if len(self.calls) >= feature_access.max_calls_per_batch:
-                logger.warning(f"Batch call limit reached for {self.user_id}: {len(self.calls)}/{feature_access.max_calls_per_batch}")
+            snapshot = await self.get_snapshot()
+            if len(self.calls) >= snapshot.max_calls_per_batch:
+                logger.warning(f"Batch call limit reached for {self.user_id}: {len(self.calls)}/{snapshot.max_calls_per_batch}")
                 return False
 
             # Check if the user can use this model
-            can_use_model = await self.credits_service.can_use_model(self.user_id, model_name)
-            if not can_use_model:
+            if not snapshot.allows_model(model_name):
                 logger.warning(f"Modèle non autorisé pour {self.user_id}: {model_name}")
                 return False
 
             # Check if the credits are available (estimation for the whole batch)
             estimated_total_cost = self.total_cost + (credit_cost * (len(self.calls) + 1))
-            credits_available = await self.credits_service.check_credits_available(self.user_id, estimated_total_cost)
 
-            if not credits_available:
+            if not snapshot.can_spend(estimated_total_cost):
                 logger.warning(f"Crédits insuffisants pour {self.user_id}: besoin de {estimated_total_cost}")
                 return False
 
             # Register the call
-            import time
             call_info = AICallInfo(
                 model_name=model_name,
                 credit_cost=credit_cost,
@@ -100,7 +110,7 @@ class CreditTracker:
 
     async def finalize_batch(self, conversation_id: Optional[str] = None) -> bool:
         """
-        Finalize the batch and deduct the credits.
+        Finalize the batch and record its usage.
 
         This method must be called after sending the final response to the user.
         """
@@ -133,17 +143,14 @@ class CreditTracker:
                 ]
             }
 
-            # Deduct the credits
-            await self.credits_service.deduct_credits(
-                user_id=self.user_id,
-                credits_to_deduct=total_credits_to_deduct,
-                reason=f"Batch AI: {len(self.calls)} appels - {', '.join(set(call.model_name for call in self.calls))}",
-                metadata=calls_summary
-            )
+            # Count the usage (Redis); the flusher writes it to usage_counters
+            if not await usage_meter.record_batch(self.user_id, self.calls):
+                return False
 
             self.final_response_sent = True
 
-            logger.info(f"Batch finalisé avec succès: {self.user_id} - {len(self.calls)} appels - {total_credits_to_deduct} crédits déduits")
+            logger.info(f"Batch finalisé avec succès: {self.user_id} - {len(self.calls)} appels - {total_credits_to_deduct} crédits comptés")
+            logger.debug(f"Batch détail {self.user_id}: {calls_summary}")
             return True
 
         except Exception as e:
@@ -166,6 +173,7 @@ class CreditTracker:
         self.calls.clear()
         self.total_cost = 0.0
         self.final_response_sent = False
+        self.snapshot = None
 
 
 
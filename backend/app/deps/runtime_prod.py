@@ -1,27 +1,162 @@
+import logging
 import os
-from psycopg import connect
+import threading
+from typing import Any, Dict, Optional
+
+from psycopg.conninfo import make_conninfo
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 host = os.getenv("SUPABASE_DB_HOST")
 port = os.getenv("SUPABASE_DB_PORT")
 dbname = os.getenv("SUPABASE_DB_NAME")
 user = os.getenv("SUPABASE_DB_USER")
 password = os.getenv("SUPABASE_DB_PASSWORD")
-conn = connect(
-    host=host,
-    port=port,
-    dbname=dbname,
-    user=user,
-    password=password,
-    sslmode="require",
-    connect_timeout=60,
-    row_factory=dict_row
-)
-conn.autocommit = True
-
-
-CHECKPOINTER_POSTGRES = PostgresSaver(conn)
-CHECKPOINTER_POSTGRES.setup()
\ No newline at end of file
+
+# Taille du pool par process (API: un pool partagé par tous les threads
+# asyncio.to_thread(agent.graph.invoke); worker Celery: un pool par process)
+POOL_MIN_SIZE = int(os.getenv("CHECKPOINTER_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("CHECKPOINTER_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT_SECONDS = float(os.getenv("CHECKPOINTER_POOL_TIMEOUT", "30"))
+POOL_MAX_IDLE_SECONDS = float(os.getenv("CHECKPOINTER_POOL_MAX_IDLE", "300"))
+POOL_MAX_LIFETIME_SECONDS = float(os.getenv("CHECKPOINTER_POOL_MAX_LIFETIME", "1800"))
+POOL_RECONNECT_TIMEOUT_SECONDS = float(os.getenv("CHECKPOINTER_POOL_RECONNECT_TIMEOUT", "300"))
+
+_lock = threading.Lock()
+_pool: Optional[ConnectionPool] = None
+_checkpointer: Optional[PostgresSaver] = None
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_checkpointer: Optional[AsyncPostgresSaver] = None
+
+
+def _conninfo() -> str:
+    return make_conninfo(
+        host=host,
+        port=port,
+        dbname=dbname,
+        user=user,
+        password=password,
+        sslmode="require",
+        connect_timeout=60,
+    )
+
+
+def _connection_kwargs() -> Dict[str, Any]:
+    # PostgresSaver requires autocommit and dict rows; prepared statements are
+    # disabled because Supabase may sit behind a transaction pooler
+    return {
+        "autocommit": True,
+        "prepare_threshold": None,
+        "row_factory": dict_row,
+    }
+
+
+def get_postgres_checkpointer() -> PostgresSaver:
+    """
+    Checkpointer LangGraph Postgres adossé à un pool de connexions
+
+    Créé au premier appel (pas à l'import). Les connexions sont vérifiées avant
+    d'être prêtées (check_connection) et le pool se reconnecte seul si la base
+    redémarre, au lieu de casser tous les agents du process.
+    """
+    global _pool, _checkpointer
+    if _checkpointer is not None:
+        return _checkpointer
+
+    with _lock:
+        if _checkpointer is None:
+            pool = ConnectionPool(
+                conninfo=_conninfo(),
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                timeout=POOL_TIMEOUT_SECONDS,
+                max_idle=POOL_MAX_IDLE_SECONDS,
+                max_lifetime=POOL_MAX_LIFETIME_SECONDS,
+                reconnect_timeout=POOL_RECONNECT_TIMEOUT_SECONDS,
+                check=ConnectionPool.check_connection,
+                kwargs=_connection_kwargs(),
+                name="langgraph-checkpointer",
+                open=False,
+            )
+            pool.open(wait=True, timeout=POOL_TIMEOUT_SECONDS)
+            checkpointer = PostgresSaver(pool)
+            checkpointer.setup()
+            _pool = pool
+            _checkpointer = checkpointer
+            logger.info(
+                f"Checkpointer Postgres initialisé (pool {POOL_MIN_SIZE}-{POOL_MAX_SIZE})"
+            )
+    return _checkpointer
+
+
+async def get_async_postgres_checkpointer() -> AsyncPostgresSaver:
+    """Variante async du checkpointer (graph.ainvoke / astream)"""
+    global _async_pool, _async_checkpointer
+    if _async_checkpointer is not None:
+        return _async_checkpointer
+
+    pool = AsyncConnectionPool(
+        conninfo=_conninfo(),
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT_SECONDS,
+        max_idle=POOL_MAX_IDLE_SECONDS,
+        max_lifetime=POOL_MAX_LIFETIME_SECONDS,
+        reconnect_timeout=POOL_RECONNECT_TIMEOUT_SECONDS,
+        check=AsyncConnectionPool.check_connection,
+        kwargs=_connection_kwargs(),
+        name="langgraph-checkpointer-async",
+        open=False,
+    )
+    await pool.open(wait=True, timeout=POOL_TIMEOUT_SECONDS)
+    if _async_checkpointer is not None:
+        # Another coroutine initialised it while this one was connecting
+        await pool.close()
+        return _async_checkpointer
+
+    checkpointer = AsyncPostgresSaver(pool)
+    await checkpointer.setup()
+    _async_pool = pool
+    _async_checkpointer = checkpointer
+    return _async_checkpointer
+
+
+def get_checkpointer_pool() -> ConnectionPool:
+    """Pool du checkpointer, pour la maintenance des tables checkpoint*"""
+    get_postgres_checkpointer()
+    return _pool
+
+
+def get_checkpointer_pool_stats() -> Dict[str, Any]:
+    """Statistiques des pools (taille, connexions disponibles, attentes)"""
+    stats: Dict[str, Any] = {}
+    if _pool is not None:
+        stats["sync"] = _pool.get_stats()
+    if _async_pool is not None:
+        stats["async"] = _async_pool.get_stats()
+    return stats
+
+
+def close_postgres_checkpointer() -> None:
+    """Fermer le pool synchrone"""
+    global _pool, _checkpointer
+    with _lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+        _checkpointer = None
+
+
+async def close_async_postgres_checkpointer() -> None:
+    """Fermer le pool async"""
+    global _async_pool, _async_checkpointer
+    if _async_pool is not None:
+        await _async_pool.close()
+    _async_pool = None
+    _async_checkpointer = None
@@ -1,4 +1,7 @@
 import os
+import threading
+from typing import Optional
+
 from langgraph.checkpoint.redis import RedisSaver
 from dotenv import load_dotenv
 load_dotenv()
@@ -10,6 +13,17 @@ ttl_config = {
    "refresh_on_read": True
 }
 
-CHECKPOINTER_REDIS = RedisSaver(REDIS_URL, ttl=ttl_config)
-CHECKPOINTER_REDIS.setup()
+_lock = threading.Lock()
+_checkpointer: Optional[RedisSaver] = None
+
 
+def get_redis_checkpointer() -> RedisSaver:
+    """Checkpointer Redis du mode test (playground), créé au premier appel"""
+    global _checkpointer
+    if _checkpointer is None:
+        with _lock:
+            if _checkpointer is None:
+                checkpointer = RedisSaver(REDIS_URL, ttl=ttl_config)
+                checkpointer.setup()
+                _checkpointer = checkpointer
+    return _checkpointer
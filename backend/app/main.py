@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.routers import (
@@ -20,6 +20,7 @@ from app.routers import (
     monitoring,
     analytics,
 )
+from app.core.metrics import WebhookAckTimer, render_latest
 import logging
 import datetime
 
@@ -54,6 +55,15 @@ async def lifespan(app: FastAPI):
     await close_async_db()
     logging.info("✅ Async Supabase client closed")
 
+    # Close LangGraph checkpointer pools (only opened if an agent ran)
+    from app.deps.runtime_prod import (
+        close_postgres_checkpointer,
+        close_async_postgres_checkpointer,
+    )
+    close_postgres_checkpointer()
+    await close_async_postgres_checkpointer()
+    logging.info("✅ Checkpointer pools closed")
+
     logging.info("🛑 FastAPI shutdown complete")
 
 
@@ -80,6 +90,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latence d'acquittement des webhooks (Prometheus, voir /metrics)
+app.add_middleware(
+    WebhookAckTimer,
+    paths={
+        "/api/whatsapp/webhook": "whatsapp",
+        "/api/instagram/webhook": "instagram",
+        "/api/messenger/webhook": "messenger",
+    },
+)
+
 # Inclusion des routes
 app.include_router(social_accounts.router, prefix="/api")
 app.include_router(whatsapp.router, prefix="/api")
@@ -153,23 +173,30 @@ async def system_health():
 
     return {
         "system": "healthy",
-        "scanner": batch_scanner.get_health_status(),
-        "timestamp": datetime.now().isoformat(),
+        "scanner": await batch_scanner.get_health_status(),
+        "timestamp": datetime.datetime.now().isoformat(),
         "version": "1.0.0",
     }
 
 
 @app.get("/api/metrics")
 async def system_metrics():
-    """Métriques détaillées du système"""
+    """Métriques détaillées du système (scanners des workers batching)"""
     from app.services.batch_scanner import batch_scanner
 
-    metrics = batch_scanner.get_metrics()
-    health = batch_scanner.get_health_status()
+    metrics = await batch_scanner.get_metrics()
+    health = await batch_scanner.get_health_status()
 
     return {
         "scanner_metrics": metrics,
         "health_status": health,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.datetime.now().isoformat(),
         "version": "1.0.0",
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Export Prometheus des processus API (multiprocess si PROMETHEUS_MULTIPROC_DIR)"""
+    content, content_type = render_latest()
+    return Response(content=content, media_type=content_type)
@@ -8,6 +8,7 @@ from app.schemas.ai_settings import (
     AITestRequest,
     AITestResponse,
     AIResponse,
+    AnswerCacheStats,
 )
 from app.schemas.ai_decisions import (
     CheckMessageRequest,
@@ -17,13 +18,13 @@ from app.schemas.ai_decisions import (
 )
 from app.services.ai_decision_service import AIDecisionService
 from app.core.security import get_current_user_id
+from app.services.answer_cache import semantic_answer_cache
+from app.services.knowledge_version import bump_knowledge_version
 import time
 import random
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from app.services.rag_agent import RAGAgent
-from app.deps.runtime_test import CHECKPOINTER_REDIS
 from langchain_core.messages import HumanMessage
 from typing import List, Optional
 from datetime import datetime
@@ -150,6 +151,7 @@ async def update_ai_settings(
         )
 
         if result.data:
+            bump_knowledge_version(current_user_id)
             return AISettings(**result.data[0])
         else:
             raise HTTPException(status_code=404, detail="AI settings not found")
@@ -167,6 +169,10 @@ async def test_ai_response(
     db: Client = Depends(get_authenticated_db),
     current_user_id: str = Depends(get_current_user_id),
 ):
+    # LangGraph stack loaded on first test, not at API startup
+    from app.services.rag_agent import RAGAgent
+    from app.deps.runtime_test import get_redis_checkpointer
+
     try:
         print("=== AI TEST REQUEST DEBUG ===")
         print(f"User ID: {current_user_id}")
@@ -182,8 +188,9 @@ async def test_ai_response(
             conversation_id=test_request.thread_id,
             model_name=test_request.settings.ai_model,
             system_prompt=test_request.settings.system_prompt,
-            checkpointer=CHECKPOINTER_REDIS,
+            checkpointer=get_redis_checkpointer(),
             test_mode=True,
+            fallback_models=test_request.settings.ai_fallback_models or None,
         )
         print("RAGAgent created successfully")
 
@@ -280,6 +287,7 @@ async def reset_to_template(
         )
 
         if result.data:
+            bump_knowledge_version(current_user_id)
             return {"message": f"Settings reset to {template_type} template"}
         else:
             raise HTTPException(status_code=404, detail="AI settings not found")
@@ -472,3 +480,14 @@ async def get_decisions_stats(
         return stats
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/answer-cache/stats", response_model=AnswerCacheStats)
+async def get_answer_cache_stats(
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """
+    Get semantic answer cache statistics
+    Returns lookups, hit rate and tokens saved by cached answers
+    """
+    return AnswerCacheStats(**semantic_answer_cache.get_metrics(current_user_id))
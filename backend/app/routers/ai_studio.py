@@ -16,7 +16,7 @@ from app.services.content_creation_agent import (
     ContentCreationAgent,
     CONTENT_CREATION_SYSTEM_PROMPT,
 )
-from app.deps.runtime_prod import CHECKPOINTER_POSTGRES
+from app.deps.runtime_prod import get_postgres_checkpointer
 from app.schemas.ai_studio_settings import (
     AIStudioSettings,
     AIStudioSettingsUpdate,
@@ -108,7 +108,7 @@ async def create_content(
             user_id=current_user_id,
             model_name=model_to_use,
             system_prompt=system_prompt_to_use,
-            checkpointer=CHECKPOINTER_POSTGRES,
+            checkpointer=get_postgres_checkpointer(),
             max_iterations=10,
         )
 
@@ -397,7 +397,7 @@ async def get_conversation_messages(
         agent = ContentCreationAgent(
             user_id=current_user_id,
             model_name="openai/gpt-4o",
-            checkpointer=CHECKPOINTER_POSTGRES,
+            checkpointer=get_postgres_checkpointer(),
         )
 
         config = {"configurable": {"thread_id": thread_id, "user_id": current_user_id}}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
 from typing import List, Optional
 import logging
 
@@ -7,8 +7,9 @@ from app.schemas.conversation import (
  Message, ConversationListResponse, MessageListResponse,
     SendMessageRequest, ConversationQueryParams
 )
-from app.schemas.conversation import ConversationAIModeRequest
+from app.schemas.conversation import ConversationAIModeRequest, ConversationLatencyResponse
 from app.services.conversation_service import ConversationService
+from app.services.latency_breakdown import latency_store, LATENCY_HISTORY_SIZE
 from app.core.security import get_current_user_id
 router = APIRouter(prefix="/conversations", tags=["Conversations"])
 logger = logging.getLogger(__name__)
@@ -16,26 +17,34 @@ logger = logging.getLogger(__name__)
 @router.get("", response_model=ConversationListResponse)
 async def get_user_conversations(
     channel: Optional[str] = Query(None, description="Filtrer par canal: whatsapp, instagram, all"),
-    limit: int = Query(50, le=100),
+    limit: int = Query(50, le=500),
+    cursor: Optional[str] = Query(None, description="Curseur de pagination (next_cursor de la page précédente)"),
     current_user_id: str = Depends(get_current_user_id),
     db = Depends(get_authenticated_db)
 ):  
     """
-    Récupère toutes les conversations de l'utilisateur connecté
+    Récupère les conversations de l'utilisateur connecté (pagination keyset)
     """
     try:
         service = ConversationService(db)
-        conversations = service.get_user_conversations(
+        conversations, next_cursor = service.get_user_conversations(
             user_id=current_user_id,
             channel=channel,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
         return ConversationListResponse(
             conversations=conversations,
-            total=len(conversations)
+            total=len(conversations),
+            next_cursor=next_cursor
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des conversations: {e}")
         raise HTTPException(
@@ -46,29 +55,43 @@ async def get_user_conversations(
 @router.get("/{conversation_id}/messages", response_model=MessageListResponse)
 async def get_conversation_messages(
     conversation_id: str,
-    limit: int = Query(100, le=200),
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Messages plus anciens que ce message (id ou timestamp ISO)"),
+    after: Optional[str] = Query(None, description="Mode delta: messages plus récents que ce message (id ou timestamp ISO)"),
     current_user_id: str = Depends(get_current_user_id),
     db = Depends(get_authenticated_db)    
 ):
     """
     Récupère les messages d'une conversation spécifique
+
+    Supporte If-None-Match: 304 si la page n'a pas changé depuis le dernier poll.
     """
     try:
         service = ConversationService(db)
-        messages = await service.get_conversation_messages(
+        page = await service.get_conversation_messages(
             conversation_id=conversation_id,
             user_id=current_user_id,
-            limit=limit
+            limit=limit,
+            before=before,
+            after=after
         )
-        
+
+        etag = page['etag']
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
         return MessageListResponse(
-            messages=messages,
-            total=len(messages)
+            messages=page['messages'],
+            total=len(page['messages']),
+            has_more=page['has_more']
         )
         
     except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
@@ -215,3 +238,30 @@ async def update_conversation_ai_mode(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour du mode IA: {str(e)}"
         )
+
+
+@router.get("/{conversation_id}/latency", response_model=ConversationLatencyResponse)
+async def get_conversation_latency(
+    conversation_id: str,
+    limit: int = Query(LATENCY_HISTORY_SIZE, ge=1, le=LATENCY_HISTORY_SIZE),
+    current_user_id: str = Depends(get_current_user_id),
+    db = Depends(get_authenticated_db)
+):
+    """Temps de réponse des dernières réponses IA, détaillés par étape"""
+    try:
+        # Vérifier que la conversation existe et appartient à l'utilisateur
+        conversation_check = db.table("conversations").select("id").eq("id", conversation_id).execute()
+        if not conversation_check.data:
+            raise HTTPException(status_code=404, detail="Conversation non trouvée")
+
+        replies = await latency_store.get_recent(conversation_id, limit)
+        return ConversationLatencyResponse(conversation_id=conversation_id, replies=replies)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des latences: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la récupération des latences: {str(e)}"
+        )
@@ -8,6 +8,7 @@ from app.schemas.faq_qa_service import (
     FAQQuestionsAddRequest, FAQQuestionsUpdateRequest, FAQQuestionsDeleteRequest
 )
 from app.core.security import get_current_user_id
+from app.services.knowledge_version import bump_knowledge_version
 
 router = APIRouter(prefix="/faq-qa", tags=["FAQ Q&A"])
 
@@ -80,6 +81,7 @@ async def create_faq_qa(
         print(f"Données à insérer: {data}")
         result = db.table("faq_qa").insert(data).execute()
         print(f"Résultat de l'insertion: {result}")
+        bump_knowledge_version(current_user_id)
         return FAQQA(**result.data[0])
     except Exception as e:
         print(f"Erreur détaillée lors de la création de la FAQ: {str(e)}")
@@ -112,6 +114,7 @@ async def toggle_faq_qa(
         }).eq("id", faq_id).execute()
 
         print(f"FAQ {faq_id} {'activée' if new_status else 'désactivée'}")
+        bump_knowledge_version(current_user_id)
         return {
             "message": f"FAQ {'activée' if new_status else 'désactivée'} avec succès",
             "is_active": new_status
@@ -140,6 +143,7 @@ async def delete_faq_qa(
         # Suppression définitive (hard delete)
         db.table("faq_qa").delete().eq("id", faq_id).execute()
         print(f"FAQ {faq_id} supprimée définitivement")
+        bump_knowledge_version(current_user_id)
         return {"message": "FAQ supprimée définitivement avec succès"}
     except HTTPException:
         raise
@@ -170,7 +174,7 @@ async def add_faq_questions(
             "questions": updated_questions,
             "updated_at": "now()"
         }).eq("id", faq_id).execute()
-        
+        bump_knowledge_version(current_user_id)
         return {"message": f"{len(request.items)} questions ajoutées avec succès", "questions": updated_questions}
     except HTTPException:
         raise
@@ -212,7 +216,7 @@ async def update_faq_questions(
             "questions": updated_questions,
             "updated_at": "now()"
         }).eq("id", faq_id).execute()
-        
+        bump_knowledge_version(current_user_id)
         return {"message": f"{len(request.updates)} questions mises à jour", "questions": updated_questions}
     except HTTPException:
         raise
@@ -254,7 +258,7 @@ async def delete_faq_questions(
             "questions": updated_questions,
             "updated_at": "now()"
         }).eq("id", faq_id).execute()
-        
+        bump_knowledge_version(current_user_id)
         return {"message": f"{len(request.indexes)} questions supprimées", "questions": updated_questions}
     except HTTPException:
         raise
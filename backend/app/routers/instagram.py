@@ -19,11 +19,13 @@ from app.schemas.instagram import (
     ConversationsResponse,
     CommentReplyResponse,
 )
+from app.core.tracing import webhook_trace
 from app.services.instagram_service import get_instagram_service, InstagramService
 from app.services.response_manager import (
     process_incoming_message_for_user,
     get_user_credentials_by_platform_account,
 )
+from app.services.comment_ingestion import dispatch_comment_changes
 
 router = APIRouter(prefix="/instagram", tags=["Instagram"])
 logger = logging.getLogger(__name__)
@@ -235,9 +237,12 @@ async def instagram_webhook_handler(request: Request):
         webhook_data = await request.json()
         logger.info(f"Webhook Instagram received: {webhook_data}")
 
-        for entry in webhook_data.get("entry", []):
-            logger.info(f"Processing Instagram webhook for entry: {entry}")
-            await process_instagram_webhook_entry_with_user_routing(entry)
+        with webhook_trace("instagram"):
+            for entry in webhook_data.get("entry", []):
+                logger.info(f"Processing Instagram webhook for entry: {entry}")
+                dispatch_comment_changes(entry)
+                if entry.get("messaging"):
+                    await process_instagram_webhook_entry_with_user_routing(entry)
 
         return {"status": "ok"}
 
@@ -7,6 +7,7 @@ import logging
 import uuid as uuid_lib
 from app.schemas.knowledge_documents import KnowledgeDocument
 from app.core.security import get_current_user_id
+from app.services.knowledge_version import bump_knowledge_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/knowledge_documents", tags=["Knowledge Documents"])
@@ -99,7 +100,8 @@ async def get_knowledge_document(
 async def delete_knowledge_document(
     document_id: UUID,
     request: Request,
-    db: Client = Depends(get_authenticated_db)
+    db: Client = Depends(get_authenticated_db),
+    current_user_id: str = Depends(get_current_user_id)
 ):
     try:
         print(f"🗑️ Deleting document: {document_id}")
@@ -127,6 +129,8 @@ async def delete_knowledge_document(
                 print(f"⚠️ Warning: Could not delete from storage: {storage_error}")
                 # Don't fail the whole operation if storage deletion fails
 
+        bump_knowledge_version(current_user_id)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -9,7 +9,10 @@ from typing import Dict, Any
 
 load_dotenv()
 
+from app.core.tracing import webhook_trace
 from app.services.messenger_service import get_messenger_service, MessengerService
+from app.services.comment_ingestion import dispatch_comment_changes
+from app.services.status_store import status_store
 from app.services.response_manager import (
     process_incoming_message_for_user,
     get_user_credentials_by_platform_account,
@@ -152,9 +155,17 @@ async def messenger_webhook_handler(request: Request):
         #   ]
         # }
 
-        for entry in webhook_data.get("entry", []):
-            logger.info(f"Processing Messenger webhook entry for Page ID: {entry.get('id')}")
-            await process_messenger_webhook_entry_with_user_routing(entry)
+        # Instagram accounts linked to a Page may be subscribed on this callback:
+        # their `comments` changes go to the comment moderation push path
+        if webhook_data.get("object") == "instagram":
+            for entry in webhook_data.get("entry", []):
+                dispatch_comment_changes(entry)
+            return {"status": "ok"}
+
+        with webhook_trace("messenger"):
+            for entry in webhook_data.get("entry", []):
+                logger.info(f"Processing Messenger webhook entry for Page ID: {entry.get('id')}")
+                await process_messenger_webhook_entry_with_user_routing(entry)
 
         return {"status": "ok"}
 
@@ -265,13 +276,15 @@ async def process_messenger_message_event(message_event: Dict[str, Any], user_in
         elif "delivery" in message_event:
             delivery = message_event["delivery"]
             logger.debug(f"📬 Message delivery confirmed: {delivery.get('mids', [])}")
-            # TODO: Update message status to 'delivered' in database
+            for mid in delivery.get("mids", []):
+                await status_store.add_status(
+                    mid, "delivered", timestamp=delivery.get("watermark"), platform="messenger"
+                )
 
         # Handle message read receipts
         elif "read" in message_event:
             read = message_event["read"]
             logger.debug(f"👁️ Message read: watermark={read.get('watermark')}")
-            # TODO: Update message status to 'read' in database
 
         # Handle postbacks (button clicks, get started, etc.)
         elif "postback" in message_event:
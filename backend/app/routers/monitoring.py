@@ -34,10 +34,12 @@ async def sync_instagram_posts(
     """
     Import Instagram posts and apply auto-monitoring rules
 
-    If no social_account_id specified, uses first connected Instagram account
+    If no social_account_id specified, uses first connected Instagram account.
+    Large accounts are imported over several calls: when has_more is true,
+    call again with resume=true to continue from the stored cursor.
 
     Args:
-        request: Sync configuration (account_id, limit)
+        request: Sync configuration (account_id, limit, resume)
 
     Returns:
         SyncInstagramPostsResponse with import metrics
@@ -66,15 +68,19 @@ async def sync_instagram_posts(
 
         result = await service.sync_instagram_posts(
             social_account_id,
-            limit=request.limit
+            limit=request.limit,
+            resume=request.resume
         )
 
         return SyncInstagramPostsResponse(
             success=result["success"],
             posts_imported=result["posts_imported"],
             posts_monitored=result["posts_monitored"],
+            has_more=result["has_more"],
+            next_cursor=result["next_cursor"],
             message=f"Successfully imported {result['posts_imported']} posts, "
                     f"{result['posts_monitored']} enabled for monitoring"
+                    + (" (more posts available, sync again with resume=true)" if result["has_more"] else "")
         )
 
     except ValueError as e:
@@ -2,7 +2,8 @@
 from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional
-from app.workers.ingest import process_document_task
+# Sent by name: the API does not import the ingest worker (document parsers)
+from app.workers.celery_app import celery
 router = APIRouter(prefix="/functions/v1", tags=["Ingestion"])
 
 class ProcessDocumentRequest(BaseModel):
@@ -11,7 +12,9 @@ class ProcessDocumentRequest(BaseModel):
 @router.post("/process")
 async def process_document(request: ProcessDocumentRequest, authorization: Optional[str] = Header(None)):
     try:
-        task = process_document_task.delay(request.document_id)
+        task = celery.send_task(
+            "app.workers.ingest.process_document", args=[request.document_id]
+        )
         return {"document_id": request.document_id, "job_id": task.id, "status": "queued"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,42 +1,49 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import logging
 
-from app.db.session import get_authenticated_db, get_db
+from app.db.session import get_db
 from app.core.security import get_current_user_id
-from app.services.user_data_deletion_service import UserDataDeletionService, DeletionResult
+from app.services.user_data_deletion_service import create_deletion_job, get_deletion_job
+# Sent by name: the API does not import the worker modules
+from app.workers.celery_app import celery
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/user-data", tags=["user-data"])
 
 
-class UserDataDeletionResponse(BaseModel):
-    """Response model for user data deletion operations."""
-    user_id: str
-    deleted_counts: Dict[str, int]
-    storage_deleted: List[str]
-    cache_keys_deleted: List[str]
-    errors: List[str]
-    success: bool
+class UserDataDeletionJobResponse(BaseModel):
+    """Deletion job and its progress."""
+    job_id: str
+    status: str
+    phase: Optional[str] = None
+    totals: Dict[str, int] = {}
+    deleted: Dict[str, int] = {}
+    errors: List[Dict[str, Any]] = []
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
 
     @classmethod
-    def from_deletion_result(cls, result: DeletionResult) -> "UserDataDeletionResponse":
+    def from_job(cls, job: Dict[str, Any]) -> "UserDataDeletionJobResponse":
         return cls(
-            user_id=result.user_id,
-            deleted_counts=result.deleted_counts,
-            storage_deleted=result.storage_deleted,
-            cache_keys_deleted=result.cache_keys_deleted,
-            errors=result.errors,
-            success=len(result.errors) == 0
+            job_id=job["id"],
+            status=job["status"],
+            phase=job.get("phase"),
+            totals=job.get("totals") or {},
+            deleted=job.get("deleted") or {},
+            errors=job.get("errors") or [],
+            created_at=job.get("created_at"),
+            started_at=job.get("started_at"),
+            completed_at=job.get("completed_at"),
         )
 
 
-@router.delete("/delete", response_model=UserDataDeletionResponse)
+@router.delete("/delete", response_model=UserDataDeletionJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def delete_user_data(
     current_user_id: str = Depends(get_current_user_id),
-    auth_db = Depends(get_authenticated_db),
     service_db = Depends(get_db)
 ):
     """
@@ -46,44 +53,27 @@ async def delete_user_data(
     All conversations, messages, social accounts, knowledge documents, and user settings
     will be permanently deleted. This action cannot be undone.
 
-    Returns a detailed report of what was deleted and any errors encountered.
+    The deletion runs in the background: the response is the deletion job
+    (the active one if a deletion is already in progress), whose progress is
+    available at GET /user-data/delete/{job_id}.
     """
     try:
-        logger.info(f"Starting user data deletion for user: {current_user_id}")
-
-        # Initialize the deletion service
-        deletion_service = UserDataDeletionService(
-            auth_db=auth_db,
-            service_db=service_db,
-            user_id=current_user_id
-        )
-
-        # Execute the deletion
-        result = await deletion_service.delete_user_data()
-
-        # Log the results
-        total_deleted = sum(result.deleted_counts.values())
-        logger.info(f"User data deletion completed for {current_user_id}: "
-                   f"{total_deleted} records deleted, "
-                   f"{len(result.errors)} errors, "
-                   f"{len(result.storage_deleted)} storage objects removed, "
-                   f"{len(result.cache_keys_deleted)} cache keys cleared")
-
-        # Return the result
-        return UserDataDeletionResponse.from_deletion_result(result)
-
+        job = create_deletion_job(service_db, current_user_id)
+        celery.send_task("app.workers.deletion.run_user_deletion", args=[job["id"]])
     except Exception as e:
-        logger.error(f"Critical error during user data deletion for {current_user_id}: {e}")
+        logger.error(f"Error starting user data deletion for {current_user_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Critical error during data deletion: {str(e)}"
+            detail=f"Could not start data deletion: {str(e)}"
         )
 
+    logger.info(f"User data deletion job {job['id']} queued for user: {current_user_id}")
+    return UserDataDeletionJobResponse.from_job(job)
+
 
-@router.post("/delete", response_model=UserDataDeletionResponse)
+@router.post("/delete", response_model=UserDataDeletionJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def delete_user_data_post(
     current_user_id: str = Depends(get_current_user_id),
-    auth_db = Depends(get_authenticated_db),
     service_db = Depends(get_db)
 ):
     """
@@ -92,8 +82,21 @@ async def delete_user_data_post(
     Same functionality as the DELETE endpoint, but accessible via POST method.
     """
     # Reuse the same logic as the DELETE endpoint
-    return await delete_user_data(current_user_id, auth_db, service_db)
-
+    return await delete_user_data(current_user_id, service_db)
 
 
+@router.get("/delete/{job_id}", response_model=UserDataDeletionJobResponse)
+async def get_user_data_deletion(
+    job_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    service_db = Depends(get_db)
+):
+    """
+    Progress of a deletion job of the authenticated user.
 
+    Still readable once the account rows are deleted (the job outlives them).
+    """
+    job = get_deletion_job(service_db, job_id)
+    if not job or job["user_id"] != current_user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion job not found")
+    return UserDataDeletionJobResponse.from_job(job)
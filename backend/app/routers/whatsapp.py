@@ -15,6 +15,7 @@ from app.schemas.whatsapp import (
     WhatsAppCredentialsValidation,
     WhatsAppCredentials,
 )
+from app.core.tracing import webhook_trace
 from app.services.whatsapp_service import get_whatsapp_service, WhatsAppService
 from app.services.response_manager import (
     get_user_credentials_by_platform_account,
@@ -52,7 +53,7 @@ async def send_text_message(request: TextMessageRequest):
     Uses the credentials of the connected user from the database
     """
     try:
-        user_credentials = get_user_credentials_by_platform_account(
+        user_credentials = await get_user_credentials_by_platform_account(
             platform="whatsapp", account_id=request.to
         )
 
@@ -161,8 +162,9 @@ async def webhook_handler(request: Request):
         webhook_data = await request.json()
         logger.info(f"Webhook received: {webhook_data}")
 
-        for entry in webhook_data.get("entry", []):
-            await process_webhook_entry_with_user_routing(entry)
+        with webhook_trace("whatsapp"):
+            for entry in webhook_data.get("entry", []):
+                await process_webhook_entry_with_user_routing(entry)
 
         return {"status": "ok"}
 
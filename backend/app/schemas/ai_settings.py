@@ -16,6 +16,29 @@ AIModelType = Literal[
     "google/gemini-2.5-pro"
 ]
 
+# Modèles acceptés (ai_model, ai_fallback_models)
+VALID_AI_MODELS = [
+    "x-ai/grok-4", "x-ai/grok-4-fast",
+    "openai/gpt-4o", "openai/gpt-4o-mini", "openai/gpt-5", "openai/gpt-5-mini",
+    "anthropic/claude-3.5-sonnet", "anthropic/claude-sonnet-4", "anthropic/claude-sonnet-4.5",
+    "anthropic/claude-3.5-haiku", "anthropic/claude-3-haiku",  # Anciens modèles
+    "google/gemini-2.5-flash", "google/gemini-2.5-pro"
+]
+MAX_FALLBACK_MODELS = 3
+
+
+def _validate_fallback_models(v):
+    """Unknown models are dropped, duplicates removed, at most MAX_FALLBACK_MODELS kept"""
+    if v is None:
+        return v
+    models = []
+    for model in v:
+        if model not in VALID_AI_MODELS:
+            print(f"WARNING: Unknown fallback model '{model}', ignored")
+        elif model not in models:
+            models.append(model)
+    return models[:MAX_FALLBACK_MODELS]
+
 ToneType = Literal[
     "friendly",
     "professional", 
@@ -34,6 +57,7 @@ class AISettingsBase(BaseModel):
     # LLM Configuration
     system_prompt: str = Field(..., min_length=10, max_length=5000)
     ai_model: str = Field(default="openai/gpt-4o", description="AI model identifier")
+    ai_fallback_models: List[str] = Field(default_factory=list, description="Models tried in order when ai_model is slow or failing (empty: platform defaults)")
     temperature: float = Field(default=0.20, ge=0.0, le=2.0)
     top_p: float = Field(default=1.00, ge=0.0, le=1.0)
     lang: LangType = "en"
@@ -55,6 +79,9 @@ class AISettingsBase(BaseModel):
     instructions: Optional[str] = Field(None, description="Free-text instructions for AI behavior")
     ignore_examples: List[str] = Field(default_factory=list, description="Array of example messages to NOT respond to")
 
+    # Semantic answer cache
+    answer_cache_enabled: bool = Field(default=True, description="Answer near-duplicate standalone questions from the cache")
+
     @field_validator('doc_lang', mode='before')
     @classmethod
     def parse_doc_lang(cls, v):
@@ -65,21 +92,17 @@ class AISettingsBase(BaseModel):
     @field_validator('ai_model', mode='before')
     @classmethod
     def validate_ai_model(cls, v):
-        # Liste des modèles valides
-        valid_models = [
-            "x-ai/grok-4", "x-ai/grok-4-fast",
-            "openai/gpt-4o", "openai/gpt-4o-mini", "openai/gpt-5", "openai/gpt-5-mini",
-            "anthropic/claude-3.5-sonnet", "anthropic/claude-sonnet-4", "anthropic/claude-sonnet-4.5",
-            "anthropic/claude-3.5-haiku", "anthropic/claude-3-haiku",  # Anciens modèles
-            "google/gemini-2.5-flash", "google/gemini-2.5-pro"
-        ]
-
         # Si le modèle n'est pas dans la liste, utiliser le défaut
-        if v not in valid_models:
+        if v not in VALID_AI_MODELS:
             print(f"WARNING: Unknown ai_model '{v}', using default 'openai/gpt-4o'")
             return "openai/gpt-4o"
         return v
 
+    @field_validator('ai_fallback_models', mode='before')
+    @classmethod
+    def validate_ai_fallback_models(cls, v):
+        return _validate_fallback_models(v) if v is not None else []
+
 class AISettingsCreate(AISettingsBase):
     pass
 
@@ -87,6 +110,7 @@ class AISettingsUpdate(BaseModel):
     # LLM Configuration
     system_prompt: Optional[str] = Field(None, min_length=10, max_length=5000)
     ai_model: Optional[str] = Field(None, description="AI model identifier")
+    ai_fallback_models: Optional[List[str]] = Field(None, description="Models tried in order when ai_model is slow or failing")
     temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
     top_p: Optional[float] = Field(None, ge=0.0, le=1.0)
     lang: Optional[LangType] = None
@@ -108,6 +132,14 @@ class AISettingsUpdate(BaseModel):
     instructions: Optional[str] = Field(None, description="Free-text instructions for AI")
     ignore_examples: Optional[List[str]] = Field(None, description="Example messages to ignore")
 
+    # Semantic answer cache
+    answer_cache_enabled: Optional[bool] = Field(None, description="Enable the semantic answer cache")
+
+    @field_validator('ai_fallback_models', mode='before')
+    @classmethod
+    def validate_ai_fallback_models(cls, v):
+        return _validate_fallback_models(v)
+
 class AISettings(AISettingsBase):
     model_config = ConfigDict(from_attributes=True, extra='ignore')
 
@@ -132,6 +164,16 @@ class AITestResponse(BaseModel):
     response: str
     response_time: float
     confidence: float
+
+class AnswerCacheStats(BaseModel):
+    """Statistiques du cache sémantique des réponses"""
+    lookups: int
+    hits: int
+    misses: int
+    stores: int
+    hit_rate: float
+    tokens_saved: int
+
 class AIResponse(BaseModel):
     """Json format for the response"""
     response: str
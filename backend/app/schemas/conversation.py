@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class Conversation(BaseModel):
@@ -15,6 +15,7 @@ class Conversation(BaseModel):
     tags: Optional[List[str]] = None
     metadata: Optional[dict] = None
     last_message_at: Optional[datetime] = None
+    last_inbound_at: Optional[datetime] = None
     unread_count: int = 0
     automation_disabled: bool = False
     ai_mode: Optional[str] = "ON"
@@ -75,10 +76,12 @@ class SendMessageRequest(BaseModel):
 class ConversationListResponse(BaseModel):
     conversations: List[Conversation]
     total: int
+    next_cursor: Optional[str] = None
 
 class MessageListResponse(BaseModel):
     messages: List[Message]
     total: int
+    has_more: bool = False
 
 class ConversationQueryParams(BaseModel):
     channel: Optional[str] = None
@@ -93,4 +96,19 @@ class ConversationAIModeRequest(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {"mode": "OFF"}
-        }
\ No newline at end of file
+        }
+
+class ReplyLatency(BaseModel):
+    recorded_at: datetime
+    platform: Optional[str] = None
+    outcome: str
+    trace_id: Optional[str] = Field(None, description="OpenTelemetry trace id (sampled replies only)")
+    message_count: int = 0
+    total_ms: Optional[float] = Field(None, description="First inbound message to end of processing")
+    stages: Dict[str, float] = Field(default_factory=dict, description="Stage durations (ms)")
+    counts: Dict[str, int] = Field(default_factory=dict, description="Runs per stage")
+
+
+class ConversationLatencyResponse(BaseModel):
+    conversation_id: str
+    replies: List[ReplyLatency]
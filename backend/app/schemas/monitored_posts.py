@@ -75,7 +75,8 @@ class MonitoringRulesInDB(MonitoringRulesBase):
 class SyncInstagramPostsRequest(BaseModel):
     """Request schema for syncing Instagram posts"""
     social_account_id: Optional[str] = Field(None, description="Specific account to sync (optional)")
-    limit: int = Field(50, ge=1, le=100, description="Max number of posts to import")
+    limit: int = Field(50, ge=1, le=10000, description="Max number of posts to import")
+    resume: bool = Field(False, description="Continue the previous import from its stored cursor")
 
 
 class SyncInstagramPostsResponse(BaseModel):
@@ -83,6 +84,8 @@ class SyncInstagramPostsResponse(BaseModel):
     success: bool
     posts_imported: int
     posts_monitored: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
     message: str
 
 
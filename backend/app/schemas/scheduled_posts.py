@@ -22,6 +22,13 @@ class PostStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class PublishStage(str, Enum):
+    """Resumable publishing stage (Instagram container flow)"""
+    CREATE_CONTAINER = "create_container"
+    CHECK_STATUS = "check_status"
+    PUBLISH = "publish"
+
+
 class RunStatus(str, Enum):
     """Execution run status"""
     SUCCESS = "success"
@@ -112,6 +119,7 @@ class ScheduledPostResponse(BaseModel):
     platform_post_id: Optional[str]
     error_message: Optional[str]
     retry_count: int
+    publish_stage: Optional[PublishStage] = None
     last_check_at: Optional[datetime] = None
     next_check_at: Optional[datetime] = None
     stop_at: Optional[datetime] = None
@@ -6,15 +6,24 @@ et OpenAI Moderation API
 
 import os
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Tuple, Optional, Dict, Any
 from difflib import SequenceMatcher
 from supabase import Client
 from openai import OpenAI
+from app.core.metrics import MODERATION_SECONDS
+from app.core.tracing import stage
 from app.schemas.ai_decisions import AIDecision
 from app.db.session import get_db
 
 logger = logging.getLogger(__name__)
 
+# Decision logging is off the reply path: inserts run on a small shared pool
+_decision_log_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="ai-decision-log"
+)
+
 
 class AIDecisionService:
     """Service pour évaluer si l'IA doit répondre à un message"""
@@ -180,12 +189,21 @@ class AIDecisionService:
             if not moderation_input:
                 moderation_input = text
 
-            response = self.openai_client.moderations.create(
-                model="omni-moderation-latest",
-                input=moderation_input
-            )
+            moderation_start = time.perf_counter()
+            try:
+                with stage("moderation"):
+                    response = self.openai_client.moderations.create(
+                        model="omni-moderation-latest",
+                        input=moderation_input
+                    )
+            except Exception:
+                MODERATION_SECONDS.labels(outcome="error").observe(time.perf_counter() - moderation_start)
+                raise
 
             result = response.results[0]
+            MODERATION_SECONDS.labels(outcome="flagged" if result.flagged else "passed").observe(
+                time.perf_counter() - moderation_start
+            )
 
             if result.flagged:
                 categories_dict = result.categories.model_dump()
@@ -258,16 +276,9 @@ class AIDecisionService:
             Dict with the ID of the created decision (or None if error)
         """
         try:
-            data = {
-                "user_id": self.user_id,
-                "message_id": message_id,
-                "decision": decision.value,
-                "confidence": float(confidence),
-                "reason": reason,
-                "matched_rule": matched_rule,
-                "message_text": message_text[:500],  # Limiter taille
-                "snapshot_json": {"version": "1.0"},
-            }
+            data = self._decision_payload(
+                message_id, message_text, decision, confidence, reason, matched_rule
+            )
 
             result = self.db.table("ai_decisions").insert(data).execute()
             logger.info(
@@ -281,3 +292,48 @@ class AIDecisionService:
         except Exception as e:
             logger.error(f"Error logging AI decision: {e}")
             return None
+
+    def _decision_payload(
+        self,
+        message_id: Optional[str],
+        message_text: str,
+        decision: AIDecision,
+        confidence: float,
+        reason: str,
+        matched_rule: str,
+    ) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "message_id": message_id,
+            "decision": decision.value,
+            "confidence": float(confidence),
+            "reason": reason,
+            "matched_rule": matched_rule,
+            "message_text": message_text[:500],  # Limiter taille
+            "snapshot_json": {"version": "1.0"},
+        }
+
+    def log_decision_background(
+        self,
+        message_id: Optional[str],
+        message_text: str,
+        decision: AIDecision,
+        confidence: float,
+        reason: str,
+        matched_rule: str,
+    ) -> Future:
+        """
+        Fire-and-forget variant of log_decision
+
+        The insert runs on a background thread so the caller does not wait for
+        the DB round trip. Errors are logged by log_decision itself.
+        """
+        return _decision_log_executor.submit(
+            self.log_decision,
+            message_id,
+            message_text,
+            decision,
+            confidence,
+            reason,
+            matched_rule,
+        )
@@ -0,0 +1,248 @@
+"""
+Semantic answer cache per user
+
+Tenants receive the same few questions ("prix ?", "horaires", "livraison à
+Douala ?") over and over. Answers generated for standalone questions (first
+turn of a conversation, text only) are stored with the question embedding;
+a near-duplicate question (cosine similarity above the threshold) is answered
+from the cache instead of running the agent.
+
+Redis layout (per user and knowledge version, see knowledge_version.py):
+    answer_cache:{user_id}:v{version}:entries  hash  entry_id -> JSON entry
+    answer_cache:{user_id}:v{version}:lru      zset  entry_id -> last use
+    answer_cache:metrics:{user_id}             hash  lookups/hits/stores/tokens_saved
+
+Entries are evicted LRU beyond ANSWER_CACHE_MAX_ENTRIES and expire after
+ANSWER_CACHE_TTL_SECONDS. A bump of the knowledge version orphans the previous
+keys, which then expire with their TTL.
+"""
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import redis
+
+from app.services.knowledge_version import get_knowledge_version
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 3600)))
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "200"))
+# Only short questions are cached; long messages carry their own context
+MAX_QUESTION_CHARS = int(os.getenv("ANSWER_CACHE_MAX_QUESTION_CHARS", "300"))
+
+
+class SemanticAnswerCache:
+    """Cache sémantique des réponses, par utilisateur et version de la base de connaissances"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self._client: Optional[redis.Redis] = None
+        self._lock = threading.Lock()
+
+    def _get_redis(self) -> redis.Redis:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = redis.Redis.from_url(
+                        self.redis_url, decode_responses=True, socket_timeout=2
+                    )
+        return self._client
+
+    def _get_keys(self, user_id: str, version: int) -> Dict[str, str]:
+        prefix = f"answer_cache:{user_id}:v{version}"
+        return {"entries": f"{prefix}:entries", "lru": f"{prefix}:lru"}
+
+    def _get_metrics_key(self, user_id: str) -> str:
+        return f"answer_cache:metrics:{user_id}"
+
+    @staticmethod
+    def _encode_embedding(embedding: List[float]) -> str:
+        return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode_embedding(encoded: str) -> np.ndarray:
+        return np.frombuffer(base64.b64decode(encoded), dtype=np.float32)
+
+    def is_eligible(self, question: Any, ai_settings: Dict[str, Any]) -> bool:
+        """
+        Whether a question may be answered from / stored in the cache
+
+        Text-only, short, cache enabled globally and for the tenant, and free of
+        the tenant's flagged keywords/phrases (those must go through guardrails).
+        """
+        if not ANSWER_CACHE_ENABLED or not ai_settings.get("answer_cache_enabled", True):
+            return False
+        if not isinstance(question, str):
+            return False
+        question = question.strip()
+        if not question or len(question) > MAX_QUESTION_CHARS:
+            return False
+
+        lowered = question.lower()
+        flagged = (ai_settings.get("flagged_keywords") or []) + (
+            ai_settings.get("flagged_phrases") or []
+        )
+        return not any(term and term.lower() in lowered for term in flagged)
+
+    def embed_question(self, question: str) -> Optional[List[float]]:
+        """Embedding of a question, compared to the cached questions"""
+        from app.services.ingest_helpers import embed_texts
+
+        try:
+            return embed_texts([question.strip()], task_type="semantic_similarity")[0]
+        except Exception as e:
+            logger.warning(f"[ANSWER CACHE] Embedding failed: {e}")
+            return None
+
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Knowledge version to use for a lookup and the following store
+
+        Read once before generating, so that an answer generated while the
+        knowledge base changes is stored under the old version.
+        """
+        return get_knowledge_version(user_id)
+
+    def lookup(
+        self, user_id: str, version: Optional[int], embedding: List[float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Closest cached answer above the similarity threshold
+
+        Returns:
+            {"answer", "question", "similarity", "tokens"} or None
+        """
+        if version is None:
+            return None
+
+        client = self._get_redis()
+        keys = self._get_keys(user_id, version)
+        metrics_key = self._get_metrics_key(user_id)
+        try:
+            client.hincrby(metrics_key, "lookups", 1)
+            raw_entries = client.hgetall(keys["entries"])
+            if not raw_entries:
+                client.hincrby(metrics_key, "misses", 1)
+                return None
+
+            now = time.time()
+            entry_ids, entries, vectors = [], [], []
+            expired = []
+            for entry_id, raw in raw_entries.items():
+                entry = json.loads(raw)
+                if now - entry["created_at"] > TTL_SECONDS:
+                    expired.append(entry_id)
+                    continue
+                entry_ids.append(entry_id)
+                entries.append(entry)
+                vectors.append(self._decode_embedding(entry["embedding"]))
+
+            if expired:
+                client.hdel(keys["entries"], *expired)
+                client.zrem(keys["lru"], *expired)
+
+            if not vectors:
+                client.hincrby(metrics_key, "misses", 1)
+                return None
+
+            # Embeddings are normalized: cosine similarity is a dot product
+            similarities = np.vstack(vectors) @ np.asarray(embedding, dtype=np.float32)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < SIMILARITY_THRESHOLD:
+                client.hincrby(metrics_key, "misses", 1)
+                return None
+
+            entry = entries[best]
+            with client.pipeline(transaction=False) as pipe:
+                pipe.zadd(keys["lru"], {entry_ids[best]: now})
+                pipe.hincrby(metrics_key, "hits", 1)
+                pipe.hincrby(metrics_key, "tokens_saved", int(entry.get("tokens") or 0))
+                pipe.execute()
+
+            return {
+                "answer": entry["answer"],
+                "question": entry["question"],
+                "similarity": similarity,
+                "tokens": entry.get("tokens") or 0,
+            }
+
+        except Exception as e:
+            logger.warning(f"[ANSWER CACHE] Lookup failed for {user_id}: {e}")
+            return None
+
+    def store(
+        self,
+        user_id: str,
+        version: Optional[int],
+        question: str,
+        embedding: List[float],
+        answer: str,
+        tokens: int = 0,
+    ) -> bool:
+        """Store a generated answer, evicting the least recently used entries"""
+        if version is None or not answer:
+            return False
+
+        client = self._get_redis()
+        keys = self._get_keys(user_id, version)
+        entry_id = uuid.uuid4().hex
+        now = time.time()
+        entry = {
+            "question": question.strip(),
+            "answer": answer,
+            "embedding": self._encode_embedding(embedding),
+            "tokens": int(tokens or 0),
+            "created_at": now,
+        }
+        try:
+            with client.pipeline(transaction=True) as pipe:
+                pipe.hset(keys["entries"], entry_id, json.dumps(entry, ensure_ascii=False))
+                pipe.zadd(keys["lru"], {entry_id: now})
+                pipe.expire(keys["entries"], TTL_SECONDS)
+                pipe.expire(keys["lru"], TTL_SECONDS)
+                pipe.hincrby(self._get_metrics_key(user_id), "stores", 1)
+                pipe.execute()
+
+            overflow = client.zcard(keys["lru"]) - MAX_ENTRIES
+            if overflow > 0:
+                evicted = client.zpopmin(keys["lru"], overflow)
+                if evicted:
+                    client.hdel(keys["entries"], *[entry_id for entry_id, _ in evicted])
+            return True
+
+        except Exception as e:
+            logger.warning(f"[ANSWER CACHE] Store failed for {user_id}: {e}")
+            return False
+
+    def get_metrics(self, user_id: str) -> Dict[str, Any]:
+        """Hit rate and tokens saved for a user"""
+        try:
+            raw = self._get_redis().hgetall(self._get_metrics_key(user_id))
+        except Exception as e:
+            logger.warning(f"[ANSWER CACHE] Metrics unavailable for {user_id}: {e}")
+            raw = {}
+
+        lookups = int(raw.get("lookups", 0))
+        hits = int(raw.get("hits", 0))
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "misses": int(raw.get("misses", 0)),
+            "stores": int(raw.get("stores", 0)),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "tokens_saved": int(raw.get("tokens_saved", 0)),
+        }
+
+
+# Instance globale du cache
+semantic_answer_cache = SemanticAnswerCache()
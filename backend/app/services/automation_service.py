@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional, Literal
 from app.db.session import get_db
+from app.db.repositories import ai_settings_repo, conversations_repo
 import logging
 import re
 
@@ -75,6 +76,36 @@ class AutomationService:
                 'ai_settings': {}
             }
 
+    async def should_auto_reply_async(
+        self,
+        user_id: str,
+        conversation_id: Optional[str] = None,
+        comment_id: Optional[str] = None,
+        context_type: Literal["chat", "comment"] = "chat"
+    ) -> Dict[str, Any]:
+        """
+        Same as should_auto_reply, for callers running on an event loop
+
+        The chat context reads ai_settings and the conversation through the
+        async repositories; the comment context is only used from Celery tasks
+        and falls back to the sync path.
+        """
+        if context_type != "chat" or not conversation_id:
+            return self.should_auto_reply(user_id, conversation_id, comment_id, context_type)
+
+        try:
+            rules = await ai_settings_repo.get_by_user(user_id)
+            conversation_data = await conversations_repo.get_ai_mode(conversation_id) if rules else None
+            return self._conversation_decision(user_id, conversation_id, rules, conversation_data)
+        except Exception as e:
+            logger.error(f'Error checking conversation automation: {e}')
+            return {
+                'should_reply': False,
+                'reason': f'Error: {str(e)}',
+                'matched_rules': [],
+                'ai_settings': {}
+            }
+
     def _check_conversation_automation(self, user_id: str, conversation_id: str) -> Dict[str, Any]:
         """
         Check conversation automation rules (DMs/chats)
@@ -87,54 +118,66 @@ class AutomationService:
         try:
             response = self.db.table('ai_settings').select('*').eq('user_id', user_id).limit(1).single().execute()
             rules = response.data or {}
-            logger.info(f'AI settings for user {user_id}: {rules}')
+            conversation_data = None
+            if rules:
+                conversation = self.db.table('conversations').select('ai_mode').eq('id', conversation_id).limit(1).single().execute()
+                conversation_data = conversation.data
+            return self._conversation_decision(user_id, conversation_id, rules, conversation_data)
 
-            if not rules:
-                return {
-                    'should_reply': False,
-                    'reason': 'No conversation rules matched',
-                    'matched_rules': [],
-                    'ai_settings': {}
-                }
-
-            conversation = self.db.table('conversations').select('ai_mode').eq('id', conversation_id).limit(1).single().execute()
-            conversation_data = conversation.data or {}
+        except Exception as e:
+            logger.error(f'Error checking conversation automation: {e}')
+            return {
+                'should_reply': False,
+                'reason': f'Error: {str(e)}',
+                'matched_rules': [],
+                'ai_settings': {}
+            }
 
-            if not conversation_data:
-                logger.info(f'Conversation not found for user {user_id}: {conversation_id}')
-                return {
-                    'should_reply': False,
-                    'reason': 'Conversation not found',
-                    'matched_rules': [],
-                    'ai_settings': {}
-                }
+    def _conversation_decision(
+        self,
+        user_id: str,
+        conversation_id: str,
+        rules: Optional[Dict[str, Any]],
+        conversation_data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Decision from the user's ai_settings and the conversation's ai_mode"""
+        rules = rules or {}
+        logger.info(f'AI settings for user {user_id}: {rules}')
 
-            if conversation_data.get('ai_mode') == 'OFF':
-                logger.info(f'Conversation is not active for user {user_id}: {conversation_id}')
-                return {
-                    'should_reply': False,
-                    'reason': 'Conversation is not active (ai_mode=OFF)',
-                    'matched_rules': [],
-                    'ai_settings': {}
-                }
+        if not rules:
+            return {
+                'should_reply': False,
+                'reason': 'No conversation rules matched',
+                'matched_rules': [],
+                'ai_settings': {}
+            }
 
-            logger.info(f'Conversation is active for user {user_id}: {conversation_id}')
+        if not conversation_data:
+            logger.info(f'Conversation not found for user {user_id}: {conversation_id}')
             return {
-                'should_reply': rules.get('is_active', True),
-                'reason': 'Conversation rules matched' if rules.get('is_active', True) else 'Conversation rules not matched',
-                'matched_rules': [rules.get('system_prompt', '')],
-                'ai_settings': rules
+                'should_reply': False,
+                'reason': 'Conversation not found',
+                'matched_rules': [],
+                'ai_settings': {}
             }
 
-        except Exception as e:
-            logger.error(f'Error checking conversation automation: {e}')
+        if conversation_data.get('ai_mode') == 'OFF':
+            logger.info(f'Conversation is not active for user {user_id}: {conversation_id}')
             return {
                 'should_reply': False,
-                'reason': f'Error: {str(e)}',
+                'reason': 'Conversation is not active (ai_mode=OFF)',
                 'matched_rules': [],
                 'ai_settings': {}
             }
 
+        logger.info(f'Conversation is active for user {user_id}: {conversation_id}')
+        return {
+            'should_reply': rules.get('is_active', True),
+            'reason': 'Conversation rules matched' if rules.get('is_active', True) else 'Conversation rules not matched',
+            'matched_rules': [rules.get('system_prompt', '')],
+            'ai_settings': rules
+        }
+
     def _check_comment_automation(self, user_id: str, comment_id: str) -> Dict[str, Any]:
         """
         Check comment automation rules (public comments on posts)
@@ -2,21 +2,49 @@ import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import List, Dict, Any
-from contextlib import asynccontextmanager
-from langchain_core.messages import HumanMessage
+from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager, ExitStack
+from langchain_core.messages import AIMessage, HumanMessage
 from app.services.message_batcher import message_batcher
 from app.services.response_manager import (
     get_user_credentials_by_platform_account,
-    send_response,
+    send_response_with_id,
     save_response_to_db,
     send_typing_indicator_and_mark_read,
     generate_smart_response,
+    has_agent_history,
+    check_cached_turn,
+    record_cached_turn,
 )
 from app.services.automation_service import AutomationService
+from app.services.answer_cache import semantic_answer_cache
+from app.services.token_accounting import content_token_count, set_cached_token_count
+from app.core.tracing import collect_breakdown, continue_trace, current_trace_id, record_stage, stage
+from app.services.latency_breakdown import latency_store
+from app.core.metrics import (
+    ANSWER_CACHE_HITS,
+    BATCH_CONVERSATIONS,
+    BATCH_PROCESSING_SECONDS,
+    BATCH_WAIT_SECONDS,
+    SCANNER_ERRORS,
+    SCANNER_LAST_SCAN,
+    SCANNER_SCANS,
+)
 
 logger = logging.getLogger(__name__)
 
+# Shared status of the scanners (every batching worker), read by /api/health
+# and /api/metrics: the API process does not scan
+SCANNER_STATUS_KEY = "scanner:status"
+SCANNER_STATUS_TTL = 24 * 3600
+SCANNER_STALE_SECONDS = 10
+
+OUTCOME_FIELDS = {
+    "processed": "conversations_processed",
+    "failed": "conversations_failed",
+    "timed_out": "conversations_timed_out",
+}
+
 class BatchScanner:
     """
     Scanner of background task to process the batches of messages
@@ -29,17 +57,9 @@ class BatchScanner:
         self.is_running = False
         self._task: asyncio.Task = None
 
-        # 📊 Métriques de monitoring
-        self.metrics = {
-            'conversations_processed': 0,
-            'conversations_failed': 0,
-            'conversations_timed_out': 0,
-            'responses_generated': 0,
-            'errors_total': 0,
-            'processing_times': [],
-            'last_scan_timestamp': None,
-            'total_scans': 0
-        }
+        # 📊 Métriques: Prometheus (app/core/metrics.py) + compteurs du scan en
+        # cours, publiés dans SCANNER_STATUS_KEY à la fin de chaque scan
+        self._pending_status: Dict[str, float] = {}
         
     
     async def start(self):
@@ -67,21 +87,19 @@ class BatchScanner:
         """Main loop of the scanner"""
         while self.is_running:
             try:
-                # 📊 Tracker les scans
-                self.metrics['total_scans'] += 1
-                self.metrics['last_scan_timestamp'] = datetime.now().isoformat()
-
                 await self._process_due_conversations()
                 await asyncio.sleep(self.scan_interval)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in scanner: {e}")
-                self.metrics['errors_total'] += 1
+                self._record_scan_error()
                 await asyncio.sleep(self.scan_interval)
     
     async def _process_due_conversations(self):
         """Process all due conversations"""
+        SCANNER_SCANS.inc()
+        SCANNER_LAST_SCAN.set_to_current_time()
         try:
             logger.debug("[DEBUG] Starting _process_due_conversations")
 
@@ -120,6 +138,9 @@ class BatchScanner:
             sys.stderr.flush()
 
             logger.error(f"Error processing due conversations: {e}", exc_info=True)
+            self._record_scan_error()
+        finally:
+            await self._publish_status()
     
     async def _process_single_conversation(self, conv_info: Dict[str, Any]):
         """
@@ -133,6 +154,13 @@ class BatchScanner:
 
         # ⏱️ Measure the processing time for the metrics
         start_time = time.perf_counter()
+        picked_up_at = time.time()
+        # Trace + latency breakdown of the reply, opened once the batch is read
+        trace_scope = ExitStack()
+        breakdown = None
+        trace_id = None
+        batch_result = None
+        outcome = None
 
         try:
             async with asyncio.timeout(30):
@@ -144,17 +172,34 @@ class BatchScanner:
                 logger.info(f"No batch result for {platform}:{account_id}:{contact_id}")
                 await message_batcher.delete_conversation_cache(platform, account_id, contact_id)
                 # 📊 Métriques
-                self.metrics['conversations_failed'] += 1
-                self.metrics['errors_total'] += 1
+                outcome = self._record_outcome(platform, "failed", start_time)
                 return
             
             if not isinstance(batch_result, dict) or "messages" not in batch_result:
                 logger.warning(f"Invalid batch result structure for {platform}:{account_id}:{contact_id}: {batch_result}")
                 # 📊 Métriques
-                self.metrics['conversations_failed'] += 1
-                self.metrics['errors_total'] += 1
+                outcome = self._record_outcome(platform, "failed", start_time)
                 return
-            
+
+            # ⏱️ First message of the batch → now (the deadline is set by the
+            # first message, batch_window_seconds after it)
+            batch_started_at = batch_result.get("first_received_at")
+            if not batch_started_at and conv_info.get("deadline"):
+                batch_started_at = float(conv_info["deadline"]) - message_batcher.batch_window_seconds
+            if batch_started_at:
+                BATCH_WAIT_SECONDS.labels(platform=platform).observe(max(time.time() - batch_started_at, 0.0))
+
+            breakdown = trace_scope.enter_context(collect_breakdown())
+            trace_scope.enter_context(continue_trace(
+                "batch.process",
+                batch_result.get("trace_context"),
+                platform=platform,
+                conversation_id=conversation_id,
+                message_count=len(batch_result.get("message_ids") or []),
+            ))
+            trace_id = current_trace_id()
+            self._record_batch_stages(batch_result, breakdown, picked_up_at)
+
             messages = batch_result["messages"]
             message_ids = batch_result["message_ids"]
             logger.info("=" * 60)
@@ -192,7 +237,8 @@ class BatchScanner:
 
             logger.info("-" * 60)
             
-            user_credentials = await get_user_credentials_by_platform_account(platform, account_id)
+            with stage("batch.credentials"):
+                user_credentials = await get_user_credentials_by_platform_account(platform, account_id)
             if not user_credentials:
                 logger.error(f"Credentials not found for {platform}:{account_id}")
                 return
@@ -202,11 +248,12 @@ class BatchScanner:
             
             
             automation_service = AutomationService()
-            automation_check = automation_service.should_auto_reply(
-                user_id=user_id,
-                conversation_id=conversation_id,
-                context_type="chat"
-            )
+            with stage("batch.automation_check"):
+                automation_check = await automation_service.should_auto_reply_async(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    context_type="chat"
+                )
             ai_settings = automation_check.get("ai_settings", {})
 
             # Check if AI is enabled for conversations (DM/chat messages)
@@ -237,7 +284,8 @@ class BatchScanner:
 
         
             if message_ids and message_ids[-1]:
-                await send_typing_indicator_and_mark_read(platform, user_credentials, contact_id, message_ids[-1])
+                with stage("batch.typing_indicator"):
+                    await send_typing_indicator_and_mark_read(platform, user_credentials, contact_id, message_ids[-1])
                 logger.info(f"📝 Typing indicator + read receipt sent for {platform}:{account_id}:{contact_id}")
             else:
                 logger.warning(f"No valid message ID found for typing indicator: {message_ids}")
@@ -247,8 +295,44 @@ class BatchScanner:
             logger.info(f"🔍 DEBUG - Content type: {type(content_message)}")
             logger.info(f"🔍 DEBUG - Content content: '{content_message[0].content if content_message else 'No content'}'")
 
+            # Semantic answer cache: a standalone question (no agent history
+            # today) close to an already answered one skips the agent
+            question = content_message[0].content if content_message else None
+            cache_version = None
+            question_embedding = None
+            cached_answer = None
+            with stage("answer_cache.lookup"):
+                if semantic_answer_cache.is_eligible(question, ai_settings) and not await asyncio.to_thread(
+                    has_agent_history, user_id, conversation_id
+                ):
+                    cache_version = semantic_answer_cache.get_version(user_id)
+                    question_embedding = await asyncio.to_thread(semantic_answer_cache.embed_question, question)
+                    if question_embedding is not None:
+                        cached_answer = await asyncio.to_thread(
+                            semantic_answer_cache.lookup, user_id, cache_version, question_embedding
+                        )
+
+            if cached_answer:
+                # The agent's moderation/rules pre-check does not run on a hit
+                with stage("answer_cache.guardrail"):
+                    block_reason = await asyncio.to_thread(check_cached_turn, user_id, question)
+                if block_reason:
+                    logger.warning(f"[GUARDRAILS PRE] Cached answer withheld, message blocked: {block_reason}")
+                    outcome = self._record_outcome(platform, "failed", start_time)
+                    return
+
             try:
-                response_result = await generate_smart_response(content_message, user_id, ai_settings, conversation_id)
+                if cached_answer:
+                    logger.info(
+                        f"⚡ Answer cache hit (similarity={cached_answer['similarity']:.3f}) "
+                        f"for {platform}:{account_id}:{contact_id}"
+                    )
+                    ANSWER_CACHE_HITS.inc()
+                    self._pending_status["answer_cache_hits"] = self._pending_status.get("answer_cache_hits", 0) + 1
+                    response_result = {"messages": [AIMessage(content=cached_answer["answer"])]}
+                else:
+                    with stage("agent", model=ai_settings.get("ai_model")):
+                        response_result = await generate_smart_response(content_message, user_id, ai_settings, conversation_id)
             except Exception as e:
                 logger.error(f"🔍 DEBUG - Exception in generate_smart_response: {e}")
                 logger.error(f"🔍 DEBUG - Exception type: {type(e)}")
@@ -263,8 +347,7 @@ class BatchScanner:
                     logger.error(f"❌ Error in RAG agent: {response_result['error']}")
                     logger.info("=" * 60)
                     # 📊 Métriques
-                    self.metrics['conversations_failed'] += 1
-                    self.metrics['errors_total'] += 1
+                    outcome = self._record_outcome(platform, "failed", start_time)
                     return
                 elif 'messages' in response_result:
                     # Réponse réussie - extraire le contenu du dernier message AI
@@ -292,22 +375,19 @@ class BatchScanner:
                         logger.warning(f"❌ No AI message found in response for {platform}:{account_id}:{contact_id}")
                         logger.info("=" * 60)
                         # 📊 Métriques
-                        self.metrics['conversations_failed'] += 1
-                        self.metrics['errors_total'] += 1
+                        outcome = self._record_outcome(platform, "failed", start_time)
                         return
                 else:
                     logger.error(f"❌ Unexpected dict response format: {response_result}")
                     logger.info("=" * 60)
                     # 📊 Métriques
-                    self.metrics['conversations_failed'] += 1
-                    self.metrics['errors_total'] += 1
+                    outcome = self._record_outcome(platform, "failed", start_time)
                     return
             elif not response_result:
                 logger.warning(f"❌ No response generated for {platform}:{account_id}:{contact_id}")
                 logger.info("=" * 60)
                 # 📊 Métriques
-                self.metrics['conversations_failed'] += 1
-                self.metrics['errors_total'] += 1
+                outcome = self._record_outcome(platform, "failed", start_time)
                 return
             else:
                 # Réponse sous forme de chaîne (ancien format)
@@ -321,52 +401,97 @@ class BatchScanner:
             logger.info(f"🔑 Response content: {response_content}")
             logger.info("=" * 60)
 
-            response_sent = await send_response(platform, user_credentials, contact_id, response_content)
+            response_sent, external_message_id = await send_response_with_id(
+                platform, user_credentials, contact_id, response_content
+            )
 
             if response_sent:
                 # Save the response to the DB
-                message_assistant_group_id = save_response_to_db(
-                    conversation_id,
-                    response_content,
-                    user_credentials.get("user_id"),
-                    confidence=response_confidence,
-                )
+                with stage("batch.save_response"):
+                    message_assistant_group_id = await save_response_to_db(
+                        conversation_id,
+                        response_content,
+                        user_credentials.get("user_id"),
+                        confidence=response_confidence,
+                        external_message_id=external_message_id,
+                    )
+
+                if cached_answer:
+                    # Keep the agent thread coherent for follow-up questions
+                    await asyncio.to_thread(
+                        record_cached_turn, user_id, conversation_id,
+                        content_message, response_content
+                    )
+                elif question_embedding is not None and self._is_cacheable_result(response_result):
+                    await asyncio.to_thread(
+                        semantic_answer_cache.store, user_id, cache_version, question,
+                        question_embedding, response_content, self._answer_tokens(response_result)
+                    )
 
                 logger.info(f"Response sent for {platform}:{account_id}:{contact_id}")
 
                 # 📊 Métriques de succès
-                end_time = time.perf_counter()
-                processing_time = end_time - start_time
-                self.metrics['conversations_processed'] += 1
-                self.metrics['responses_generated'] += 1
-                self.metrics['processing_times'].append(processing_time)
-                # Garder seulement les 100 derniers temps
-                if len(self.metrics['processing_times']) > 100:
-                    self.metrics['processing_times'] = self.metrics['processing_times'][-100:]
+                outcome = self._record_outcome(platform, "processed", start_time)
             else:
                 # Réponse générée mais pas envoyée
                 logger.error(f"❌ Failed to send response for {platform}:{account_id}:{contact_id}")
                 # 📊 Métriques d'échec
-                end_time = time.perf_counter()
-                processing_time = end_time - start_time
-                self.metrics['conversations_failed'] += 1
-                self.metrics['errors_total'] += 1
-                self.metrics['processing_times'].append(processing_time)
-                if len(self.metrics['processing_times']) > 100:
-                    self.metrics['processing_times'] = self.metrics['processing_times'][-100:]
+                outcome = self._record_outcome(platform, "failed", start_time)
 
         except asyncio.TimeoutError:
             logger.error(f"⏰ Timeout (30s) processing {platform}:{account_id}:{contact_id}")
             await message_batcher.delete_conversation_cache(platform, account_id, contact_id)
             # 📊 Métriques
-            self.metrics['conversations_timed_out'] += 1
-            self.metrics['errors_total'] += 1
+            outcome = self._record_outcome(platform, "timed_out", start_time)
         except Exception as e:
             logger.error(f"Error processing {platform}:{account_id}:{contact_id}: {e}")
             # 📊 Métriques
-            self.metrics['conversations_failed'] += 1
-            self.metrics['errors_total'] += 1
-    
+            outcome = self._record_outcome(platform, "failed", start_time)
+        finally:
+            trace_scope.close()
+            if breakdown is not None:
+                await self._store_latency(
+                    conversation_id, platform, outcome or "skipped", trace_id, batch_result, breakdown
+                )
+
+    def _record_batch_stages(self, batch_result: Dict[str, Any], breakdown, picked_up_at: float):
+        """Stages before the reply: webhook ingest, batch window, scanner pickup, batch read"""
+        if batch_result.get("ingest_ms") is not None:
+            # Timed in the webhook, its span belongs to the webhook trace
+            breakdown.add("webhook.ingest", batch_result["ingest_ms"])
+
+        first_received_at = batch_result.get("first_received_at")
+        if first_received_at:
+            window_end = first_received_at + message_batcher.batch_window_seconds
+            record_stage("batch.window", first_received_at, window_end)
+            record_stage("scanner.pickup", window_end, picked_up_at)
+        record_stage("batch.read", picked_up_at, time.time())
+
+    async def _store_latency(
+        self,
+        conversation_id: Optional[str],
+        platform: str,
+        outcome: str,
+        trace_id: Optional[str],
+        batch_result: Dict[str, Any],
+        breakdown,
+    ):
+        """Keep the breakdown of this reply for GET /conversations/{id}/latency"""
+        now = time.time()
+        first_received_at = batch_result.get("first_received_at")
+        total_ms = None
+        if first_received_at:
+            total_ms = round((now - first_received_at) * 1000 + (batch_result.get("ingest_ms") or 0), 1)
+        await latency_store.record(conversation_id, {
+            "recorded_at": datetime.now().isoformat(),
+            "platform": platform,
+            "outcome": outcome,
+            "trace_id": trace_id,
+            "message_count": len(batch_result.get("message_ids") or []),
+            "total_ms": total_ms,
+            **breakdown.to_dict(),
+        })
+
     def _format_messages(self, messages: Dict[str, Any]) -> List[HumanMessage]:
         """
         Format the messages for the agent.
@@ -384,10 +509,12 @@ class BatchScanner:
             # Ancienne structure
             message_data = messages.get("message_data", {})
             content = message_data.get("content", "")
+            token_count = messages.get("token_count")
             structure_type = "message_data"
         else:
             # Nouvelle structure ou structure directe
             content = messages.get("content", "")
+            token_count = messages.get("token_count")
             structure_type = "direct"
 
         # Nettoyer le contenu uniquement si c'est une chaîne
@@ -404,55 +531,110 @@ class BatchScanner:
             f"content_length={len(str(content))}"
         )
 
-        return [HumanMessage(content=content)]
+        # Token count computed once at ingest and carried in the batch payload
+        if not token_count:
+            token_count = content_token_count(content)
+
+        return [set_cached_token_count(HumanMessage(content=content), token_count)]
+
+    @staticmethod
+    def _is_cacheable_result(response_result: Any) -> bool:
+        """An agent answer can be cached unless it escalated or hit an error"""
+        if not isinstance(response_result, dict) or response_result.get("error_message"):
+            return False
+        escalation = response_result.get("escalation_result")
+        if isinstance(escalation, dict):
+            return not escalation.get("escalated")
+        return not getattr(escalation, "escalated", False)
+
+    @staticmethod
+    def _answer_tokens(response_result: Dict[str, Any]) -> int:
+        """Tokens spent by the agent on this answer (saved by each cache hit)"""
+        total = 0
+        for msg in response_result.get("messages", []):
+            usage = getattr(msg, "usage_metadata", None)
+            if usage:
+                total += int(usage.get("total_tokens") or 0)
+        return total
 
     # 📊 Méthodes de monitoring
-    def get_metrics(self) -> Dict[str, Any]:
-        """Récupérer les métriques de performance"""
-        metrics = self.metrics.copy()
-        if metrics['processing_times']:
-            metrics['avg_processing_time'] = sum(metrics['processing_times']) / len(metrics['processing_times'])
-            metrics['max_processing_time'] = max(metrics['processing_times'])
-            metrics['min_processing_time'] = min(metrics['processing_times'])
-        else:
-            metrics['avg_processing_time'] = 0
-            metrics['max_processing_time'] = 0
-            metrics['min_processing_time'] = 0
-        return metrics
-
-    def log_performance_metrics(self):
-        """Logger les métriques de performance"""
-        metrics = self.get_metrics()
-        logger.info(f"  - Conversations traitées: {metrics['conversations_processed']}")
-        logger.info(f"  - Échecs: {metrics['conversations_failed']}")
-        logger.info(f"  - Timeouts: {metrics['conversations_timed_out']}")
-        logger.info(f"  - Réponses générées: {metrics['responses_generated']}")
-        logger.info(f"  - Erreurs totales: {metrics['errors_total']}")
-        logger.info(f"  - Scans totaux: {metrics['total_scans']}")
-
-        if metrics['processing_times']:
-            logger.info(f"  - Temps moyen de traitement: {metrics['avg_processing_time']:.2f}s")
-            logger.info(f"  - Temps max: {metrics['max_processing_time']:.2f}s")
-            logger.info(f"  - Temps min: {metrics['min_processing_time']:.2f}s")
-
-        # Calculer les taux de succès
-        total_processed = metrics['conversations_processed'] + metrics['conversations_failed']
-        if total_processed > 0:
-            success_rate = (metrics['conversations_processed'] / total_processed) * 100
-            logger.info(f"  - Taux de succès: {success_rate:.1f}%")
-
-    def get_health_status(self) -> Dict[str, Any]:
-        """Récupérer le statut de santé du scanner"""
-        metrics = self.get_metrics()
+    def _record_outcome(self, platform: str, outcome: str, start_time: float) -> str:
+        """Count a handled conversation (Prometheus + shared status)"""
+        elapsed = time.perf_counter() - start_time
+        BATCH_CONVERSATIONS.labels(outcome=outcome).inc()
+        BATCH_PROCESSING_SECONDS.labels(platform=platform, outcome=outcome).observe(elapsed)
+
+        field = OUTCOME_FIELDS[outcome]
+        self._pending_status[field] = self._pending_status.get(field, 0) + 1
+        self._pending_status["processing_count"] = self._pending_status.get("processing_count", 0) + 1
+        self._pending_status["processing_seconds"] = self._pending_status.get("processing_seconds", 0.0) + elapsed
+        return outcome
+
+    def _record_scan_error(self):
+        SCANNER_ERRORS.inc()
+        self._pending_status["scan_errors"] = self._pending_status.get("scan_errors", 0) + 1
+
+    async def _publish_status(self):
+        """Add the counters of this scan to the shared status (one pipeline)"""
+        pending, self._pending_status = self._pending_status, {}
+        try:
+            async with message_batcher.redis_connection() as redis_client:
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.hset(SCANNER_STATUS_KEY, "last_scan", time.time())
+                pipe.hincrby(SCANNER_STATUS_KEY, "total_scans", 1)
+                for field, value in pending.items():
+                    if isinstance(value, float):
+                        pipe.hincrbyfloat(SCANNER_STATUS_KEY, field, value)
+                    else:
+                        pipe.hincrby(SCANNER_STATUS_KEY, field, value)
+                pipe.expire(SCANNER_STATUS_KEY, SCANNER_STATUS_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[BATCH_SCAN] Scanner status not published: {e}")
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        """Récupérer les métriques cumulées de tous les scanners (statut Redis)"""
+        async with message_batcher.redis_connection() as redis_client:
+            status = await redis_client.hgetall(SCANNER_STATUS_KEY)
+
+        def count(field: str) -> int:
+            return int(float(status.get(field) or 0))
+
+        processed = count("conversations_processed")
+        failed = count("conversations_failed")
+        timed_out = count("conversations_timed_out")
+        processing_count = count("processing_count")
+        last_scan = float(status["last_scan"]) if status.get("last_scan") else None
+
+        return {
+            'conversations_processed': processed,
+            'conversations_failed': failed,
+            'conversations_timed_out': timed_out,
+            'responses_generated': processed,
+            'errors_total': failed + timed_out + count("scan_errors"),
+            'total_scans': count("total_scans"),
+            'answer_cache_hits': count("answer_cache_hits"),
+            'last_scan_timestamp': datetime.fromtimestamp(last_scan).isoformat() if last_scan else None,
+            'seconds_since_last_scan': time.time() - last_scan if last_scan else None,
+            'avg_processing_time': (
+                float(status.get("processing_seconds") or 0) / processing_count if processing_count else 0
+            ),
+        }
+
+    async def get_health_status(self) -> Dict[str, Any]:
+        """Récupérer le statut de santé des scanners"""
+        metrics = await self.get_metrics()
+        handled = metrics['conversations_processed'] + metrics['conversations_failed']
+        since_last_scan = metrics['seconds_since_last_scan']
         return {
-            'is_running': self.is_running,
+            'is_running': since_last_scan is not None and since_last_scan < SCANNER_STALE_SECONDS,
             'last_scan': metrics['last_scan_timestamp'],
             'total_scans': metrics['total_scans'],
             'conversations_processed': metrics['conversations_processed'],
             'errors_total': metrics['errors_total'],
-            'success_rate': (metrics['conversations_processed'] / (metrics['conversations_processed'] + metrics['conversations_failed']) * 100) if (metrics['conversations_processed'] + metrics['conversations_failed']) > 0 else 0,
+            'success_rate': (metrics['conversations_processed'] / handled * 100) if handled > 0 else 0,
             'avg_response_time': metrics['avg_processing_time']
         }
 
 # Instance globale du scanner
-batch_scanner = BatchScanner()
\ No newline at end of file
+batch_scanner = BatchScanner()
@@ -0,0 +1,112 @@
+"""
+Comment ingestion mode and counters
+
+Comments arrive through the Instagram `comments` webhook field (push path,
+app.workers.comments.ingest_comment_webhook). poll_post_comments is then a
+reconciliation sweep: a post is polled every COMMENT_RECONCILE_INTERVAL_MINUTES
+unless a poll found comments the webhook missed, in which case it goes back to
+adaptive polling (5/15/30 min) until a sweep finds no gap.
+
+With COMMENT_WEBHOOKS_ENABLED=false the poller is the only path (adaptive
+polling for every post), as before.
+
+Graph API calls made by the poller are counted per hour and mode in Redis:
+    comments:graph_calls:{mode}:{YYYYMMDDHH}  integer, expires after 7 days
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+COMMENT_WEBHOOKS_ENABLED = os.getenv("COMMENT_WEBHOOKS_ENABLED", "true").lower() == "true"
+RECONCILE_INTERVAL = timedelta(
+    minutes=int(os.getenv("COMMENT_RECONCILE_INTERVAL_MINUTES", "120"))
+)
+# A comment younger than this may still be on its way through the webhook
+WEBHOOK_GRACE = timedelta(seconds=int(os.getenv("COMMENT_WEBHOOK_GRACE_SECONDS", "120")))
+
+COUNTER_TTL_SECONDS = 7 * 24 * 3600
+
+_client: Optional[redis.Redis] = None
+_lock = threading.Lock()
+
+
+def _get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    decode_responses=True,
+                    socket_timeout=2,
+                )
+    return _client
+
+
+def get_ingestion_mode() -> str:
+    return "webhook" if COMMENT_WEBHOOKS_ENABLED else "poll"
+
+
+def dispatch_comment_changes(entry: Dict[str, Any]) -> int:
+    """
+    Push path: hand each `comments` change of an Instagram webhook entry to
+    the comments worker (saved and processed there)
+
+    Returns:
+        Number of comment events queued
+    """
+    if not COMMENT_WEBHOOKS_ENABLED:
+        return 0
+
+    from app.workers.celery_app import celery
+
+    queued = 0
+    for change in entry.get("changes", []):
+        if change.get("field") != "comments":
+            continue
+        value = change.get("value") or {}
+        celery.send_task(
+            "app.workers.comments.ingest_comment_webhook",
+            args=[entry.get("id"), value, entry.get("time")],
+        )
+        queued += 1
+        logger.info(
+            f"[COMMENTS] Webhook comment {value.get('id')} queued for account {entry.get('id')}"
+        )
+    return queued
+
+
+def _counter_key(mode: str, hour: datetime) -> str:
+    return f"comments:graph_calls:{mode}:{hour.strftime('%Y%m%d%H')}"
+
+
+def record_graph_calls(count: int = 1) -> None:
+    """Count Graph API calls of the poller in the current hour"""
+    if count <= 0:
+        return
+    key = _counter_key(get_ingestion_mode(), datetime.now(timezone.utc))
+    try:
+        pipe = _get_redis().pipeline()
+        pipe.incrby(key, count)
+        pipe.expire(key, COUNTER_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[COMMENTS] Graph API counter unavailable: {e}")
+
+
+def get_graph_calls_per_hour(mode: str, hours: int = 24) -> Dict[str, int]:
+    """Poller Graph API calls of the last `hours` hours, keyed by YYYYMMDDHH"""
+    now = datetime.now(timezone.utc)
+    hour_list = [now - timedelta(hours=h) for h in range(hours)]
+    keys = [_counter_key(mode, hour) for hour in hour_list]
+    values = _get_redis().mget(keys)
+    return {
+        hour.strftime("%Y%m%d%H"): int(value or 0)
+        for hour, value in zip(hour_list, values)
+    }
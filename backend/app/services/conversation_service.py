@@ -1,13 +1,15 @@
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from supabase import Client
 from datetime import datetime, timezone
+import base64
 import logging
-import json
+import uuid
 from app.services.whatsapp_service import WhatsAppService
 from app.services.instagram_service import InstagramService
 from app.services.response_manager import get_signed_url
 from app.services.media_cache_service import media_cache_service
+from app.services.message_history_cache import message_history_cache, compute_messages_etag
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +17,50 @@ class ConversationService:
     def __init__(self, supabase_client: Client):
         self.supabase = supabase_client
 
-    def get_user_conversations(self, user_id: str, channel: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """Récupère les conversations d'un utilisateur"""
+    def get_user_conversations(
+        self,
+        user_id: str,
+        channel: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Récupère les conversations d'un utilisateur (une seule requête)
+
+        L'inbox est triée par last_inbound_at (colonne dénormalisée maintenue par
+        trigger, comme last_message_snippet) avec une pagination keyset.
+
+        Returns:
+            (conversations, next_cursor) - next_cursor est None sur la dernière page
+        """
         try:
             query = self.supabase.table('conversations').select('''
-                id, customer_name, customer_identifier, customer_avatar_url, ai_mode, last_message_at, unread_count, created_at, updated_at,
+                id, customer_name, customer_identifier, customer_avatar_url, ai_mode, last_message_at, last_inbound_at,
+                last_message_snippet, unread_count, created_at, updated_at,
                 social_account_id, external_conversation_id, status, priority, assigned_to, tags, metadata,
-                social_accounts: social_account_id (
-                    id, platform, account_id, access_token, user_id
-                )
+                social_accounts!inner(id, platform, user_id)
             ''')
             query = query.eq('social_accounts.user_id', user_id)
             if channel and channel != 'all':
                 query = query.eq('social_accounts.platform', channel)
-            query = query.order('last_message_at', desc=True).limit(limit * 2)
+
+            if cursor:
+                last_inbound_at, last_id = self._decode_inbox_cursor(cursor)
+                query = query.or_(
+                    f'last_inbound_at.lt."{last_inbound_at}",'
+                    f'and(last_inbound_at.eq."{last_inbound_at}",id.lt.{last_id})'
+                )
+
+            query = query.order('last_inbound_at', desc=True).order('id', desc=True).limit(limit + 1)
             response = query.execute()
-            
-            if not response.data:
-                return []
-            
+
+            rows = response.data or []
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
             conversations = []
-            for row in response.data:
+            for row in rows:
                 social_account = row.get('social_accounts')
 
-                # Récupérer le vrai dernier message pour le snippet
-                last_message_content = self._get_last_message_snippet(row['id'])
-
                 conversation = {
                     'id': row['id'],
                     'social_account_id': social_account['id'],
@@ -57,118 +77,201 @@ class ConversationService:
                     'created_at': row['created_at'],
                     'updated_at': row['updated_at'],
                     'channel': social_account['platform'],
-                    'last_message_snippet': last_message_content,
-                    'last_message_at': row.get('last_message_at')
+                    'last_message_snippet': row.get('last_message_snippet') or '',
+                    'last_message_at': row.get('last_message_at'),
+                    'last_inbound_at': row.get('last_inbound_at')
                 }
                 conversations.append(conversation)
-            
-            last_inbound_times = {}
-            for conv in conversations:
-                try:
-                    inbound = self.supabase.table('conversation_messages').select('created_at, content').eq('conversation_id', conv['id']).eq('direction', 'inbound').order('created_at', desc=True).limit(1).execute()
-                    if inbound.data:
-                        last_inbound_times[conv['id']] = inbound.data[0]['created_at']
-                    else:
-                        last_inbound_times[conv['id']] = conv['last_message_at']
-                except Exception:
-                    last_inbound_times[conv['id']] = conv['last_message_at']
-            
-            conversations.sort(key=lambda c: last_inbound_times.get(c['id']) or '', reverse=True)
-            conversations = conversations[:limit]
-            return conversations
-            
+
+            next_cursor = None
+            if has_more and rows:
+                next_cursor = self._encode_inbox_cursor(rows[-1]['last_inbound_at'], rows[-1]['id'])
+
+            return conversations, next_cursor
+
         except Exception as e:
             logger.error(f'Erreur lors de la récupération des conversations pour l\'utilisateur {user_id}: {e}')
             raise
 
-    def _get_last_message_snippet(self, conversation_id: str) -> str:
-        """Récupère le snippet du dernier message d'une conversation"""
+    @staticmethod
+    def _encode_inbox_cursor(last_inbound_at: str, conversation_id: str) -> str:
+        """Curseur opaque (last_inbound_at, id) de la dernière conversation d'une page"""
+        raw = f'{last_inbound_at}|{conversation_id}'
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_inbox_cursor(cursor: str) -> Tuple[str, str]:
+        """Décode un curseur d'inbox, ValueError si invalide"""
         try:
-            # Récupérer le dernier message (inbound ou outbound)
-            response = self.supabase.table('conversation_messages').select(
-                'content, message_type, direction'
-            ).eq('conversation_id', conversation_id).order('created_at', desc=True).limit(1).execute()
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            last_inbound_at, conversation_id = raw.split('|', 1)
+            datetime.fromisoformat(last_inbound_at)
+            uuid.UUID(conversation_id)
+        except Exception:
+            raise ValueError('Curseur de pagination invalide')
+        return last_inbound_at, conversation_id
 
-            if not response.data:
-                return ""
+    MESSAGE_COLUMNS = (
+        'id, conversation_id, external_message_id, direction, message_type, content, storage_object_name, '
+        'media_type, sender_id, sender_name, sender_avatar_url, status, is_from_agent, agent_id, '
+        'reply_to_message_id, metadata, created_at, updated_at'
+    )
 
-            message = response.data[0]
-            content = message.get('content', '')
+    async def get_conversation_messages(
+        self,
+        conversation_id: str,
+        user_id: str,
+        limit: int = 100,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Récupère les messages d'une conversation (pagination keyset sur (created_at, id))
 
-            # Si c'est du texte simple
-            if message.get('message_type') == 'text' or not content:
-                return content[:100] + ('...' if len(content) > 100 else '')
+        - sans curseur: la dernière page (messages les plus récents), servie depuis
+          le cache Redis tant qu'aucun nouveau message n'a été enregistré
+        - before: page plus ancienne que le curseur (scroll vers le haut)
+        - after: mode delta, uniquement les messages plus récents que le curseur
 
-            # Si c'est du JSON (image avec texte)
-            try:
-                parsed_content = json.loads(content)
-                if isinstance(parsed_content, list):
-                    # Chercher le texte dans le contenu JSON
-                    for item in parsed_content:
-                        if item.get('type') == 'text' and item.get('text'):
-                            text = item['text']
-                            return text[:100] + ('...' if len(text) > 100 else '')
-            except (json.JSONDecodeError, KeyError):
-                pass
-
-            # Fallback : retourner le contenu brut tronqué
-            return str(content)[:100] + ('...' if len(str(content)) > 100 else '')
+        Les curseurs sont un id de message ou un timestamp ISO 8601. Un id de
+        message départage les messages de même created_at (un lot enregistré
+        dans la même transaction). Les messages sont toujours retournés du plus
+        ancien au plus récent.
+
+        Returns:
+            {"messages", "has_more", "etag"}
+        """
+        if before and after:
+            raise ValueError('Les paramètres before et after sont exclusifs')
 
-        except Exception as e:
-            logger.warning(f'Erreur lors de la récupération du snippet pour la conversation {conversation_id}: {e}')
-            return ""
-    async def get_conversation_messages(self, conversation_id: str, user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Récupère les messages d'une conversation"""
         try:
-            response = self.supabase.table('conversation_messages').select(
-                'id, conversation_id, external_message_id, direction, message_type, content, storage_object_name, '
-                'media_type, sender_id, sender_name, sender_avatar_url, status, is_from_agent, agent_id, '
-                'reply_to_message_id, metadata, created_at, updated_at'
-            ).eq('conversation_id', conversation_id).order('created_at', desc=False).limit(limit).execute()
-            
-            messages = []
-            for row in response.data:
-                # Générer l'URL signée pour les médias si storage_object_name existe (avec cache Redis)
-                media_url = None
-                if row.get('storage_object_name'):
-                    try:
-                        # Utiliser le cache Redis pour éviter de régénérer les URLs
-                        media_url = await media_cache_service.get_cached_signed_url(
-                            storage_object_name=row['storage_object_name'],
-                            bucket_id='message',
-                            expires_in=3600*24  # 24 heures
-                        )
-                    except Exception as e:
-                        logger.warning(f"Impossible de générer l'URL signée pour {row['storage_object_name']}: {e}")
-                        # En cas d'erreur, on garde le storage_object_name comme fallback
-                        media_url = row['storage_object_name']
-
-                message = {
-                    'id': row['id'],
-                    'conversation_id': row['conversation_id'],
-                    'external_message_id': row.get('external_message_id'),
-                    'direction': row['direction'],
-                    'message_type': row.get('message_type', 'text'),
-                    'content': row.get('content', ''),
-                    'media_url': media_url,
-                    'media_type': row.get('media_type'),
-                    'storage_object_name': row.get('storage_object_name'),  # Garder pour référence
-                    'sender_id': row.get('sender_id'),
-                    'sender_name': row.get('sender_name'),
-                    'sender_avatar_url': row.get('sender_avatar_url'),
-                    'status': row.get('status'),
-                    'is_from_agent': row.get('is_from_agent', False),
-                    'agent_id': row.get('agent_id'),
-                    'reply_to_message_id': row.get('reply_to_message_id'),
-                    'metadata': row.get('metadata', {}),
-                    'created_at': row['created_at'],
-                    'updated_at': row['updated_at']
-                }
-                messages.append(message)
-            return messages
+            if not before and not after:
+                cached = await message_history_cache.get_latest_page(conversation_id, user_id, limit)
+                if cached:
+                    return cached
+            elif after:
+                cached = await message_history_cache.get_latest_page(conversation_id, user_id, limit)
+                delta = self._delta_from_cached_page(cached, after) if cached else None
+                if delta is not None:
+                    return {
+                        'messages': delta,
+                        'has_more': False,
+                        'etag': compute_messages_etag(conversation_id, delta),
+                    }
+
+            query = self.supabase.table('conversation_messages').select(
+                self.MESSAGE_COLUMNS
+            ).eq('conversation_id', conversation_id)
+
+            if after:
+                query = self._apply_message_cursor(query, conversation_id, after, 'gt')
+                rows = query.order('created_at', desc=False).order('id', desc=False).limit(
+                    limit + 1
+                ).execute().data or []
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+            else:
+                if before:
+                    query = self._apply_message_cursor(query, conversation_id, before, 'lt')
+                rows = query.order('created_at', desc=True).order('id', desc=True).limit(
+                    limit + 1
+                ).execute().data or []
+                has_more = len(rows) > limit
+                rows = list(reversed(rows[:limit]))
+
+            messages = [await self._format_message_row(row) for row in rows]
+            page = {
+                'messages': messages,
+                'has_more': has_more,
+                'etag': compute_messages_etag(conversation_id, messages),
+            }
+
+            if not before and not after:
+                await message_history_cache.set_latest_page(
+                    conversation_id, user_id, limit, messages, has_more, page['etag']
+                )
+            return page
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f'Erreur lors de la récupération des messages pour la conversation {conversation_id}: {e}')
             raise
+
+    @staticmethod
+    def _delta_from_cached_page(cached: Dict[str, Any], after: str) -> Optional[List[Dict[str, Any]]]:
+        """Messages postérieurs à ``after`` si le curseur est un id présent dans la page en cache"""
+        messages = cached.get('messages') or []
+        for index, message in enumerate(messages):
+            if str(message.get('id')) == after:
+                return messages[index + 1:]
+        return None
+
+    def _apply_message_cursor(self, query, conversation_id: str, cursor: str, op: str):
+        """Filtre keyset strictement avant ('lt') ou après ('gt') le curseur"""
+        created_at, message_id = self._resolve_message_cursor(conversation_id, cursor)
+        if message_id is None:
+            return query.filter('created_at', op, created_at)
+        return query.or_(
+            f'created_at.{op}."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.{op}.{message_id})'
+        )
+
+    def _resolve_message_cursor(self, conversation_id: str, cursor: str) -> Tuple[str, Optional[str]]:
+        """Convertit un curseur en (created_at, id); id à None pour un timestamp ISO"""
+        try:
+            uuid.UUID(cursor)
+        except ValueError:
+            try:
+                datetime.fromisoformat(cursor.replace('Z', '+00:00'))
+            except ValueError:
+                raise ValueError('Curseur de messages invalide')
+            return cursor, None
+
+        response = self.supabase.table('conversation_messages').select('created_at').eq(
+            'id', cursor
+        ).eq('conversation_id', conversation_id).limit(1).execute()
+        if not response.data:
+            raise ValueError('Curseur de messages invalide')
+        return response.data[0]['created_at'], cursor
+
+    async def _format_message_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Formate une ligne conversation_messages pour l'API"""
+        # Générer l'URL signée pour les médias si storage_object_name existe (avec cache Redis)
+        media_url = None
+        if row.get('storage_object_name'):
+            try:
+                # Utiliser le cache Redis pour éviter de régénérer les URLs
+                media_url = await media_cache_service.get_cached_signed_url(
+                    storage_object_name=row['storage_object_name'],
+                    bucket_id='message',
+                    expires_in=3600*24  # 24 heures
+                )
+            except Exception as e:
+                logger.warning(f"Impossible de générer l'URL signée pour {row['storage_object_name']}: {e}")
+                # En cas d'erreur, on garde le storage_object_name comme fallback
+                media_url = row['storage_object_name']
+
+        return {
+            'id': row['id'],
+            'conversation_id': row['conversation_id'],
+            'external_message_id': row.get('external_message_id'),
+            'direction': row['direction'],
+            'message_type': row.get('message_type', 'text'),
+            'content': row.get('content', ''),
+            'media_url': media_url,
+            'media_type': row.get('media_type'),
+            'storage_object_name': row.get('storage_object_name'),  # Garder pour référence
+            'sender_id': row.get('sender_id'),
+            'sender_name': row.get('sender_name'),
+            'sender_avatar_url': row.get('sender_avatar_url'),
+            'status': row.get('status'),
+            'is_from_agent': row.get('is_from_agent', False),
+            'agent_id': row.get('agent_id'),
+            'reply_to_message_id': row.get('reply_to_message_id'),
+            'metadata': row.get('metadata', {}),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+
     async def send_message(self, content: str, customer_name: str, platform: str, message_type: str = 'text') -> Dict[str, Any]:
         """Envoie un message dans une conversation"""
         try:
@@ -197,15 +300,15 @@ class ConversationService:
                 logger.info(f'Numéro original: \'{customer_identifier}\', normalisé: \'{normalized_phone}\'')
                 customer_identifier = normalized_phone
             
-            success = False
+            external_message_id = None
             if platform == 'whatsapp':
-                success = await self._send_whatsapp_message(social_account['access_token'], social_account['account_id'], customer_identifier, content)
+                external_message_id = await self._send_whatsapp_message(social_account['access_token'], social_account['account_id'], customer_identifier, content)
             elif platform == 'instagram':
-                success = await self._send_instagram_message(social_account['access_token'], social_account['account_id'], customer_identifier, content)
+                external_message_id = await self._send_instagram_message(social_account['access_token'], social_account['account_id'], customer_identifier, content)
             else:
                 raise ValueError(f'Plateforme non supportée: {platform}')
             
-            if not success:
+            if not external_message_id:
                 raise ValueError(f'Échec de l\'envoi du message sur {platform}')
             
             message_data = {
@@ -215,6 +318,7 @@ class ConversationService:
                 'content': content,
                 'is_from_agent': True,
                 'status': 'sent',
+                'external_message_id': external_message_id,
                 'created_at': datetime.now(timezone.utc).isoformat(),
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }
@@ -222,6 +326,7 @@ class ConversationService:
             response = self.supabase.table('conversation_messages').insert(message_data).execute()
             if not response.data:
                 raise ValueError('Échec de l\'enregistrement du message')
+            await message_history_cache.invalidate(conversation['id'])
             
             # try:
             #     await self.mark_conversation_as_read(conversation['id'], user_id)
@@ -234,26 +339,26 @@ class ConversationService:
             logger.error(f'Erreur lors de l\'envoi du message: {e}')
             raise
 
-    async def _send_whatsapp_message(self, access_token: str, phone_number_id: str, to: str, text: str) -> bool:
-        """Envoie un message WhatsApp"""
+    async def _send_whatsapp_message(self, access_token: str, phone_number_id: str, to: str, text: str) -> Optional[str]:
+        """Envoie un message WhatsApp, retourne l'ID du message (None en cas d'échec)"""
         try:
             async with WhatsAppService(access_token, phone_number_id) as service:
                 result = await service.send_text_message(to, text)
                 messages = result.get('messages', [])
-                return len(messages) > 0 and messages[0].get('id') is not None
+                return messages[0].get('id') if messages else None
         except Exception as e:
             logger.error(f'Erreur WhatsApp: {e}')
-            return False
+            return None
 
-    async def _send_instagram_message(self, access_token: str, account_id: str, recipient_id: str, text: str) -> bool:
-        """Envoie un message Instagram"""
+    async def _send_instagram_message(self, access_token: str, account_id: str, recipient_id: str, text: str) -> Optional[str]:
+        """Envoie un message Instagram, retourne l'ID du message (None en cas d'échec)"""
         try:
             async with InstagramService(access_token, account_id) as service:
                 result = await service.send_direct_message(recipient_id, text)
-                return result.get('id') is not None
+                return result.get('message_id') if result.get('success') else None
         except Exception as e:
             logger.error(f'Erreur Instagram: {e}')
-            return False
+            return None
 
     async def mark_conversation_as_read(self, conversation_id: str, user_id: str) -> bool:
         """Marque une conversation comme lue en utilisant la fonction SQL existante"""
@@ -271,6 +376,8 @@ class ConversationService:
                 return False
 
             result = self.supabase.rpc('mark_conversation_as_read', {'conversation_uuid': conversation_id}).execute()
+            # Les statuts des messages changent
+            await message_history_cache.invalidate(conversation_id)
             return True
         except Exception as e:
             logger.error(f'Erreur lors du marquage comme lu: {e}')
@@ -1,7 +1,7 @@
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import jwt
 import resend
@@ -188,8 +188,92 @@ A customer requested human assistance.
 
         return html_content, text_content
 
+    async def send_escalation_digest_email(
+        self,
+        to_email: str,
+        escalations: List[Dict[str, Any]]
+    ) -> bool:
+        """Send one email for several escalations of a same recipient
+
+        Args:
+            to_email: Email address of the recipient
+            escalations: Escalations (reason, created_at, conversation_link), oldest first
+
+        Returns:
+            bool: True if the email has been sent successfully
+        """
+        if not self.emails_client:
+            logger.error("Resend not configured - impossible to send the email")
+            return False
 
+        try:
+            html_content, text_content = self._render_escalation_digest_template(escalations)
+
+            from resend import Tag
+            email_data = {
+                "from": self.from_email,
+                "to": [to_email],
+                "subject": f"{len(escalations)} Customer Support Requests",
+                "html": html_content,
+                "text": text_content,
+                "reply_to": [self.from_email],
+                "tags": [Tag(name="type", value="escalation_digest")]
+            }
+
+            response = self.emails_client.send(email_data)
+            if response:
+                logger.info(f"Email récapitulatif d'escalades envoyé ({len(escalations)} escalades)")
+                return True
 
+            logger.error("Échec de l'envoi de l'email récapitulatif d'escalades")
+            return False
+
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi de l'email récapitulatif d'escalades: {e}")
+            return False
+
+    def _render_escalation_digest_template(self, escalations: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Render the HTML and text of an escalation digest
+
+        Args:
+            escalations: Escalations (reason, created_at, conversation_link)
+
+        Returns:
+            tuple: HTML and text content
+        """
+        template = Template("""
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Human Support</title>
+        </head>
+        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
+            <div style="background-color: white; margin: 20px; border-radius: 8px; padding: 30px 20px;">
+                <h1>{{ escalations|length }} Customer Support Requests</h1>
+                {% for escalation in escalations %}
+                <div style="border-top: 1px solid #e5e7eb; padding: 12px 0;">
+                    <p>{{ escalation.reason }}</p>
+                    <a href="{{ escalation.conversation_link }}" style="color: #2563eb;">Access Conversation</a>
+                </div>
+                {% endfor %}
+                <p style="color: #6b7280; font-size: 12px;">These links expire in 24 hours.</p>
+            </div>
+        </body>
+        </html>
+        """, autoescape=True)
+
+        html_content = template.render(escalations=escalations)
+
+        lines = [f"{len(escalations)} Customer Support Requests", ""]
+        for escalation in escalations:
+            lines.append(f"- {escalation.get('reason', '')}")
+            lines.append(f"  Access Conversation: {escalation.get('conversation_link', '')}")
+        lines += ["", "These links expire in 24 hours.", ""]
+        text_content = "\n".join(lines)
+
+        return html_content, text_content
 
 
 def get_email_service() -> EmailService:
@@ -1,10 +1,7 @@
 import logging
-import os
 from typing import Optional
 
 from app.db.session import get_db
-from app.services.email_service import EmailService
-from app.services.link_service import LinkService
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +19,13 @@ class Escalation:
         # Note: Using get_db() (service role) - all queries MUST filter by user_id
         # TODO (Phase 2): Migrate to get_authenticated_db() for RLS enforcement
         self.db = get_db()
-        self.email_service = EmailService()
-        self.link_service = LinkService()
 
-    async def create_escalation(self, message: str, confidence: float, reason: str) -> Optional[str]:
-        """Create an escalation, disable the IA and send an email to the client
+    def create_escalation(self, message: str, confidence: float, reason: str) -> Optional[str]:
+        """Create an escalation, disable the IA and queue the email to the client
+
+        One create_escalation call (migration 039): escalation, AI mode off and
+        escalation_outbox row in a single transaction. The email is rendered and
+        sent by app.workers.notifications (app/services/escalation_notifier.py).
 
         Args:
             message: Message that triggered the escalation
@@ -37,83 +36,22 @@ class Escalation:
             str: ID of the escalation or None if failure
         """
         try:
-            escalation_data = {
-                "user_id": self.user_id,
-                "conversation_id": self.conversation_id,
-                "message": message,
-                "confidence": confidence,
-                "reason": reason,
-                "notified": False
-            }
-
-            escalation_result = self.db.table("support_escalations").insert(escalation_data).execute()
-            escalation_id = escalation_result.data[0]["id"] if escalation_result.data else None
+            # ✅ SECURITY: the function only escalates a conversation of this
+            # user (conversation → social_account → user_id)
+            result = self.db.rpc("create_escalation", {
+                "p_user_id": self.user_id,
+                "p_conversation_id": self.conversation_id,
+                "p_message": message,
+                "p_confidence": confidence,
+                "p_reason": reason,
+            }).execute()
+            escalation_id = result.data
 
             if not escalation_id:
-                logger.error("Échec de création de l'escalade en base")
+                logger.error(f"Échec de création de l'escalade: conversation {self.conversation_id} introuvable pour {self.user_id}")
                 return None
 
-            # ✅ SECURITY: Verify escalation belongs to user (defensive validation)
-            created_escalation = self.db.table("support_escalations") \
-                .select("user_id") \
-                .eq("id", escalation_id) \
-                .single() \
-                .execute()
-            if created_escalation.data.get("user_id") != self.user_id:
-                logger.error(f"🚨 SECURITY ALERT: Escalation {escalation_id} user_id mismatch!")
-                raise RuntimeError("Escalation user_id validation failed")
-
-            # ✅ SECURITY: Filter conversation by user_id (service role bypass mitigation)
-            self.db.table("conversations").update({
-                "ai_mode": "OFF",
-                "updated_at": "now()"
-            }).eq("id", self.conversation_id) \
-              .eq("user_id", self.user_id) \
-              .execute()
-
-            # Get user email (already filtered by user_id)
-            user_result = self.db.table("users").select("email").eq("id", self.user_id).single().execute()
-            user_email = user_result.data.get("email") if user_result.data else None
-
-            if not user_email:
-                logger.error(f"Email utilisateur non trouvé pour user_id: {self.user_id}")
-                return escalation_id  # Escalation created but no email
-
-            # Generate secure link to the conversation
-            conversation_link = self.link_service.generate_conversation_link(
-                conversation_id=self.conversation_id,
-                user_id=self.user_id,
-                escalation_id=escalation_id
-            )
-
-            # Prepare email data
-            email_data = {
-                "id": escalation_id,
-                "conversation_id": self.conversation_id,
-                "user_id": self.user_id,
-                "user_email": user_email,
-                "message": message,
-                "confidence": confidence,
-                "reason": reason
-            }
-
-            # Send notification email to the support team
-            email_sent = await self.email_service.send_escalation_email(
-                to_email=user_email,
-                escalation_data=email_data,
-                conversation_link=conversation_link
-            )
-
-            # Mark as notified if email has been sent
-            if email_sent:
-                self.db.table("support_escalations").update({
-                    "notified": True
-                }).eq("id", escalation_id).execute()
-
-                logger.info(f"Escalation créée et email envoyé à l'équipe de support: {escalation_id}")
-            else:
-                logger.warning(f"Escalation créée mais email non envoyé à l'équipe de support: {escalation_id}")
-
+            logger.info(f"Escalation créée, notification en file d'envoi: {escalation_id}")
             return escalation_id
 
         except Exception as e:
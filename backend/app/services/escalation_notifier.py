@@ -0,0 +1,184 @@
+"""
+Escalation notifications, delivered from the escalation outbox
+
+The agent's escalation tool only calls create_escalation (migration 039): the
+escalation, the AI switch-off of the conversation and an escalation_outbox
+row are written in one transaction. Rendering and sending happen here, in
+app.workers.notifications:
+
+- EscalationNotifier.flush claims due outbox rows (claim_escalation_outbox,
+  SKIP LOCKED, with a lease) and groups them per recipient.
+- Per-recipient rate limit: one email per ESCALATION_DIGEST_WINDOW_SECONDS.
+  The first escalation of a quiet period is sent right away; the next ones
+  are deferred to the end of the window and sent together as one digest.
+- A failed send is retried with exponential backoff, up to
+  ESCALATION_NOTIFY_MAX_ATTEMPTS, then the rows are marked failed.
+
+Redis layout:
+    escalation:notify:{user_id}   string  set for the window after an email
+"""
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import redis
+from supabase import Client
+
+from app.core.metrics import ESCALATION_EMAILS, ESCALATION_NOTIFICATIONS
+from app.services.email_service import EmailService
+from app.services.link_service import LinkService
+
+logger = logging.getLogger(__name__)
+
+ESCALATION_NOTIFY_BATCH = int(os.getenv("ESCALATION_NOTIFY_BATCH", "200"))
+ESCALATION_DIGEST_WINDOW_SECONDS = int(os.getenv("ESCALATION_DIGEST_WINDOW_SECONDS", "300"))
+ESCALATION_NOTIFY_MAX_ATTEMPTS = int(os.getenv("ESCALATION_NOTIFY_MAX_ATTEMPTS", "5"))
+ESCALATION_NOTIFY_RETRY_SECONDS = int(os.getenv("ESCALATION_NOTIFY_RETRY_SECONDS", "30"))
+# Claimed rows not settled within the lease are claimed again (dead worker)
+ESCALATION_NOTIFY_LEASE_SECONDS = 120
+
+
+def _in(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+class EscalationNotifier:
+    """Envoi des notifications d'escalade depuis l'outbox: limité par destinataire, récapitulatif, réessais"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self._sync_client: Optional[redis.Redis] = None
+        self._email_service: Optional[EmailService] = None
+        self._link_service: Optional[LinkService] = None
+
+    def _get_sync_redis(self) -> redis.Redis:
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._sync_client
+
+    @property
+    def email_service(self) -> EmailService:
+        if self._email_service is None:
+            self._email_service = EmailService()
+        return self._email_service
+
+    @property
+    def link_service(self) -> LinkService:
+        if self._link_service is None:
+            self._link_service = LinkService()
+        return self._link_service
+
+    async def flush(self, db: Client) -> Dict[str, int]:
+        """
+        Deliver the due notifications of one claimed batch
+
+        Returns:
+            Dict with rows claimed, emails sent (single/digest) and rows
+            deferred, retried and failed
+        """
+        stats = {"claimed": 0, "emails": 0, "digests": 0, "deferred": 0, "retried": 0, "failed": 0}
+        rows = db.rpc(
+            "claim_escalation_outbox",
+            {"claim_limit": ESCALATION_NOTIFY_BATCH, "lease_seconds": ESCALATION_NOTIFY_LEASE_SECONDS},
+        ).execute().data or []
+        if not rows:
+            return stats
+        stats["claimed"] = len(rows)
+
+        by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_user[row["user_id"]].append(row)
+
+        users = db.table("users").select("id, email").in_("id", list(by_user)).execute().data or []
+        emails = {user["id"]: user.get("email") for user in users}
+
+        client = self._get_sync_redis()
+        for user_id, items in by_user.items():
+            items.sort(key=lambda item: item["created_at"])
+            ids = [item["id"] for item in items]
+
+            if not emails.get(user_id):
+                self._settle(db, ids, status="failed", last_error="no email for user")
+                stats["failed"] += len(ids)
+                ESCALATION_NOTIFICATIONS.labels(outcome="failed").inc(len(ids))
+                continue
+
+            # One email per window and recipient; the rest waits for the digest
+            window_key = f"escalation:notify:{user_id}"
+            if not client.set(window_key, "1", nx=True, ex=ESCALATION_DIGEST_WINDOW_SECONDS):
+                ttl = max(int(client.ttl(window_key)), 1)
+                db.table("escalation_outbox").update(
+                    {"status": "pending", "next_attempt_at": _in(ttl), "locked_until": None}
+                ).in_("id", ids).execute()
+                stats["deferred"] += len(ids)
+                ESCALATION_NOTIFICATIONS.labels(outcome="deferred").inc(len(ids))
+                continue
+
+            sent = await self._send(emails[user_id], user_id, items)
+            if sent:
+                self._settle(db, ids, status="sent")
+                db.table("support_escalations").update({"notified": True}).in_(
+                    "id", [item["escalation_id"] for item in items]
+                ).execute()
+                stats["digests" if len(items) > 1 else "emails"] += 1
+                ESCALATION_EMAILS.labels(kind="digest" if len(items) > 1 else "single").inc()
+                ESCALATION_NOTIFICATIONS.labels(outcome="sent").inc(len(ids))
+                continue
+
+            # Failed send: the window is not used up
+            client.delete(window_key)
+            attempts = max(item["attempts"] for item in items) + 1
+            if attempts >= ESCALATION_NOTIFY_MAX_ATTEMPTS:
+                self._settle(db, ids, status="failed", attempts=attempts, last_error="email not sent")
+                stats["failed"] += len(ids)
+                ESCALATION_NOTIFICATIONS.labels(outcome="failed").inc(len(ids))
+            else:
+                db.table("escalation_outbox").update({
+                    "status": "pending",
+                    "attempts": attempts,
+                    "next_attempt_at": _in(ESCALATION_NOTIFY_RETRY_SECONDS * 2 ** (attempts - 1)),
+                    "locked_until": None,
+                    "last_error": "email not sent",
+                }).in_("id", ids).execute()
+                stats["retried"] += len(ids)
+                ESCALATION_NOTIFICATIONS.labels(outcome="retried").inc(len(ids))
+
+        return stats
+
+    async def _send(self, to_email: str, user_id: str, items: List[Dict[str, Any]]) -> bool:
+        for item in items:
+            item["conversation_link"] = self.link_service.generate_conversation_link(
+                conversation_id=item["conversation_id"],
+                user_id=user_id,
+                escalation_id=item["escalation_id"],
+            )
+
+        if len(items) == 1:
+            item = items[0]
+            return await self.email_service.send_escalation_email(
+                to_email=to_email,
+                escalation_data={
+                    "id": item["escalation_id"],
+                    "conversation_id": item["conversation_id"],
+                    "user_id": user_id,
+                    "user_email": to_email,
+                    "message": item["message"],
+                    "confidence": item["confidence"],
+                    "reason": item["reason"],
+                },
+                conversation_link=item["conversation_link"],
+            )
+        return await self.email_service.send_escalation_digest_email(to_email=to_email, escalations=items)
+
+    @staticmethod
+    def _settle(db: Client, ids: List[int], status: str, **fields: Any) -> None:
+        update = {"status": status, "locked_until": None, **fields}
+        if status == "sent":
+            update["sent_at"] = datetime.now(timezone.utc).isoformat()
+        db.table("escalation_outbox").update(update).in_("id", ids).execute()
+
+
+# Instance globale du notifier d'escalades
+escalation_notifier = EscalationNotifier()
@@ -8,7 +8,12 @@ from typing import Optional, TypeAlias, Literal, List
 from datetime import datetime
 from app.db.session import get_db
 import logging
-from langchain_openai import ChatOpenAI
+from app.services.llm_router import (
+    LLMUnavailableError,
+    build_chain,
+    llm_router,
+    openrouter_chat_model,
+)
 import os
 import json
 from openai import OpenAIError
@@ -80,7 +85,12 @@ class FindAnswersError(Exception):
 
 
 class FindAnswers:
-    def __init__(self, user_id: str, model_name: str = "x-ai/grok-4-fast"):
+    def __init__(
+        self,
+        user_id: str,
+        model_name: str = "x-ai/grok-4-fast",
+        fallback_models: Optional[List[str]] = None,
+    ):
         if not user_id:
             raise FindAnswersError(
                 "User ID is required and cannot be empty",
@@ -90,6 +100,9 @@ class FindAnswers:
 
         self.user_id = user_id
         self.model_name = model_name
+        # Models tried by the LLM router: model_name, then fallbacks
+        self.model_chain = build_chain(model_name, fallback_models)
+        self._structured_llms = {}
 
         # No longer store db client (will use async client per-call)
 
@@ -102,12 +115,7 @@ class FindAnswers:
             )
 
         try:
-            self.llm = ChatOpenAI(
-                api_key=api_key,
-                base_url=os.getenv("OPENROUTER_BASE_URL")
-                or "https://openrouter.ai/api/v1",
-                model=model_name,
-            )
+            self.llm = self._structured_llm(model_name)
         except Exception as e:
             raise FindAnswersError(
                 f"Failed to initialize LLM client: {str(e)}",
@@ -115,6 +123,14 @@ class FindAnswers:
                 details={"model_name": model_name, "original_error": str(e)},
             )
 
+    def _structured_llm(self, model: str):
+        """Chat model returning an _AnswerSchema, one per model of the chain"""
+        if model not in self._structured_llms:
+            self._structured_llms[model] = openrouter_chat_model(
+                model
+            ).with_structured_output(_AnswerSchema)
+        return self._structured_llms[model]
+
     def get_question_answers(self) -> list[QuestionAnswer]:
         """
         Retrieve all active FAQ question-answers for the user.
@@ -315,8 +331,24 @@ User Question: ###
 """
 
             try:
-                result = self.llm.with_structured_output(_AnswerSchema).invoke(prompt)
+                try:
+                    _, result = llm_router.invoke(
+                        self.model_chain,
+                        lambda model: self._structured_llm(model).invoke(prompt),
+                        purpose="find_answers",
+                    )
+                except LLMUnavailableError as e:
+                    # Report the error of the last model tried
+                    if e.last_error is None:
+                        raise FindAnswersError(
+                            f"No LLM available for answer generation: {str(e)}",
+                            error_type="LLM_UNAVAILABLE",
+                            details={"question": question, "models": self.model_chain},
+                        )
+                    raise e.last_error
                 logger.debug(result.model_dump_json(indent=2))
+            except FindAnswersError:
+                raise
             except OpenAIError as e:
                 raise FindAnswersError(
                     f"OpenAI API error during answer generation: {str(e)}",
@@ -3,18 +3,21 @@ import os
 import random
 import asyncio
 from typing import List, Tuple
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
 from openai import AsyncOpenAI
-import PyPDF2
-import docx
-from bs4 import BeautifulSoup
 from google import genai
 from google.genai import types
 import numpy as np
 from numpy.linalg import norm
 
+from app.services.llm_router import LLM_REQUEST_TIMEOUT_SECONDS, build_chain, llm_router
+
+# Parsers and language detection are imported in the functions using them:
+# only the ingest worker needs them, not the processes that just embed queries
+
 def detect_language(text: str) -> tuple[str, str]:
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+
     try:
         sample = text[:1000].strip()
         if len(sample) < 50:
@@ -44,6 +47,8 @@ def parse_bytes_by_ext(data: bytes, ext: str) -> str:
     if ext in ['.txt', '.md']:
         return data.decode('utf-8', errors='ignore')
     if ext == '.pdf':
+        import PyPDF2
+
         reader = PyPDF2.PdfReader(io.BytesIO(data))
         out = []
         for p in reader.pages:
@@ -51,10 +56,14 @@ def parse_bytes_by_ext(data: bytes, ext: str) -> str:
             out.append(t)
         return '\n'.join(out)
     elif ext == '.docx':
+        import docx
+
         d = docx.Document(io.BytesIO(data))
         return '\n'.join([p.text for p in d.paragraphs])
     else:
         if ext == '.html':
+            from bs4 import BeautifulSoup
+
             soup = BeautifulSoup(data.decode('utf-8', errors='ignore'), 'html.parser')
             return soup.get_text(separator='\n', strip=True)
         raise ValueError(f'Format non supporté: {ext}')
@@ -63,8 +72,10 @@ async def add_context_to_chunks(chunks: List[Tuple[str, int, int]], document_tex
     if len(document_text) > 700000:
         document_text = document_text[:700000]
 
-    client = AsyncOpenAI(base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'), api_key=os.getenv('OPENROUTER_API_KEY'))
+    # No client retries: llm_router moves on to the fallback models instead
+    client = AsyncOpenAI(base_url=os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'), api_key=os.getenv('OPENROUTER_API_KEY'), max_retries=0, timeout=LLM_REQUEST_TIMEOUT_SECONDS)
     sem = asyncio.Semaphore(max(1, concurrency))
+    chain = build_chain(model)
 
     async def one(c: Tuple[str, int, int]) -> Tuple[str, int, int]:
         chunk_text = c[0]
@@ -73,7 +84,14 @@ async def add_context_to_chunks(chunks: List[Tuple[str, int, int]], document_tex
             {'role': 'user', 'content': f'\n<document>\n{document_text}\n</document>\n<chunk>\n{chunk_text}\n</chunk>\nGive only the succinct context (same language as the document).\nYOU MUST USE THE SAME LANGUAGE AS THE DOCUMENT.'}
         ]
         async with sem:
-            r = await asyncio.wait_for(client.chat.completions.create(model=model, messages=messages, temperature=0.75, max_tokens=256), timeout=timeout_s)
+            _, r = await asyncio.wait_for(
+                llm_router.ainvoke(
+                    chain,
+                    lambda m: client.chat.completions.create(model=m, messages=messages, temperature=0.75, max_tokens=256),
+                    purpose='contextualize',
+                ),
+                timeout=timeout_s,
+            )
         ctx = (r.choices[0].message.content or '').strip()
         return (f'{ctx} {chunk_text}'.strip(), c[1], c[2])
 
@@ -108,7 +126,12 @@ def embed_texts(
     if task_type not in valid_task_types:
         raise ValueError(f'Invalid task_type. Must be one of: {valid_task_types}')
 
-    client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
+    # GEMINI_API_BASE_URL: other endpoint (e.g. the load test stand-in)
+    base_url = os.getenv('GEMINI_API_BASE_URL')
+    client = genai.Client(
+        api_key=os.getenv('GEMINI_API_KEY'),
+        http_options=types.HttpOptions(base_url=base_url) if base_url else None,
+    )
     resp = client.models.embed_content(
         model=model,
         contents=batch,
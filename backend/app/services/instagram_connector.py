@@ -3,12 +3,16 @@ Instagram Platform Connector
 Implementation of PlatformConnector for Instagram
 """
 import logging
-from typing import List, Dict, Tuple, Optional, Any
+from typing import AsyncIterator, List, Dict, Tuple, Optional, Any
 from app.services.platform_connector import PlatformConnector
 from app.services.instagram_service import InstagramService
 
 logger = logging.getLogger(__name__)
 
+# Graph API maximum for /{ig_user_id}/media
+MEDIA_PAGE_SIZE = 100
+MEDIA_FIELDS = 'id,caption,media_type,media_url,thumbnail_url,permalink,timestamp,comments_count,like_count'
+
 
 class InstagramConnector(PlatformConnector):
     """
@@ -224,39 +228,97 @@ class InstagramConnector(PlatformConnector):
         Docs: https://developers.facebook.com/docs/instagram-api/reference/ig-user/media
 
         Args:
-            limit: Max number of posts to fetch (default 50, max 100)
+            limit: Max number of posts to fetch (default 50, follows pagination
+                beyond the 100 per page of the Graph API)
 
         Returns:
             List of media objects with fields: id, caption, media_type, media_url, timestamp, etc.
         """
-        try:
-            page_id = self.service.page_id
-
-            url = f'/{page_id}/media'
-            params = {
-                'fields': 'id,caption,media_type,media_url,thumbnail_url,permalink,timestamp,comments_count,like_count',
-                'limit': min(limit, 100),
-                'access_token': self.service.access_token
-            }
+        media_list: List[Dict[str, Any]] = []
+        async for page, _ in self.iter_user_media(max_items=limit):
+            media_list.extend(page)
+        return media_list
 
-            logger.info(f"[IG_CONNECTOR] Fetching user media (limit={limit})")
-
-            resp = await self.service.client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+    async def fetch_user_media_page(
+        self,
+        after: Optional[str] = None,
+        page_size: int = MEDIA_PAGE_SIZE
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of user's Instagram media posts
 
-            media_list = data.get('data', [])
+        Args:
+            after: Graph API cursor of the previous page (None = most recent posts)
+            page_size: Posts per page (max 100)
 
-            logger.info(
-                f"[IG_CONNECTOR] Fetched {len(media_list)} media posts "
-                f"for user {page_id}"
-            )
+        Returns:
+            (media_list, next_cursor), next_cursor is None on the last page
 
-            return media_list
+        Raises:
+            httpx.HTTPError: On Graph API failure (the caller keeps its cursor)
+        """
+        page_id = self.service.page_id
+
+        url = f'/{page_id}/media'
+        params = {
+            'fields': MEDIA_FIELDS,
+            'limit': min(page_size, MEDIA_PAGE_SIZE),
+            'access_token': self.service.access_token
+        }
+        if after:
+            params['after'] = after
+
+        resp = await self.service.client.get(url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        media_list = data.get('data', [])
+        paging = data.get('paging', {})
+        # cursors.after is also set on the last page: only 'next' tells there is more
+        next_cursor = paging.get('cursors', {}).get('after') if paging.get('next') else None
+
+        logger.info(
+            f"[IG_CONNECTOR] Fetched {len(media_list)} media posts for user {page_id}, "
+            f"next_cursor={'exists' if next_cursor else 'none'}"
+        )
+
+        return (media_list, next_cursor)
+
+    async def iter_user_media(
+        self,
+        after: Optional[str] = None,
+        max_items: Optional[int] = None,
+        raise_errors: bool = False
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Stream user's media page by page, most recent first
 
-        except Exception as e:
-            logger.error(f"[IG_CONNECTOR] Error fetching user media: {e}")
-            return []
+        Yields (page, next_cursor): next_cursor resumes the stream right after
+        this page. Stops after max_items posts (the last page is truncated) or
+        at the end of the feed. A Graph API error ends the stream, or is raised
+        with raise_errors=True.
+        """
+        remaining = max_items
+        cursor = after
+        while remaining is None or remaining > 0:
+            try:
+                page_size = MEDIA_PAGE_SIZE if remaining is None else min(remaining, MEDIA_PAGE_SIZE)
+                page, next_cursor = await self.fetch_user_media_page(cursor, page_size)
+            except Exception as e:
+                logger.error(f"[IG_CONNECTOR] Error fetching user media: {e}")
+                if raise_errors:
+                    raise
+                return
+
+            if remaining is not None:
+                page = page[:remaining]
+                remaining -= len(page)
+
+            yield (page, next_cursor)
+
+            if not next_cursor or not page:
+                return
+            cursor = next_cursor
 
     async def fetch_post_details(
         self,
@@ -21,7 +21,8 @@ class InstagramService:
             raise RuntimeError('INSTAGRAM_PAGE_ID manquant')
 
         graph_version = os.getenv('META_GRAPH_VERSION', 'v24.0')
-        self.api_url = f'https://graph.instagram.com/{graph_version}'
+        graph_base_url = os.getenv('INSTAGRAM_GRAPH_BASE_URL', 'https://graph.instagram.com')
+        self.api_url = f'{graph_base_url}/{graph_version}'
         self.client = httpx.AsyncClient(base_url=self.api_url, timeout=httpx.Timeout(connect=5.0, read=15.0, write=10.0, pool=15.0))
 
     async def validate_credentials(self) -> Dict[str, Any]:
@@ -0,0 +1,63 @@
+"""
+Knowledge version per user
+
+A counter in Redis bumped on every change that can alter an AI answer
+(FAQ, knowledge documents, AI settings). Caches derived from the knowledge
+base put the version in their keys, so a bump invalidates them at once
+without scanning for keys.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+_lock = threading.Lock()
+
+
+def _get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    decode_responses=True,
+                    socket_timeout=2,
+                )
+    return _client
+
+
+def _get_key(user_id: str) -> str:
+    return f"kb_version:{user_id}"
+
+
+def get_knowledge_version(user_id: str) -> Optional[int]:
+    """
+    Current knowledge version of a user (0 if never bumped)
+
+    Returns None if Redis is unavailable; callers must then bypass their cache.
+    """
+    try:
+        value = _get_redis().get(_get_key(user_id))
+        return int(value) if value is not None else 0
+    except Exception as e:
+        logger.warning(f"Knowledge version unavailable for {user_id}: {e}")
+        return None
+
+
+def bump_knowledge_version(user_id: str) -> Optional[int]:
+    """Increment the knowledge version of a user, invalidating derived caches"""
+    if not user_id:
+        return None
+    try:
+        version = _get_redis().incr(_get_key(user_id))
+        logger.info(f"Knowledge version of {user_id} bumped to {version}")
+        return version
+    except Exception as e:
+        logger.error(f"Failed to bump knowledge version for {user_id}: {e}")
+        return None
@@ -0,0 +1,73 @@
+"""
+Per-conversation latency breakdown of the DM replies
+
+The batch scanner collects the stage durations of each reply
+(app.core.tracing.collect_breakdown) and stores them here; the last
+LATENCY_HISTORY_SIZE replies of a conversation are kept for
+LATENCY_HISTORY_TTL_SECONDS and served by
+GET /api/conversations/{conversation_id}/latency.
+
+Redis layout:
+    latency:{conversation_id}   list of JSON records, newest first
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis_async
+
+logger = logging.getLogger(__name__)
+
+LATENCY_HISTORY_SIZE = int(os.getenv("LATENCY_HISTORY_SIZE", "20"))
+LATENCY_HISTORY_TTL_SECONDS = int(os.getenv("LATENCY_HISTORY_TTL_SECONDS", str(24 * 3600)))
+
+
+class LatencyStore:
+    """Historique Redis des temps de réponse par conversation"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self._redis_pool = None
+
+    async def get_redis(self) -> redis_async.Redis:
+        if not self._redis_pool:
+            self._redis_pool = redis_async.ConnectionPool.from_url(
+                self.redis_url, decode_responses=True, max_connections=20
+            )
+        return redis_async.Redis(connection_pool=self._redis_pool)
+
+    @staticmethod
+    def _key(conversation_id: str) -> str:
+        return f"latency:{conversation_id}"
+
+    async def record(self, conversation_id: str, record: Dict[str, Any]) -> None:
+        """Store the breakdown of one reply (one pipeline, never raises)"""
+        if not conversation_id:
+            return
+        key = self._key(conversation_id)
+        try:
+            redis_client = await self.get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.lpush(key, json.dumps(record))
+                pipe.ltrim(key, 0, LATENCY_HISTORY_SIZE - 1)
+                pipe.expire(key, LATENCY_HISTORY_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[LATENCY] Breakdown not stored for {conversation_id}: {e}")
+
+    async def get_recent(self, conversation_id: str, limit: int = LATENCY_HISTORY_SIZE) -> List[Dict[str, Any]]:
+        """Latest reply breakdowns of a conversation, newest first"""
+        redis_client = await self.get_redis()
+        raw_records = await redis_client.lrange(self._key(conversation_id), 0, limit - 1)
+        records = []
+        for raw in raw_records:
+            try:
+                records.append(json.loads(raw))
+            except json.JSONDecodeError:
+                logger.warning(f"[LATENCY] Invalid record ignored for {conversation_id}")
+        return records
+
+
+# Instance globale de l'historique des latences
+latency_store = LatencyStore()
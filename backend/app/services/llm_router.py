@@ -0,0 +1,406 @@
+"""
+LLM routing: latency budgets, hedged requests, circuit breakers, fallbacks
+
+Every OpenRouter call of the reply and ingestion paths (agent turns, the
+FindAnswers FAQ grader, history summaries, chunk contextualization) goes
+through LLMRouter instead of retrying the same model with sleeps:
+
+- Chain: the configured model first, then the fallback models of the tenant
+  (ai_settings.ai_fallback_models) or LLM_FALLBACK_MODELS.
+- Latency budget: once a call has run longer than the budget of its model
+  (LLM_LATENCY_BUDGETS, LLM_LATENCY_BUDGET_SECONDS by default), a hedged call
+  to the next model of the chain is started; the first success wins, the
+  other call is abandoned. At most LLM_HEDGE_MAX_IN_FLIGHT calls run at once.
+- Failure: the next model of the chain is called right away.
+- Circuit breaker per model ("provider/model"): LLM_BREAKER_FAILURES
+  consecutive failures open it for LLM_BREAKER_COOLDOWN_SECONDS, during which
+  the model is skipped; then one probe call is let through (half-open).
+- Deadline: a routed call gives up after LLM_ROUTE_DEADLINE_SECONDS, or
+  earlier at the reply deadline (reply_deadline(), set by
+  generate_smart_response): the routed calls of one reply (speculative first
+  turn, FindAnswers inside unified_search, next agent turns) share
+  LLM_REPLY_DEADLINE_SECONDS, under the 30 s budget of BatchScanner. A call
+  answering after the deadline counts as a failure for its breaker.
+
+Breakers are per process: each API / Celery worker process learns on its own
+calls. Abandoned calls keep running until the provider answers or the HTTP
+timeout (LLM_REQUEST_TIMEOUT_SECONDS); their outcome still feeds the breaker.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.metrics import LLM_BREAKER_OPEN, LLM_CALLS, LLM_HEDGES
+
+logger = logging.getLogger(__name__)
+
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "8"))
+# {"x-ai/grok-4-fast": 6, "openai/gpt-5": 15}: per-model budgets
+LLM_LATENCY_BUDGETS: Dict[str, float] = {
+    model: float(seconds)
+    for model, seconds in json.loads(os.getenv("LLM_LATENCY_BUDGETS") or "{}").items()
+}
+LLM_FALLBACK_MODELS = [
+    m.strip()
+    for m in os.getenv("LLM_FALLBACK_MODELS", "openai/gpt-4o-mini,google/gemini-2.5-flash").split(",")
+    if m.strip()
+]
+LLM_ROUTE_DEADLINE_SECONDS = float(os.getenv("LLM_ROUTE_DEADLINE_SECONDS", "25"))
+LLM_REPLY_DEADLINE_SECONDS = float(os.getenv("LLM_REPLY_DEADLINE_SECONDS", "25"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "30"))
+LLM_HEDGE_MAX_IN_FLIGHT = int(os.getenv("LLM_HEDGE_MAX_IN_FLIGHT", "2"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+# Threads running the sync calls (hedges and abandoned calls included); a
+# saturated pool delays the calls themselves
+LLM_ROUTER_THREADS = int(os.getenv("LLM_ROUTER_THREADS", "64"))
+
+
+# time.perf_counter() by which every routed call of the current reply must end.
+# Context variable: copied into asyncio.to_thread and the copy_context() pools
+# of the agent, so nested calls (FindAnswers in a tool call) see it too.
+_reply_deadline: ContextVar[Optional[float]] = ContextVar("llm_reply_deadline", default=None)
+
+
+@contextmanager
+def reply_deadline(seconds: float = LLM_REPLY_DEADLINE_SECONDS):
+    """Cap the routed calls made in this context (nested deadlines keep the earliest)"""
+    deadline = time.perf_counter() + seconds
+    current = _reply_deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _reply_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _reply_deadline.reset(token)
+
+
+class LLMUnavailableError(Exception):
+    """Every model of the chain failed, is open, or the deadline passed"""
+
+    def __init__(self, message: str, last_error: Optional[BaseException] = None):
+        self.last_error = last_error
+        super().__init__(message)
+
+
+def build_chain(primary: str, fallback_models: Optional[Iterable[str]] = None) -> List[str]:
+    """Primary model then fallbacks (tenant's if set, else LLM_FALLBACK_MODELS), deduplicated"""
+    fallbacks = list(fallback_models) if fallback_models else LLM_FALLBACK_MODELS
+    chain: List[str] = []
+    for model in [primary, *fallbacks]:
+        if model and model not in chain:
+            chain.append(model)
+    return chain
+
+
+def latency_budget(model: str) -> float:
+    return LLM_LATENCY_BUDGETS.get(model, LLM_LATENCY_BUDGET_SECONDS)
+
+
+def openrouter_chat_model(model: str, **kwargs: Any):
+    """
+    ChatOpenAI on OpenRouter for routed calls: bounded HTTP timeout and no
+    client retries (the router moves to the next model instead)
+    """
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=os.getenv("OPENROUTER_API_KEY"),
+        base_url=os.getenv("OPENROUTER_BASE_URL") or "https://openrouter.ai/api/v1",
+        model=model,
+        timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+        max_retries=0,
+        **kwargs,
+    )
+
+
+@dataclass
+class _BreakerState:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+
+
+class CircuitBreakers:
+    """Disjoncteurs par modèle (closed → open → half-open), en mémoire du process"""
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES,
+                 cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self._states: Dict[str, _BreakerState] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, model: str) -> bool:
+        """Closed: yes. Open: no until the cooldown is over, then one probe at a time"""
+        with self._lock:
+            state = self._states.get(model)
+            if state is None or state.opened_at is None:
+                return True
+            if self.clock() - state.opened_at < self.cooldown_seconds or state.probing:
+                return False
+            state.probing = True
+            return True
+
+    def record_success(self, model: str) -> None:
+        with self._lock:
+            state = self._states.get(model)
+            if state is None:
+                return
+            if state.opened_at is not None:
+                logger.info(f"[LLM ROUTER] Breaker closed for {model}")
+                LLM_BREAKER_OPEN.labels(model=model).set(0)
+            self._states.pop(model, None)
+
+    def record_failure(self, model: str) -> None:
+        with self._lock:
+            state = self._states.setdefault(model, _BreakerState())
+            state.failures += 1
+            if state.probing or (state.opened_at is None and state.failures >= self.failure_threshold):
+                # Failed probe: open again for a full cooldown
+                state.opened_at = self.clock()
+                state.probing = False
+                LLM_BREAKER_OPEN.labels(model=model).set(1)
+                logger.warning(
+                    f"[LLM ROUTER] Breaker open for {model} "
+                    f"({state.failures} failures, {self.cooldown_seconds:.0f}s cooldown)"
+                )
+
+    def release_probe(self, model: str) -> None:
+        """Cancelled probe: neither a success nor a failure, let the next call probe"""
+        with self._lock:
+            state = self._states.get(model)
+            if state is not None:
+                state.probing = False
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model: {"failures": s.failures, "open": s.opened_at is not None}
+                for model, s in self._states.items()
+            }
+
+
+class LLMRouter:
+    """Appels LLM avec budget de latence, requêtes couvertes et chaîne de repli"""
+
+    def __init__(self, breakers: Optional[CircuitBreakers] = None,
+                 deadline_seconds: float = LLM_ROUTE_DEADLINE_SECONDS,
+                 max_in_flight: int = LLM_HEDGE_MAX_IN_FLIGHT,
+                 max_attempts: int = LLM_MAX_ATTEMPTS,
+                 budget: Callable[[str], float] = latency_budget,
+                 threads: int = LLM_ROUTER_THREADS):
+        self.breakers = breakers or CircuitBreakers()
+        self.deadline_seconds = deadline_seconds
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_attempts = max(1, max_attempts)
+        self.budget = budget
+        self.threads = threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix="llm-router"
+                )
+            return self._executor
+
+    def _deadline(self) -> float:
+        """End of a routed call starting now: route deadline, capped by the reply deadline"""
+        deadline = time.perf_counter() + self.deadline_seconds
+        reply = _reply_deadline.get()
+        return deadline if reply is None else min(deadline, reply)
+
+    def _candidates(self, chain: List[str]):
+        """Models to call in order: the chain, then again from the top, skipping open breakers"""
+        attempts = 0
+        index = 0
+        skipped = 0
+        while attempts < self.max_attempts and skipped < len(chain):
+            model = chain[index % len(chain)]
+            index += 1
+            if not self.breakers.allow(model):
+                skipped += 1
+                continue
+            skipped = 0
+            attempts += 1
+            yield model
+
+    def _record(self, model: str, started: float, error: Optional[BaseException], purpose: str) -> None:
+        # Model health is judged on the route deadline, not on what was left
+        # of the reply deadline when the call started
+        elapsed = time.perf_counter() - started
+        if error is None and elapsed <= self.deadline_seconds:
+            self.breakers.record_success(model)
+            LLM_CALLS.labels(model=model, purpose=purpose, outcome="success").inc()
+        elif error is None:
+            # Answered after the caller gave up: a failure for the breaker
+            self.breakers.record_failure(model)
+            LLM_CALLS.labels(model=model, purpose=purpose, outcome="timeout").inc()
+        else:
+            self.breakers.record_failure(model)
+            LLM_CALLS.labels(model=model, purpose=purpose, outcome="error").inc()
+            logger.warning(
+                f"[LLM ROUTER] {purpose} call to {model} failed after "
+                f"{elapsed:.1f}s: {error}"
+            )
+
+    def invoke(self, chain: List[str], call: Callable[[str], Any], purpose: str = "llm") -> Tuple[str, Any]:
+        """
+        Run call(model) along the chain (sync); returns (model, result)
+
+        Raises LLMUnavailableError when no model answered in time.
+        """
+        deadline = self._deadline()
+        if deadline <= time.perf_counter():
+            raise self._unavailable(chain, {}, None, purpose, reply_deadline_passed=True)
+        executor = self._get_executor()
+        candidates = self._candidates(chain)
+        pending: Dict[Future, Tuple[str, float]] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch(hedge: bool) -> bool:
+            model = next(candidates, None)
+            if model is None:
+                return False
+            started = time.perf_counter()
+            future = executor.submit(copy_context().run, call, model)
+            future.add_done_callback(
+                lambda f, m=model, s=started: self._record(m, s, f.exception(), purpose)
+            )
+            pending[future] = (model, started)
+            if hedge:
+                LLM_HEDGES.labels(model=model, purpose=purpose).inc()
+                logger.info(f"[LLM ROUTER] {purpose}: budget exceeded, hedging with {model}")
+            return True
+
+        exhausted = not launch(hedge=False)
+        while pending:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            # Wake up at the budget of the latest call to hedge it, if allowed
+            model, started = list(pending.values())[-1]
+            hedge_at = started + self.budget(model)
+            can_hedge = not exhausted and len(pending) < self.max_in_flight and hedge_at < deadline
+            timeout = (hedge_at if can_hedge else deadline) - now
+
+            done, _ = wait(list(pending), timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                if can_hedge and time.perf_counter() >= hedge_at:
+                    exhausted = not launch(hedge=True)
+                continue
+
+            for future in done:
+                model, _ = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    return model, future.result()
+                last_error = error
+            if not pending:
+                exhausted = not launch(hedge=False)
+
+        # Calls still running past the deadline are recorded when they end
+        raise self._unavailable(chain, pending, last_error, purpose)
+
+    async def ainvoke(self, chain: List[str], call: Callable[[str], Awaitable[Any]],
+                      purpose: str = "llm") -> Tuple[str, Any]:
+        """Async version of invoke(): call(model) returns an awaitable"""
+        deadline = self._deadline()
+        if deadline <= time.perf_counter():
+            raise self._unavailable(chain, {}, None, purpose, reply_deadline_passed=True)
+        candidates = self._candidates(chain)
+        pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+        last_error: Optional[BaseException] = None
+        exhausted = False
+
+        def launch(hedge: bool) -> bool:
+            model = next(candidates, None)
+            if model is None:
+                return False
+            started = time.perf_counter()
+            task = asyncio.ensure_future(call(model))
+            task.add_done_callback(
+                lambda t, m=model, s=started: None if t.cancelled()
+                else self._record(m, s, t.exception(), purpose)
+            )
+            pending[task] = (model, started)
+            if hedge:
+                LLM_HEDGES.labels(model=model, purpose=purpose).inc()
+                logger.info(f"[LLM ROUTER] {purpose}: budget exceeded, hedging with {model}")
+            return True
+
+        exhausted = not launch(hedge=False)
+        try:
+            while pending:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                model, started = list(pending.values())[-1]
+                hedge_at = started + self.budget(model)
+                can_hedge = not exhausted and len(pending) < self.max_in_flight and hedge_at < deadline
+                timeout = (hedge_at if can_hedge else deadline) - now
+
+                done, _ = await asyncio.wait(
+                    list(pending), timeout=max(timeout, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if can_hedge and time.perf_counter() >= hedge_at:
+                        exhausted = not launch(hedge=True)
+                    continue
+
+                for task in done:
+                    model, _ = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return model, task.result()
+                    last_error = error
+                if not pending:
+                    exhausted = not launch(hedge=False)
+        finally:
+            # Unlike threads, abandoned coroutines can be cancelled. Their done
+            # callback skips them, so settle their breaker here, also when the
+            # caller itself is cancelled: a failure past the route deadline,
+            # otherwise (reply deadline, hedge loser, outer cancel) the probe
+            # they may hold is released
+            for task, (model, started) in pending.items():
+                task.cancel()
+                if time.perf_counter() - started >= self.deadline_seconds:
+                    self.breakers.record_failure(model)
+                else:
+                    self.breakers.release_probe(model)
+
+        for model, _ in pending.values():
+            LLM_CALLS.labels(model=model, purpose=purpose, outcome="timeout").inc()
+        raise self._unavailable(chain, pending, last_error, purpose)
+
+    def _unavailable(self, chain: List[str], pending: Dict, last_error: Optional[BaseException],
+                     purpose: str, reply_deadline_passed: bool = False) -> LLMUnavailableError:
+        if reply_deadline_passed:
+            reason = "reply deadline already passed"
+        elif pending:
+            reason = "deadline exceeded"
+        elif last_error is not None:
+            reason = f"last error: {last_error}"
+        else:
+            reason = "all circuit breakers open"
+        logger.error(f"[LLM ROUTER] {purpose}: no answer from {chain} ({reason})")
+        return LLMUnavailableError(f"No LLM available for {purpose} ({reason})", last_error)
+
+
+# Instance globale du routeur LLM
+llm_router = LLMRouter()
@@ -6,6 +6,9 @@ from typing import Dict, List, Optional, Any
 import redis.asyncio as redis
 from contextlib import asynccontextmanager
 import os
+import time
+
+from app.core.tracing import inject_context, webhook_elapsed_ms
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +119,12 @@ class MessageBatcher:
                     'message_data': message_data["metadata"],
                     'conversation_message_id': conversation_message_id,
                     'message_type': message_data["message_type"],
-                    'external_message_id': message_data["external_message_id"]
+                    'external_message_id': message_data["external_message_id"],
+                    'token_count': message_data["metadata"].get("token_count", 0),
+                    # Latency tracing: arrival, webhook time until batched, trace context
+                    'received_at': time.time(),
+                    'ingest_ms': webhook_elapsed_ms(),
+                    'trace_context': inject_context(),
                 }
 
                 try:
@@ -216,12 +224,16 @@ class MessageBatcher:
                 context_messages_text_only = ""
                 context_messages =[]
                 message_ids = []
+                batch_token_count = 0
                 last_external_message_id = None
                 #check if there is only one image in the messages
                 image_in_messages = False
                 storage_object_name_list = []
+                first_message = {}
                 for msg_raw in messages_raw:
                     msg_data = json.loads(msg_raw)
+                    if not first_message:
+                        first_message = msg_data
                     if msg_data.get("message_type") == "image":
                         image_in_messages = True
                         continue
@@ -248,6 +260,7 @@ class MessageBatcher:
                         else:
                             context_messages_text_only = context_messages_text_only + " " + content
                             
+                        batch_token_count += int(msg_data.get("token_count") or 0)
                         external_id = msg_data.get("external_message_id", "")
                         message_ids.append(external_id)
                         last_external_message_id = external_id
@@ -257,7 +270,8 @@ class MessageBatcher:
                 messages = {
                 "message_data": {"role": "user", "content": context_messages_text_only if not image_in_messages else context_messages},
                 "storage_object_name_list": storage_object_name_list,
-                "external_message_id": last_external_message_id
+                "external_message_id": last_external_message_id,
+                "token_count": batch_token_count
             }
                      
 
@@ -276,7 +290,11 @@ class MessageBatcher:
                     "messages": messages,
                     "message_ids": message_ids,
                     "conversation_key": base_key,
-                    "conversation_id": conversation_id
+                    "conversation_id": conversation_id,
+                    # The first message opened the batch window: its trace is continued
+                    "first_received_at": first_message.get("received_at"),
+                    "ingest_ms": first_message.get("ingest_ms"),
+                    "trace_context": first_message.get("trace_context"),
                 }
                 
             finally:
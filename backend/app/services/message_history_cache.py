@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import redis
+import redis.asyncio as redis_async
+
+logger = logging.getLogger(__name__)
+
+
+def compute_messages_etag(conversation_id: str, messages: List[Dict[str, Any]]) -> str:
+    """
+    ETag of a page of messages
+
+    Built from the ids, statuses and update timestamps so that a new message,
+    a status change (delivered/read) or an edit changes the tag.
+    """
+    digest = hashlib.sha1(conversation_id.encode("utf-8"))
+    for message in messages:
+        digest.update(
+            f"{message.get('id')}|{message.get('status')}|{message.get('updated_at')};".encode("utf-8")
+        )
+    return f'W/"{digest.hexdigest()}"'
+
+
+class MessageHistoryCache:
+    """
+    Cache Redis de la dernière page de messages d'une conversation
+
+    Le frontend poll /conversations/{id}/messages tant qu'un chat est ouvert.
+    La dernière page (par taille de page) est stockée dans un hash Redis par
+    conversation et invalidée à chaque insertion de message
+    (save_unified_message, save_response_to_db, envoi manuel).
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 300):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.ttl_seconds = ttl_seconds
+        self._redis_pool = None
+        self._sync_client: Optional[redis.Redis] = None
+
+    async def get_redis(self) -> redis_async.Redis:
+        """Obtenir une connexion Redis depuis le pool"""
+        if not self._redis_pool:
+            self._redis_pool = redis_async.ConnectionPool.from_url(
+                self.redis_url,
+                decode_responses=True,
+                max_connections=20
+            )
+        return redis_async.Redis(connection_pool=self._redis_pool)
+
+    def _get_sync_redis(self) -> redis.Redis:
+        """Client synchrone pour les appelants synchrones (workers, threads)"""
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._sync_client
+
+    def _get_cache_key(self, conversation_id: str) -> str:
+        """Clé du hash des dernières pages d'une conversation (champ = taille de page)"""
+        return f"messages:latest:{conversation_id}"
+
+    async def get_latest_page(
+        self, conversation_id: str, user_id: str, limit: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Récupérer la dernière page en cache
+
+        Returns:
+            {"messages", "has_more", "etag"} ou None si absent / autre utilisateur
+        """
+        try:
+            redis_client = await self.get_redis()
+            raw = await redis_client.hget(self._get_cache_key(conversation_id), str(limit))
+            if not raw:
+                return None
+            entry = json.loads(raw)
+            # The page was fetched through RLS for this user only
+            if entry.get("user_id") != user_id:
+                return None
+            return entry
+        except Exception as e:
+            logger.warning(f"Erreur lecture cache messages {conversation_id}: {e}")
+            return None
+
+    async def set_latest_page(
+        self,
+        conversation_id: str,
+        user_id: str,
+        limit: int,
+        messages: List[Dict[str, Any]],
+        has_more: bool,
+        etag: str,
+    ) -> None:
+        """Mettre en cache la dernière page d'une conversation"""
+        entry = {
+            "user_id": user_id,
+            "messages": messages,
+            "has_more": has_more,
+            "etag": etag,
+        }
+        try:
+            redis_client = await self.get_redis()
+            key = self._get_cache_key(conversation_id)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, str(limit), json.dumps(entry, default=str))
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Erreur écriture cache messages {conversation_id}: {e}")
+
+    async def invalidate(self, conversation_id: str) -> None:
+        """Invalider la dernière page d'une conversation"""
+        if not conversation_id:
+            return
+        try:
+            redis_client = await self.get_redis()
+            await redis_client.delete(self._get_cache_key(conversation_id))
+        except Exception as e:
+            logger.warning(f"Erreur invalidation cache messages {conversation_id}: {e}")
+
+    def invalidate_sync(self, conversation_id: str) -> None:
+        """Invalider la dernière page depuis du code synchrone"""
+        if not conversation_id:
+            return
+        try:
+            self._get_sync_redis().delete(self._get_cache_key(conversation_id))
+        except Exception as e:
+            logger.warning(f"Erreur invalidation cache messages {conversation_id}: {e}")
+
+    def invalidate_many_sync(self, conversation_ids: List[str]) -> None:
+        """Invalider la dernière page de plusieurs conversations (un seul DEL)"""
+        keys = [self._get_cache_key(conversation_id) for conversation_id in conversation_ids if conversation_id]
+        if not keys:
+            return
+        try:
+            self._get_sync_redis().delete(*keys)
+        except Exception as e:
+            logger.warning(f"Erreur invalidation cache messages ({len(keys)} conversations): {e}")
+
+    async def close(self):
+        """Fermer les connexions Redis"""
+        if self._redis_pool:
+            await self._redis_pool.disconnect()
+        if self._sync_client:
+            self._sync_client.close()
+
+
+# Instance globale du cache
+message_history_cache = MessageHistoryCache()
@@ -33,7 +33,8 @@ class MessengerService:
             raise RuntimeError('Messenger page_id is required')
 
         graph_version = os.getenv('META_GRAPH_VERSION', 'v24.0')
-        self.api_url = f'https://graph.facebook.com/{graph_version}'
+        graph_base_url = os.getenv('META_GRAPH_BASE_URL', 'https://graph.facebook.com')
+        self.api_url = f'{graph_base_url}/{graph_version}'
         self.client = httpx.AsyncClient(
             base_url=self.api_url,
             timeout=httpx.Timeout(connect=5.0, read=15.0, write=10.0, pool=15.0)
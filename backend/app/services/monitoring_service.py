@@ -3,6 +3,7 @@ Monitoring Service
 Manages comment monitoring for all posts (scheduled + imported)
 """
 import logging
+import os
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
 from supabase import Client
@@ -15,6 +16,9 @@ from app.schemas.monitored_posts import (
 
 logger = logging.getLogger(__name__)
 
+# Rows per monitored_posts upsert during an import (several Graph API pages)
+IMPORT_BATCH_SIZE = int(os.getenv("MONITORING_IMPORT_BATCH_SIZE", "500"))
+
 
 class MonitoringService:
     """Service for managing post monitoring and auto-rules"""
@@ -33,17 +37,27 @@ class MonitoringService:
     async def sync_instagram_posts(
         self,
         social_account_id: str,
-        limit: int = 50
+        limit: int = 50,
+        resume: bool = False
     ) -> Dict[str, Any]:
         """
         Import Instagram posts and apply auto-rules
 
+        Media pages are streamed from the Graph API and upserted in batches of
+        IMPORT_BATCH_SIZE rows. After each batch the Graph API cursor is stored
+        on the social account, so a large import interrupted (timeout, API
+        error, limit reached) continues where it stopped with resume=True.
+        A sync of the latest posts (resume=False) leaves the cursor of an import
+        in progress untouched, and an import ended by an API error keeps the
+        cursor of its last stored batch (a NULL cursor means fully imported).
+
         Args:
             social_account_id: UUID of social_accounts
-            limit: Max number of posts to import
+            limit: Max number of posts to import in this call
+            resume: Continue from the stored cursor instead of the latest posts
 
         Returns:
-            Dict with posts_imported and posts_monitored counts
+            Dict with posts_imported, posts_monitored, has_more and next_cursor
 
         Raises:
             ValueError: If account not found or not connected
@@ -69,7 +83,7 @@ class MonitoringService:
                 f"has_account_id={bool(account.data.get('account_id'))}"
             )
 
-            # 2. Fetch posts from Instagram Graph API
+            # 2. Stream posts from Instagram Graph API
             from app.services.instagram_connector import InstagramConnector
 
             access_token = account.data.get("access_token")
@@ -85,42 +99,43 @@ class MonitoringService:
                     "Instagram account ID (page_id) missing. Please reconnect your Instagram account."
                 )
 
+            stored_cursor = account.data.get("media_import_cursor")
+            after = stored_cursor if resume else None
+            # Only the import owns the cursor: a refresh of the latest posts
+            # must not move (or clear) the cursor of an import in progress
+            track_cursor = resume or not stored_cursor
             connector = InstagramConnector(access_token, page_id)
-            media_list = await connector.fetch_user_media(limit=limit)
-
-            logger.info(
-                f"[MONITORING_SERVICE] Fetched {len(media_list)} posts "
-                f"from Instagram for account {social_account_id}"
-            )
 
-            # 3. Insert/update monitored_posts
+            # 3. Upsert monitored_posts in batches, checkpointing the cursor
             imported_count = 0
-            for media in media_list:
-                post_data = {
-                    "user_id": self.user_id,
-                    "social_account_id": social_account_id,
-                    "platform_post_id": media["id"],
-                    "platform": "instagram",
-                    "caption": media.get("caption"),
-                    "media_url": media.get("media_url") or media.get("thumbnail_url"),
-                    "posted_at": media["timestamp"],
-                    "source": "imported"
-                }
-
-                # Upsert (insert or update on conflict)
-                result = self.supabase.table("monitored_posts") \
-                    .upsert(
-                        post_data,
-                        on_conflict="user_id,platform_post_id"
-                    ) \
-                    .execute()
-
-                if result.data:
-                    imported_count += 1
+            batch: List[Dict[str, Any]] = []
+            cursor = after
+            stream_failed = False
+            try:
+                async for page, next_cursor in connector.iter_user_media(
+                    after=after, max_items=limit, raise_errors=True
+                ):
+                    batch.extend(self._imported_post_row(social_account_id, media) for media in page)
+                    cursor = next_cursor
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        imported_count += self._upsert_posts(batch)
+                        batch = []
+                        if track_cursor:
+                            self._save_import_cursor(social_account_id, cursor)
+            except Exception as e:
+                logger.warning(f"[MONITORING_SERVICE] Import stream interrupted: {e}")
+                stream_failed = True
+
+            if batch:
+                imported_count += self._upsert_posts(batch)
+            # After an API error the stored cursor (last batch) stays the resume
+            # point: the final cursor may be NULL without the feed being done
+            if track_cursor and not stream_failed:
+                self._save_import_cursor(social_account_id, cursor)
 
             logger.info(
                 f"[MONITORING_SERVICE] Imported {imported_count} posts "
-                f"for user {self.user_id}"
+                f"for user {self.user_id} (more={'yes' if cursor or stream_failed else 'no'})"
             )
 
             # 4. Apply auto-rules
@@ -129,17 +144,57 @@ class MonitoringService:
             return {
                 "success": True,
                 "posts_imported": imported_count,
-                "posts_monitored": monitored_count
+                "posts_monitored": monitored_count,
+                "has_more": cursor is not None or stream_failed,
+                "next_cursor": cursor
             }
 
         except Exception as e:
             logger.error(f"[MONITORING_SERVICE] Error syncing Instagram posts: {e}")
             raise
 
+    def _imported_post_row(self, social_account_id: str, media: Dict[str, Any]) -> Dict[str, Any]:
+        """monitored_posts row of a Graph API media object"""
+        return {
+            "user_id": self.user_id,
+            "social_account_id": social_account_id,
+            "platform_post_id": media["id"],
+            "platform": "instagram",
+            "caption": media.get("caption"),
+            "media_url": media.get("media_url") or media.get("thumbnail_url"),
+            "posted_at": media["timestamp"],
+            "source": "imported"
+        }
+
+    def _upsert_posts(self, rows: List[Dict[str, Any]]) -> int:
+        """Upsert a batch of posts in one request, returns the number of rows written"""
+        # Graph API pages never overlap, but a resumed import may replay one
+        unique_rows = list({row["platform_post_id"]: row for row in rows}.values())
+        result = self.supabase.table("monitored_posts") \
+            .upsert(
+                unique_rows,
+                on_conflict="user_id,platform_post_id"
+            ) \
+            .execute()
+        return len(result.data or [])
+
+    def _save_import_cursor(self, social_account_id: str, cursor: Optional[str]) -> None:
+        """Store the Graph API cursor to resume the import from (None = feed fully imported)"""
+        self.supabase.table("social_accounts") \
+            .update({
+                "media_import_cursor": cursor,
+                "media_import_updated_at": datetime.now(timezone.utc).isoformat()
+            }) \
+            .eq("id", social_account_id) \
+            .eq("user_id", self.user_id) \
+            .execute()
+
     async def apply_auto_rules(self, social_account_id: str) -> int:
         """
         Apply auto-monitoring rules to latest posts
 
+        The latest posts not yet monitored are enabled with a single update.
+
         Args:
             social_account_id: UUID of social_accounts
 
@@ -162,7 +217,7 @@ class MonitoringService:
 
             # Get latest X posts that are NOT already monitored
             posts = self.supabase.table("monitored_posts") \
-                .select("id, posted_at") \
+                .select("id") \
                 .eq("user_id", self.user_id) \
                 .eq("social_account_id", social_account_id) \
                 .eq("monitoring_enabled", False) \
@@ -170,10 +225,25 @@ class MonitoringService:
                 .limit(auto_count) \
                 .execute()
 
-            monitored_count = 0
-            for post in (posts.data or []):
-                await self.enable_monitoring(post["id"], duration_days)
-                monitored_count += 1
+            post_ids = [post["id"] for post in (posts.data or [])]
+            if not post_ids:
+                return 0
+
+            now = datetime.now(timezone.utc)
+            ends_at = now + timedelta(days=duration_days)
+
+            result = self.supabase.table("monitored_posts") \
+                .update({
+                    "monitoring_enabled": True,
+                    "monitoring_started_at": now.isoformat(),
+                    "monitoring_ends_at": ends_at.isoformat(),
+                    "next_check_at": now.isoformat()  # Poll immediately
+                }) \
+                .in_("id", post_ids) \
+                .eq("user_id", self.user_id) \
+                .execute()
+
+            monitored_count = len(result.data or [])
 
             logger.info(
                 f"[MONITORING_SERVICE] Auto-enabled monitoring on "
@@ -2,6 +2,10 @@ import logging
 import operator
 import json
 import os
+import threading
+import weakref
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Literal, Annotated
 
 from langchain_core.messages import (
@@ -11,26 +15,68 @@ from langchain_core.messages import (
     SystemMessage,
     ToolMessage,
 )
-from langchain_core.messages.utils import trim_messages, count_tokens_approximately
+from langchain_core.messages.utils import trim_messages
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import RemoveMessage, REMOVE_ALL_MESSAGES, add_messages
+from langgraph.graph.message import RemoveMessage, add_messages
 from pydantic import BaseModel, Field
 from psycopg import connect
 from psycopg.rows import dict_row
 
-from app.deps.runtime_prod import CHECKPOINTER_POSTGRES
-from app.deps.runtime_test import CHECKPOINTER_REDIS
+from app.core.metrics import record_llm_tokens, timed_stage
+from app.core.tracing import traced_node
+from app.deps.runtime_prod import get_postgres_checkpointer
+from app.deps.runtime_test import get_redis_checkpointer
 from app.services.escalation import Escalation
 from app.services.find_answers import FindAnswers
+from app.services.llm_router import (
+    LLMUnavailableError,
+    LLM_MAX_ATTEMPTS,
+    build_chain,
+    llm_router,
+    openrouter_chat_model,
+)
 from app.services.retriever import Retriever
+from app.services.token_accounting import (
+    count_text_tokens,
+    message_token_count,
+    messages_token_count,
+)
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Run the pre-guardrail concurrently with the first LLM turn (see _speculative_start)
+SPECULATIVE_PRE_CHECK = os.getenv("RAG_SPECULATIVE_PRE_CHECK", "true").lower() == "true"
+
+# Rolling summaries run after the reply, off the request path (see
+# RAGAgent.schedule_history_summary); one in flight per thread
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-summary")
+_summaries_in_flight: set = set()
+_summaries_lock = threading.Lock()
+# Turns and summary writes of a thread are serialized, one lock per thread
+# key (dropped once no turn or summary holds it)
+_thread_write_locks: "weakref.WeakValueDictionary[tuple, threading.Lock]" = weakref.WeakValueDictionary()
+_thread_write_locks_guard = threading.Lock()
+
+
+def _thread_key(config: Dict[str, Any]) -> tuple:
+    return (
+        config["configurable"].get("thread_id"),
+        config["configurable"].get("checkpoint_ns", ""),
+    )
+
+
+def _thread_write_lock(thread_key: tuple) -> threading.Lock:
+    with _thread_write_locks_guard:
+        lock = _thread_write_locks.get(thread_key)
+        if lock is None:
+            lock = threading.Lock()
+            _thread_write_locks[thread_key] = lock
+        return lock
+
 
 class QueryItem(BaseModel):
     query: str = Field(..., description="The query to search for")
@@ -93,7 +139,11 @@ def create_search_files_tool(user_id: str):
     return search_files
 
 
-def create_unified_search_tool(user_id: str, model_name: str = "x-ai/grok-4-fast"):
+def create_unified_search_tool(
+    user_id: str,
+    model_name: str = "x-ai/grok-4-fast",
+    fallback_models: Optional[List[str]] = None,
+):
     """
     Factory function to create unified_search tool with user_id.
 
@@ -105,7 +155,7 @@ def create_unified_search_tool(user_id: str, model_name: str = "x-ai/grok-4-fast
         QueryItem as UnifiedQueryItem,
     )
 
-    service = UnifiedSearchService(user_id, model_name)
+    service = UnifiedSearchService(user_id, model_name, fallback_models)
 
     @tool
     def unified_search(question: str, queries: List[dict]) -> dict:
@@ -175,8 +225,8 @@ def create_escalation_tool(user_id: str, conversation_id: str):
         """Escalate the conversation to human support
 
         This tool creates an escalation record, disables AI mode for the conversation,
-        and sends an email notification to the support team with a secure link to
-        access the conversation.
+        and queues an email notification to the support team with a secure link to
+        access the conversation (sent by the notifications worker).
 
         Args:
             message: str the message that triggered the escalation
@@ -187,24 +237,13 @@ def create_escalation_tool(user_id: str, conversation_id: str):
             EscalationResult: The escalation result with success status and details
         """
         try:
-            # Run async method in sync context
-            import asyncio
-
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            escalation_id = loop.run_until_complete(
-                escalation_service.create_escalation(message, confidence, reason)
-            )
+            escalation_id = escalation_service.create_escalation(message, confidence, reason)
 
             if escalation_id:
                 return EscalationResult(
                     escalated=True,
                     escalation_id=escalation_id,
-                    reason=f"Escalation créée avec succès. Email envoyé à l'équipe support.",
+                    reason="Escalation créée avec succès. Email en file d'envoi pour l'équipe support.",
                 )
             else:
                 return EscalationResult(
@@ -262,6 +301,10 @@ class RAGAgentState(BaseModel):
     guardrail_pre_result: Optional[dict] = None
     should_respond: bool = True
     retry_count: int = 0
+    # Running token total of the non-system history; nodes return deltas
+    history_tokens: Annotated[int, operator.add] = 0
+    # Rolling summary of the messages removed from the history
+    conversation_summary: Optional[str] = None
 
 
 class RAGAgent:
@@ -281,6 +324,9 @@ class RAGAgent:
         max_find_answers: int = 5,
         test_mode: bool = False,
         checkpointer=None,
+        speculative_pre_check: Optional[bool] = None,
+        fallback_models: Optional[List[str]] = None,
+        parallel_tool_calls: bool = True,
     ):
 
         self.user_id = user_id
@@ -292,28 +338,30 @@ class RAGAgent:
         self.max_tokens_before_summary = int(max_tokens * 0.8)
         self.summarization_model_name = summarization_model_name
         self.summarization_max_tokens = summarization_max_tokens
-
-        self.init_system_prompt = False
-        self.llm = ChatOpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url=os.getenv("OPENROUTER_BASE_URL") or "https://openrouter.ai/api/v1",
-            model=model_name,
+        self.speculative_pre_check = (
+            SPECULATIVE_PRE_CHECK
+            if speculative_pre_check is None
+            else speculative_pre_check
         )
 
-        self.sum_llm = ChatOpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url=os.getenv("OPENROUTER_BASE_URL") or "https://openrouter.ai/api/v1",
-            model=summarization_model_name,
+        self.init_system_prompt = False
+        # Models tried by the LLM router: configured model, then fallbacks
+        self.model_chain = build_chain(model_name, fallback_models)
+        self.summarization_chain = build_chain(summarization_model_name, fallback_models)
+        # False: one tool call per LLM turn (bench_multi_tool_calls.py baseline)
+        self.parallel_tool_calls = parallel_tool_calls
+        self._tool_llms: Dict[str, Any] = {}
+        self._sum_llms: Dict[str, Any] = {}
+
+        self.unified_search_tool = create_unified_search_tool(
+            user_id, model_name, fallback_models
         )
-
-        self.unified_search_tool = create_unified_search_tool(user_id, model_name)
         self.tools = [self.unified_search_tool]
 
         if not test_mode:
             self.escalation_tool = create_escalation_tool(user_id, conversation_id)
             self.tools.append(self.escalation_tool)
 
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
         if not system_prompt or system_prompt.strip() == "":
             from app.deps.system_prompt import SYSTEM_PROMPT
 
@@ -324,26 +372,65 @@ class RAGAgent:
 
         self.system_prompt = [SystemMessage(content=system_prompt)]
 
-        if test_mode:
-            self.checkpointer = CHECKPOINTER_REDIS
+        if checkpointer is not None:
+            self.checkpointer = checkpointer
+        elif test_mode:
+            self.checkpointer = get_redis_checkpointer()
         else:
-            self.checkpointer = CHECKPOINTER_POSTGRES
+            self.checkpointer = get_postgres_checkpointer()
 
         self.graph = self._build_graph()
 
+    def _tool_llm(self, model: str):
+        """Chat model with the agent tools bound, one per model of the chain"""
+        if model not in self._tool_llms:
+            kwargs = {} if self.parallel_tool_calls else {"parallel_tool_calls": False}
+            self._tool_llms[model] = openrouter_chat_model(model).bind_tools(self.tools, **kwargs)
+        return self._tool_llms[model]
+
+    def _sum_llm(self, model: str):
+        if model not in self._sum_llms:
+            self._sum_llms[model] = openrouter_chat_model(model)
+        return self._sum_llms[model]
+
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph workflow with history management and guardrails"""
         graph = StateGraph(RAGAgentState)
 
-        # Add nodes
-        graph.add_node("guardrails_pre_check", self._guardrails_pre_check)
-        graph.add_node("llm", self._call_llm)
-        graph.add_node("handle_tool_call", self._handle_tool_call)
-        graph.add_node("guardrails_post_check", self._guardrails_post_check)
-        graph.add_node("error_handler", self._error_handler)
-
-        # Entry point: pre-validation
-        graph.set_entry_point("guardrails_pre_check")
+        # Add nodes (each run observed in socialsync_agent_stage_seconds)
+        for name, node in (
+            ("guardrails_pre_check", self._guardrails_pre_check),
+            ("llm", self._call_llm),
+            ("handle_tool_call", self._handle_tool_call),
+            ("guardrails_post_check", self._guardrails_post_check),
+            ("error_handler", self._error_handler),
+        ):
+            graph.add_node(name, timed_stage(name, traced_node(name, node)))
+
+        if self.speculative_pre_check:
+            # Entry point: pre-validation and first LLM turn run concurrently
+            graph.add_node(
+                "speculative_start",
+                timed_stage(
+                    "speculative_start",
+                    traced_node("speculative_start", self._speculative_start),
+                ),
+            )
+            graph.set_entry_point("speculative_start")
+            graph.add_conditional_edges(
+                "speculative_start",
+                self._speculative_decision,
+                {
+                    "block": "error_handler",
+                    "error": "error_handler",
+                    "llm": "llm",
+                    "tool_call": "handle_tool_call",
+                    "end": "guardrails_post_check",
+                },
+            )
+        else:
+            # Entry point: pre-validation
+            graph.set_entry_point("guardrails_pre_check")
 
         # Pre-check → llm (if safe) or error_handler (if flagged)
         graph.add_conditional_edges(
@@ -419,7 +506,8 @@ class RAGAgent:
                 message_text, context_type="chat", message_content=message_content
             )
 
-            decision_log = decision_service.log_decision(
+            # Fire-and-forget: the reply does not wait for the ai_decisions insert
+            decision_service.log_decision_background(
                 message_id=None,
                 message_text=message_text,
                 decision=decision,
@@ -427,9 +515,6 @@ class RAGAgent:
                 reason=reason,
                 matched_rule=matched_rule,
             )
-            logger.debug(
-                f"[GUARDRAILS PRE] Decision logged: {decision_log.get('id') if decision_log else 'failed'}"
-            )
 
             if decision.value == "ignore":
                 logger.warning(
@@ -459,6 +544,74 @@ class RAGAgent:
             logger.error(f"Error in guardrails_pre_check: {e}")
             return {}
 
+    def _speculative_start(self, state: RAGAgentState) -> Dict[str, Any]:
+        """Speculative entry: pre-guardrail and first LLM turn in parallel
+
+        The first LLM call (and the unified_search it usually asks for) starts
+        together with the moderation/rules check instead of after it. If the
+        guardrail blocks, the LLM turn is discarded without being waited for and
+        nothing is written to the state but the block result.
+        """
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            # Each branch keeps the trace context of the node
+            guard_future = executor.submit(
+                copy_context().run, self._guardrails_pre_check, state
+            )
+            turn_future = executor.submit(
+                copy_context().run, self._speculative_first_turn, state
+            )
+
+            guard_update = guard_future.result()
+            if (guard_update.get("guardrail_pre_result") or {}).get("decision") == "block":
+                turn_future.cancel()
+                logger.info("[SPECULATIVE] Pre-guardrail blocked, LLM turn discarded")
+                return guard_update
+
+            return {**turn_future.result(), **guard_update}
+        finally:
+            executor.shutdown(wait=False)
+
+    def _speculative_first_turn(self, state: RAGAgentState) -> Dict[str, Any]:
+        """First LLM call, followed by its unified_search tool calls if any
+
+        Only read-only tools are executed speculatively; an escalation is left
+        to the regular handle_tool_call node once the guardrail has passed.
+        """
+        update = self._call_llm(state)
+        messages = update.get("messages") or []
+        if not messages:
+            return update
+
+        response = messages[-1]
+        tool_calls = getattr(response, "tool_calls", None) or []
+        if not tool_calls or any(
+            call.get("name") != "unified_search" for call in tool_calls
+        ):
+            return update
+
+        turn_state = state.model_copy(update={"messages": state.messages + [response]})
+        tool_update = self._handle_tool_call(turn_state)
+
+        merged = {**update, **tool_update}
+        merged["messages"] = messages + (tool_update.get("messages") or [])
+        merged["history_tokens"] = update.get("history_tokens", 0) + tool_update.get(
+            "history_tokens", 0
+        )
+        return merged
+
+    def _speculative_decision(self, state: RAGAgentState) -> str:
+        """Routing after speculative_start"""
+        if self._guardrails_pre_decision(state) == "block":
+            return "block"
+
+        last_message = state.messages[-1] if state.messages else None
+        if isinstance(last_message, ToolMessage):
+            # Speculative search already done: next LLM turn
+            return "llm"
+
+        return self._check_llm_result(state)
+
     def _guardrails_pre_decision(self, state: RAGAgentState) -> str:
         """Decision point: proceed or block based on pre-check"""
         result = getattr(state, "guardrail_pre_result", None)
@@ -542,6 +695,7 @@ class RAGAgent:
                     }
 
                 messages_to_remove = [RemoveMessage(id=last_ai_msg_obj.id)]
+                removed_tokens = message_token_count(last_ai_msg_obj)
 
                 for i in range(last_ai_index - 1, -1, -1):
                     if isinstance(state.messages[i], HumanMessage):
@@ -549,6 +703,7 @@ class RAGAgent:
                             messages_to_remove.append(
                                 RemoveMessage(id=state.messages[i].id)
                             )
+                            removed_tokens += message_token_count(state.messages[i])
                             logger.info(
                                 f"[GUARDRAILS POST] Removing triggering user message from context"
                             )
@@ -562,6 +717,7 @@ class RAGAgent:
                     "messages": messages_to_remove,
                     "should_respond": False,
                     "error_message": f"GUARDRAIL_POST_BLOCKED: {moderation_result.get('reason')}",
+                    "history_tokens": -removed_tokens,
                 }
 
             return {}
@@ -600,8 +756,16 @@ class RAGAgent:
         messages: List[AnyMessage],
         trim_strategy: Literal["none", "hard", "summary"],
         max_tokens: int,
+        history_tokens: Optional[int] = None,
     ) -> List[AnyMessage]:
-        """Manage the history according to the configured strategy"""
+        """Return the LLM input for the configured strategy ([] = unchanged)
+
+        history_tokens is the running total kept in the agent state; when it is
+        not provided the cached per-message counts are summed instead. With the
+        "summary" strategy the summary is computed after the reply
+        (schedule_history_summary); if it lags behind and the history exceeds
+        max_tokens, the history is hard-trimmed instead of waiting for the LLM.
+        """
         try:
             system_messages = [m for m in messages if isinstance(m, SystemMessage)]
             messages = [m for m in messages if not isinstance(m, SystemMessage)]
@@ -609,119 +773,191 @@ class RAGAgent:
             if trim_strategy == "none":
                 return []
 
-            elif (
-                trim_strategy == "hard"
-                and count_tokens_approximately(messages) > max_tokens
-            ):
-                trimmed = trim_messages(
-                    messages,
-                    strategy="last",
-                    token_counter=count_tokens_approximately,
-                    max_tokens=max_tokens,
-                    start_on="human",
-                    end_on=("human", "tool"),
-                    include_system=False,
-                )
-                new_messages = system_messages + trimmed
-                return [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + new_messages
-
-            elif (
-                trim_strategy == "summary"
-                and count_tokens_approximately(messages)
-                > self.max_tokens_before_summary
-            ):
-                TAIL_LENGTH = 1
-                TAIL_MESSAGES = messages[-TAIL_LENGTH:]
-                messages_to_summarize = trim_messages(
-                    messages,
-                    strategy="last",
-                    token_counter=count_tokens_approximately,
-                    max_tokens=self.max_tokens_before_summary,
-                    start_on="human",
-                    end_on=("human", "tool"),
-                    include_system=False,
-                )
+            if not history_tokens:
+                history_tokens = messages_token_count(messages)
 
-                summary_prompt = (
-                    "Summarize this conversation in the language of the conversation, "
-                    "concisely but without losing key facts, decisions, TODOs.\n\n"
-                    + "\n".join(
-                        f"{m.__class__.__name__}: {getattr(m, 'content', '')}"
-                        for m in messages_to_summarize[0:-TAIL_LENGTH]
-                    )
+            if history_tokens <= max_tokens:
+                return []
+
+            trimmed = trim_messages(
+                messages,
+                strategy="last",
+                token_counter=messages_token_count,
+                max_tokens=max_tokens,
+                start_on="human",
+                end_on=("human", "tool"),
+                include_system=False,
+            )
+            return system_messages + trimmed
+
+        except Exception as e:
+            logger.error(f"Error in history management: {e}")
+            return []
+
+    def invoke_turn(self, agent_input: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        """graph.invoke, serialized with the summary write of the same thread"""
+        with _thread_write_lock(_thread_key(config)):
+            return self.graph.invoke(agent_input, config=config)
+
+    def schedule_history_summary(
+        self, config: Dict[str, Any], state_values: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Summarize the history in the background once it passes the threshold
+
+        Called after a reply has been generated; the summary and the removal of
+        the summarized messages are written to the thread state and used from
+        the next turn on.
+
+        Returns:
+            True if a summarization was scheduled
+        """
+        if self.trim_strategy != "summary":
+            return False
+
+        history_tokens = (state_values or {}).get("history_tokens")
+        if history_tokens is not None and history_tokens <= self.max_tokens_before_summary:
+            return False
+
+        thread_key = _thread_key(config)
+        with _summaries_lock:
+            if thread_key in _summaries_in_flight:
+                return False
+            _summaries_in_flight.add(thread_key)
+
+        _summary_executor.submit(self._summarize_history, config, thread_key)
+        return True
+
+    def _summarize_history(self, config: Dict[str, Any], thread_key: tuple) -> None:
+        """Fold the older messages of the thread into the rolling summary
+
+        The summary is only written if the thread has not moved on since it was
+        read (same checkpoint id, checked under the thread lock that invoke_turn
+        holds): a turn that started meanwhile would otherwise write its own
+        channel values over the summary and the token delta. A dropped summary
+        is scheduled again after the next reply.
+        """
+        try:
+            snapshot = self.graph.get_state(config)
+            read_checkpoint_id = snapshot.config["configurable"].get("checkpoint_id")
+            values = snapshot.values
+            messages = [
+                m for m in values.get("messages", []) if not isinstance(m, SystemMessage)
+            ]
+            history_tokens = values.get("history_tokens") or messages_token_count(messages)
+            if history_tokens <= self.max_tokens_before_summary:
+                return
+
+            # Keep the recent turns verbatim, starting on a human message so no
+            # tool message is separated from its tool call
+            tail = trim_messages(
+                messages,
+                strategy="last",
+                token_counter=messages_token_count,
+                max_tokens=self.max_tokens_before_summary // 2,
+                start_on="human",
+                include_system=False,
+            )
+            to_summarize = messages[: len(messages) - len(tail)]
+            if not to_summarize or any(m.id is None for m in to_summarize):
+                return
+
+            previous_summary = values.get("conversation_summary")
+            summary_prompt = (
+                "Summarize this conversation in the language of the conversation, "
+                "concisely but without losing key facts, decisions, TODOs.\n\n"
+                + (
+                    f"Previous summary:\n{previous_summary}\n\n"
+                    if previous_summary
+                    else ""
+                )
+                + "\n".join(
+                    f"{m.__class__.__name__}: {getattr(m, 'content', '')}"
+                    for m in to_summarize
                 )
+            )
 
-                summary_response = self.sum_llm.invoke(
+            summary_model, summary_response = llm_router.invoke(
+                self.summarization_chain,
+                lambda model: self._sum_llm(model).invoke(
                     [HumanMessage(content=summary_prompt)],
                     max_tokens=self.summarization_max_tokens,
-                )
+                ),
+                purpose="summary",
+            )
+            record_llm_tokens(summary_model, summary_response)
 
-                summary_system = SystemMessage(
-                    content=f"[PREVIOUS CONVERSATION SUMMARY]\n{summary_response.content}\n[END SUMMARY]"
+            with _thread_write_lock(thread_key):
+                latest = self.graph.get_state(config)
+                if latest.config["configurable"].get("checkpoint_id") != read_checkpoint_id:
+                    logger.info(
+                        f"[SUMMARY] Thread moved on during summarization, summary dropped for user {self.user_id}"
+                    )
+                    return
+                self.graph.update_state(
+                    config,
+                    {
+                        "messages": [RemoveMessage(id=m.id) for m in to_summarize],
+                        "conversation_summary": summary_response.content,
+                        "history_tokens": -messages_token_count(to_summarize),
+                    },
+                    as_node="guardrails_post_check",
                 )
-
-                new_messages = system_messages + [summary_system] + TAIL_MESSAGES
-
-                return [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + new_messages
+            logger.info(
+                f"[SUMMARY] {len(to_summarize)} messages summarized for user {self.user_id}"
+            )
 
         except Exception as e:
-            return [AIMessage(content=f"Error in history management: {str(e)}")]
+            logger.error(f"[SUMMARY] Background summarization failed: {e}")
+        finally:
+            with _summaries_lock:
+                _summaries_in_flight.discard(thread_key)
 
     def _call_llm(self, state: RAGAgentState) -> Dict[str, Any]:
-        """Call the LLM with trimming soft and silent retry on errors"""
-        MAX_RETRIES = 3
-        RETRY_DELAY = 2  # seconds
-
+        """Call the LLM with trimming soft; latency budgets and fallbacks by llm_router"""
         try:
             messages = state.messages.copy()
+            history_tokens = state.history_tokens
+            if state.conversation_summary:
+                messages = [
+                    SystemMessage(
+                        content=f"[PREVIOUS CONVERSATION SUMMARY]\n{state.conversation_summary}\n[END SUMMARY]"
+                    )
+                ] + messages
+                history_tokens += count_text_tokens(state.conversation_summary)
             if self.system_prompt and not self.init_system_prompt:
                 self.init_system_prompt = True
                 messages = self.system_prompt + messages
 
             trimmed_messages = self._manage_history(
-                messages, self.trim_strategy, self.max_tokens
+                messages, self.trim_strategy, self.max_tokens, history_tokens
             )
             llm_input = trimmed_messages if trimmed_messages else messages
 
-            # Retry logic with exponential backoff
-            last_error = None
-            for attempt in range(MAX_RETRIES):
-                try:
-                    # CRITICAL FIX: Use llm_with_tools to allow tool calls
-                    # Only use structured_llm for final response (when no tools needed)
-                    response = self.llm_with_tools.invoke(llm_input)
-
-                    # Success - reset retry count if needed
-                    if attempt > 0:
-                        logger.info(
-                            f"[LLM RETRY] Success on attempt {attempt + 1}/{MAX_RETRIES}"
-                        )
-
-                    # Return the raw AI message (might contain tool_calls)
-                    return {"messages": [response], "retry_count": 0}
-
-                except Exception as retry_error:
-                    last_error = retry_error
-                    logger.warning(
-                        f"[LLM RETRY] Attempt {attempt + 1}/{MAX_RETRIES} failed: {str(retry_error)}"
-                    )
-
-                    if attempt < MAX_RETRIES - 1:
-                        # Wait before retrying (exponential backoff)
-                        import time
+            try:
+                # Tools bound so the model can call unified_search / escalation
+                model, response = llm_router.invoke(
+                    self.model_chain,
+                    lambda model: self._tool_llm(model).invoke(llm_input),
+                    purpose="agent",
+                )
+            except LLMUnavailableError as e:
+                # Silent failure: no reply rather than an error message
+                logger.error(f"[LLM ERROR] No model answered for user {self.user_id}: {e}")
+                return {
+                    "should_respond": False,
+                    "error_message": f"LLM_ERROR: {str(e)}",
+                    "retry_count": LLM_MAX_ATTEMPTS,
+                }
 
-                        time.sleep(RETRY_DELAY * (2**attempt))
-                    else:
-                        # Max retries reached
-                        logger.error(
-                            f"[LLM ERROR] Max retries ({MAX_RETRIES}) reached for user {self.user_id}: {str(last_error)}"
-                        )
+            record_llm_tokens(model, response)
+            if model != self.model_name:
+                logger.info(f"[LLM ROUTER] Agent turn answered by {model} instead of {self.model_name}")
 
-            # All retries failed - return silent failure
+            # Return the raw AI message (might contain tool_calls)
             return {
-                "should_respond": False,
-                "error_message": f"LLM_ERROR: {str(last_error)}",
-                "retry_count": MAX_RETRIES,
+                "messages": [response],
+                "retry_count": 0,
+                "history_tokens": message_token_count(response),
             }
 
         except Exception as e:
@@ -731,33 +967,50 @@ class RAGAgent:
             return {"should_respond": False, "error_message": f"LLM_ERROR: {str(e)}"}
 
     def _handle_tool_call(self, state: RAGAgentState) -> Dict[str, Any]:
-        """Handle the tool call"""
+        """Handle every tool call of the last AI message concurrently
+
+        One ToolMessage is returned per call, in call order. max_searches is
+        applied across the whole batch: unified_search calls beyond the limit
+        get an error ToolMessage instead of running.
+        """
         try:
             last_message = state.messages[-1] if state.messages else None
-            tool_calls = getattr(last_message, "tool_calls", [])
-            tool_call = tool_calls[0]
-            tool_name = tool_call.get("name")
-
-            if tool_name == "unified_search":
-                return self._unified_search(state)
-            elif tool_name == "search_files":
-                # Legacy support (will be removed after migration)
-                return self._search_files(state)
-            elif tool_name == "find_answers":
-                # Legacy support (will be removed after migration)
-                return self._find_answers(state)
-            elif tool_name == "escalation":
-                return self._escalation(state)
-            else:
+            tool_calls = getattr(last_message, "tool_calls", None) or []
+
+            if not tool_calls:
                 return {
-                    "messages": [
-                        ToolMessage(
-                            content=json.dumps({"error": "Unknown tool"}),
-                            tool_call_id=tool_call.get("id"),
-                            name=tool_call.get("name"),
-                        )
-                    ],
+                    "messages": [AIMessage(content="Error processing tool")],
+                    "error_message": "No tool calls found",
                 }
+
+            remaining_searches = max(self.max_searches - state.n_search, 0)
+            jobs = []
+            for tool_call in tool_calls:
+                tool_name = tool_call.get("name")
+                if tool_name == "unified_search":
+                    if remaining_searches > 0:
+                        remaining_searches -= 1
+                        jobs.append((self._unified_search, tool_call))
+                    else:
+                        jobs.append((self._search_limit_reached, tool_call))
+                elif tool_name == "escalation" and hasattr(self, "escalation_tool"):
+                    jobs.append((self._escalation, tool_call))
+                else:
+                    jobs.append((self._unknown_tool, tool_call))
+
+            if len(jobs) == 1:
+                results = [jobs[0][0](jobs[0][1])]
+            else:
+                logger.info(f"[TOOLS] Running {len(jobs)} tool calls concurrently")
+                with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                    futures = [
+                        executor.submit(copy_context().run, fn, tool_call)
+                        for fn, tool_call in jobs
+                    ]
+                    results = [future.result() for future in futures]
+
+            return self._merge_tool_results(state, results)
+
         except Exception as e:
             logger.error(f"Error in _handle_tool_call: {e}")
             return {
@@ -765,29 +1018,43 @@ class RAGAgent:
                 "error_message": str(e),
             }
 
-    def _unified_search(self, state: RAGAgentState) -> Dict[str, Any]:
+    def _merge_tool_results(
+        self, state: RAGAgentState, results: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Combine the per-call results into a single state update"""
+        tool_messages = [result["message"] for result in results]
+        update: Dict[str, Any] = {
+            "messages": tool_messages,
+            "history_tokens": sum(message_token_count(m) for m in tool_messages),
+        }
+
+        searches = [result for result in results if "search_results" in result]
+        if searches:
+            update["n_search"] = state.n_search + len(searches)
+            update["search_results"] = [
+                chunk for result in searches for chunk in result["search_results"]
+            ]
+            update["find_answers_results"] = [
+                answer for result in searches for answer in result["find_answers_results"]
+            ]
+
+        for result in results:
+            if "escalation_result" in result:
+                update["escalation_result"] = result["escalation_result"]
+
+        errors = [result["error"] for result in results if result.get("error")]
+        if errors:
+            update["error_message"] = "; ".join(errors)
+
+        return update
+
+    def _unified_search(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute unified search (parallel FAQ + documents search).
-        This is an async tool, so we need to run it in an event loop.
+        Execute one unified_search call (parallel FAQ + documents search).
         """
-        last_message = state.messages[-1]
-        tool_calls = getattr(last_message, "tool_calls", [])
-
-        if not tool_calls:
-            return {
-                "messages": [
-                    ToolMessage(
-                        content=json.dumps({"error": "No tool calls found"}),
-                        tool_call_id=None,
-                        name=None,
-                    )
-                ],
-            }
-
-        tool_call = tool_calls[0]
+        tool_name = tool_call.get("name")
+        tool_call_id = tool_call.get("id")
         try:
-            tool_name = tool_call.get("name")
-            tool_call_id = tool_call.get("id")
             tool_args = tool_call.get("args", {})
 
             logger.info(f"🔍 Executing unified_search with args: {tool_args}")
@@ -801,13 +1068,10 @@ class RAGAgent:
 
             content = json.dumps(results, ensure_ascii=False)
 
-            tool_message = ToolMessage(
-                content=content, tool_call_id=tool_call_id, name=tool_name
-            )
-
             return {
-                "messages": [tool_message],
-                "n_search": state.n_search + 1,
+                "message": ToolMessage(
+                    content=content, tool_call_id=tool_call_id, name=tool_name
+                ),
                 "search_results": results.get("doc_chunks", []),
                 "find_answers_results": (
                     [results] if results.get("faq_references") else []
@@ -821,14 +1085,35 @@ class RAGAgent:
             traceback.print_exc()
 
             error_content = json.dumps({"error": str(e)})
-            tool_message = ToolMessage(
-                content=error_content, tool_call_id=tool_call_id, name=tool_name
-            )
             return {
-                "messages": [tool_message],
-                "error_message": str(e),
+                "message": ToolMessage(
+                    content=error_content, tool_call_id=tool_call_id, name=tool_name
+                ),
+                "error": str(e),
             }
 
+    def _search_limit_reached(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """unified_search call refused because max_searches is reached"""
+        logger.info(f"[TOOLS] max_searches ({self.max_searches}) reached, skipping search")
+        return {
+            "message": ToolMessage(
+                content=json.dumps(
+                    {"error": "Search limit reached, answer with the information already found"}
+                ),
+                tool_call_id=tool_call.get("id"),
+                name=tool_call.get("name"),
+            ),
+        }
+
+    def _unknown_tool(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "message": ToolMessage(
+                content=json.dumps({"error": "Unknown tool"}),
+                tool_call_id=tool_call.get("id"),
+                name=tool_call.get("name"),
+            ),
+        }
+
     # def _find_answers(self, state: RAGAgentState) -> Dict[str, Any]:
     #     """Execute the find answers (LEGACY - use unified_search instead)"""
 
@@ -964,27 +1249,11 @@ class RAGAgent:
     #         "search_results": search_results,
     #     }
 
-    def _escalation(self, state: RAGAgentState) -> Dict[str, Any]:
-        """Execute the escalation"""
-
-        last_message = state.messages[-1]
-        tool_calls = getattr(last_message, "tool_calls", [])
-
-        if not tool_calls:
-            return {
-                "messages": [
-                    ToolMessage(
-                        content=json.dumps({"error": "No tool calls found"}),
-                        tool_call_id=None,
-                        name=None,
-                    )
-                ],
-                "escalation_result": state.escalation_result,
-            }
+    def _escalation(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one escalation call"""
+        tool_name = tool_call.get("name")
+        tool_call_id = tool_call.get("id")
         try:
-            tool_call = tool_calls[0]
-            tool_name = tool_call.get("name")
-            tool_call_id = tool_call.get("id")
             tool_args = tool_call.get("args", {})
 
             message = tool_args.get("message", "")
@@ -1004,13 +1273,11 @@ class RAGAgent:
             }
 
             return {
-                "messages": [
-                    ToolMessage(
-                        content=json.dumps({"escalation_result": escalation_dict}),
-                        tool_call_id=tool_call_id,
-                        name=tool_name,
-                    )
-                ],
+                "message": ToolMessage(
+                    content=json.dumps({"escalation_result": escalation_dict}),
+                    tool_call_id=tool_call_id,
+                    name=tool_name,
+                ),
                 "escalation_result": escalation_result,
             }
 
@@ -1020,14 +1287,11 @@ class RAGAgent:
 
             traceback.print_exc()
             return {
-                "messages": [
-                    ToolMessage(
-                        content=json.dumps({"error": str(e)}),
-                        tool_call_id=tool_call_id,
-                        name=tool_name,
-                    )
-                ],
-                "escalation_result": state.escalation_result,
+                "message": ToolMessage(
+                    content=json.dumps({"error": str(e)}),
+                    tool_call_id=tool_call_id,
+                    name=tool_name,
+                ),
             }
 
 
@@ -1044,6 +1308,9 @@ def create_rag_agent(
     max_find_answers: int = 5,
     test_mode: bool = False,
     checkpointer=None,
+    speculative_pre_check: Optional[bool] = None,
+    fallback_models: Optional[List[str]] = None,
+    parallel_tool_calls: bool = True,
 ) -> RAGAgent:
     """Factory function to create a RAG Agent"""
     return RAGAgent(
@@ -1059,13 +1326,13 @@ def create_rag_agent(
         system_prompt=system_prompt,
         checkpointer=checkpointer,
         test_mode=test_mode,
+        speculative_pre_check=speculative_pre_check,
+        fallback_models=fallback_models,
+        parallel_tool_calls=parallel_tool_calls,
     )
 
 
 if __name__ == "__main__":
-    # Import uniquement pour les tests (évite de bloquer le démarrage du backend)
-    from app.deps.runtime_prod import CHECKPOINTER_POSTGRES
-
     agent = create_rag_agent(
         user_id="example_user_id",
         conversation_id="example_conversation_id",
@@ -1073,7 +1340,7 @@ if __name__ == "__main__":
         trim_strategy="summary",
         max_tokens=6000,
         max_find_answers=5,
-        checkpointer=CHECKPOINTER_POSTGRES,
+        checkpointer=get_postgres_checkpointer(),
         test_mode=True,
     )
 
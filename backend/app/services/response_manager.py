@@ -1,8 +1,11 @@
 import json
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from app.core.metrics import OUTBOUND_SEND_SECONDS
+from app.core.tracing import stage
 from app.services.message_batcher import MessageBatcher
 from app.services.instagram_service import InstagramService
 from app.services.whatsapp_service import WhatsAppService
@@ -17,6 +20,15 @@ from app.schemas.messages import (
 )
 from langchain_core.messages import HumanMessage
 from app.deps.system_prompt import SYSTEM_PROMPT
+from app.services.llm_router import reply_deadline
+from app.services.token_accounting import count_text_tokens, messages_token_count
+from app.services.message_history_cache import message_history_cache
+from app.services.status_store import status_store
+from app.db.repositories import (
+    conversation_messages_repo,
+    conversations_repo,
+    social_accounts_repo,
+)
 
 logger = logging.getLogger(__name__)
 message_batcher = MessageBatcher()
@@ -338,7 +350,7 @@ async def process_incoming_message_for_user(
 
         if not success:
             logger.error("Failed to add to batch, deleting message from database")
-            delete_message_from_db(save_response.conversation_message_id)
+            await delete_message_from_db(save_response.conversation_message_id)
             return None
 
         return save_response.conversation_message_id
@@ -355,14 +367,20 @@ async def process_message_status_for_user(
     logger.info(
         f"Status '{status_type}' for message {message_id} (user: {user_info['user_id']})"
     )
-    await update_message_status_in_user_db(message_id, status_type, user_info)
+    await update_message_status_in_user_db(
+        message_id, status_type, user_info, timestamp=status.get("timestamp")
+    )
 
 
 async def update_message_status_in_user_db(
-    message_id: str, status: str, user_info: Dict[str, Any]
+    message_id: str,
+    status: str,
+    user_info: Dict[str, Any],
+    timestamp: Optional[Any] = None,
 ) -> None:
-    logger.info(
-        f"Mise à jour statut {status} pour message {message_id} (utilisateur: {user_info['user_id']})"
+    """Queue the status for conversation_messages (flushed by app.workers.statuses)"""
+    await status_store.add_status(
+        message_id, status, timestamp=timestamp, platform=user_info.get("platform")
     )
 
 
@@ -396,7 +414,7 @@ async def process_webhook_change_for_user(
         logger.info(f"Type de webhook non géré: {field}")
 
 
-def delete_message_from_db(conversation_message_id: str) -> bool:
+async def delete_message_from_db(conversation_message_id: str) -> bool:
     """
     Supprime un message de la base de données en cas d'échec du batch
 
@@ -406,17 +424,8 @@ def delete_message_from_db(conversation_message_id: str) -> bool:
     Returns:
         bool: True si suppression réussie, False sinon
     """
-    from app.db.session import get_db
-
     try:
-        db = get_db()
-        res = (
-            db.table("conversation_messages")
-            .delete()
-            .eq("id", conversation_message_id)
-            .execute()
-        )
-        if res:
+        if await conversation_messages_repo.delete(conversation_message_id):
             logger.info(
                 f"Message {conversation_message_id} supprimé suite à échec du batch"
             )
@@ -436,27 +445,16 @@ async def get_or_create_conversation(
     customer_identifier: str,
     customer_name: Optional[str] = None,
 ) -> Optional[str]:
-    from app.db.session import get_db
-
     try:
         cache_key = f"conversation:{social_account_id}:{customer_identifier}"
         cached = await conversation_cache.get(cache_key)
         if cached:
             return cached
 
-        db = get_db()
-        res_find = (
-            db.table("conversations")
-            .select("id")
-            .eq("social_account_id", social_account_id)
-            .eq("customer_identifier", customer_identifier)
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute()
+        conversation_id = await conversations_repo.find_latest_id(
+            social_account_id, customer_identifier
         )
-        rows = res_find.data or []
-        if rows:
-            conversation_id = str(rows[0]["id"])
+        if conversation_id:
             await conversation_cache.set(cache_key, conversation_id)
             return conversation_id
         insert_payload = {
@@ -468,9 +466,8 @@ async def get_or_create_conversation(
             "status": "open",
             "priority": "normal",
         }
-        res_create = db.table("conversations").insert(insert_payload).execute()
-        if res_create and res_create.data:
-            first = res_create.data[0]
+        first = await conversations_repo.create(insert_payload)
+        if first:
             conversation_id = (
                 str(first.get("id")) if first and first.get("id") else None
             )
@@ -599,7 +596,8 @@ async def get_media_content(media_id: str, access_token: str) -> bytes:
     graph_version = os.getenv("META_GRAPH_VERSION", "v24.0")
 
     client = httpx.AsyncClient()
-    url = f"https://graph.facebook.com/{graph_version}/{media_id}"
+    graph_base_url = os.getenv("META_GRAPH_BASE_URL", "https://graph.facebook.com")
+    url = f"{graph_base_url}/{graph_version}/{media_id}"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
@@ -612,6 +610,109 @@ async def get_media_content(media_id: str, access_token: str) -> bytes:
     return response.content
 
 
+def get_agent_config(user_id: str, conversation_id: str) -> Dict[str, Any]:
+    """LangGraph config of the agent thread of a conversation (one thread per day)"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    return {
+        "configurable": {
+            "thread_id": f"1conversation:{conversation_id}day:{today}",
+            "user_id": user_id,
+            "checkpoint_ns": f"user:{user_id}:conversation:{conversation_id}:{today}",
+        }
+    }
+
+
+def has_agent_history(user_id: str, conversation_id: str) -> bool:
+    """True if the agent thread of today already has a checkpoint (conversation context)"""
+    from app.deps.runtime_prod import get_postgres_checkpointer
+
+    try:
+        return get_postgres_checkpointer().get_tuple(
+            get_agent_config(user_id, conversation_id)
+        ) is not None
+    except Exception as e:
+        logger.warning(f"Could not read agent history for {conversation_id}: {e}")
+        return True
+
+
+def check_cached_turn(user_id: str, question: str) -> Optional[str]:
+    """
+    Pre-guardrail of a turn answered from the semantic answer cache
+
+    Same check and ai_decisions log as the agent's guardrails_pre_check, which
+    does not run on a cache hit. Returns the block reason, None if the answer
+    can be sent.
+    """
+    from app.services.ai_decision_service import AIDecisionService
+
+    try:
+        decision_service = AIDecisionService(user_id)
+        decision, confidence, reason, matched_rule = decision_service.check_message(
+            question, context_type="chat"
+        )
+        # Fire-and-forget, like the agent pre-check
+        decision_service.log_decision_background(
+            message_id=None,
+            message_text=question,
+            decision=decision,
+            confidence=confidence,
+            reason=reason,
+            matched_rule=matched_rule,
+        )
+    except Exception as e:
+        logger.error(f"Error in cached turn guardrail: {e}")
+        return None
+
+    return reason if decision.value == "ignore" else None
+
+
+def record_cached_turn(
+    user_id: str,
+    conversation_id: str,
+    messages: List[HumanMessage],
+    answer: str,
+) -> None:
+    """
+    Write a turn answered from the semantic answer cache into the agent thread
+
+    The agent did not run, so without this a follow-up question would be
+    answered without knowing what was already said. Cache hits only happen on
+    a thread without checkpoint: the first checkpoint is written directly,
+    without building the agent graph.
+    """
+    from uuid import uuid4
+    from langchain_core.messages import AIMessage
+    from langgraph.checkpoint.base import empty_checkpoint
+    from app.deps.runtime_prod import get_postgres_checkpointer
+
+    try:
+        checkpointer = get_postgres_checkpointer()
+        # Message ids, as the add_messages reducer would set them (RemoveMessage)
+        turn = [
+            message.model_copy(update={"id": message.id or str(uuid4())})
+            for message in messages
+        ] + [AIMessage(content=answer, id=str(uuid4()))]
+
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {
+            "messages": turn,
+            "history_tokens": messages_token_count(turn),
+        }
+        versions = {
+            channel: checkpointer.get_next_version(None, None)
+            for channel in checkpoint["channel_values"]
+        }
+        checkpoint["channel_versions"] = dict(versions)
+        checkpointer.put(
+            get_agent_config(user_id, conversation_id),
+            checkpoint,
+            {"source": "update", "step": 0, "parents": {}},
+            versions,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record cached turn for {conversation_id}: {e}")
+
+
 async def generate_smart_response(
     messages: List[HumanMessage],
     user_id: str,
@@ -642,23 +743,28 @@ async def generate_smart_response(
         conversation_id,
         model_name=model_name,
         system_prompt=local_system_prompt,
+        fallback_models=ai_settings.get("ai_fallback_models"),
     )
 
     try:
         # invoke() est synchrone mais doit être exécuté dans un thread séparé
         # pour ne pas bloquer l'event loop avec le checkpointer synchrone
         import asyncio
-        response = await asyncio.to_thread(
-            agent.graph.invoke,
-            {"messages": messages},
-            config={
-                "configurable": {
-                    "thread_id": f"1conversation:{conversation_id}day:{datetime.now().strftime('%Y-%m-%d')}",
-                    "user_id": user_id,
-                    "checkpoint_ns": f"user:{user_id}:conversation:{conversation_id}:{datetime.now().strftime('%Y-%m-%d')}",
-                }
-            },
-        )
+        config = get_agent_config(user_id, conversation_id)
+        # One deadline for every routed LLM call of this reply (agent turns,
+        # FindAnswers): copied into the to_thread context
+        with reply_deadline():
+            response = await asyncio.to_thread(
+                agent.invoke_turn,
+                # history_tokens is a running total in the agent state: only the
+                # counts of the new messages are added, the history is never recounted
+                {"messages": messages, "history_tokens": messages_token_count(messages)},
+                config=config,
+            )
+
+        # Rolling summary in the background: the reply is sent without waiting
+        # for it, the next turn uses it
+        agent.schedule_history_summary(config, response)
 
         logger.info(
             f"🔍 DEBUG generate_smart_response - response type: {type(response)}"
@@ -673,8 +779,6 @@ async def generate_smart_response(
 async def get_user_credentials_by_platform_account(
     platform: str, account_id: str
 ) -> Optional[Dict[str, Any]]:
-    from app.db.session import get_db
-
     try:
         if platform not in [
             "facebook",
@@ -692,19 +796,10 @@ async def get_user_credentials_by_platform_account(
         if cached:
             return cached
 
-        db = get_db()
-        res = (
-            db.table("social_accounts")
-            .select("*")
-            .eq("platform", platform)
-            .eq("account_id", account_id)
-            .eq("is_active", True)
-            .limit(1)
-            .execute()
+        record = await social_accounts_repo.get_active_by_platform_account(
+            platform, account_id
         )
-        rows = res.data or []
-        if rows:
-            record = rows[0]
+        if record:
             await credentials_cache.set(cache_key, record)
             return record
         return None
@@ -788,6 +883,28 @@ async def send_typing_indicator_and_mark_read(
 async def send_response(
     platform: str, user_credentials: Dict[str, Any], contact_id: str, content: str
 ) -> bool:
+    sent, _ = await send_response_with_id(platform, user_credentials, contact_id, content)
+    return sent
+
+
+async def send_response_with_id(
+    platform: str, user_credentials: Dict[str, Any], contact_id: str, content: str
+) -> Tuple[bool, Optional[str]]:
+    """Send a DM reply; (sent, platform message id) for the status webhooks"""
+    start = time.perf_counter()
+    with stage("send", platform=platform):
+        sent, external_message_id = await _send_response(
+            platform, user_credentials, contact_id, content
+        )
+    OUTBOUND_SEND_SECONDS.labels(
+        platform=platform, kind="dm", outcome="sent" if sent else "failed"
+    ).observe(time.perf_counter() - start)
+    return sent, external_message_id
+
+
+async def _send_response(
+    platform: str, user_credentials: Dict[str, Any], contact_id: str, content: str
+) -> Tuple[bool, Optional[str]]:
     try:
         if platform == "whatsapp":
             service = WhatsAppService(
@@ -798,36 +915,39 @@ async def send_response(
             result = await service.send_text_message(
                 to=contact_id, text=content, skip_validation=True
             )
-            return bool(result.get("messages"))
+            messages = result.get("messages") or []
+            return bool(messages), (messages[0].get("id") if messages else None)
         elif platform == "instagram":
             service = InstagramService(
                 user_credentials.get("access_token"), user_credentials.get("account_id")
             )
             result = await service.send_direct_message(contact_id, content)
-            return result.get("success", False)
+            return result.get("success", False), result.get("message_id")
         elif platform == "messenger":
             from app.services.messenger_service import MessengerService
             service = MessengerService(
                 user_credentials.get("access_token"), user_credentials.get("account_id")
             )
             result = await service.send_message(contact_id, content)
-            return result.get("success", False)
+            return result.get("success", False), result.get("message_id")
         else:
-            return False
+            return False, None
     except Exception as e:
         logger.error(f"Error sending response for {platform}: {e}")
-        return False
+        return False, None
 
 
-def save_response_to_db(
-    conversation_id: str, content: str, user_id: str, confidence: Optional[float] = None
+async def save_response_to_db(
+    conversation_id: str,
+    content: str,
+    user_id: str,
+    confidence: Optional[float] = None,
+    external_message_id: Optional[str] = None,
 ) -> Optional[str]:
-    from app.db.session import get_db
-
     try:
-        db = get_db()
         metadata_payload = {
             "content": content,
+            "token_count": count_text_tokens(content),
         }
         if confidence is not None:
             metadata_payload["confidence"] = confidence
@@ -840,10 +960,15 @@ def save_response_to_db(
             "is_from_agent": False,
             "agent_id": user_id,
             "sender_id": "user",
+            "status": "sent",
             "metadata": metadata_payload,
         }
-        res = db.table("conversation_messages").insert(payload).execute()
-        return res.data[0]["id"] if res.data else None
+        if external_message_id:
+            # Matched by the delivery/read status webhooks
+            payload["external_message_id"] = external_message_id
+        row = await conversation_messages_repo.insert(payload)
+        await message_history_cache.invalidate(conversation_id)
+        return row["id"] if row else None
     except Exception as e:
         logger.error(f"Error saving response to database: {e}")
 
@@ -881,10 +1006,6 @@ async def extract_whatsapp_message_content(
     """
     extraction of the content for the WhatsApp messages
     """
-    import tiktoken
-
-    enc = tiktoken.get_encoding("o200k_harmony")
-
     if not message:
         return None
 
@@ -898,7 +1019,7 @@ async def extract_whatsapp_message_content(
         content = message.get("text", {}).get("body", "")
         return UnifiedMessageContent(
             content=content,
-            token_count=len(enc.encode(content)),
+            token_count=count_text_tokens(content),
             message_type=UnifiedMessageType.TEXT,
             message_id=message.get("id"),
             message_from=message.get("from"),
@@ -944,7 +1065,7 @@ async def extract_whatsapp_message_content(
                 return None
 
             if caption:
-                text_tokens = len(enc.encode(f"[Image] {caption}"))
+                text_tokens = count_text_tokens(f"[Image] {caption}")
                 content = [
                     {"type": "text", "text": caption},
                     {"type": "image_url", "image_url": {"url": image_url}},
@@ -1003,10 +1124,6 @@ async def extract_instagram_message_content(
     """
     extraction of the content for the Instagram messages based on webhook structure
     """
-    import tiktoken
-
-    enc = tiktoken.get_encoding("o200k_harmony")
-
     if not message:
         return None
 
@@ -1028,7 +1145,7 @@ async def extract_instagram_message_content(
         content = message.get("text", "")
         return UnifiedMessageContent(
             content=content,
-            token_count=len(enc.encode(content)),
+            token_count=count_text_tokens(content),
             message_type=UnifiedMessageType.TEXT,
             message_id=message.get("mid"),
             message_from=message.get("from"),
@@ -1094,7 +1211,7 @@ async def extract_instagram_message_content(
 
             # Combiner texte + image si les deux sont présents
             if caption:
-                text_tokens = len(enc.encode(caption))
+                text_tokens = count_text_tokens(caption)
                 content = [
                     {"type": "text", "text": caption},
                     {"type": "image_url", "image_url": {"url": image_url}},
@@ -1194,10 +1311,6 @@ async def extract_messenger_message_content(
     Returns:
         UnifiedMessageContent or None if extraction fails
     """
-    import tiktoken
-
-    enc = tiktoken.get_encoding("o200k_harmony")
-
     if not message:
         return None
 
@@ -1220,7 +1333,7 @@ async def extract_messenger_message_content(
         content = message.get("text", "")
         return UnifiedMessageContent(
             content=content,
-            token_count=len(enc.encode(content)),
+            token_count=count_text_tokens(content),
             message_type=UnifiedMessageType.TEXT,
             message_id=message.get("mid"),
             message_from=message.get("from"),
@@ -1286,7 +1399,7 @@ async def extract_messenger_message_content(
 
             # Combine text + image if both present
             if caption:
-                text_tokens = len(enc.encode(caption))
+                text_tokens = count_text_tokens(caption)
                 content = [
                     {"type": "text", "text": caption},
                     {"type": "image_url", "image_url": {"url": image_url}},
@@ -1405,9 +1518,10 @@ async def save_unified_message(request: MessageSaveRequest) -> MessageSaveRespon
         )
 
         try:
-            res = save_message_to_db(message_data)
-            if res and res.data:
-                conversation_message_id = str(res.data[0]["id"])
+            row = await save_message_to_db(message_data)
+            if row:
+                conversation_message_id = str(row["id"])
+                await message_history_cache.invalidate(conversation_id)
                 response = MessageSaveResponse(
                     success=True,
                     conversation_message_id=conversation_message_id,
@@ -1484,13 +1598,8 @@ async def update_instagram_conversation_profile(
     if not update_payload:
         return
 
-    from app.db.session import get_db
-
-    db = get_db()
     try:
-        db.table("conversations").update(update_payload).eq(
-            "id", conversation_id
-        ).execute()
+        await conversations_repo.update(conversation_id, update_payload)
     except Exception as exc:
         logger.error(
             f"Error updating Instagram profile for conversation {conversation_id}: {exc}"
@@ -1502,7 +1611,8 @@ async def fetch_instagram_user_profile(
 ) -> Optional[Dict[str, Any]]:
     import httpx
 
-    url = f"https://graph.instagram.com/v23.0/{instagram_user_id}"
+    graph_base_url = os.getenv("INSTAGRAM_GRAPH_BASE_URL", "https://graph.instagram.com")
+    url = f"{graph_base_url}/v23.0/{instagram_user_id}"
     params = {
         # Use correct fields for Instagram User Profile API (messaging)
         # profile_pic is the correct field for Instagram User IDs from messaging
@@ -1596,14 +1706,11 @@ def prepare_message_data_for_db(
     return base_data
 
 
-def save_message_to_db(message_data: Dict[str, Any]) -> Any:
+async def save_message_to_db(message_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
-    save a message in the database
+    save a message in the database, returns the inserted row
     """
-    from app.db.session import get_db
-
-    db = get_db()
-    return db.table("conversation_messages").insert(message_data).execute()
+    return await conversation_messages_repo.insert(message_data)
 
 
 async def add_message_to_batch_unified(request: BatchMessageRequest) -> bool:
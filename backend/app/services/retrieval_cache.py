@@ -0,0 +1,129 @@
+"""
+Retrieval result cache per user
+
+Identical searches (same user, queries, languages and limits) come back within
+minutes of each other: the same customer questions, reformulated the same way
+by the agent. The ranked result of a search is cached as a compact list of
+(id, score) pairs; the caller rehydrates the rows with a single select by id,
+which skips the embedding call and the full-text/vector search.
+
+Redis layout (per user and knowledge version, see knowledge_version.py):
+    retrieval:{user_id}:v{version}:{kind}:{params_hash}  string  JSON [[id, score], ...]
+
+Entries expire after RETRIEVAL_CACHE_TTL_SECONDS. A bump of the knowledge
+version orphans the previous keys, which then expire with their TTL.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from app.services.knowledge_version import get_knowledge_version
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+TTL_SECONDS = int(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "600"))
+
+
+class RetrievalCache:
+    """Cache des résultats de recherche (ids + scores), par utilisateur et version"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self._client: Optional[redis.Redis] = None
+        self._lock = threading.Lock()
+
+    def _get_redis(self) -> redis.Redis:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = redis.Redis.from_url(
+                        self.redis_url, decode_responses=True, socket_timeout=2
+                    )
+        return self._client
+
+    @staticmethod
+    def _get_key(user_id: str, version: int, kind: str, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return f"retrieval:{user_id}:v{version}:{kind}:{digest}"
+
+    def get_version(self, user_id: str) -> Optional[int]:
+        """
+        Knowledge version to use for a lookup and the following store
+
+        None when the cache is disabled or Redis is unavailable: callers then
+        search without caching.
+        """
+        if not RETRIEVAL_CACHE_ENABLED:
+            return None
+        return get_knowledge_version(user_id)
+
+    def get(
+        self, user_id: str, version: Optional[int], kind: str, params: Dict[str, Any]
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Cached (id, score) pairs of a search, best first, or None"""
+        if version is None:
+            return None
+        try:
+            raw = self._get_redis().get(self._get_key(user_id, version, kind, params))
+        except Exception as e:
+            logger.warning(f"[RETRIEVAL CACHE] Lookup failed for {user_id}: {e}")
+            return None
+        if raw is None:
+            return None
+        return [(entry_id, float(score)) for entry_id, score in json.loads(raw)]
+
+    def set(
+        self,
+        user_id: str,
+        version: Optional[int],
+        kind: str,
+        params: Dict[str, Any],
+        rows: List[Dict[str, Any]],
+    ) -> bool:
+        """Store the (id, score) pairs of search result rows"""
+        if version is None:
+            return False
+        entries = [
+            [str(row["id"]), float(row.get("score") or 0.0)]
+            for row in rows
+            if row.get("id") is not None
+        ]
+        try:
+            self._get_redis().setex(
+                self._get_key(user_id, version, kind, params),
+                TTL_SECONDS,
+                json.dumps(entries),
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"[RETRIEVAL CACHE] Store failed for {user_id}: {e}")
+            return False
+
+    @staticmethod
+    def rehydrate(
+        entries: List[Tuple[str, float]], rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Rows fetched by id, in the cached order and with the cached score
+
+        Ids missing from ``rows`` (deleted since) are dropped.
+        """
+        rows_by_id = {str(row["id"]): row for row in rows}
+        result = []
+        for entry_id, score in entries:
+            row = rows_by_id.get(entry_id)
+            if row is not None:
+                result.append({**row, "score": score})
+        return result
+
+
+# Instance globale du cache
+retrieval_cache = RetrievalCache()
@@ -3,7 +3,9 @@
 # backend_path = Path(__file__).parent.parent.parent
 # sys.path.insert(0, str(backend_path))
 import re
+import asyncio
 from app.services.ingest_helpers import embed_texts
+from app.services.retrieval_cache import retrieval_cache
 from typing import List, Tuple, Dict, Any, Optional
 from app.db.session import get_db
 from httpx import HTTPError
@@ -11,6 +13,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns used to rehydrate cached search results (no embedding)
+CHUNK_COLUMNS = "id,document_id,chunk_index,content,token_count,start_char,end_char,metadata"
+FAQ_COLUMNS = "id,title,questions,answer,metadata"
+
 class RetrieverError(Exception):
     """Exception personnalisée pour les erreurs de Retriever"""
     def __init__(self, message: str, error_type: str = "UNKNOWN", details: dict = None):
@@ -113,6 +119,25 @@ class Retriever:
             from app.db.session import get_async_db
             db = await get_async_db()
             result = None
+
+            cache_params = {
+                "query": " ".join(query.lower().split()),
+                "k": k,
+                "type": type,
+                "query_lang": query_lang,
+            }
+            version = await asyncio.to_thread(retrieval_cache.get_version, self.user_id)
+            cached = await asyncio.to_thread(
+                retrieval_cache.get, self.user_id, version, "chunks", cache_params
+            )
+            if cached is not None:
+                if not cached:
+                    return []
+                rows = await db.table("knowledge_chunks").select(CHUNK_COLUMNS).in_(
+                    "id", [chunk_id for chunk_id, _ in cached]
+                ).execute()
+                logger.info(f"Retrieval cache hit for query: '{query}'")
+                return retrieval_cache.rehydrate(cached, rows.data or [])
             
             try:
                 if type == 'text':
@@ -127,7 +152,6 @@ class Retriever:
                 elif type == 'vector':
                     try:
                         # Embedding generation is sync, wrap in asyncio.to_thread
-                        import asyncio
                         embedding = await asyncio.to_thread(self._embed_texts, [query])
                         embedding = embedding[0]
                     except RetrieverError:
@@ -148,7 +172,6 @@ class Retriever:
                 elif type == 'hybrid':
                     try:
                         # Embedding generation is sync, wrap in asyncio.to_thread
-                        import asyncio
                         embedding = await asyncio.to_thread(self._embed_texts, [query])
                         embedding = embedding[0]
                     except RetrieverError:
@@ -183,6 +206,9 @@ class Retriever:
                     details={"query": query, "type": type, "user_id": self.user_id, "original_error": str(e)}
                 )
             result_data = result.data
+            await asyncio.to_thread(
+                retrieval_cache.set, self.user_id, version, "chunks", cache_params, result_data or []
+            )
             if result_data:
                 logger.info(f"Retrieved {len(result_data)} knowledge chunks for query: '{query}'")
                 return result_data
@@ -242,6 +268,23 @@ class Retriever:
             
             db = get_db()
             result = None
+
+            cache_params = {
+                "query": " ".join(query.lower().split()),
+                "k": k,
+                "type": type,
+                "query_lang": query_lang,
+            }
+            version = retrieval_cache.get_version(self.user_id)
+            cached = retrieval_cache.get(self.user_id, version, "faq", cache_params)
+            if cached is not None:
+                if not cached:
+                    return []
+                rows = db.table("faq_qa").select(FAQ_COLUMNS).in_(
+                    "id", [faq_id for faq_id, _ in cached]
+                ).execute()
+                logger.info(f"Retrieval cache hit for FAQ query: '{query}'")
+                return retrieval_cache.rehydrate(cached, rows.data or [])
             
             try:
                 if type == 'text':
@@ -267,6 +310,7 @@ class Retriever:
                     details={"query": query, "type": type, "user_id": self.user_id, "original_error": str(e)}
                 )
             result_data = result.data
+            retrieval_cache.set(self.user_id, version, "faq", cache_params, result_data or [])
             if result_data:
                 logger.info(f"Retrieved {len(result_data)} FAQ results for query: '{query}'")
                 return result_data
@@ -1,23 +1,317 @@
-import time
-from typing import Any, Dict, List, Optional
-from collections import deque
-
-_message_statuses: Dict[str, List[Dict[str, Any]]] = {}
-_recent: deque = deque(maxlen=200)
-
-def add_status(message_id: str, status: str, payload: Dict[str, Any]) -> None:
-    ts = time.time()
-    entry = {'status': status, 'timestamp': ts, 'payload': payload}
-    if message_id not in _message_statuses:
-        _message_statuses[message_id] = []
-    _message_statuses[message_id].append(entry)
-    _recent.appendleft({'message_id': message_id, **entry})
-
-def get_status_by_message_id(message_id: str) -> Optional[Dict[str, Any]]:
-    items = _message_statuses.get(message_id)
-    if items is None:
-        return
-    return {'message_id': message_id, 'events': items}
-
-def list_recent_statuses(limit: int=50) -> List[Dict[str, Any]]:
-    return list(list(_recent)[:max(1, min(limit, 200))])
\ No newline at end of file
+"""
+Delivery/read status pipeline
+
+Status webhooks used to be appended to a module-level dict (one entry per
+event, never evicted) and never reached the database. Now:
+
+- StatusStore.add_status: the webhook appends the event to a Redis Stream
+  (XADD, approximate MAXLEN) and keeps the latest status of the message in a
+  bounded LRU for recent lookups.
+- StatusStore.flush: run periodically (app.workers.statuses), reads the
+  stream through a consumer group, coalesces the events per message (only the
+  most advanced status is kept) and applies them to conversation_messages with
+  one apply_message_statuses call per batch, then invalidates the cached
+  message pages of the conversations it touched (their ETag includes the
+  statuses). Entries are acked and deleted once written; a failed write
+  leaves them pending, claimed again by a later flush. Entries delivered
+  STATUS_MAX_DELIVERIES times (a batch that keeps failing) are moved to the
+  dead-letter stream instead, so they cannot hold back the new entries.
+
+Redis layout:
+    message_statuses                  stream  message_id, status, timestamp, platform
+    message_statuses / status-flusher consumer group of the flush task
+    message_statuses:dead             stream  dead-lettered entries (+ source_id,
+                                              deliveries), replay with XADD
+"""
+import logging
+import os
+import socket
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+import redis.asyncio as redis_async
+
+from app.services.message_history_cache import message_history_cache
+
+logger = logging.getLogger(__name__)
+
+STATUS_STREAM = "message_statuses"
+STATUS_GROUP = "status-flusher"
+STATUS_STREAM_MAXLEN = int(os.getenv("STATUS_STREAM_MAXLEN", "1000000"))
+STATUS_FLUSH_BATCH = int(os.getenv("STATUS_FLUSH_BATCH", "1000"))
+STATUS_FLUSH_MAX_BATCHES = int(os.getenv("STATUS_FLUSH_MAX_BATCHES", "50"))
+STATUS_LRU_SIZE = int(os.getenv("STATUS_LRU_SIZE", "10000"))
+# Deliveries of a pending entry before it is dead-lettered
+STATUS_MAX_DELIVERIES = int(os.getenv("STATUS_MAX_DELIVERIES", "10"))
+STATUS_DEAD_LETTER_MAXLEN = 100_000
+# Pending entries of a flusher idle for longer than this are taken over
+STATUS_CLAIM_IDLE_MS = 60_000
+
+# A status never moves backwards (same order as message_status_rank in SQL)
+STATUS_RANK = {"sent": 1, "delivered": 2, "read": 3, "failed": 4}
+
+
+def status_rank(status: Optional[str]) -> int:
+    return STATUS_RANK.get(status or "", 0)
+
+
+def _supersedes(new: Dict[str, Any], current: Optional[Dict[str, Any]]) -> bool:
+    """Most advanced status wins, the latest event on a tie"""
+    if current is None:
+        return True
+    new_key = (status_rank(new["status"]), new["timestamp"])
+    return new_key >= (status_rank(current["status"]), current["timestamp"])
+
+
+def coalesce(events: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Latest status per message_id of a list of status events"""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        message_id = event.get("message_id")
+        if not message_id or event.get("status") not in STATUS_RANK:
+            continue
+        if _supersedes(event, latest.get(message_id)):
+            latest[message_id] = event
+    return latest
+
+
+def _parse_timestamp(timestamp: Any) -> float:
+    """Unix time of a status event (seconds or milliseconds), now if missing"""
+    try:
+        value = float(timestamp)
+    except (TypeError, ValueError):
+        return datetime.now(timezone.utc).timestamp()
+    return value / 1000 if value > 1e11 else value
+
+
+class StatusStore:
+    """Statuts de livraison/lecture: Redis Stream + LRU borné, flush groupé vers Postgres"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        lru_size: int = STATUS_LRU_SIZE,
+        stream: str = STATUS_STREAM,
+    ):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.lru_size = lru_size
+        self.stream = stream
+        self.dead_letter_stream = f"{stream}:dead"
+        self._redis_pool = None
+        self._sync_client: Optional[redis.Redis] = None
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def get_redis(self) -> redis_async.Redis:
+        if not self._redis_pool:
+            self._redis_pool = redis_async.ConnectionPool.from_url(
+                self.redis_url, decode_responses=True, max_connections=20
+            )
+        return redis_async.Redis(connection_pool=self._redis_pool)
+
+    def _get_sync_redis(self) -> redis.Redis:
+        """Client synchrone pour le flusher (worker Celery)"""
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._sync_client
+
+    def _remember(self, event: Dict[str, Any]) -> None:
+        message_id = event["message_id"]
+        if _supersedes(event, self._recent.get(message_id)):
+            self._recent[message_id] = event
+        self._recent.move_to_end(message_id)
+        while len(self._recent) > self.lru_size:
+            self._recent.popitem(last=False)
+
+    async def add_status(
+        self,
+        message_id: str,
+        status: str,
+        timestamp: Any = None,
+        platform: Optional[str] = None,
+    ) -> bool:
+        """Queue a status event for the flusher (never raises)"""
+        if not message_id or status not in STATUS_RANK:
+            return False
+
+        event = {
+            "message_id": message_id,
+            "status": status,
+            "timestamp": _parse_timestamp(timestamp),
+            "platform": platform or "",
+        }
+        self._remember(event)
+        try:
+            redis_client = await self.get_redis()
+            await redis_client.xadd(
+                self.stream,
+                {key: str(value) for key, value in event.items()},
+                maxlen=STATUS_STREAM_MAXLEN,
+                approximate=True,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"[STATUS] Status {status} of {message_id} not queued: {e}")
+            return False
+
+    def get_status(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Latest status of a message seen by this process (LRU)"""
+        event = self._recent.get(message_id)
+        if event is not None:
+            self._recent.move_to_end(message_id)
+        return event
+
+    def list_recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently updated messages, newest first"""
+        limit = max(1, min(limit, self.lru_size))
+        recent = []
+        for message_id in reversed(self._recent):
+            recent.append(self._recent[message_id])
+            if len(recent) >= limit:
+                break
+        return recent
+
+    def _ensure_group(self, client: redis.Redis) -> None:
+        try:
+            client.xgroup_create(self.stream, STATUS_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    @staticmethod
+    def _events(entries: List[Tuple[str, Dict[str, str]]]) -> List[Dict[str, Any]]:
+        events = []
+        for _, fields in entries:
+            if not fields:  # Entry deleted while pending
+                continue
+            events.append({
+                "message_id": fields.get("message_id"),
+                "status": fields.get("status"),
+                "timestamp": _parse_timestamp(fields.get("timestamp")),
+            })
+        return events
+
+    def _write_batch(self, db, statuses: Dict[str, Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """Apply the coalesced statuses of a batch, one RPC; (messages updated, conversations touched)"""
+        rows = [
+            {
+                "external_message_id": message_id,
+                "status": event["status"],
+                "status_at": datetime.fromtimestamp(event["timestamp"], timezone.utc).isoformat(),
+            }
+            for message_id, event in statuses.items()
+        ]
+        res = db.rpc("apply_message_statuses", {"p_statuses": rows}).execute()
+        touched = res.data or []
+        return (
+            sum(int(row.get("updated") or 0) for row in touched),
+            [row["conversation_id"] for row in touched if row.get("conversation_id")],
+        )
+
+    def _dead_letter(self, client: redis.Redis, entries: List[Tuple[str, Dict[str, str]]]) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Move the entries delivered STATUS_MAX_DELIVERIES times to the
+        dead-letter stream; returns the others
+        """
+        if not entries:
+            return entries
+        pending = client.xpending_range(
+            self.stream, STATUS_GROUP, min=entries[0][0], max=entries[-1][0], count=len(entries)
+        )
+        deliveries = {item["message_id"]: item["times_delivered"] for item in pending}
+        dead = [(entry_id, fields) for entry_id, fields in entries if deliveries.get(entry_id, 0) >= STATUS_MAX_DELIVERIES]
+        if not dead:
+            return entries
+
+        pipe = client.pipeline(transaction=False)
+        for entry_id, fields in dead:
+            pipe.xadd(
+                self.dead_letter_stream,
+                {**(fields or {}), "source_id": entry_id, "deliveries": str(deliveries[entry_id])},
+                maxlen=STATUS_DEAD_LETTER_MAXLEN,
+                approximate=True,
+            )
+        dead_ids = [entry_id for entry_id, _ in dead]
+        pipe.xack(self.stream, STATUS_GROUP, *dead_ids)
+        pipe.xdel(self.stream, *dead_ids)
+        pipe.execute()
+        logger.error(
+            f"[STATUS] {len(dead)} status events dead-lettered to {self.dead_letter_stream} "
+            f"after {STATUS_MAX_DELIVERIES} deliveries"
+        )
+        dead_set = set(dead_ids)
+        return [entry for entry in entries if entry[0] not in dead_set]
+
+    def flush(self, db, consumer: Optional[str] = None) -> Dict[str, int]:
+        """
+        Write the queued status events to conversation_messages
+
+        Pending entries of flushers idle for STATUS_CLAIM_IDLE_MS are taken over
+        first (dead-lettered past STATUS_MAX_DELIVERIES), then new entries are
+        read by batches of STATUS_FLUSH_BATCH (at most STATUS_FLUSH_MAX_BATCHES
+        per run). A failed reclaimed batch stays pending and new entries are
+        still read; a failed new batch stays pending and ends the run (the
+        database is likely unavailable).
+
+        Returns:
+            Dict with events read, messages written, rows updated, DB writes,
+            failed batches and dead-lettered events
+        """
+        client = self._get_sync_redis()
+        consumer = consumer or f"{socket.gethostname()}:{os.getpid()}"
+        self._ensure_group(client)
+        stats = {"events": 0, "messages": 0, "updated": 0, "db_writes": 0, "failed": 0, "dead_lettered": 0}
+
+        claimed = client.xautoclaim(
+            self.stream, STATUS_GROUP, consumer,
+            min_idle_time=STATUS_CLAIM_IDLE_MS, start_id="0-0", count=STATUS_FLUSH_BATCH,
+        )
+        reclaimed = claimed[1] if claimed and claimed[1] else []
+        if reclaimed:
+            alive = self._dead_letter(client, reclaimed)
+            stats["dead_lettered"] += len(reclaimed) - len(alive)
+            reclaimed = alive
+        batches = [reclaimed] if reclaimed else []
+
+        for _ in range(STATUS_FLUSH_MAX_BATCHES):
+            from_pending = bool(batches)
+            if not batches:
+                response = client.xreadgroup(
+                    STATUS_GROUP, consumer, {self.stream: ">"}, count=STATUS_FLUSH_BATCH
+                )
+                if not response:
+                    break
+                batches = [response[0][1]]
+            entries = batches.pop()
+            entry_ids = [entry_id for entry_id, _ in entries]
+
+            statuses = coalesce(self._events(entries))
+            if statuses:
+                try:
+                    updated, conversation_ids = self._write_batch(db, statuses)
+                except Exception as e:
+                    # Left pending: claimed again once STATUS_CLAIM_IDLE_MS elapsed
+                    logger.error(f"[STATUS] Flush failed for {len(statuses)} messages: {e}")
+                    stats["failed"] += 1
+                    if from_pending:
+                        continue
+                    break
+                stats["updated"] += updated
+                stats["db_writes"] += 1
+                # Cached pages (and their ETag) show the statuses
+                message_history_cache.invalidate_many_sync(conversation_ids)
+
+            pipe = client.pipeline(transaction=False)
+            pipe.xack(self.stream, STATUS_GROUP, *entry_ids)
+            pipe.xdel(self.stream, *entry_ids)
+            pipe.execute()
+
+            stats["events"] += len(entries)
+            stats["messages"] += len(statuses)
+
+        return stats
+
+
+# Instance globale du pipeline de statuts
+status_store = StatusStore()
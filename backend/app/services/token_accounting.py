@@ -0,0 +1,99 @@
+import logging
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_harmony"
+TOKEN_COUNT_KEY = "token_count"
+
+
+@lru_cache(maxsize=4)
+def get_encoder(encoding_name: str = DEFAULT_ENCODING):
+    """
+    Return the tiktoken encoder for ``encoding_name``.
+
+    Loading an encoding parses its BPE ranks, so it is done once per process
+    and shared by every extractor and agent.
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding_name)
+
+
+def count_text_tokens(text: Optional[str], encoding_name: str = DEFAULT_ENCODING) -> int:
+    """Count the tokens of a plain text with the shared encoder."""
+    if not text:
+        return 0
+    return len(get_encoder(encoding_name).encode(text))
+
+
+def get_cached_token_count(message: BaseMessage) -> Optional[int]:
+    """Return the token count stored on a message, if any."""
+    metadata = getattr(message, "response_metadata", None) or {}
+    value = metadata.get(TOKEN_COUNT_KEY)
+    return int(value) if value is not None else None
+
+
+def set_cached_token_count(message: BaseMessage, token_count: int) -> BaseMessage:
+    """
+    Store ``token_count`` on the message.
+
+    ``response_metadata`` is persisted by the checkpointer but never sent to the
+    LLM provider, so the count travels with the message across turns.
+    """
+    message.response_metadata = {
+        **(message.response_metadata or {}),
+        TOKEN_COUNT_KEY: int(token_count),
+    }
+    return message
+
+
+def message_token_count(message: BaseMessage) -> int:
+    """
+    Token count of a single message, computed at most once.
+
+    Uses the count stored at ingest (or the provider usage for AI messages) and
+    falls back to the approximate counter, caching the result on the message.
+    Reasoning tokens are billed as output but never stored in the message, so
+    they are left out of the count.
+    """
+    cached = get_cached_token_count(message)
+    if cached is not None:
+        return cached
+
+    usage = getattr(message, "usage_metadata", None)
+    if usage and usage.get("output_tokens") is not None:
+        reasoning = (usage.get("output_token_details") or {}).get("reasoning") or 0
+        token_count = max(int(usage["output_tokens"]) - int(reasoning), 0)
+    else:
+        token_count = count_tokens_approximately([message])
+
+    set_cached_token_count(message, token_count)
+    return token_count
+
+
+def messages_token_count(messages: Iterable[BaseMessage]) -> int:
+    """Sum of the cached token counts of ``messages``.
+
+    Signature-compatible with ``trim_messages(token_counter=...)``.
+    """
+    return sum(message_token_count(m) for m in messages)
+
+
+def content_token_count(content: Any) -> int:
+    """Token count of a message content (text or multimodal list)."""
+    if isinstance(content, str):
+        return count_text_tokens(content)
+    if isinstance(content, list):
+        total = 0
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "text":
+                total += count_text_tokens(part.get("text", ""))
+            elif isinstance(part, str):
+                total += count_text_tokens(part)
+        return total
+    return 0
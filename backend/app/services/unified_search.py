@@ -5,17 +5,32 @@ This service orchestrates parallel searches across FAQ and knowledge documents
 using synchronous Supabase client with thread-based parallelism.
 """
 
+import os
+import re
+import json
 import time
 import logging
 from typing import List, Literal, Optional
 from pydantic import BaseModel
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
+from app.core.metrics import RETRIEVAL_SECONDS
+from app.core.tracing import stage
 from app.services.find_answers import FindAnswers, Answer, ReferencedAnswer
 from app.services.retriever import Retriever
+from app.services.retrieval_cache import retrieval_cache
+from app.services.token_accounting import count_text_tokens
 
 logger = logging.getLogger(__name__)
 
+# Chunks returned per query and per method (vector / full-text) before fusion
+DOCS_MATCH_COUNT = int(os.getenv("DOCS_SEARCH_MATCH_COUNT", "10"))
+DOCS_RRF_K = int(os.getenv("DOCS_SEARCH_RRF_K", "10"))
+# Fused candidates returned by the RPC, then packed into the token budget
+DOCS_RESULT_LIMIT = int(os.getenv("DOCS_SEARCH_RESULT_LIMIT", "20"))
+DOCS_CONTEXT_TOKEN_BUDGET = int(os.getenv("DOCS_CONTEXT_TOKEN_BUDGET", "2000"))
+
 
 class QueryItem(BaseModel):
     """
@@ -36,6 +51,10 @@ class SearchMetadata(BaseModel):
     strategy_used: str
     faq_count: int
     docs_count: int
+    docs_rpc_count: int = 0
+    docs_payload_bytes: int = 0
+    docs_context_tokens: int = 0
+    docs_cache_status: Literal["hit", "miss", "disabled"] = "disabled"
 
 
 class UnifiedSearchResult(BaseModel):
@@ -57,16 +76,22 @@ class UnifiedSearchService:
     Uses synchronous Supabase client with thread-based parallelism.
     """
 
-    def __init__(self, user_id: str, model_name: str = "x-ai/grok-4-fast"):
+    def __init__(
+        self,
+        user_id: str,
+        model_name: str = "x-ai/grok-4-fast",
+        fallback_models: Optional[List[str]] = None,
+    ):
         """
         Initialize unified search service.
 
         Args:
             user_id: User ID for filtering results
             model_name: LLM model to use for FAQ reasoning
+            fallback_models: Models tried when model_name is slow or failing
         """
         self.user_id = user_id
-        self.find_answers = FindAnswers(user_id, model_name)
+        self.find_answers = FindAnswers(user_id, model_name, fallback_models)
         self.retriever = Retriever(user_id)
 
     def search(self, question: str, queries: List[QueryItem]) -> UnifiedSearchResult:
@@ -92,11 +117,14 @@ class UnifiedSearchService:
         logger.info(f"📝 Document queries: {[q.query for q in queries]}")
 
         with ThreadPoolExecutor(max_workers=2) as executor:
-            faq_future = executor.submit(self._search_faq_with_timing, question)
-            docs_future = executor.submit(self._search_docs_with_timing, queries)
+            # copy_context: both searches stay in the trace of the calling stage
+            faq_future = executor.submit(copy_context().run, self._search_faq_with_timing, question)
+            docs_future = executor.submit(copy_context().run, self._search_docs_with_timing, queries)
 
             (faq_result, faq_time) = faq_future.result()
-            (doc_chunks, docs_time) = docs_future.result()
+            (docs_search, docs_time) = docs_future.result()
+
+        doc_chunks = docs_search["chunks"]
 
         logger.info(
             f"✅ FAQ search completed in {faq_time:.2f}s (grade: {faq_result.grade})"
@@ -106,6 +134,9 @@ class UnifiedSearchService:
         )
 
         total_time = time.time() - start_time
+        RETRIEVAL_SECONDS.labels(source="faq").observe(faq_time)
+        RETRIEVAL_SECONDS.labels(source="docs").observe(docs_time)
+        RETRIEVAL_SECONDS.labels(source="total").observe(total_time)
 
         metadata = SearchMetadata(
             faq_latency=faq_time,
@@ -114,6 +145,10 @@ class UnifiedSearchService:
             strategy_used=self._get_strategy_name(faq_result.grade),
             faq_count=len(faq_result.references) if faq_result.references else 0,
             docs_count=len(doc_chunks),
+            docs_rpc_count=docs_search["rpc_count"],
+            docs_payload_bytes=docs_search["payload_bytes"],
+            docs_context_tokens=docs_search["context_tokens"],
+            docs_cache_status=docs_search["cache_status"],
         )
 
         final_result = self._merge_results(faq_result, doc_chunks, metadata)
@@ -138,7 +173,8 @@ class UnifiedSearchService:
         """
         start = time.time()
         try:
-            result = self.find_answers.find_answers(question)
+            with stage("unified_search.faq"):
+                result = self.find_answers.find_answers(question)
             latency = time.time() - start
             return result, latency
         except Exception as e:
@@ -157,94 +193,179 @@ class UnifiedSearchService:
 
     def _search_docs_with_timing(
         self, queries: List[QueryItem]
-    ) -> tuple[List[str], float]:
+    ) -> tuple[dict, float]:
         """
         Execute document search with timing measurement.
 
         Optimizations:
         1. Batch embedding generation (all queries in one API call)
-        2. Parallel RPC calls for each query using threads
+        2. One RPC for all queries: fusion (RRF) and dedup by chunk id in SQL
+        3. Fused chunks packed into DOCS_CONTEXT_TOKEN_BUDGET
+        4. Ranked chunk ids cached per knowledge version: a hit skips the
+           embeddings and the RPC, the chunks are fetched by id
 
         Args:
             queries: List of search queries with languages
 
         Returns:
-            Tuple of (list of document chunks, latency_in_seconds)
+            Tuple of (dict with chunks and transfer stats, latency_in_seconds)
         """
         start = time.time()
+        docs_search = {
+            "chunks": [],
+            "rpc_count": 0,
+            "payload_bytes": 0,
+            "context_tokens": 0,
+            "cache_status": "disabled",
+        }
 
         if not queries:
             logger.warning("⚠️  No queries provided for document search")
-            return [], 0.0
+            return docs_search, 0.0
 
         try:
-            query_texts = [q.query for q in queries]
-            embeddings = self.retriever.embed_texts(query_texts)
-
-            logger.info(f"🔢 Generated {len(embeddings)} embeddings in batch")
-
-            all_chunks = []
-            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
-                futures = {
-                    executor.submit(self._search_single_query, q, emb): i
-                    for i, (q, emb) in enumerate(zip(queries, embeddings))
-                }
-
-                for future in as_completed(futures):
-                    i = futures[future]
-                    try:
-                        results = future.result()
-                        all_chunks.extend([r["content"] for r in results])
-                    except Exception as e:
-                        logger.error(f"❌ Query {i+1} failed: {str(e)}")
+            cache_params = self._get_cache_params(queries)
+            version = retrieval_cache.get_version(self.user_id)
+            cached = retrieval_cache.get(self.user_id, version, "docs", cache_params)
+
+            if cached is not None:
+                with stage("unified_search.docs_cached_fetch"):
+                    rows, payload_bytes = self._fetch_chunks(cached)
+                docs_search.update(rpc_count=0, cache_status="hit")
+            else:
+                query_texts = [q.query for q in queries]
+                with stage("unified_search.docs_embed", queries=len(query_texts)):
+                    embeddings = self.retriever.embed_texts(query_texts)
+
+                logger.info(f"🔢 Generated {len(embeddings)} embeddings in batch")
+
+                with stage("unified_search.docs_rpc"):
+                    rows, payload_bytes = self._search_multi_query(queries, embeddings)
+                retrieval_cache.set(self.user_id, version, "docs", cache_params, rows)
+                docs_search.update(
+                    rpc_count=1,
+                    cache_status="miss" if version is not None else "disabled",
+                )
+
+            chunks, context_tokens = self._pack_chunks(rows, DOCS_CONTEXT_TOKEN_BUDGET)
+
+            docs_search.update(
+                chunks=chunks,
+                payload_bytes=payload_bytes,
+                context_tokens=context_tokens,
+            )
+            logger.info(
+                f"📦 Docs search ({docs_search['cache_status']}): {len(rows)} fused chunks, "
+                f"{len(chunks)} packed ({context_tokens} tokens, {payload_bytes} bytes, "
+                f"{docs_search['rpc_count']} RPC)"
+            )
 
             latency = time.time() - start
-            return all_chunks, latency
+            return docs_search, latency
 
         except Exception as e:
             latency = time.time() - start
             logger.error(f"❌ Document search failed after {latency:.2f}s: {str(e)}")
-            return [], latency
+            return docs_search, latency
 
-    def _search_single_query(
-        self, query: QueryItem, embedding: List[float]
-    ) -> List[dict]:
+    def _search_multi_query(
+        self, queries: List[QueryItem], embeddings: List[List[float]]
+    ) -> tuple[List[dict], int]:
         """
-        Execute search for a single query with pre-computed embedding.
+        Execute hybrid search for all queries in a single RPC.
 
         Args:
-            query: Query with language specification
-            embedding: Pre-computed embedding vector
+            queries: Queries with language specification
+            embeddings: Pre-computed embedding vectors, same order as queries
 
         Returns:
-            List of search results with content and score
+            Tuple of (fused results ordered by score, request + response bytes)
         """
         from app.db.session import get_db
-        import re
+
+        params = {
+            "p_user_id": self.user_id,
+            "query_texts": [self._to_tsquery_text(q.query) for q in queries],
+            "query_embeddings": embeddings,
+            "query_langs": [q.lang for q in queries],
+            "match_count": DOCS_MATCH_COUNT,
+            "rrf_k": DOCS_RRF_K,
+            "result_limit": DOCS_RESULT_LIMIT,
+        }
 
         try:
             db = get_db()
+            response = db.rpc("hybrid_knowledge_chunks_multi_search", params).execute()
+            rows = response.data or []
+        except Exception as e:
+            logger.error(f"❌ Multi-query search failed for {len(queries)} queries: {str(e)}")
+            raise
+
+        payload_bytes = len(json.dumps(params)) + len(json.dumps(rows, default=str))
+        return rows, payload_bytes
+
+    @staticmethod
+    def _get_cache_params(queries: List[QueryItem]) -> dict:
+        """Retrieval cache key parameters; query order does not change the fusion"""
+        return {
+            "queries": sorted(
+                [" ".join(q.query.lower().split()), q.lang] for q in queries
+            ),
+            "match_count": DOCS_MATCH_COUNT,
+            "rrf_k": DOCS_RRF_K,
+            "result_limit": DOCS_RESULT_LIMIT,
+        }
+
+    def _fetch_chunks(self, cached: List[tuple]) -> tuple[List[dict], int]:
+        """
+        Rehydrate cached (chunk id, score) pairs with one select by id.
 
-            processed_query = " ".join(query.query.split())
-            processed_query = re.sub(r"\s+", " | ", processed_query)
+        Returns:
+            Tuple of (rows in cached order, response bytes)
+        """
+        from app.db.session import get_db
 
-            response = db.rpc(
-                "hybrid_knowledge_chunks_search_v2",
-                {
-                    "p_user_id": self.user_id,
-                    "query_text": processed_query,
-                    "query_embedding": embedding,
-                    "query_lang": query.lang,
-                    "match_count": 10,
-                    "rrf_k": 10,
-                },
-            ).execute()
+        if not cached:
+            return [], 0
 
-            return response.data if response.data else []
+        response = (
+            get_db()
+            .table("knowledge_chunks")
+            .select("id,document_id,chunk_index,content")
+            .in_("id", [chunk_id for chunk_id, _ in cached])
+            .execute()
+        )
+        rows = retrieval_cache.rehydrate(cached, response.data or [])
+        return rows, len(json.dumps(response.data or [], default=str))
 
-        except Exception as e:
-            logger.error(f"❌ Search failed for query '{query.query}': {str(e)}")
-            raise
+    @staticmethod
+    def _to_tsquery_text(query: str) -> str:
+        """Words of a query joined with OR, safe for to_tsquery"""
+        return " | ".join(re.findall(r"\w+", query))
+
+    @staticmethod
+    def _pack_chunks(rows: List[dict], token_budget: int) -> tuple[List[str], int]:
+        """
+        Keep the best chunks that fit in the token budget.
+
+        Rows are already deduplicated and ordered by fused score; a chunk too
+        large for the remaining budget is skipped, smaller ones may still fit.
+
+        Returns:
+            Tuple of (chunk contents, context tokens used)
+        """
+        chunks: List[str] = []
+        used = 0
+        for row in rows:
+            content = (row.get("content") or "").strip()
+            if not content:
+                continue
+            tokens = count_text_tokens(content)
+            if used + tokens > token_budget:
+                continue
+            chunks.append(content)
+            used += tokens
+        return chunks, used
 
     def _merge_results(
         self, faq_result: Answer, doc_chunks: List[str], metadata: SearchMetadata
@@ -254,7 +375,7 @@ class UnifiedSearchService:
 
         Strategy:
         - full: Use FAQ answer only (docs ignored but were calculated in parallel by the LLM)
-        - partial: Enrich FAQ answer with top 3 doc chunks
+        - partial: FAQ answer, enriched with the packed doc chunks
         - no-answer: Use docs only (or escalate if also empty)
 
         Args:
@@ -280,17 +401,9 @@ class UnifiedSearchService:
         elif faq_result.grade == "partial":
             logger.info("📝 Enriching partial FAQ answer with documents")
 
-            if doc_chunks:
-                enriched_content = (
-                    f"{faq_result.content}\n\n"
-                    f"**Additional information:**\n\n"
-                    f"{doc_chunks}"
-                )
-            else:
-                enriched_content = faq_result.content
-
+            # The chunks are returned once, in doc_chunks, next to the FAQ answer
             return UnifiedSearchResult(
-                answer_content=enriched_content,
+                answer_content=faq_result.content,
                 answer_grade="partial",
                 faq_references=[
                     ref.model_dump() for ref in (faq_result.references or [])
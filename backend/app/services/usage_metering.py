@@ -0,0 +1,242 @@
+"""
+Buffered usage metering
+
+An LLM call used to cost 3-5 network hops on the reply path (feature access,
+model access, credits check, locked deduction). Metering splits that in three:
+
+- EntitlementSnapshot: plan limits, allowed models and credit balance of a
+  user, loaded once per batch (CreditTracker); every check of the batch runs
+  against it in memory.
+- UsageMeter.record_batch: usage counted in Redis with atomic HINCRBY, one
+  pipeline per batch. Credits are counted in millicredits (integers).
+- UsageMeter.flush: run periodically (app.workers.metering), writes the
+  aggregated counters of the users touched since the last flush to the
+  usage_counters table in bulk.
+
+Redis layout (period = billing month, YYYY-MM):
+    usage:{period}:{user_id}  hash   calls, millicredits, calls:{model}, millicredits:{model}
+    usage:dirty:{period}      set    user ids with unflushed usage
+
+Hashes hold the period totals: a flush writes absolute values, so replaying a
+flush never double counts.
+"""
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import redis
+import redis.asyncio as redis_async
+
+logger = logging.getLogger(__name__)
+
+USAGE_TTL_SECONDS = 40 * 24 * 3600  # Covers a billing month + flush delay
+FLUSH_BATCH_USERS = int(os.getenv("USAGE_FLUSH_BATCH_USERS", "500"))
+MILLI = 1000
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m")
+
+
+def previous_period(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    year, month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+    return f"{year:04d}-{month:02d}"
+
+
+def to_millicredits(credits: float) -> int:
+    return int(round(credits * MILLI))
+
+
+@dataclass
+class EntitlementSnapshot:
+    """Entitlements of a user for one batch, checked in memory"""
+
+    user_id: str
+    plan: str
+    max_calls_per_batch: int
+    credits_balance: float
+    # Credits already used this period when the snapshot was loaded
+    credits_used: float = 0.0
+    # None: every model is allowed
+    allowed_models: Optional[FrozenSet[str]] = None
+    loaded_at: float = field(default_factory=time.time)
+
+    @property
+    def unlimited(self) -> bool:
+        return math.isinf(self.credits_balance)
+
+    def allows_model(self, model_name: str) -> bool:
+        return self.allowed_models is None or model_name in self.allowed_models
+
+    def remaining(self) -> float:
+        return self.credits_balance - self.credits_used
+
+    def can_spend(self, credits: float) -> bool:
+        return self.unlimited or credits <= self.remaining()
+
+
+class UsageMeter:
+    """Compteurs d'usage Redis par utilisateur et période, flush groupé vers Postgres"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self._redis_pool = None
+        self._sync_client: Optional[redis.Redis] = None
+
+    async def get_redis(self) -> redis_async.Redis:
+        if not self._redis_pool:
+            self._redis_pool = redis_async.ConnectionPool.from_url(
+                self.redis_url, decode_responses=True, max_connections=20
+            )
+        return redis_async.Redis(connection_pool=self._redis_pool)
+
+    def _get_sync_redis(self) -> redis.Redis:
+        """Client synchrone pour le flusher (worker Celery)"""
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._sync_client
+
+    @staticmethod
+    def _usage_key(period: str, user_id: str) -> str:
+        return f"usage:{period}:{user_id}"
+
+    @staticmethod
+    def _dirty_key(period: str) -> str:
+        return f"usage:dirty:{period}"
+
+    async def load_snapshot(self, user_id: str, credits_service) -> EntitlementSnapshot:
+        """
+        Entitlements of a user: one credits service round for the plan and
+        balance, one Redis read for the usage of the period
+        """
+        feature_access = await credits_service.get_feature_access(user_id)
+        balance_data = await credits_service.get_credits_balance(user_id)
+        balance = (
+            balance_data.get("balance") if isinstance(balance_data, dict)
+            else getattr(balance_data, "balance", None)
+        )
+        allowed_models = getattr(feature_access, "allowed_models", None)
+
+        snapshot = EntitlementSnapshot(
+            user_id=user_id,
+            plan=(balance_data.get("plan") if isinstance(balance_data, dict) else None) or "unknown",
+            max_calls_per_batch=getattr(feature_access, "max_calls_per_batch", 999999),
+            credits_balance=float("inf") if balance is None else float(balance),
+            allowed_models=frozenset(allowed_models) if allowed_models is not None else None,
+        )
+
+        if not snapshot.unlimited:
+            try:
+                redis_client = await self.get_redis()
+                used = await redis_client.hget(
+                    self._usage_key(current_period(), user_id), "millicredits"
+                )
+                snapshot.credits_used = int(used or 0) / MILLI
+            except Exception as e:
+                # Balance checks then rely on the balance alone
+                logger.warning(f"[METERING] Usage unavailable for {user_id}: {e}")
+
+        return snapshot
+
+    async def record_batch(self, user_id: str, calls: List[Any]) -> bool:
+        """
+        Count the AI calls of a batch (objects with model_name and credit_cost)
+
+        One pipeline: HINCRBY per counter, dirty flag, TTL.
+        """
+        if not calls:
+            return True
+
+        period = current_period()
+        key = self._usage_key(period, user_id)
+        per_model: Dict[str, List[int]] = {}
+        for call in calls:
+            counters = per_model.setdefault(call.model_name, [0, 0])
+            counters[0] += 1
+            counters[1] += to_millicredits(call.credit_cost)
+
+        try:
+            redis_client = await self.get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(key, "calls", len(calls))
+                pipe.hincrby(key, "millicredits", sum(c[1] for c in per_model.values()))
+                for model_name, (count, millicredits) in per_model.items():
+                    pipe.hincrby(key, f"calls:{model_name}", count)
+                    pipe.hincrby(key, f"millicredits:{model_name}", millicredits)
+                pipe.expire(key, USAGE_TTL_SECONDS)
+                pipe.sadd(self._dirty_key(period), user_id)
+                pipe.expire(self._dirty_key(period), USAGE_TTL_SECONDS)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"[METERING] Error recording usage for {user_id}: {e}")
+            return False
+
+    @staticmethod
+    def _rows_from_hash(user_id: str, period: str, usage: Dict[str, str]) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for field_name, value in usage.items():
+            if not field_name.startswith("calls:"):
+                continue
+            model_name = field_name[len("calls:"):]
+            rows.append({
+                "user_id": user_id,
+                "period": period,
+                "model": model_name,
+                "calls": int(value),
+                "credits": int(usage.get(f"millicredits:{model_name}", 0)) / MILLI,
+                "updated_at": now,
+            })
+        return rows
+
+    def flush(self, db, period: Optional[str] = None) -> Dict[str, int]:
+        """
+        Write the counters of the users with unflushed usage to usage_counters
+
+        Users are taken from the dirty set in batches of FLUSH_BATCH_USERS; a
+        failed upsert puts them back for the next flush.
+
+        Returns:
+            Dict with users and rows flushed
+        """
+        period = period or current_period()
+        client = self._get_sync_redis()
+        dirty_key = self._dirty_key(period)
+        stats = {"users": 0, "rows": 0}
+
+        while True:
+            user_ids = client.spop(dirty_key, FLUSH_BATCH_USERS)
+            if not user_ids:
+                return stats
+
+            pipe = client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.hgetall(self._usage_key(period, user_id))
+            usages = pipe.execute()
+
+            rows: List[Dict[str, Any]] = []
+            for user_id, usage in zip(user_ids, usages):
+                rows.extend(self._rows_from_hash(user_id, period, usage or {}))
+
+            try:
+                if rows:
+                    db.table("usage_counters").upsert(
+                        rows, on_conflict="user_id,period,model"
+                    ).execute()
+            except Exception as e:
+                logger.error(f"[METERING] Flush failed for {len(user_ids)} users: {e}")
+                client.sadd(dirty_key, *user_ids)
+                raise
+
+            stats["users"] += len(user_ids)
+            stats["rows"] += len(rows)
+
+
+# Instance globale du compteur d'usage
+usage_meter = UsageMeter()
@@ -1,294 +1,315 @@
+"""
+User data deletion, as a resumable job processed in bounded chunks
+
+A deletion request creates a user_deletion_jobs row (one active job per user,
+migration 038); app.workers.deletion.run_user_deletion runs it through
+UserDataDeletionService. The user's social accounts are deactivated (and
+their cached credentials dropped) when the job runs, so webhooks stop creating
+conversations and cache entries for them; then, phase by phase:
+
+- conversations: pages of DELETION_CONVERSATION_PAGE conversations: their
+                 per-conversation keys, message media (one bulk storage remove
+                 per DELETION_STORAGE_BATCH objects), then messages,
+                 escalations and conversations in one purge_conversations call
+- knowledge:     pages of DELETION_DOCUMENT_PAGE documents: files removed in
+                 bulk, then chunks and documents (purge_knowledge_documents)
+- cache:         Redis keys of the user's accounts and knowledge base, found
+                 with SCAN MATCH/COUNT (never KEYS) and removed with UNLINK
+                 in batches; after the row phases, as webhooks received
+                 before the deactivation may still have written some
+- account:       remaining rows keyed by user_id, user row last (purge_user_rows)
+
+Ids never travel in URLs (RPC bodies only) and each statement touches one
+page. Storage objects go before their rows and every step is idempotent, so a
+chunk interrupted midway is simply re-run when the job resumes. Progress
+(phase, deleted counts per resource, errors) is saved after every chunk.
+"""
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
+import redis
 from supabase import Client
 
-try:  # Lazy import to avoid circular references when running tests
-    from app.services.message_batcher import message_batcher
-except Exception:  # pragma: no cover - fallback when batcher not available
-    message_batcher = None
-
-try:
-    from app.services.media_cache_service import redis_client as media_cache_redis
-except Exception:  # pragma: no cover - redis cache optional in some envs
-    media_cache_redis = None
-
 logger = logging.getLogger(__name__)
 
+DELETION_CONVERSATION_PAGE = int(os.getenv("DELETION_CONVERSATION_PAGE", "200"))
+DELETION_DOCUMENT_PAGE = int(os.getenv("DELETION_DOCUMENT_PAGE", "20"))
+DELETION_STORAGE_BATCH = int(os.getenv("DELETION_STORAGE_BATCH", "1000"))
+DELETION_SCAN_COUNT = int(os.getenv("DELETION_SCAN_COUNT", "1000"))
+DELETION_UNLINK_BATCH = int(os.getenv("DELETION_UNLINK_BATCH", "500"))
 
-@dataclass
-class DeletionResult:
-    user_id: str
-    deleted_counts: Dict[str, int] = field(default_factory=dict)
-    storage_deleted: List[str] = field(default_factory=list)
-    cache_keys_deleted: List[str] = field(default_factory=list)
-    errors: List[str] = field(default_factory=list)
-
-    def record(self, resource: str, count: int) -> None:
-        self.deleted_counts[resource] = self.deleted_counts.get(resource, 0) + count
-
-    def add_error(self, resource: str, error: Exception) -> None:
-        error_message = f"{resource}: {error}"
-        logger.error(error_message)
-        self.errors.append(error_message)
-
-
-class UserDataDeletionService:
-    """Service responsible for permanently deleting all user-related data."""
-
-    def __init__(
-        self,
-        auth_db: Client,
-        service_db: Client,
-        user_id: str,
-        storage_bucket_names: Optional[List[str]] = None,
-    ) -> None:
-        self.auth_db = auth_db
-        self.service_db = service_db
-        self.user_id = user_id
-        self.storage_bucket_names = storage_bucket_names or ["message", "knowledge"]
-
-    async def delete_user_data(self) -> DeletionResult:
-        result = DeletionResult(user_id=self.user_id)
-
-        social_account_ids = self._get_social_account_ids(result)
-        conversation_ids = self._get_conversation_ids(result)
-        document_entries = self._get_document_entries(result)
+PHASES = ("conversations", "knowledge", "cache", "account")
+ACTIVE_STATUSES = ("pending", "running")
 
-        await self._delete_conversation_messages(conversation_ids, result)
-        await self._delete_conversation_cache(conversation_ids, result)
-        self._delete_conversations(conversation_ids, result)
-        self._delete_social_accounts(social_account_ids, result)
+MESSAGE_MEDIA_BUCKET = "message"
 
-        self._delete_knowledge_chunks([entry["id"] for entry in document_entries], result)
-        await self._delete_document_storage_objects(document_entries, result)
-        self._delete_knowledge_documents(document_entries, result)
 
-        self._delete_support_escalations(result)
-        self._delete_ai_settings(result)
-        self._delete_user_preferences(result)
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
 
-        self._delete_user_record(result)
 
-        return result
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
-    # --- Fetch helpers ---
 
-    def _get_social_account_ids(self, result: DeletionResult) -> List[str]:
-        try:
-            response = (
-                self.auth_db.table("social_accounts")
-                .select("id")
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            return [row["id"] for row in response.data or []]
-        except Exception as exc:
-            result.add_error("social_accounts.fetch", exc)
-            return []
+def create_deletion_job(db: Client, user_id: str) -> Dict[str, Any]:
+    """Active job of the user, or a new pending one"""
+    active = get_active_deletion_job(db, user_id)
+    if active:
+        return active
+    try:
+        response = db.table("user_deletion_jobs").insert({"user_id": user_id}).execute()
+        return response.data[0]
+    except Exception:
+        # Concurrent request: the unique index kept the other job
+        active = get_active_deletion_job(db, user_id)
+        if active:
+            return active
+        raise
 
-    def _get_conversation_ids(self, result: DeletionResult) -> List[str]:
-        try:
-            response = (
-                self.auth_db.table("conversations")
-                .select("id")
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            return [row["id"] for row in response.data or []]
-        except Exception as exc:
-            result.add_error("conversations.fetch", exc)
-            return []
 
-    def _get_document_entries(self, result: DeletionResult) -> List[Dict[str, Optional[str]]]:
-        try:
-            response = (
-                self.auth_db.table("knowledge_documents")
-                .select("id, storage_object_name")
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            return response.data or []
-        except Exception as exc:
-            result.add_error("knowledge_documents.fetch", exc)
-            return []
+def get_active_deletion_job(db: Client, user_id: str) -> Optional[Dict[str, Any]]:
+    response = (
+        db.table("user_deletion_jobs")
+        .select("*")
+        .eq("user_id", user_id)
+        .in_("status", list(ACTIVE_STATUSES))
+        .limit(1)
+        .execute()
+    )
+    return response.data[0] if response.data else None
 
-    # --- Deletion helpers ---
 
-    async def _delete_conversation_messages(
-        self, conversation_ids: List[str], result: DeletionResult
-    ) -> None:
-        if not conversation_ids:
-            return
-        try:
-            response = (
-                self.service_db.table("conversation_messages")
-                .delete()
-                .in_("conversation_id", conversation_ids)
-                .execute()
-            )
-            result.record("conversation_messages", len(response.data or []))
-        except Exception as exc:
-            result.add_error("conversation_messages", exc)
+def get_deletion_job(db: Client, job_id: str) -> Optional[Dict[str, Any]]:
+    response = db.table("user_deletion_jobs").select("*").eq("id", job_id).limit(1).execute()
+    return response.data[0] if response.data else None
 
-    async def _delete_conversation_cache(
-        self, conversation_ids: List[str], result: DeletionResult
-    ) -> None:
-        if not conversation_ids:
-            return
-        try:
-            redis_client = None
-            if message_batcher and getattr(message_batcher, "redis_client", None):
-                redis_client = message_batcher.redis_client
-            elif media_cache_redis:
-                redis_client = media_cache_redis
-
-            if not redis_client:
-                return
-            for conversation_id in conversation_ids:
-                cache_pattern = f"conv:*:{conversation_id}"
-                try:
-                    matching_keys = await redis_client.keys(cache_pattern)  # type: ignore[arg-type]
-                    if not matching_keys:
-                        continue
-                    deleted = await redis_client.delete(*matching_keys)  # type: ignore[arg-type]
-                    if deleted:
-                        result.cache_keys_deleted.extend(matching_keys)
-                except Exception as redis_exc:  # pragma: no cover - best effort cleanup
-                    result.add_error(f"cache:{conversation_id}", redis_exc)
-        except Exception as exc:
-            result.add_error("cache.global", exc)
 
-    def _delete_conversations(
-        self, conversation_ids: List[str], result: DeletionResult
-    ) -> None:
-        if not conversation_ids:
-            return
-        try:
-            response = (
-                self.service_db.table("conversations")
-                .delete()
-                .in_("id", conversation_ids)
-                .execute()
-            )
-            result.record("conversations", len(response.data or []))
-        except Exception as exc:
-            result.add_error("conversations", exc)
-
-    def _delete_social_accounts(
-        self, social_account_ids: List[str], result: DeletionResult
-    ) -> None:
-        if not social_account_ids:
-            return
-        try:
-            response = (
-                self.service_db.table("social_accounts")
-                .delete()
-                .in_("id", social_account_ids)
-                .execute()
-            )
-            result.record("social_accounts", len(response.data or []))
-        except Exception as exc:
-            result.add_error("social_accounts", exc)
+class UserDataDeletionService:
+    """Suppression des données d'un utilisateur, par lots bornés et reprenable"""
 
-    def _delete_knowledge_chunks(
-        self, document_ids: List[str], result: DeletionResult
+    def __init__(
+        self,
+        db: Client,
+        job: Dict[str, Any],
+        redis_client: Optional[redis.Redis] = None,
+        on_chunk: Optional[Callable[[], None]] = None,
     ) -> None:
-        if not document_ids:
-            return
-        try:
-            response = (
-                self.service_db.table("knowledge_chunks")
-                .delete()
-                .in_("document_id", document_ids)
-                .execute()
+        self.db = db
+        self.job = job
+        self.job_id = job["id"]
+        self.user_id = job["user_id"]
+        self.redis_client = redis_client or redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True
+        )
+        # Called after every saved chunk (the worker refreshes its lock there)
+        self.on_chunk = on_chunk
+        self.deleted: Dict[str, int] = defaultdict(int, job.get("deleted") or {})
+
+    # --- Job lifecycle ---
+
+    def run(self, time_budget_seconds: float) -> Dict[str, Any]:
+        """
+        Process chunks until the job is done or the time budget is spent
+
+        Returns the saved job; status stays "running" when the budget ran out
+        (the caller re-enqueues it). Exceptions are left to the caller.
+        """
+        deadline = time.monotonic() + time_budget_seconds
+        # Every run: idempotent, and an account reconnected meanwhile is caught
+        self._deactivate_accounts()
+        if self.job["status"] == "pending" or not self.job.get("started_at"):
+            self._save(
+                status="running",
+                phase=self.job.get("phase") or PHASES[0],
+                started_at=_now(),
+                totals=self._totals(),
             )
-            result.record("knowledge_chunks", len(response.data or []))
-        except Exception as exc:
-            result.add_error("knowledge_chunks", exc)
-
-    async def _delete_document_storage_objects(
-        self, document_entries: List[Dict[str, Optional[str]]], result: DeletionResult
-    ) -> None:
-        if not document_entries:
-            return
-        bucket = self.service_db.storage.from_("knowledge")
-        for entry in document_entries:
-            object_name = entry.get("storage_object_name")
-            if not object_name:
-                continue
-            try:
-                bucket.remove(object_name)  # type: ignore[arg-type]
-                result.storage_deleted.append(object_name)
-            except Exception as exc:  # pragma: no cover - relies on Supabase storage
-                result.add_error(f"storage:{object_name}", exc)
-
-    def _delete_knowledge_documents(
-        self, document_entries: List[Dict[str, Optional[str]]], result: DeletionResult
-    ) -> None:
-        if not document_entries:
-            return
-        document_ids = [entry["id"] for entry in document_entries if entry.get("id")]
-        if not document_ids:
-            return
+        elif self.job["status"] != "running":
+            self._save(status="running")
+
+        steps = {
+            "conversations": self._purge_conversations_page,
+            "knowledge": self._purge_documents_page,
+            "cache": self._purge_cache,
+            "account": self._purge_account,
+        }
+        phase_index = PHASES.index(self.job.get("phase") or PHASES[0])
+        while phase_index < len(PHASES):
+            phase = PHASES[phase_index]
+            # A step returns True once its phase is finished
+            if steps[phase]():
+                phase_index += 1
+                next_phase = PHASES[phase_index] if phase_index < len(PHASES) else None
+                if next_phase is None:
+                    return self._save(status="completed", phase=None, completed_at=_now())
+                self._save(phase=next_phase)
+            else:
+                self._save()
+            if self.on_chunk:
+                self.on_chunk()
+            if time.monotonic() >= deadline:
+                logger.info(f"[DELETION] Job {self.job_id} paused in {self.job['phase']}: time budget spent")
+                return self.job
+        return self.job
+
+    def _totals(self) -> Dict[str, Any]:
         try:
-            response = (
-                self.service_db.table("knowledge_documents")
-                .delete()
-                .in_("id", document_ids)
-                .execute()
-            )
-            result.record("knowledge_documents", len(response.data or []))
-        except Exception as exc:
-            result.add_error("knowledge_documents", exc)
-
-    def _delete_support_escalations(self, result: DeletionResult) -> None:
-        try:
-            response = (
-                self.service_db.table("support_escalations")
-                .delete()
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            result.record("support_escalations", len(response.data or []))
-        except Exception as exc:
-            result.add_error("support_escalations", exc)
-
-    def _delete_ai_settings(self, result: DeletionResult) -> None:
-        try:
-            response = (
-                self.service_db.table("ai_settings")
-                .delete()
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            result.record("ai_settings", len(response.data or []))
-        except Exception as exc:
-            result.add_error("ai_settings", exc)
-
-    def _delete_user_preferences(self, result: DeletionResult) -> None:
-        try:
-            response = (
-                self.service_db.table("user_preferences")
-                .delete()
-                .eq("user_id", self.user_id)
-                .execute()
-            )
-            result.record("user_preferences", len(response.data or []))
-        except Exception as exc:
-            result.add_error("user_preferences", exc)
-
-    def _delete_user_record(self, result: DeletionResult) -> None:
-        try:
-            response = (
-                self.service_db.table("users")
-                .delete()
-                .eq("id", self.user_id)
-                .execute()
-            )
-            result.record("users", len(response.data or []))
+            return self.db.rpc("user_deletion_totals", {"p_user_id": self.user_id}).execute().data or {}
         except Exception as exc:
-            result.add_error("users", exc)
\ No newline at end of file
+            logger.warning(f"[DELETION] Could not count the data of {self.user_id}: {exc}")
+            return {}
+
+    def _save(self, **fields: Any) -> Dict[str, Any]:
+        fields.update(deleted=dict(self.deleted), updated_at=_now())
+        self.db.table("user_deletion_jobs").update(fields).eq("id", self.job_id).execute()
+        self.job.update(fields)
+        return self.job
+
+    def _record(self, counts: Dict[str, Any]) -> None:
+        for resource, count in (counts or {}).items():
+            self.deleted[resource] += int(count or 0)
+
+    def _deactivate_accounts(self) -> None:
+        """Stop webhook processing for the user's accounts during the job"""
+        accounts = (
+            self.db.table("social_accounts")
+            .update({"is_active": False})
+            .eq("user_id", self.user_id)
+            .execute()
+        ).data or []
+        # Cached credentials would still let the webhooks through
+        self._record({"cache_keys": self._unlink(
+            [f"credentials:{account['platform']}:{account['account_id']}" for account in accounts]
+        )})
+
+    # --- Redis ---
+
+    def _unlink(self, keys: List[str]) -> int:
+        removed = 0
+        for batch in _chunks(keys, DELETION_UNLINK_BATCH):
+            removed += self.redis_client.unlink(*batch)
+        return removed
+
+    def _unlink_matching(self, pattern: str) -> int:
+        """SCAN MATCH/COUNT: incremental, never blocks Redis like KEYS"""
+        removed = 0
+        batch: List[str] = []
+        for key in self.redis_client.scan_iter(match=pattern, count=DELETION_SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= DELETION_UNLINK_BATCH:
+                removed += self._unlink(batch)
+                batch = []
+        if batch:
+            removed += self._unlink(batch)
+        return removed
+
+    def _purge_cache(self) -> bool:
+        """Account, batching and knowledge base keys of the user (idempotent)"""
+        accounts = (
+            self.db.table("social_accounts")
+            .select("id, platform, account_id")
+            .eq("user_id", self.user_id)
+            .execute()
+        ).data or []
+
+        removed = 0
+        for account in accounts:
+            platform, account_id = account["platform"], account["account_id"]
+            # Batches in progress: conv:{platform}:{account_id}:{contact}:* and the deadline index
+            removed += self._unlink_matching(f"conv:{platform}:{account_id}:*")
+            members = [
+                member
+                for member, _ in self.redis_client.zscan_iter(
+                    "conv:deadlines", match=f"{platform}:{account_id}:*", count=DELETION_SCAN_COUNT
+                )
+            ]
+            for batch in _chunks(members, DELETION_UNLINK_BATCH):
+                removed += self.redis_client.zrem("conv:deadlines", *batch)
+            removed += self._unlink_matching(f"conversation:{account['id']}:*")
+            removed += self._unlink([f"credentials:{platform}:{account_id}"])
+
+        removed += self._unlink_matching(f"answer_cache:{self.user_id}:*")
+        removed += self._unlink_matching(f"retrieval:{self.user_id}:*")
+        removed += self._unlink([f"answer_cache:metrics:{self.user_id}", f"kb_version:{self.user_id}"])
+
+        self._record({"cache_keys": removed})
+        return True
+
+    # --- Storage ---
+
+    def _remove_objects(self, bucket_id: str, object_names: List[str]) -> int:
+        """Bulk removal, DELETION_STORAGE_BATCH objects per storage call"""
+        removed = 0
+        bucket = self.db.storage.from_(bucket_id)
+        for batch in _chunks(object_names, DELETION_STORAGE_BATCH):
+            bucket.remove(batch)
+            removed += len(batch)
+        return removed
+
+    # --- Pages ---
+
+    def _purge_conversations_page(self) -> bool:
+        page = (
+            self.db.rpc(
+                "user_conversations_page",
+                {"p_user_id": self.user_id, "p_limit": DELETION_CONVERSATION_PAGE},
+            ).execute()
+        ).data or []
+        if not page:
+            return True
+
+        conversation_ids = [row["conversation_id"] for row in page]
+        self._record({"cache_keys": self._unlink(
+            [f"latency:{cid}" for cid in conversation_ids]
+            + [f"messages:latest:{cid}" for cid in conversation_ids]
+        )})
+
+        media = [name for row in page for name in (row.get("media_objects") or []) if name]
+        if media:
+            self._record({"storage_objects": self._remove_objects(MESSAGE_MEDIA_BUCKET, media)})
+
+        counts = self.db.rpc(
+            "purge_conversations",
+            {"p_user_id": self.user_id, "p_conversation_ids": conversation_ids},
+        ).execute().data
+        self._record(counts)
+        return len(page) < DELETION_CONVERSATION_PAGE
+
+    def _purge_documents_page(self) -> bool:
+        page = (
+            self.db.table("knowledge_documents")
+            .select("id, bucket_id, object_name")
+            .eq("user_id", self.user_id)
+            .order("id")
+            .limit(DELETION_DOCUMENT_PAGE)
+            .execute()
+        ).data or []
+        if not page:
+            return True
+
+        objects_by_bucket: Dict[str, List[str]] = defaultdict(list)
+        for document in page:
+            if document.get("bucket_id") and document.get("object_name"):
+                objects_by_bucket[document["bucket_id"]].append(document["object_name"])
+        for bucket_id, object_names in objects_by_bucket.items():
+            self._record({"storage_objects": self._remove_objects(bucket_id, object_names)})
+
+        counts = self.db.rpc(
+            "purge_knowledge_documents",
+            {"p_user_id": self.user_id, "p_document_ids": [d["id"] for d in page]},
+        ).execute().data
+        self._record(counts)
+        return len(page) < DELETION_DOCUMENT_PAGE
+
+    def _purge_account(self) -> bool:
+        counts = self.db.rpc("purge_user_rows", {"p_user_id": self.user_id}).execute().data
+        self._record(counts)
+        return True
@@ -29,7 +29,8 @@ class WhatsAppService:
             raise RuntimeError("WHATSAPP_PHONE_NUMBER_ID manquant")
 
         graph_version = os.getenv("META_GRAPH_VERSION", "v24.0")
-        self.api_url = f"https://graph.facebook.com/{graph_version}"
+        graph_base_url = os.getenv("META_GRAPH_BASE_URL", "https://graph.facebook.com")
+        self.api_url = f"{graph_base_url}/{graph_version}"
         
         self.client = httpx.AsyncClient(
             base_url=self.api_url,
@@ -0,0 +1,41 @@
+"""
+Celery Workers for message batching (DMs/chats)
+
+Tasks:
+- Redis batch scan every 500 ms: due conversations are answered by the AI
+
+Kept apart from ingest so that the batching worker does not import the
+document parsing stack (PDF/DOCX parsers, language detection).
+"""
+import logging
+
+from app.workers.celery_app import celery
+from app.workers.event_loop import run_async_safe
+
+logger = logging.getLogger(__name__)
+
+
+# Task name unchanged (routes, beat schedule and queued messages refer to it)
+@celery.task(bind=True, name="app.workers.ingest.scan_redis_batches")
+def scan_redis_batches_task(self):
+    """
+    Celery task to scan Redis for due message batches and process them.
+
+    This replaces the asyncio loop in batch_scanner that runs in FastAPI process.
+    Executes every 0.5s via Celery Beat for robust distributed processing.
+    """
+    try:
+        # Import here to avoid circular dependencies
+        from app.services.batch_scanner import batch_scanner
+
+        logger.debug("[BATCH_SCAN] Starting Redis batch scan")
+
+        # Run the async processing function
+        run_async_safe(batch_scanner._process_due_conversations())
+
+        logger.debug("[BATCH_SCAN] Batch scan completed successfully")
+
+    except Exception as e:
+        logger.error(f"[BATCH_SCAN] Error scanning Redis batches: {e}")
+        # Don't raise - let Celery retry automatically
+        # The next scheduled task will try again in 0.5s
@@ -1,6 +1,9 @@
 import os
+from typing import List, Optional
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import celeryd_init, worker_init, worker_process_shutdown
 
 celery = Celery(
     "socialsyncAI",
@@ -15,10 +18,15 @@ celery.conf.update(
         },  # Documents/embeddings only
         "app.workers.ingest.scan_redis_batches": {
             "queue": "batching"
-        },  # Batch scanner (DMs/chats)
+        },  # Batch scanner (DMs/chats), defined in app.workers.batching
         "app.workers.scheduler.*": {"queue": "scheduler"},
         "app.workers.comments.*": {"queue": "comments"},
         "app.workers.topics.*": {"queue": "topics"},  # Topic modeling (BERTopic)
+        "app.workers.checkpoints.*": {"queue": "maintenance"},  # Checkpoint retention
+        "app.workers.metering.*": {"queue": "maintenance"},  # Usage counters flush
+        "app.workers.statuses.*": {"queue": "maintenance"},  # Delivery/read statuses flush
+        "app.workers.deletion.*": {"queue": "maintenance"},  # User data deletion jobs
+        "app.workers.notifications.*": {"queue": "notifications"},  # Escalation emails (outbox)
     },
     task_time_limit=1800,  # 30 min max/ tâche
     worker_max_tasks_per_child=200,
@@ -56,11 +64,114 @@ celery.conf.beat_schedule = {
             "expires": 7200,  # 2 hours timeout
         },
     },
+    "flush-usage-every-minute": {
+        "task": "app.workers.metering.flush_usage",
+        "schedule": 60.0,  # Every 60 seconds (1 minute)
+        "options": {
+            "expires": 55,  # Task expires after 55s to avoid overlap
+        },
+    },
+    "flush-message-statuses-every-5s": {
+        "task": "app.workers.statuses.flush_message_statuses",
+        "schedule": 5.0,  # Every 5 seconds
+        "options": {
+            "expires": 4,  # Task expires after 4s to avoid overlap
+        },
+    },
+    "flush-escalation-outbox-every-5s": {
+        "task": "app.workers.notifications.flush_escalation_outbox",
+        "schedule": 5.0,  # Every 5 seconds
+        "options": {
+            "expires": 4,  # Task expires after 4s to avoid overlap
+        },
+    },
+    "purge-escalation-outbox-daily": {
+        "task": "app.workers.notifications.purge_escalation_outbox",
+        "schedule": crontab(hour=3, minute=10),  # Every day at 03:10 AM UTC
+        "options": {
+            "expires": 3600,
+        },
+    },
+    "resume-user-deletions-every-5-minutes": {
+        "task": "app.workers.deletion.resume_user_deletions",
+        "schedule": 300.0,  # Every 5 minutes (300 seconds)
+        "options": {
+            "expires": 290,  # Task expires after 290s to avoid overlap
+        },
+    },
+    "checkpoint-lifecycle-hourly": {
+        "task": "app.workers.checkpoints.run_checkpoint_lifecycle",
+        "schedule": crontab(minute=40),  # Every hour at :40
+        "options": {
+            "expires": 3000,  # Task expires after 50 min to avoid overlap
+        },
+    },
 }
 
 
-from app.workers import ingest
-from app.workers import scheduler
-from app.workers import comments
+# Task modules per queue. A worker only imports the modules of the queues it
+# consumes (CELERY_WORKER_QUEUES, e.g. "batching" or "topics,maintenance"):
+# the 500 ms batching worker no longer loads the ingest or topic modeling
+# stacks. Unset: every module (single worker setup). Empty: none (beat, flower,
+# API; beat only needs task names).
+QUEUE_TASK_MODULES = {
+    "ingest": ["app.workers.ingest"],
+    "batching": ["app.workers.batching"],
+    "scheduler": ["app.workers.scheduler"],
+    "notifications": ["app.workers.notifications"],
+    "comments": ["app.workers.comments"],
+    "topics": ["app.workers.topics"],
+    "maintenance": [
+        "app.workers.checkpoints",
+        "app.workers.metering",
+        "app.workers.statuses",
+        "app.workers.deletion",
+    ],
+}
+
+
+def get_task_modules(queues: Optional[str]) -> List[str]:
+    """Task modules to import for a comma-separated list of queues (None: all)"""
+    if queues is None:
+        names = list(QUEUE_TASK_MODULES)
+    else:
+        names = [name.strip() for name in queues.split(",") if name.strip()]
+
+    modules: List[str] = []
+    for name in names:
+        for module in QUEUE_TASK_MODULES.get(name, []):
+            if module not in modules:
+                modules.append(module)
+    return modules
+
+
+# Imported by the worker at startup, not when this module is imported
+celery.conf.imports = get_task_modules(os.getenv("CELERY_WORKER_QUEUES"))
+
+
+# Prometheus metrics (app/core/metrics.py). The worker node owns its
+# PROMETHEUS_MULTIPROC_DIR: emptied before any task module writes to it, then
+# exported on CELERY_METRICS_PORT for the node and its pool processes.
+@celeryd_init.connect
+def reset_metrics_dir(**kwargs):
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not metrics_dir:
+        return
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    from app.core.metrics import start_worker_exporter
+
+    start_worker_exporter()
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    from app.core.metrics import mark_process_dead
 
-from app.workers import topics  # Re-enabled after Supabase migration
+    mark_process_dead(pid)
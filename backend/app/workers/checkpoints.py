@@ -0,0 +1,101 @@
+"""
+Celery Workers for LangGraph checkpoint lifecycle
+
+Tasks:
+- Hourly lifecycle run: expire old RAGAgent threads, compact inactive threads to
+  their latest checkpoint and prune older checkpoints of idle threads
+  (checkpoint_lifecycle_batch SQL function, batched deletes)
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from app.workers.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+KEEP_LATEST_CHECKPOINTS = int(os.getenv("CHECKPOINT_KEEP_LATEST", "20"))
+IDLE_AFTER_MINUTES = int(os.getenv("CHECKPOINT_IDLE_AFTER_MINUTES", "15"))
+COMPACT_AFTER_HOURS = int(os.getenv("CHECKPOINT_COMPACT_AFTER_HOURS", "48"))
+RETENTION_DAYS = int(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))
+# Threads per transaction: keeps each delete short-lived
+BATCH_SIZE = int(os.getenv("CHECKPOINT_LIFECYCLE_BATCH_SIZE", "200"))
+# Stay below the beat expiry of the task
+TIME_BUDGET_SECONDS = 600
+
+_COUNTERS = (
+    "selected_threads",
+    "expired_threads",
+    "compacted_threads",
+    "pruned_threads",
+    "deleted_checkpoints",
+    "deleted_writes",
+    "deleted_blobs",
+)
+
+
+def _fetch_json(conn, query: str, params: tuple = ()) -> Dict[str, Any]:
+    row = conn.execute(query, params).fetchone()
+    value = next(iter(row.values())) if isinstance(row, dict) else row[0]
+    return value if isinstance(value, dict) else json.loads(value)
+
+
+@celery.task(name="app.workers.checkpoints.run_checkpoint_lifecycle")
+def run_checkpoint_lifecycle() -> Dict[str, Any]:
+    """
+    Periodic task: checkpoint retention / compaction
+    Runs every hour via Celery Beat
+
+    Calls checkpoint_lifecycle_batch until no thread is left to process or the
+    time budget is spent; the next run resumes where this one stopped.
+
+    Returns:
+        Dict with cumulated counters and storage stats before/after
+    """
+    from app.deps.runtime_prod import get_checkpointer_pool
+
+    deadline = time.monotonic() + TIME_BUDGET_SECONDS
+    totals: Dict[str, Any] = {counter: 0 for counter in _COUNTERS}
+    totals["batches"] = 0
+
+    try:
+        pool = get_checkpointer_pool()
+        with pool.connection() as conn:
+            totals["before"] = _fetch_json(conn, "SELECT checkpoint_storage_stats()")
+
+            while time.monotonic() < deadline:
+                result = _fetch_json(
+                    conn,
+                    "SELECT checkpoint_lifecycle_batch(%s, make_interval(mins => %s), "
+                    "make_interval(hours => %s), make_interval(days => %s), %s)",
+                    (
+                        KEEP_LATEST_CHECKPOINTS,
+                        IDLE_AFTER_MINUTES,
+                        COMPACT_AFTER_HOURS,
+                        RETENTION_DAYS,
+                        BATCH_SIZE,
+                    ),
+                )
+                totals["batches"] += 1
+                for counter in _COUNTERS:
+                    totals[counter] += int(result.get(counter) or 0)
+                if not result.get("has_more"):
+                    break
+
+            totals["after"] = _fetch_json(conn, "SELECT checkpoint_storage_stats()")
+
+        logger.info(
+            f"[CHECKPOINTS] {totals['batches']} batches: "
+            f"{totals['expired_threads']} expired, {totals['compacted_threads']} compacted, "
+            f"{totals['pruned_threads']} pruned threads; "
+            f"{totals['deleted_checkpoints']} checkpoints, {totals['deleted_writes']} writes, "
+            f"{totals['deleted_blobs']} blobs deleted"
+        )
+        return totals
+
+    except Exception as e:
+        logger.error(f"[CHECKPOINTS] Lifecycle run failed: {e}", exc_info=True)
+        totals["error"] = str(e)
+        return totals
@@ -2,7 +2,9 @@
 Celery Workers for Comment Polling System
 
 Workers:
+- ingest_comment_webhook: Push path, one Instagram `comments` webhook event
 - poll_post_comments: Periodic task (every 5 min) to fetch new comments from platforms
+  (reconciliation sweep when webhooks are enabled, see comment_ingestion.py)
 - process_comment: Process a single comment with AI guardrails and auto-reply
 
 Features:
@@ -15,16 +17,24 @@ Features:
 
 import logging
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List, Tuple
 from app.workers.celery_app import celery
 from app.db.session import get_db
+from app.core.metrics import OUTBOUND_SEND_SECONDS
 from app.services.instagram_connector import InstagramConnector
 from app.services.ai_decision_service import AIDecisionService
 from app.services.email_service import EmailService
 from app.services.rag_agent import RAGAgent
 from app.services.comment_triage import CommentTriageService, get_owner_username
 from app.schemas.ai_decisions import AIDecision
+from app.services.comment_ingestion import (
+    COMMENT_WEBHOOKS_ENABLED,
+    RECONCILE_INTERVAL,
+    WEBHOOK_GRACE,
+    record_graph_calls,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -168,49 +178,102 @@ def _update_checkpoint(
         logger.error(f"[POLL] Error updating checkpoint for {post_id}: {e}")
 
 
-def _save_comment(db, post_id: str, comment_data: Dict[str, Any]) -> Optional[str]:
+def _save_comment(
+    db, post_id: str, comment_data: Dict[str, Any], ingested_via: str = "poll"
+) -> Optional[str]:
     """
-    Save comment to database
+    Insert a comment, unless it is already stored
+
+    The insert ignores conflicts on (monitored_post_id, platform_comment_id):
+    a comment pushed by the webhook (or retried by Meta) and fetched by the
+    poller is inserted, hence dispatched, only once.
 
     Args:
         db: Supabase client
         post_id: Monitored post UUID
         comment_data: Comment data from connector
+        ingested_via: "webhook" or "poll"
 
     Returns:
-        Comment UUID or None if failed
+        Comment UUID, or None if the comment was already stored
     """
-    try:
-        data = {
-            "monitored_post_id": post_id,
-            "platform_comment_id": comment_data["id"],
-            "author_name": comment_data.get("author_name"),
-            "author_id": comment_data.get("author_id"),
-            "text": comment_data["text"],
-            "created_at": comment_data["created_at"],
-            "parent_id": comment_data.get("parent_id"),
-            "like_count": comment_data.get("like_count", 0),
-        }
+    data = {
+        "ingested_via": ingested_via,
+        "monitored_post_id": post_id,
+        "platform_comment_id": comment_data["id"],
+        "author_name": comment_data.get("author_name"),
+        "author_id": comment_data.get("author_id"),
+        "text": comment_data["text"],
+        "created_at": comment_data["created_at"],
+        "parent_id": comment_data.get("parent_id"),
+        "like_count": comment_data.get("like_count", 0),
+    }
+
+    result = (
+        db.table("comments")
+        .upsert(
+            data,
+            on_conflict="monitored_post_id,platform_comment_id",
+            ignore_duplicates=True,
+        )
+        .execute()
+    )
 
-        result = (
-            db.table("comments")
-            .upsert(data, on_conflict="monitored_post_id,platform_comment_id")
-            .execute()
+    # ON CONFLICT DO NOTHING: only an inserted row is returned
+    if not result.data:
+        return None
+    comment_id = result.data[0]["id"]
+    logger.debug(
+        f"[POLL] Saved comment {comment_id} from {comment_data.get('author_name')}"
+    )
+    return comment_id
+
+
+def _dispatch_comment(db, comment_id: str, comment: Dict[str, Any], bot_username: str) -> bool:
+    """
+    Enqueue process_comment for a saved comment, unless it is the bot's own
+
+    Returns:
+        True if the comment was enqueued
+    """
+    comment_author = (comment.get("author_name") or "").lower().strip("@")
+    if comment_author == bot_username:
+        logger.info(
+            f"[POLL] Skipping bot's own comment {comment_id} "
+            f"from @{comment_author}"
         )
+        # Mark as ignored (bot's own comment)
+        db.table("comments").update({"triage": "ignore"}).eq(
+            "id", comment_id
+        ).execute()
+        return False
 
-        if result.data and len(result.data) > 0:
-            comment_id = result.data[0]["id"]
-            logger.debug(
-                f"[POLL] Saved comment {comment_id} from {comment_data.get('author_name')}"
-            )
-            return comment_id
-        else:
-            logger.warning(f"[POLL] Failed to save comment: no data returned")
-            return None
+    # Only process comments from other users
+    process_comment.delay(comment_id)
+    return True
 
-    except Exception as e:
-        logger.error(f"[POLL] Error saving comment: {e}")
-        return None
+
+def _comment_from_webhook(value: Dict[str, Any], event_time: Optional[int]) -> Dict[str, Any]:
+    """
+    Connector-format comment from an Instagram `comments` webhook value
+
+    The value carries no timestamp: the entry time (unix seconds) is used.
+    """
+    sender = value.get("from") or {}
+    created_at = (
+        datetime.fromtimestamp(event_time, tz=timezone.utc)
+        if event_time
+        else datetime.now(timezone.utc)
+    )
+    return {
+        "id": value["id"],
+        "author_name": sender.get("username") or "Unknown User",
+        "author_id": sender.get("id"),
+        "text": value.get("text", ""),
+        "created_at": created_at.isoformat(),
+        "parent_id": value.get("parent_id"),
+        "like_count": 0,
+    }
 
 
 def _get_user_email(db, user_id: str) -> Optional[str]:
@@ -239,6 +302,74 @@ def _get_user_email(db, user_id: str) -> Optional[str]:
 # ============================================================================
 
 
+@celery.task(name="app.workers.comments.ingest_comment_webhook")
+def ingest_comment_webhook(
+    account_id: str, value: Dict[str, Any], event_time: Optional[int] = None
+):
+    """
+    Push path: save one comment received through the `comments` webhook field
+    and process it right away
+
+    Args:
+        account_id: Instagram business account ID (webhook entry id)
+        value: Webhook change value (id, text, from, media, parent_id)
+        event_time: Webhook entry time (unix seconds)
+
+    Comments on posts that are not monitored (or whose monitoring ended) are
+    dropped, as the poller would not fetch them either.
+    """
+    db = get_db()
+
+    try:
+        media_id = (value.get("media") or {}).get("id")
+        if not media_id or not value.get("id"):
+            logger.warning(f"[WEBHOOK] Comment event without media or comment id: {value}")
+            return {"status": "invalid"}
+
+        result = (
+            db.table("monitored_posts")
+            .select("id, social_accounts!inner(account_id, username)")
+            .eq("platform_post_id", media_id)
+            .eq("social_accounts.account_id", account_id)
+            .eq("monitoring_enabled", True)
+            .gt("monitoring_ends_at", datetime.utcnow().isoformat())
+            .limit(1)
+            .execute()
+        )
+        if not result.data:
+            logger.info(f"[WEBHOOK] Media {media_id} is not monitored, comment dropped")
+            return {"status": "not_monitored"}
+
+        post = result.data[0]
+        post_id = post["id"]
+        comment = _comment_from_webhook(value, event_time)
+
+        # Meta retries deliveries: a comment already stored was already dispatched
+        comment_id = _save_comment(db, post_id, comment, ingested_via="webhook")
+        if not comment_id:
+            logger.info(f"[WEBHOOK] Comment {comment['id']} already ingested, skipping")
+            return {"status": "duplicate"}
+
+        db.table("monitored_posts").update(
+            {"last_webhook_at": datetime.utcnow().isoformat()}
+        ).eq("id", post_id).execute()
+
+        bot_username = (
+            (post.get("social_accounts") or {}).get("username") or ""
+        ).lower().strip("@")
+        enqueued = _dispatch_comment(db, comment_id, comment, bot_username)
+
+        logger.info(
+            f"[WEBHOOK] Comment {comment_id} on post {post_id} saved, "
+            f"{'enqueued' if enqueued else 'ignored (own comment)'}"
+        )
+        return {"status": "ok", "comment_id": comment_id}
+
+    except Exception as e:
+        logger.error(f"[WEBHOOK] Error ingesting comment event: {e}")
+        return {"status": "error", "error": str(e)}
+
+
 @celery.task(name="app.workers.comments.poll_post_comments")
 def poll_post_comments():
     """
@@ -250,15 +381,19 @@ def poll_post_comments():
     1. Query posts with active polling (status='published' AND stop_at > NOW())
     2. For each post:
        - Check if next_check_at <= NOW() (skip if not due yet)
-       - Calculate adaptive interval
        - Fetch new comments via PlatformConnector
-       - Save comments to DB
-       - Enqueue process_comment tasks
+       - Save comments not already stored (pushed by the webhook)
+       - Enqueue process_comment tasks for them
        - Update checkpoint and next_check_at
     3. Log metrics
 
+    Next check: with webhooks enabled, a post is only re-polled after the
+    reconciliation interval, unless this poll found comments the webhook
+    missed (webhook gap), which puts it back on adaptive polling. Without
+    webhooks, adaptive polling as before.
+
     Returns:
-        Dict with metrics: {posts_checked, comments_found, errors}
+        Dict with metrics: {posts_checked, comments_found, webhook_gaps, graph_api_calls, errors}
     """
     db = get_db()
 
@@ -278,7 +413,13 @@ def poll_post_comments():
 
         logger.info(f"[POLL] Checking {len(posts)} monitored posts for new comments")
 
-        metrics = {"posts_checked": 0, "comments_found": 0, "errors": 0}
+        metrics = {
+            "posts_checked": 0,
+            "comments_found": 0,
+            "webhook_gaps": 0,
+            "graph_api_calls": 0,
+            "errors": 0,
+        }
 
         for post in posts:
             try:
@@ -317,6 +458,7 @@ def poll_post_comments():
                         platform_post_id, since_cursor=last_cursor
                     )
                 )
+                metrics["graph_api_calls"] += 1
 
                 # Get bot username to filter out bot's own comments
                 bot_username = (
@@ -326,26 +468,27 @@ def poll_post_comments():
                     .strip("@")
                 )
 
+                inserted = 0
+                missed_by_webhook = 0
+                grace_limit = datetime.now(timezone.utc) - WEBHOOK_GRACE
+
                 for comment in new_comments:
-                    comment_id = _save_comment(db, post_id, comment)
-                    if comment_id:
-                        # Skip processing if this is a comment from the bot itself
-                        comment_author = (
-                            comment.get("author_name", "").lower().strip("@")
-                        )
-                        if comment_author == bot_username:
-                            logger.info(
-                                f"[POLL] Skipping bot's own comment {comment_id} "
-                                f"from @{comment_author}"
-                            )
-                            # Mark as ignored (bot's own comment)
-                            db.table("comments").update({"triage": "ignore"}).eq(
-                                "id", comment_id
-                            ).execute()
-                        else:
-                            # Only process comments from other users
-                            process_comment.delay(comment_id)
-                            metrics["comments_found"] += 1
+                    try:
+                        comment_id = _save_comment(db, post_id, comment)
+                    except Exception as e:
+                        logger.error(f"[POLL] Error saving comment {comment['id']}: {e}")
+                        continue
+                    # Already stored: pushed by the webhook (and processed)
+                    if not comment_id:
+                        continue
+                    inserted += 1
+                    created_at = datetime.fromisoformat(
+                        comment["created_at"].replace("Z", "+00:00")
+                    )
+                    if created_at < grace_limit:
+                        missed_by_webhook += 1
+                    if _dispatch_comment(db, comment_id, comment, bot_username):
+                        metrics["comments_found"] += 1
 
                 if new_comments:
                     latest_ts = max(
@@ -356,20 +499,33 @@ def poll_post_comments():
                 elif next_cursor:
                     _update_checkpoint(db, post_id, next_cursor)
 
-                interval = _calculate_poll_interval(post)
+                # The first poll of a post imports comments from before monitoring
+                first_poll = not post.get("last_check_at")
+                webhook_gap = (
+                    COMMENT_WEBHOOKS_ENABLED and not first_poll and missed_by_webhook > 0
+                )
+                if webhook_gap:
+                    metrics["webhook_gaps"] += 1
+
+                if COMMENT_WEBHOOKS_ENABLED and not webhook_gap:
+                    interval = RECONCILE_INTERVAL
+                else:
+                    interval = _calculate_poll_interval(post)
                 next_check_at = datetime.utcnow() + interval
 
                 db.table("monitored_posts").update(
                     {
                         "last_check_at": datetime.utcnow().isoformat(),
                         "next_check_at": next_check_at.isoformat(),
+                        "webhook_gap": webhook_gap,
                     }
                 ).eq("id", post_id).execute()
 
                 metrics["posts_checked"] += 1
 
                 logger.info(
-                    f"[POLL] Post {post_id}: found {len(new_comments)} new comments, "
+                    f"[POLL] Post {post_id}: found {inserted} new comments "
+                    f"({missed_by_webhook} missed by webhook), "
                     f"next check in {interval.total_seconds() / 60:.0f} minutes"
                 )
 
@@ -377,9 +533,12 @@ def poll_post_comments():
                 logger.error(f"[POLL] Error polling post {post.get('id')}: {e}")
                 metrics["errors"] += 1
 
+        record_graph_calls(metrics["graph_api_calls"])
+
         logger.info(
             f"[POLL] Completed: {metrics['posts_checked']} posts checked, "
             f"{metrics['comments_found']} comments found, "
+            f"{metrics['webhook_gaps']} webhook gaps, "
             f"{metrics['errors']} errors"
         )
 
@@ -693,6 +852,7 @@ def process_comment(self, comment_id: str):
                 conversation_id=f"comment:{comment_id}",
                 system_prompt=local_system_prompt,
                 model_name=model_name,
+                fallback_models=ai_settings.get("ai_fallback_models"),
             )
 
             try:
@@ -731,11 +891,17 @@ def process_comment(self, comment_id: str):
             if not connector:
                 raise Exception("Failed to get platform connector")
 
+            send_start = time.perf_counter()
             result = asyncio.run(
                 connector.reply_to_comment(
                     comment["platform_comment_id"], response_text
                 )
             )
+            OUTBOUND_SEND_SECONDS.labels(
+                platform=post.get("platform", "instagram"),
+                kind="comment_reply",
+                outcome="sent" if result.get("success") else "failed",
+            ).observe(time.perf_counter() - send_start)
 
             if result.get("success"):
                 db.table("comments").update(
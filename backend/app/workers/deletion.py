@@ -0,0 +1,131 @@
+"""
+Celery Workers for user data deletion
+
+Tasks:
+- run_user_deletion: Processes a user_deletion_jobs row in bounded chunks for
+  at most DELETION_TIME_BUDGET_SECONDS, then re-enqueues itself until the job
+  is completed (see app/services/user_data_deletion_service.py)
+- resume_user_deletions: Periodic task (every 5 minutes) re-enqueuing the
+  jobs whose worker stopped (restart, lost task) without finishing them
+"""
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from app.workers.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+DELETION_TIME_BUDGET_SECONDS = float(os.getenv("DELETION_TIME_BUDGET_SECONDS", "240"))
+# A job not updated for this long has no live worker
+DELETION_STALE_SECONDS = int(os.getenv("DELETION_STALE_SECONDS", "600"))
+DELETION_MAX_RETRIES = 5
+
+
+def _lock_key(job_id: str) -> str:
+    return f"deletion:lock:{job_id}"
+
+
+@celery.task(
+    name="app.workers.deletion.run_user_deletion",
+    bind=True,
+    max_retries=DELETION_MAX_RETRIES,
+    default_retry_delay=30,
+)
+def run_user_deletion(self, job_id: str) -> Dict[str, Any]:
+    """
+    Run a deletion job for one time budget
+
+    A Redis lock keeps a single task per job (a resumed job may be enqueued
+    twice). On error the chunk is retried; after DELETION_MAX_RETRIES the job
+    is marked failed with its errors.
+
+    Args:
+        job_id: UUID of the user_deletion_jobs row
+
+    Returns:
+        Dict with job status, phase and deleted counts
+    """
+    from app.db.session import get_db
+    from app.services.user_data_deletion_service import UserDataDeletionService, get_deletion_job
+
+    db = get_db()
+    job = get_deletion_job(db, job_id)
+    if not job or job["status"] not in ("pending", "running"):
+        return {"job_id": job_id, "status": job["status"] if job else "missing"}
+
+    service = UserDataDeletionService(db, job)
+    lock_key = _lock_key(job_id)
+    lock_value = uuid.uuid4().hex
+    lock_ttl = int(DELETION_TIME_BUDGET_SECONDS) + 120
+    if not service.redis_client.set(lock_key, lock_value, nx=True, ex=lock_ttl):
+        logger.info(f"[DELETION] Job {job_id} already running, skipped")
+        return {"job_id": job_id, "status": "locked"}
+    service.on_chunk = lambda: service.redis_client.expire(lock_key, lock_ttl)
+
+    try:
+        job = service.run(DELETION_TIME_BUDGET_SECONDS)
+    except Exception as e:
+        attempts = int(job.get("attempts") or 0) + 1
+        errors = list(job.get("errors") or []) + [{
+            "phase": job.get("phase"),
+            "error": str(e)[:500],
+            "at": datetime.now(timezone.utc).isoformat(),
+        }]
+        retrying = self.request.retries < self.max_retries
+        update = {"attempts": attempts, "errors": errors[-20:]}
+        if not retrying:
+            update["status"] = "failed"
+        db.table("user_deletion_jobs").update(update).eq("id", job_id).execute()
+        if service.redis_client.get(lock_key) == lock_value:
+            service.redis_client.delete(lock_key)
+        logger.error(f"[DELETION] Job {job_id} failed in {job.get('phase')} (attempt {attempts}): {e}")
+        if retrying:
+            raise self.retry(exc=e)
+        return {"job_id": job_id, "status": "failed", "error": str(e)}
+
+    if service.redis_client.get(lock_key) == lock_value:
+        service.redis_client.delete(lock_key)
+
+    if job["status"] == "completed":
+        logger.info(f"[DELETION] Job {job_id} completed: {job['deleted']}")
+    else:
+        # Time budget spent: next chunks in a new task
+        run_user_deletion.apply_async(args=[job_id], countdown=1)
+
+    return {"job_id": job_id, "status": job["status"], "phase": job.get("phase"), "deleted": job.get("deleted")}
+
+
+@celery.task(name="app.workers.deletion.resume_user_deletions")
+def resume_user_deletions() -> Dict[str, Any]:
+    """
+    Periodic task: re-enqueue deletion jobs left pending or running
+    Runs every 5 minutes via Celery Beat
+
+    Returns:
+        Dict with the number of jobs re-enqueued
+    """
+    from app.db.session import get_db
+
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=DELETION_STALE_SECONDS)
+    try:
+        response = (
+            get_db().table("user_deletion_jobs")
+            .select("id")
+            .in_("status", ["pending", "running"])
+            .lt("updated_at", stale_before.isoformat())
+            .limit(100)
+            .execute()
+        )
+    except Exception as e:
+        logger.error(f"[DELETION] Error listing stalled deletion jobs: {e}")
+        return {"error": str(e)}
+
+    for job in response.data or []:
+        run_user_deletion.delay(job["id"])
+
+    if response.data:
+        logger.info(f"[DELETION] {len(response.data)} stalled deletion jobs re-enqueued")
+    return {"resumed": len(response.data or [])}
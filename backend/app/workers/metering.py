@@ -0,0 +1,42 @@
+"""
+Celery Workers for usage metering
+
+Tasks:
+- flush_usage: Periodic task (every minute) writing the Redis usage counters
+  of the users touched since the last flush to usage_counters, in bulk
+  (see app/services/usage_metering.py)
+"""
+import logging
+from typing import Any, Dict
+
+from app.workers.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.workers.metering.flush_usage")
+def flush_usage() -> Dict[str, Any]:
+    """
+    Periodic task: flush buffered usage counters to Postgres
+    Runs every minute via Celery Beat
+
+    The previous period is flushed too, for the usage counted just before a
+    month rollover.
+
+    Returns:
+        Dict with users and rows flushed per period
+    """
+    from app.db.session import get_db
+    from app.services.usage_metering import current_period, previous_period, usage_meter
+
+    db = get_db()
+    results: Dict[str, Any] = {}
+    for period in (previous_period(), current_period()):
+        try:
+            results[period] = usage_meter.flush(db, period)
+        except Exception as e:
+            logger.error(f"[METERING] Error flushing usage for {period}: {e}")
+            results[period] = {"error": str(e)}
+
+    logger.info(f"[METERING] Usage flushed: {results}")
+    return results
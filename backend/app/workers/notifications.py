@@ -0,0 +1,74 @@
+"""
+Celery Workers for escalation notifications
+
+Tasks:
+- flush_escalation_outbox: Periodic task (every 5 seconds) sending the emails
+  of the escalations queued in escalation_outbox: per-recipient rate limit,
+  digests, retries with backoff (see app/services/escalation_notifier.py)
+- purge_escalation_outbox: Daily task deleting the settled outbox rows older
+  than ESCALATION_OUTBOX_RETENTION_DAYS
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from app.workers.celery_app import celery
+from app.workers.event_loop import run_async_safe
+
+logger = logging.getLogger(__name__)
+
+ESCALATION_OUTBOX_RETENTION_DAYS = int(os.getenv("ESCALATION_OUTBOX_RETENTION_DAYS", "7"))
+
+
+@celery.task(name="app.workers.notifications.flush_escalation_outbox")
+def flush_escalation_outbox() -> Dict[str, Any]:
+    """
+    Periodic task: send the due escalation notifications
+    Runs every 5 seconds via Celery Beat
+
+    Returns:
+        Dict with rows claimed, emails and digests sent, rows deferred,
+        retried and failed
+    """
+    from app.db.session import get_db
+    from app.services.escalation_notifier import escalation_notifier
+
+    try:
+        stats = run_async_safe(escalation_notifier.flush(get_db()))
+    except Exception as e:
+        logger.error(f"[NOTIFY] Error flushing escalation outbox: {e}")
+        return {"error": str(e)}
+
+    if stats["claimed"]:
+        logger.info(f"[NOTIFY] Escalation outbox flushed: {stats}")
+    return stats
+
+
+@celery.task(name="app.workers.notifications.purge_escalation_outbox")
+def purge_escalation_outbox() -> Dict[str, Any]:
+    """
+    Periodic task: delete sent/failed outbox rows past the retention
+    Runs every day via Celery Beat
+
+    Returns:
+        Dict with the number of rows deleted
+    """
+    from app.db.session import get_db
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ESCALATION_OUTBOX_RETENTION_DAYS)
+    try:
+        response = (
+            get_db().table("escalation_outbox")
+            .delete()
+            .in_("status", ["sent", "failed"])
+            .lt("created_at", cutoff.isoformat())
+            .execute()
+        )
+    except Exception as e:
+        logger.error(f"[NOTIFY] Error purging escalation outbox: {e}")
+        return {"error": str(e)}
+
+    deleted = len(response.data or [])
+    logger.info(f"[NOTIFY] {deleted} escalation outbox rows purged")
+    return {"deleted": deleted}
@@ -4,16 +4,32 @@ Automatically publishes posts at scheduled times
 """
 
 import logging
+import os
+import time
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
+from celery import group
+
 from app.workers.celery_app import celery
 from app.db.session import get_db
 from app.services.whatsapp_service import WhatsAppService
 from app.services.instagram_service import InstagramService
+from app.schemas.scheduled_posts import PostStatus, PublishStage
 
 logger = logging.getLogger(__name__)
 
+# Instagram container processing is polled by re-enqueuing publish_post with a
+# countdown instead of sleeping inside the worker
+CONTAINER_POLL_INTERVAL_SECONDS = 5
+CONTAINER_MAX_WAIT_SECONDS = 300
+
+# Bulk claim of due posts (see claim_due_scheduled_posts RPC)
+CLAIM_BATCH_SIZE = int(os.getenv("SCHEDULER_CLAIM_BATCH_SIZE", "500"))
+CLAIM_LEAD_SECONDS = int(os.getenv("SCHEDULER_CLAIM_LEAD_SECONDS", "60"))
+# Stay well below the 55s beat expiry of enqueue_due_posts
+CLAIM_TIME_BUDGET_SECONDS = 40
+
 
 @celery.task(name="app.workers.scheduler.enqueue_due_posts")
 def enqueue_due_posts() -> Dict[str, int]:
@@ -21,50 +37,61 @@ def enqueue_due_posts() -> Dict[str, int]:
     Periodic task to find posts ready to publish and enqueue them
     Runs every 1 minute via Celery Beat
 
+    Due posts are claimed in bulk by the claim_due_scheduled_posts RPC
+    (single UPDATE ... SKIP LOCKED ... RETURNING) and enqueued with one group.
+    Posts due within CLAIM_LEAD_SECONDS are claimed ahead of time and enqueued
+    with an ETA on their publish_at.
+
     Returns:
         Dict with counts of posts_found and posts_enqueued
     """
     supabase = get_db()
     now = datetime.now(timezone.utc)
+    deadline = time.monotonic() + CLAIM_TIME_BUDGET_SECONDS
 
-    try:
-        result = (
-            supabase.table("scheduled_posts")
-            .select("id, platform")
-            .eq("status", "queued")
-            .lte("publish_at", now.isoformat())
-            .execute()
-        )
+    posts_enqueued = 0
 
-        posts_found = len(result.data)
-        posts_enqueued = 0
+    try:
+        while time.monotonic() < deadline:
+            result = supabase.rpc(
+                "claim_due_scheduled_posts",
+                {"claim_limit": CLAIM_BATCH_SIZE, "lead_seconds": CLAIM_LEAD_SECONDS},
+            ).execute()
+            claimed = result.data or []
 
-        for post in result.data:
-            post_id = post["id"]
+            if not claimed:
+                break
 
-            update_result = (
-                supabase.table("scheduled_posts")
-                .update({"status": "publishing", "updated_at": now.isoformat()})
-                .eq("id", post_id)
-                .eq("status", "queued")
-                .execute()
-            )
+            group(
+                publish_post.signature(
+                    args=(post["id"],), eta=_publish_eta(post.get("publish_at"), now)
+                )
+                for post in claimed
+            ).apply_async()
+            posts_enqueued += len(claimed)
 
-            if update_result.data:
-                publish_post.delay(post_id)
-                posts_enqueued += 1
+            if len(claimed) < CLAIM_BATCH_SIZE:
+                break
 
-        logger.info(f"Enqueued {posts_enqueued}/{posts_found} due posts")
+        logger.info(f"Enqueued {posts_enqueued} due posts")
 
         return {
-            "posts_found": posts_found,
+            "posts_found": posts_enqueued,
             "posts_enqueued": posts_enqueued,
             "timestamp": now.isoformat(),
         }
 
     except Exception as e:
         logger.error(f"Error in enqueue_due_posts: {str(e)}")
-        return {"posts_found": 0, "posts_enqueued": 0, "error": str(e)}
+        return {"posts_found": posts_enqueued, "posts_enqueued": posts_enqueued, "error": str(e)}
+
+
+def _publish_eta(publish_at: Optional[str], now: datetime) -> Optional[datetime]:
+    """ETA for a post claimed ahead of its publish_at (None if already due)"""
+    if not publish_at:
+        return None
+    eta = datetime.fromisoformat(publish_at)
+    return eta if eta > now else None
 
 
 @celery.task(
@@ -79,6 +106,13 @@ def publish_post(self, post_id: str) -> Dict[str, Any]:
 
     NOTE: This is a synchronous Celery task that calls async functions via asyncio.run()
 
+    Only posts in the publishing status (claimed by enqueue_due_posts) are
+    published; any other status returns right away.
+
+    Instagram posts are published in resumable stages (see PublishStage). When
+    the media container is still processing, the task persists its stage,
+    re-enqueues itself with a countdown and returns immediately.
+
     Args:
         post_id: UUID of the scheduled post
 
@@ -102,6 +136,19 @@ def publish_post(self, post_id: str) -> Dict[str, Any]:
             raise ValueError(f"Post {post_id} not found")
 
         post = post_result.data[0]
+
+        # Only a post claimed by claim_due_scheduled_posts is published: a post
+        # cancelled after its claim, or a task delivered again for a post
+        # already published (or failed), is dropped
+        if post.get("status") != PostStatus.PUBLISHING.value:
+            logger.info(f"Post {post_id} is {post.get('status')}, not publishing: skipped")
+            return {
+                "success": False,
+                "post_id": post_id,
+                "skipped": True,
+                "status": post.get("status"),
+            }
+
         platform = post["platform"]
         content_json = post["content_json"]
         channel = post.get("social_accounts")
@@ -156,7 +203,18 @@ def publish_post(self, post_id: str) -> Dict[str, Any]:
         if platform == "whatsapp":
             platform_post_id = asyncio.run(publish_to_whatsapp(channel, content_json))
         elif platform == "instagram":
-            platform_post_id = asyncio.run(publish_to_instagram(channel, content_json))
+            platform_post_id = asyncio.run(
+                advance_instagram_publication(supabase, post, channel)
+            )
+            if platform_post_id is None:
+                # Container still processing, a status check has been re-enqueued
+                return {
+                    "success": True,
+                    "post_id": post_id,
+                    "platform": platform,
+                    "pending": True,
+                    "publish_stage": PublishStage.CHECK_STATUS.value,
+                }
         else:
             raise ValueError(f"Unsupported platform: {platform}")
 
@@ -167,6 +225,7 @@ def publish_post(self, post_id: str) -> Dict[str, Any]:
                 "platform_post_id": platform_post_id,
                 "updated_at": finished_at.isoformat(),
                 "retry_count": 0,
+                "publish_stage": None,
             }
         ).eq("id", post_id).execute()
 
@@ -299,22 +358,133 @@ async def publish_to_whatsapp(channel: Dict[str, Any], content: Dict[str, Any])
     return result.get("message_id") or result.get("id")
 
 
-async def publish_to_instagram(channel: Dict[str, Any], content: Dict[str, Any]) -> str:
+def _set_publish_stage(
+    supabase, post_id: str, stage: Optional[PublishStage], **fields: Any
+) -> None:
+    """Persist the publishing stage (and container fields) of a post"""
+    supabase.table("scheduled_posts").update(
+        {
+            "publish_stage": stage.value if stage else None,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            **fields,
+        }
+    ).eq("id", post_id).execute()
+
+
+async def advance_instagram_publication(
+    supabase, post: Dict[str, Any], channel: Dict[str, Any]
+) -> Optional[str]:
     """
-    Publish content to Instagram
+    Advance an Instagram post through its publishing stages without waiting
+
+    create_container -> check_status -> publish. Each transition is stored on
+    scheduled_posts, so a retry or a re-enqueued status check resumes where the
+    previous run stopped instead of creating a new container.
 
     Args:
+        supabase: Supabase client
+        post: scheduled_posts row (with publish_stage, container_id)
         channel: Social account data with access_token, account_id
-        content: Post content with text and/or media
 
     Returns:
-        platform_post_id: Instagram media ID
+        platform_post_id when published, None if a status check was re-enqueued
     """
+    post_id = post["id"]
     ig_user_id = channel["account_id"]
     access_token = channel["access_token"]
 
+    stage = PublishStage(post.get("publish_stage") or PublishStage.CREATE_CONTAINER)
+    container_id = post.get("container_id")
+    container_created_at = post.get("container_created_at")
+
     service = InstagramService(access_token=access_token, page_id=ig_user_id)
 
+    try:
+        if stage == PublishStage.CREATE_CONTAINER or not container_id:
+            container_id = await create_instagram_container(
+                service, ig_user_id, post["content_json"]
+            )
+            container_created_at = datetime.now(timezone.utc).isoformat()
+            stage = PublishStage.CHECK_STATUS
+            _set_publish_stage(
+                supabase,
+                post_id,
+                stage,
+                container_id=container_id,
+                container_created_at=container_created_at,
+            )
+
+        if stage == PublishStage.CHECK_STATUS:
+            status_data = await service.check_container_status(
+                container_id, access_token
+            )
+            status = status_data.get("status_code")
+            logger.info(f"Container {container_id} for post {post_id} status: {status}")
+
+            if status in ("ERROR", "EXPIRED"):
+                # The container is unusable: a retry must create a new one
+                _set_publish_stage(
+                    supabase,
+                    post_id,
+                    PublishStage.CREATE_CONTAINER,
+                    container_id=None,
+                    container_created_at=None,
+                )
+                raise ValueError(f"Instagram container {container_id} status: {status}")
+
+            if status not in ("FINISHED", "PUBLISHED"):
+                created_at = (
+                    datetime.fromisoformat(container_created_at)
+                    if container_created_at
+                    else datetime.now(timezone.utc)
+                )
+                waited = (datetime.now(timezone.utc) - created_at).total_seconds()
+                if waited >= CONTAINER_MAX_WAIT_SECONDS:
+                    # Same as ERROR/EXPIRED: the retry starts over with a new
+                    # container instead of timing out again on this one
+                    _set_publish_stage(
+                        supabase,
+                        post_id,
+                        PublishStage.CREATE_CONTAINER,
+                        container_id=None,
+                        container_created_at=None,
+                    )
+                    raise ValueError(
+                        f"Timeout waiting for media processing: container {container_id} "
+                        f"still {status} after {int(waited)}s"
+                    )
+
+                publish_post.apply_async(
+                    args=[post_id], countdown=CONTAINER_POLL_INTERVAL_SECONDS
+                )
+                return None
+
+            stage = PublishStage.PUBLISH
+            _set_publish_stage(supabase, post_id, stage)
+
+        publish_result = await service.publish_media(
+            ig_user_id=ig_user_id, creation_id=container_id
+        )
+        return publish_result.get("id")
+
+    finally:
+        await service.close()
+
+
+async def create_instagram_container(
+    service: InstagramService, ig_user_id: str, content: Dict[str, Any]
+) -> str:
+    """
+    Create the Instagram media container of a post (stage 1)
+
+    Args:
+        service: InstagramService for the account
+        ig_user_id: Instagram Business Account ID
+        content: Post content with text and/or media
+
+    Returns:
+        container_id: Instagram media container ID
+    """
     text = content.get("text", "")
     media = content.get("media", [])
 
@@ -325,7 +495,6 @@ async def publish_to_instagram(channel: Dict[str, Any], content: Dict[str, Any])
 
     media_item = media[0]
 
-    # Step 1: Create media container
     container_result = await service.create_media_container(
         ig_user_id=ig_user_id,
         image_url=media_item["url"] if media_item["type"] == "image" else None,
@@ -338,18 +507,4 @@ async def publish_to_instagram(channel: Dict[str, Any], content: Dict[str, Any])
     if not container_id:
         raise ValueError("Failed to create Instagram media container")
 
-    # Step 2: Wait for container to be ready (Instagram needs time to process media)
-    # This prevents "Media ID is not available" errors
-    await service.wait_for_container_ready(
-        container_id=container_id,
-        access_token=access_token,
-        max_wait_seconds=60,
-        poll_interval=3
-    )
-
-    # Step 3: Publish the container
-    publish_result = await service.publish_media(
-        ig_user_id=ig_user_id, creation_id=container_id
-    )
-
-    return publish_result.get("id")
+    return container_id
@@ -0,0 +1,38 @@
+"""
+Celery Workers for the delivery/read status pipeline
+
+Tasks:
+- flush_message_statuses: Periodic task (every 5 seconds) applying the status
+  events queued in Redis by the webhooks to conversation_messages, coalesced
+  per message and in batches (see app/services/status_store.py)
+"""
+import logging
+from typing import Any, Dict
+
+from app.workers.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.workers.statuses.flush_message_statuses")
+def flush_message_statuses() -> Dict[str, Any]:
+    """
+    Periodic task: flush queued message statuses to Postgres
+    Runs every 5 seconds via Celery Beat
+
+    Returns:
+        Dict with events read, messages written, rows updated, DB writes,
+        failed batches and dead-lettered events
+    """
+    from app.db.session import get_db
+    from app.services.status_store import status_store
+
+    try:
+        stats = status_store.flush(get_db())
+    except Exception as e:
+        logger.error(f"[STATUS] Error flushing message statuses: {e}")
+        return {"error": str(e)}
+
+    if stats["events"] or stats["failed"] or stats["dead_lettered"]:
+        logger.info(f"[STATUS] Message statuses flushed: {stats}")
+    return stats
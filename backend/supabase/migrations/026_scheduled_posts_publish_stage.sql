@@ -0,0 +1,14 @@
+-- Resumable publishing stages for scheduled posts.
+-- Instagram publishing is split into create_container -> check_status -> publish;
+-- the current stage and container are stored so that a status check can be
+-- re-enqueued with a countdown instead of blocking a scheduler worker.
+
+ALTER TABLE scheduled_posts
+    ADD COLUMN IF NOT EXISTS publish_stage text
+        CHECK (publish_stage IN ('create_container', 'check_status', 'publish')),
+    ADD COLUMN IF NOT EXISTS container_id text,
+    ADD COLUMN IF NOT EXISTS container_created_at timestamptz;
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_posts_publish_stage
+    ON scheduled_posts (publish_stage)
+    WHERE status = 'publishing';
@@ -0,0 +1,31 @@
+-- Set-based claim of due scheduled posts.
+-- Replaces one conditional UPDATE per post in enqueue_due_posts with a single
+-- statement. SKIP LOCKED lets concurrent schedulers claim disjoint sets, and
+-- lead_seconds claims posts slightly ahead of publish_at so they can be
+-- enqueued with an ETA and hit the platform on schedule.
+
+CREATE OR REPLACE FUNCTION claim_due_scheduled_posts(
+    claim_limit integer DEFAULT 500,
+    lead_seconds integer DEFAULT 0
+)
+RETURNS TABLE (id uuid, platform text, publish_at timestamptz)
+LANGUAGE sql
+AS $$
+    UPDATE scheduled_posts sp
+    SET status = 'publishing',
+        updated_at = now()
+    WHERE sp.id IN (
+        SELECT due.id
+        FROM scheduled_posts due
+        WHERE due.status = 'queued'
+          AND due.publish_at <= now() + make_interval(secs => lead_seconds)
+        ORDER BY due.publish_at
+        LIMIT claim_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING sp.id, sp.platform, sp.publish_at;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_posts_queued_publish_at
+    ON scheduled_posts (publish_at)
+    WHERE status = 'queued';
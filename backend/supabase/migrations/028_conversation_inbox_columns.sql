@@ -0,0 +1,98 @@
+-- Denormalized inbox columns on conversations.
+-- The inbox used to run two extra queries per conversation (last message
+-- snippet + last inbound message). Both values are now maintained by a trigger
+-- on conversation_messages insert, so the inbox is a single indexed query with
+-- keyset pagination on (last_inbound_at, id).
+
+ALTER TABLE conversations
+    ADD COLUMN IF NOT EXISTS last_message_snippet text,
+    ADD COLUMN IF NOT EXISTS last_inbound_at timestamptz;
+
+-- Snippet of a message content: plain text, or the first text part of a
+-- multimodal JSON content ([{"type": "text", ...}, {"type": "image_url", ...}])
+CREATE OR REPLACE FUNCTION conversation_message_snippet(p_content text)
+RETURNS text
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    v_text text := p_content;
+BEGIN
+    IF p_content IS NULL THEN
+        RETURN '';
+    END IF;
+
+    IF left(ltrim(p_content), 1) = '[' THEN
+        BEGIN
+            SELECT part->>'text' INTO v_text
+            FROM jsonb_array_elements(p_content::jsonb) AS part
+            WHERE part->>'type' = 'text' AND coalesce(part->>'text', '') <> ''
+            LIMIT 1;
+            v_text := coalesce(v_text, p_content);
+        EXCEPTION WHEN others THEN
+            v_text := p_content;
+        END;
+    END IF;
+
+    IF length(v_text) > 100 THEN
+        RETURN left(v_text, 100) || '...';
+    END IF;
+    RETURN v_text;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION update_conversation_inbox_columns()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE conversations
+    SET last_message_snippet = conversation_message_snippet(NEW.content::text),
+        last_message_at = greatest(coalesce(last_message_at, NEW.created_at), NEW.created_at),
+        last_inbound_at = CASE
+            WHEN NEW.direction = 'inbound'
+                THEN greatest(coalesce(last_inbound_at, NEW.created_at), NEW.created_at)
+            ELSE last_inbound_at
+        END
+    WHERE id = NEW.conversation_id;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_conversation_inbox_columns ON conversation_messages;
+CREATE TRIGGER trg_conversation_inbox_columns
+    AFTER INSERT ON conversation_messages
+    FOR EACH ROW
+    EXECUTE FUNCTION update_conversation_inbox_columns();
+
+-- Backfill existing conversations
+UPDATE conversations c
+SET last_message_snippet = conversation_message_snippet((
+    SELECT cm.content::text
+    FROM conversation_messages cm
+    WHERE cm.conversation_id = c.id
+    ORDER BY cm.created_at DESC
+    LIMIT 1
+));
+
+UPDATE conversations c
+SET last_inbound_at = coalesce(
+    (
+        SELECT max(cm.created_at)
+        FROM conversation_messages cm
+        WHERE cm.conversation_id = c.id AND cm.direction = 'inbound'
+    ),
+    c.last_message_at,
+    c.created_at
+)
+WHERE c.last_inbound_at IS NULL;
+
+-- Conversations are created on the first inbound message
+ALTER TABLE conversations
+    ALTER COLUMN last_inbound_at SET DEFAULT now();
+UPDATE conversations SET last_inbound_at = created_at WHERE last_inbound_at IS NULL;
+ALTER TABLE conversations
+    ALTER COLUMN last_inbound_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_conversations_inbox
+    ON conversations (social_account_id, last_inbound_at DESC, id DESC);
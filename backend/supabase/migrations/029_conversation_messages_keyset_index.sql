@@ -0,0 +1,7 @@
+-- Keyset pagination of a conversation's message history.
+-- GET /conversations/{id}/messages reads the latest page (ORDER BY created_at
+-- DESC LIMIT n), older pages (created_at < cursor) and deltas
+-- (created_at > cursor), all scoped to one conversation.
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_created_at
+    ON conversation_messages (conversation_id, created_at DESC);
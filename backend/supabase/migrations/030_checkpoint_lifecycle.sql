@@ -0,0 +1,189 @@
+-- LangGraph checkpoint lifecycle (tables created by PostgresSaver.setup()).
+-- RAGAgent threads are per conversation per day and every graph step writes a
+-- checkpoint, so checkpoints / checkpoint_writes / checkpoint_blobs grow
+-- without bound. One call processes a bounded batch of threads:
+--   - expire:  threads idle for longer than p_retention are deleted
+--   - compact: threads idle for longer than p_compact_after are reduced to
+--              their latest checkpoint (the full state, incl. the conversation
+--              summary), flagged with metadata.compacted
+--   - prune:   idle threads keep only their p_keep_latest latest checkpoints
+-- Blobs no longer referenced by a remaining checkpoint and writes of deleted
+-- checkpoints are removed with them. Threads active in the last p_idle_after
+-- are never touched (a put writes blobs before its checkpoint row).
+-- Called repeatedly by app.workers.checkpoints.run_checkpoint_lifecycle.
+
+CREATE OR REPLACE FUNCTION checkpoint_lifecycle_batch(
+    p_keep_latest int DEFAULT 20,
+    p_idle_after interval DEFAULT interval '15 minutes',
+    p_compact_after interval DEFAULT interval '2 days',
+    p_retention interval DEFAULT interval '30 days',
+    p_batch_size int DEFAULT 200
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_selected int := 0;
+    v_expired int := 0;
+    v_compacted int := 0;
+    v_pruned int := 0;
+    v_deleted_checkpoints bigint := 0;
+    v_deleted_writes bigint := 0;
+    v_deleted_blobs bigint := 0;
+    v_rows bigint;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _checkpoint_lifecycle_threads (
+        thread_id text NOT NULL,
+        checkpoint_ns text NOT NULL,
+        action text NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns)
+    ) ON COMMIT DROP;
+    TRUNCATE _checkpoint_lifecycle_threads;
+
+    INSERT INTO _checkpoint_lifecycle_threads (thread_id, checkpoint_ns, action)
+    SELECT thread_id, checkpoint_ns, action
+    FROM (
+        SELECT
+            s.thread_id,
+            s.checkpoint_ns,
+            CASE
+                WHEN s.last_ts < now() - p_retention THEN 'expire'
+                WHEN s.last_ts < now() - p_compact_after AND s.checkpoint_count > 1 THEN 'compact'
+                WHEN s.last_ts < now() - p_idle_after AND s.checkpoint_count > p_keep_latest THEN 'prune'
+            END AS action,
+            s.last_ts
+        FROM (
+            SELECT
+                thread_id,
+                checkpoint_ns,
+                max((checkpoint->>'ts')::timestamptz) AS last_ts,
+                count(*) AS checkpoint_count
+            FROM checkpoints
+            GROUP BY thread_id, checkpoint_ns
+        ) s
+    ) candidates
+    WHERE action IS NOT NULL
+    ORDER BY last_ts
+    LIMIT p_batch_size;
+
+    GET DIAGNOSTICS v_selected = ROW_COUNT;
+    IF v_selected = 0 THEN
+        RETURN jsonb_build_object('selected_threads', 0, 'has_more', false);
+    END IF;
+
+    SELECT
+        count(*) FILTER (WHERE action = 'expire'),
+        count(*) FILTER (WHERE action = 'compact'),
+        count(*) FILTER (WHERE action = 'prune')
+    INTO v_expired, v_compacted, v_pruned
+    FROM _checkpoint_lifecycle_threads;
+
+    -- Expire whole threads
+    DELETE FROM checkpoint_writes w
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND w.thread_id = t.thread_id AND w.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_writes := v_deleted_writes + v_rows;
+
+    DELETE FROM checkpoint_blobs b
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND b.thread_id = t.thread_id AND b.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_blobs := v_deleted_blobs + v_rows;
+
+    DELETE FROM checkpoints c
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_checkpoints := v_deleted_checkpoints + v_rows;
+
+    -- Compact (keep 1) / prune (keep p_keep_latest); checkpoint ids are uuid6,
+    -- so they sort by creation time
+    WITH ranked AS (
+        SELECT
+            c.thread_id,
+            c.checkpoint_ns,
+            c.checkpoint_id,
+            row_number() OVER (
+                PARTITION BY c.thread_id, c.checkpoint_ns
+                ORDER BY c.checkpoint_id DESC
+            ) AS rn,
+            CASE t.action WHEN 'compact' THEN 1 ELSE p_keep_latest END AS keep
+        FROM checkpoints c
+        JOIN _checkpoint_lifecycle_threads t
+          ON c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns
+        WHERE t.action IN ('compact', 'prune')
+    )
+    DELETE FROM checkpoints c
+    USING ranked r
+    WHERE r.rn > r.keep
+      AND c.thread_id = r.thread_id
+      AND c.checkpoint_ns = r.checkpoint_ns
+      AND c.checkpoint_id = r.checkpoint_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_checkpoints := v_deleted_checkpoints + v_rows;
+
+    DELETE FROM checkpoint_writes w
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action IN ('compact', 'prune')
+      AND w.thread_id = t.thread_id AND w.checkpoint_ns = t.checkpoint_ns
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = w.thread_id
+            AND c.checkpoint_ns = w.checkpoint_ns
+            AND c.checkpoint_id = w.checkpoint_id
+      );
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_writes := v_deleted_writes + v_rows;
+
+    DELETE FROM checkpoint_blobs b
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action IN ('compact', 'prune')
+      AND b.thread_id = t.thread_id AND b.checkpoint_ns = t.checkpoint_ns
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = b.thread_id
+            AND c.checkpoint_ns = b.checkpoint_ns
+            AND c.checkpoint->'channel_versions'->>b.channel = b.version
+      );
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_blobs := v_deleted_blobs + v_rows;
+
+    UPDATE checkpoints c
+    SET metadata = c.metadata || jsonb_build_object('compacted', true, 'compacted_at', now())
+    FROM _checkpoint_lifecycle_threads t
+    WHERE t.action = 'compact'
+      AND c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns;
+
+    RETURN jsonb_build_object(
+        'selected_threads', v_selected,
+        'expired_threads', v_expired,
+        'compacted_threads', v_compacted,
+        'pruned_threads', v_pruned,
+        'deleted_checkpoints', v_deleted_checkpoints,
+        'deleted_writes', v_deleted_writes,
+        'deleted_blobs', v_deleted_blobs,
+        'has_more', v_selected = p_batch_size
+    );
+END;
+$$;
+
+-- Size report used before/after a lifecycle run
+CREATE OR REPLACE FUNCTION checkpoint_storage_stats()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'threads', (SELECT count(DISTINCT (thread_id, checkpoint_ns)) FROM checkpoints),
+        'checkpoints', (SELECT count(*) FROM checkpoints),
+        'checkpoint_writes', (SELECT count(*) FROM checkpoint_writes),
+        'checkpoint_blobs', (SELECT count(*) FROM checkpoint_blobs),
+        'total_bytes', pg_total_relation_size('checkpoints')
+            + pg_total_relation_size('checkpoint_writes')
+            + pg_total_relation_size('checkpoint_blobs')
+    );
+$$;
@@ -0,0 +1,6 @@
+-- Per-user toggle of the semantic answer cache (app.services.answer_cache).
+-- Enabled by default; tenants whose answers depend on per-customer context
+-- can turn it off from the AI settings.
+
+ALTER TABLE ai_settings
+    ADD COLUMN IF NOT EXISTS answer_cache_enabled boolean NOT NULL DEFAULT true;
@@ -0,0 +1,95 @@
+-- Multi-query hybrid search over knowledge chunks in a single call.
+-- unified_search sends 2-4 reformulations of the same question; they used to
+-- run as one hybrid_knowledge_chunks_search_v2 RPC each and the same chunk
+-- came back once per query. This function takes all the queries at once:
+--   - per query: top match_count chunks by vector distance (hnsw index) and
+--     by full-text rank (query text already in to_tsquery OR syntax)
+--   - reciprocal rank fusion across every (query, method) ranking:
+--     score = sum(1 / (rrf_k + rank))
+--   - one row per chunk id (dedup), best fused score first
+-- query_embeddings is a JSON array of vectors, in the order of query_texts.
+
+CREATE OR REPLACE FUNCTION hybrid_knowledge_chunks_multi_search(
+    p_user_id uuid,
+    query_texts text[],
+    query_embeddings jsonb,
+    query_langs text[],
+    match_count int DEFAULT 10,
+    rrf_k int DEFAULT 10,
+    result_limit int DEFAULT 20
+)
+RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    chunk_index int,
+    content text,
+    score double precision,
+    query_hits int
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH queries AS (
+        SELECT
+            q.ord,
+            q.query_text,
+            (query_embeddings -> (q.ord::int - 1))::text::vector(768) AS embedding,
+            COALESCE(NULLIF(query_langs[q.ord::int], ''), 'simple')::regconfig AS lang
+        FROM unnest(query_texts) WITH ORDINALITY AS q(query_text, ord)
+    ),
+    vector_ranked AS (
+        SELECT
+            queries.ord,
+            v.id,
+            row_number() OVER (PARTITION BY queries.ord ORDER BY v.distance) AS rnk
+        FROM queries
+        CROSS JOIN LATERAL (
+            SELECT c.id, c.embedding <=> queries.embedding AS distance
+            FROM knowledge_chunks c
+            JOIN knowledge_documents d ON d.id = c.document_id
+            WHERE d.user_id = p_user_id
+            ORDER BY c.embedding <=> queries.embedding
+            LIMIT match_count
+        ) v
+    ),
+    text_ranked AS (
+        SELECT
+            queries.ord,
+            t.id,
+            row_number() OVER (PARTITION BY queries.ord ORDER BY t.rank DESC) AS rnk
+        FROM queries
+        CROSS JOIN LATERAL (
+            SELECT c.id, ts_rank(c.tsv, to_tsquery(queries.lang, queries.query_text)) AS rank
+            FROM knowledge_chunks c
+            JOIN knowledge_documents d ON d.id = c.document_id
+            WHERE d.user_id = p_user_id
+              AND queries.query_text <> ''
+              AND c.tsv @@ to_tsquery(queries.lang, queries.query_text)
+            ORDER BY rank DESC
+            LIMIT match_count
+        ) t
+    ),
+    fused AS (
+        SELECT
+            r.id,
+            sum(1.0 / (rrf_k + r.rnk)) AS score,
+            count(DISTINCT r.ord) AS query_hits
+        FROM (
+            SELECT ord, id, rnk FROM vector_ranked
+            UNION ALL
+            SELECT ord, id, rnk FROM text_ranked
+        ) r
+        GROUP BY r.id
+    )
+    SELECT
+        c.id,
+        c.document_id,
+        c.chunk_index,
+        c.content,
+        f.score::double precision,
+        f.query_hits::int
+    FROM fused f
+    JOIN knowledge_chunks c ON c.id = f.id
+    ORDER BY f.score DESC, c.id
+    LIMIT result_limit;
+$$;
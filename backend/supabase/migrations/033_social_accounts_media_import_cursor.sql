@@ -0,0 +1,15 @@
+-- Resumable Instagram post import.
+-- MonitoringService.sync_instagram_posts streams /{ig_user_id}/media page by
+-- page and upserts monitored_posts in batches. After each batch the Graph API
+-- cursor of the next page is stored on the account, so an import of a large
+-- account stopped by its limit, a timeout or an API error continues from there
+-- (POST /monitoring/sync with resume=true). NULL = nothing left to import.
+
+ALTER TABLE social_accounts
+    ADD COLUMN IF NOT EXISTS media_import_cursor text,
+    ADD COLUMN IF NOT EXISTS media_import_updated_at timestamptz;
+
+-- Auto-monitoring picks the latest posts not yet monitored of an account
+CREATE INDEX IF NOT EXISTS idx_monitored_posts_account_unmonitored
+    ON monitored_posts (user_id, social_account_id, posted_at DESC)
+    WHERE monitoring_enabled = false;
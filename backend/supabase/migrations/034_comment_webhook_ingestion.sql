@@ -0,0 +1,21 @@
+-- Webhook-driven comment ingestion.
+-- Comments are pushed by the Instagram `comments` webhook field
+-- (app.workers.comments.ingest_comment_webhook); poll_post_comments becomes a
+-- reconciliation sweep that puts a post back on adaptive polling only when it
+-- found comments the webhook missed.
+--   monitored_posts.last_webhook_at  last comment pushed for the post
+--   monitored_posts.webhook_gap      last sweep found missed comments
+--   comments.ingested_via            'webhook' or 'poll' (latency reporting)
+
+ALTER TABLE monitored_posts
+    ADD COLUMN IF NOT EXISTS last_webhook_at timestamptz,
+    ADD COLUMN IF NOT EXISTS webhook_gap boolean NOT NULL DEFAULT false;
+
+ALTER TABLE comments
+    ADD COLUMN IF NOT EXISTS ingested_via text NOT NULL DEFAULT 'poll'
+        CHECK (ingested_via IN ('webhook', 'poll'));
+
+-- Webhook events look up the monitored post by its Instagram media id
+CREATE INDEX IF NOT EXISTS idx_monitored_posts_platform_post_id
+    ON monitored_posts (platform_post_id)
+    WHERE monitoring_enabled = true;
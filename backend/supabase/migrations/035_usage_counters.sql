@@ -0,0 +1,22 @@
+-- Buffered usage metering.
+-- AI usage is counted in Redis per user and billing period (HINCRBY, see
+-- app/services/usage_metering.py) and flushed every minute by
+-- app.workers.metering.flush_usage. A row holds the period totals of one
+-- model: the flush upserts absolute values, so a replayed flush is harmless.
+
+CREATE TABLE IF NOT EXISTS usage_counters (
+    user_id uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    period text NOT NULL,  -- YYYY-MM
+    model text NOT NULL,
+    calls bigint NOT NULL DEFAULT 0,
+    credits numeric(14, 3) NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, period, model)
+);
+
+ALTER TABLE usage_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own usage" ON usage_counters;
+CREATE POLICY "Users can view their own usage"
+    ON usage_counters FOR SELECT
+    USING (auth.uid() = user_id);
@@ -0,0 +1,48 @@
+-- Durable delivery/read status pipeline.
+-- Status webhooks (WhatsApp statuses, Messenger deliveries) are appended to a
+-- Redis Stream (app/services/status_store.py) and
+-- app.workers.statuses.flush_message_statuses coalesces them per message and
+-- applies the latest status of each message with one call per batch.
+-- A status never moves backwards (sent < delivered < read < failed): events
+-- of a message can arrive out of order and a replayed batch is harmless.
+
+ALTER TABLE conversation_messages
+    ADD COLUMN IF NOT EXISTS status_updated_at timestamptz;
+
+CREATE OR REPLACE FUNCTION message_status_rank(p_status text)
+RETURNS int
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE p_status
+        WHEN 'sent' THEN 1
+        WHEN 'delivered' THEN 2
+        WHEN 'read' THEN 3
+        WHEN 'failed' THEN 4
+        ELSE 0
+    END;
+$$;
+
+-- p_statuses: [{"external_message_id": ..., "status": ..., "status_at": ...}]
+-- Returns the number of messages updated.
+CREATE OR REPLACE FUNCTION apply_message_statuses(p_statuses jsonb)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated int;
+BEGIN
+    UPDATE conversation_messages cm
+    SET status = s.status,
+        status_updated_at = s.status_at,
+        updated_at = now()
+    FROM jsonb_to_recordset(p_statuses)
+        AS s(external_message_id text, status text, status_at timestamptz)
+    WHERE cm.external_message_id = s.external_message_id
+      AND cm.direction = 'outbound'
+      AND message_status_rank(s.status) > message_status_rank(cm.status);
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
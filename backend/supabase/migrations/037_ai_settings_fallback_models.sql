@@ -0,0 +1,6 @@
+-- Per-user LLM fallback chain (app.services.llm_router).
+-- Models tried in order when ai_model exceeds its latency budget, fails, or
+-- has its circuit breaker open. Empty: LLM_FALLBACK_MODELS of the backend.
+
+ALTER TABLE ai_settings
+    ADD COLUMN IF NOT EXISTS ai_fallback_models text[] NOT NULL DEFAULT '{}';
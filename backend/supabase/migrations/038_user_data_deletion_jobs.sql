@@ -0,0 +1,186 @@
+-- Resumable user data deletion.
+-- A deletion request creates a job (one active job per user) that
+-- app.workers.deletion.run_user_deletion processes in bounded chunks
+-- (app/services/user_data_deletion_service.py): Redis cleanup, then pages of
+-- conversations and knowledge documents (storage objects removed in bulk
+-- before their rows), then the account rows. Progress is written to the job
+-- after every chunk; a chunk is re-run as a whole when the job resumes.
+-- Conversations belong to a user through social_accounts.
+
+CREATE TABLE IF NOT EXISTS user_deletion_jobs (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id uuid NOT NULL,  -- no FK: the job outlives the user rows
+    status text NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    phase text,
+    totals jsonb NOT NULL DEFAULT '{}'::jsonb,
+    deleted jsonb NOT NULL DEFAULT '{}'::jsonb,
+    errors jsonb NOT NULL DEFAULT '[]'::jsonb,
+    attempts int NOT NULL DEFAULT 0,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    started_at timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    completed_at timestamptz
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS user_deletion_jobs_active_idx
+    ON user_deletion_jobs (user_id)
+    WHERE status IN ('pending', 'running');
+
+CREATE INDEX IF NOT EXISTS user_deletion_jobs_status_idx
+    ON user_deletion_jobs (status, updated_at);
+
+ALTER TABLE user_deletion_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own deletion jobs" ON user_deletion_jobs;
+CREATE POLICY "Users can view their own deletion jobs"
+    ON user_deletion_jobs FOR SELECT
+    USING (auth.uid() = user_id);
+
+-- Next p_limit conversations of the user with the storage objects of their
+-- messages (bucket 'message').
+CREATE OR REPLACE FUNCTION user_conversations_page(p_user_id uuid, p_limit int DEFAULT 200)
+RETURNS TABLE (conversation_id uuid, media_objects text[])
+LANGUAGE sql
+STABLE
+AS $$
+    WITH page AS (
+        SELECT c.id
+        FROM conversations c
+        JOIN social_accounts sa ON sa.id = c.social_account_id
+        WHERE sa.user_id = p_user_id
+        ORDER BY c.id
+        LIMIT p_limit
+    )
+    SELECT
+        page.id,
+        coalesce(
+            array_agg(m.storage_object_name) FILTER (WHERE m.storage_object_name IS NOT NULL),
+            '{}'
+        )
+    FROM page
+    LEFT JOIN conversation_messages m ON m.conversation_id = page.id
+    GROUP BY page.id;
+$$;
+
+-- Deletes the messages, escalations and rows of conversations of the user.
+-- Returns {"conversation_messages": n, "support_escalations": n, "conversations": n}.
+CREATE OR REPLACE FUNCTION purge_conversations(p_user_id uuid, p_conversation_ids uuid[])
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_ids uuid[];
+    v_messages bigint;
+    v_escalations bigint;
+    v_conversations bigint;
+BEGIN
+    -- Only conversations of this user, whatever the caller passed
+    SELECT coalesce(array_agg(c.id), '{}') INTO v_ids
+    FROM conversations c
+    JOIN social_accounts sa ON sa.id = c.social_account_id
+    WHERE sa.user_id = p_user_id
+      AND c.id = ANY (p_conversation_ids);
+
+    DELETE FROM conversation_messages WHERE conversation_id = ANY (v_ids);
+    GET DIAGNOSTICS v_messages = ROW_COUNT;
+
+    DELETE FROM support_escalations WHERE conversation_id = ANY (v_ids);
+    GET DIAGNOSTICS v_escalations = ROW_COUNT;
+
+    DELETE FROM conversations WHERE id = ANY (v_ids);
+    GET DIAGNOSTICS v_conversations = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'conversation_messages', v_messages,
+        'support_escalations', v_escalations,
+        'conversations', v_conversations
+    );
+END;
+$$;
+
+-- Deletes the chunks and rows of knowledge documents of the user.
+-- Returns {"knowledge_chunks": n, "knowledge_documents": n}.
+CREATE OR REPLACE FUNCTION purge_knowledge_documents(p_user_id uuid, p_document_ids uuid[])
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_ids uuid[];
+    v_chunks bigint;
+    v_documents bigint;
+BEGIN
+    SELECT coalesce(array_agg(id), '{}') INTO v_ids
+    FROM knowledge_documents
+    WHERE user_id = p_user_id
+      AND id = ANY (p_document_ids);
+
+    DELETE FROM knowledge_chunks WHERE document_id = ANY (v_ids);
+    GET DIAGNOSTICS v_chunks = ROW_COUNT;
+
+    DELETE FROM knowledge_documents WHERE id = ANY (v_ids);
+    GET DIAGNOSTICS v_documents = ROW_COUNT;
+
+    RETURN jsonb_build_object('knowledge_chunks', v_chunks, 'knowledge_documents', v_documents);
+END;
+$$;
+
+-- Last phase, once conversations and documents are gone: the remaining rows
+-- keyed by user_id. Returns the row count per table.
+CREATE OR REPLACE FUNCTION purge_user_rows(p_user_id uuid)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_counts jsonb := '{}'::jsonb;
+    v_rows bigint;
+BEGIN
+    DELETE FROM support_escalations WHERE user_id = p_user_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_counts := v_counts || jsonb_build_object('support_escalations', v_rows);
+
+    DELETE FROM social_accounts WHERE user_id = p_user_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_counts := v_counts || jsonb_build_object('social_accounts', v_rows);
+
+    DELETE FROM ai_settings WHERE user_id = p_user_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_counts := v_counts || jsonb_build_object('ai_settings', v_rows);
+
+    DELETE FROM user_preferences WHERE user_id = p_user_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_counts := v_counts || jsonb_build_object('user_preferences', v_rows);
+
+    DELETE FROM users WHERE id = p_user_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_counts := v_counts || jsonb_build_object('users', v_rows);
+
+    RETURN v_counts;
+END;
+$$;
+
+-- Job totals, counted once when the job starts.
+CREATE OR REPLACE FUNCTION user_deletion_totals(p_user_id uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'conversations', (
+            SELECT count(*)
+            FROM conversations c
+            JOIN social_accounts sa ON sa.id = c.social_account_id
+            WHERE sa.user_id = p_user_id
+        ),
+        'knowledge_documents', (
+            SELECT count(*) FROM knowledge_documents WHERE user_id = p_user_id
+        )
+    );
+$$;
+
+-- Service role only (the deletion worker)
+REVOKE EXECUTE ON FUNCTION user_conversations_page(uuid, int) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION purge_conversations(uuid, uuid[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION purge_knowledge_documents(uuid, uuid[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION purge_user_rows(uuid) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION user_deletion_totals(uuid) FROM PUBLIC, anon, authenticated;
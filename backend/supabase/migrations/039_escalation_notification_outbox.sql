@@ -0,0 +1,116 @@
+-- Transactional outbox for escalation notifications.
+-- create_escalation writes the escalation, switches the conversation AI off
+-- and queues its notification in one statement, so the agent's escalation
+-- tool costs a single round trip. app.workers.notifications claims the queued
+-- rows, merges the ones of a same recipient into a digest, sends the emails
+-- and retries failures with backoff (app/services/escalation_notifier.py).
+
+CREATE TABLE IF NOT EXISTS escalation_outbox (
+    id bigserial PRIMARY KEY,
+    escalation_id uuid NOT NULL REFERENCES support_escalations(id) ON DELETE CASCADE,
+    user_id uuid NOT NULL,
+    status text NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts int NOT NULL DEFAULT 0,
+    next_attempt_at timestamptz NOT NULL DEFAULT now(),
+    locked_until timestamptz,
+    last_error text,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    sent_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS escalation_outbox_due_idx
+    ON escalation_outbox (next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+
+-- Retention purge (app.workers.notifications.purge_escalation_outbox)
+CREATE INDEX IF NOT EXISTS escalation_outbox_settled_idx
+    ON escalation_outbox (created_at)
+    WHERE status IN ('sent', 'failed');
+
+-- Worker only (service role)
+ALTER TABLE escalation_outbox ENABLE ROW LEVEL SECURITY;
+
+-- Escalation + AI off + outbox row, in one transaction.
+-- The conversation must belong to the user (through social_accounts);
+-- returns the escalation id, NULL otherwise.
+CREATE OR REPLACE FUNCTION create_escalation(
+    p_user_id uuid,
+    p_conversation_id uuid,
+    p_message text,
+    p_confidence float8,
+    p_reason text
+)
+RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_escalation_id uuid;
+BEGIN
+    UPDATE conversations c
+    SET ai_mode = 'OFF',
+        updated_at = now()
+    FROM social_accounts sa
+    WHERE c.id = p_conversation_id
+      AND sa.id = c.social_account_id
+      AND sa.user_id = p_user_id;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO support_escalations (user_id, conversation_id, message, confidence, reason, notified)
+    VALUES (p_user_id, p_conversation_id, p_message, p_confidence, p_reason, false)
+    RETURNING id INTO v_escalation_id;
+
+    INSERT INTO escalation_outbox (escalation_id, user_id)
+    VALUES (v_escalation_id, p_user_id);
+
+    RETURN v_escalation_id;
+END;
+$$;
+
+-- Claims due outbox rows with their escalation. Rows left in 'sending' by a
+-- worker that died are claimed again once their lease (lease_seconds) ends.
+CREATE OR REPLACE FUNCTION claim_escalation_outbox(
+    claim_limit integer DEFAULT 200,
+    lease_seconds integer DEFAULT 120
+)
+RETURNS TABLE (
+    id bigint,
+    escalation_id uuid,
+    user_id uuid,
+    attempts int,
+    conversation_id uuid,
+    message text,
+    confidence float8,
+    reason text,
+    created_at timestamptz
+)
+LANGUAGE sql
+AS $$
+    WITH claimed AS (
+        UPDATE escalation_outbox o
+        SET status = 'sending',
+            locked_until = now() + make_interval(secs => lease_seconds)
+        WHERE o.id IN (
+            SELECT due.id
+            FROM escalation_outbox due
+            WHERE due.next_attempt_at <= now()
+              AND (due.status = 'pending'
+                   OR (due.status = 'sending' AND due.locked_until < now()))
+            ORDER BY due.next_attempt_at
+            LIMIT claim_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING o.id, o.escalation_id, o.user_id, o.attempts
+    )
+    SELECT claimed.id, claimed.escalation_id, claimed.user_id, claimed.attempts,
+           e.conversation_id, e.message, e.confidence, e.reason, e.created_at
+    FROM claimed
+    JOIN support_escalations e ON e.id = claimed.escalation_id;
+$$;
+
+-- Service role only (agent tool, notification worker)
+REVOKE EXECUTE ON FUNCTION create_escalation(uuid, uuid, text, float8, text) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION claim_escalation_outbox(integer, integer) FROM PUBLIC, anon, authenticated;
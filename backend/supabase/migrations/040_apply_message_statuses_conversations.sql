@@ -0,0 +1,28 @@
+-- apply_message_statuses returns the conversations it touched, so the status
+-- flusher can invalidate their cached message pages (message_history_cache):
+-- the ETag of a page includes the message statuses.
+
+DROP FUNCTION IF EXISTS apply_message_statuses(jsonb);
+
+-- p_statuses: [{"external_message_id": ..., "status": ..., "status_at": ...}]
+-- Returns one row per conversation with messages updated.
+CREATE FUNCTION apply_message_statuses(p_statuses jsonb)
+RETURNS TABLE (conversation_id uuid, updated bigint)
+LANGUAGE sql
+AS $$
+    WITH changed AS (
+        UPDATE conversation_messages cm
+        SET status = s.status,
+            status_updated_at = s.status_at,
+            updated_at = now()
+        FROM jsonb_to_recordset(p_statuses)
+            AS s(external_message_id text, status text, status_at timestamptz)
+        WHERE cm.external_message_id = s.external_message_id
+          AND cm.direction = 'outbound'
+          AND message_status_rank(s.status) > message_status_rank(cm.status)
+        RETURNING cm.conversation_id
+    )
+    SELECT changed.conversation_id, count(*)
+    FROM changed
+    GROUP BY changed.conversation_id;
+$$;
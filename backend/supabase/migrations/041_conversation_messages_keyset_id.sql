@@ -0,0 +1,9 @@
+-- Keyset pagination of a conversation's message history on (created_at, id).
+-- Messages of a batch share their created_at: the id breaks the tie, so a
+-- page boundary never skips or repeats a message. Replaces the index of
+-- migration 029 (the ORDER BY now ends with id).
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_created_at_id
+    ON conversation_messages (conversation_id, created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_messages_conversation_created_at;
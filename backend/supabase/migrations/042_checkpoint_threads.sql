@@ -0,0 +1,246 @@
+-- Candidate threads of checkpoint_lifecycle_batch without aggregating the
+-- checkpoints table. Migration 030 grouped every checkpoint row (and parsed
+-- its JSON ts) on each batch call; checkpoint_threads keeps one row per
+-- thread (last checkpoint time, checkpoint count), maintained by an insert
+-- trigger on checkpoints and by the lifecycle itself, and the batch reads the
+-- idle threads through its last_checkpoint_at index.
+--
+-- The checkpoints table is created by PostgresSaver.setup() at runtime, so the
+-- trigger (and the one-off backfill) are installed by ensure_checkpoint_threads,
+-- called here and at the start of every lifecycle batch.
+
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id text NOT NULL,
+    checkpoint_ns text NOT NULL DEFAULT '',
+    last_checkpoint_at timestamptz NOT NULL,
+    checkpoint_count int NOT NULL DEFAULT 0,
+    PRIMARY KEY (thread_id, checkpoint_ns)
+);
+
+CREATE INDEX IF NOT EXISTS checkpoint_threads_last_checkpoint_at_idx
+    ON checkpoint_threads (last_checkpoint_at);
+
+-- Checkpointer / maintenance connection only
+ALTER TABLE checkpoint_threads ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION track_checkpoint_thread()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO checkpoint_threads (thread_id, checkpoint_ns, last_checkpoint_at, checkpoint_count)
+    VALUES (NEW.thread_id, NEW.checkpoint_ns, now(), 1)
+    ON CONFLICT (thread_id, checkpoint_ns) DO UPDATE
+    SET last_checkpoint_at = now(),
+        checkpoint_count = checkpoint_threads.checkpoint_count + 1;
+    RETURN NULL;
+END;
+$$;
+
+-- Installs the trigger on checkpoints and backfills checkpoint_threads once.
+-- Returns false while the checkpoints table does not exist yet.
+CREATE OR REPLACE FUNCTION ensure_checkpoint_threads()
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF to_regclass('checkpoints') IS NULL THEN
+        RETURN false;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'checkpoints_track_thread'
+          AND tgrelid = to_regclass('checkpoints')
+    ) THEN
+        RETURN true;
+    END IF;
+
+    CREATE TRIGGER checkpoints_track_thread
+        AFTER INSERT ON checkpoints
+        FOR EACH ROW EXECUTE FUNCTION track_checkpoint_thread();
+
+    INSERT INTO checkpoint_threads (thread_id, checkpoint_ns, last_checkpoint_at, checkpoint_count)
+    SELECT thread_id, checkpoint_ns, max((checkpoint->>'ts')::timestamptz), count(*)
+    FROM checkpoints
+    GROUP BY thread_id, checkpoint_ns
+    ON CONFLICT (thread_id, checkpoint_ns) DO UPDATE
+    SET last_checkpoint_at = greatest(checkpoint_threads.last_checkpoint_at, excluded.last_checkpoint_at),
+        checkpoint_count = excluded.checkpoint_count;
+
+    RETURN true;
+END;
+$$;
+
+SELECT ensure_checkpoint_threads();
+
+CREATE OR REPLACE FUNCTION checkpoint_lifecycle_batch(
+    p_keep_latest int DEFAULT 20,
+    p_idle_after interval DEFAULT interval '15 minutes',
+    p_compact_after interval DEFAULT interval '2 days',
+    p_retention interval DEFAULT interval '30 days',
+    p_batch_size int DEFAULT 200
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_selected int := 0;
+    v_expired int := 0;
+    v_compacted int := 0;
+    v_pruned int := 0;
+    v_deleted_checkpoints bigint := 0;
+    v_deleted_writes bigint := 0;
+    v_deleted_blobs bigint := 0;
+    v_rows bigint;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _checkpoint_lifecycle_threads (
+        thread_id text NOT NULL,
+        checkpoint_ns text NOT NULL,
+        action text NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns)
+    ) ON COMMIT DROP;
+    TRUNCATE _checkpoint_lifecycle_threads;
+
+    PERFORM ensure_checkpoint_threads();
+
+    -- Candidates from the per-thread summary, idle threads only (index on
+    -- last_checkpoint_at): the checkpoints table is not aggregated
+    INSERT INTO _checkpoint_lifecycle_threads (thread_id, checkpoint_ns, action)
+    SELECT thread_id, checkpoint_ns, action
+    FROM (
+        SELECT
+            t.thread_id,
+            t.checkpoint_ns,
+            CASE
+                WHEN t.last_checkpoint_at < now() - p_retention THEN 'expire'
+                WHEN t.last_checkpoint_at < now() - p_compact_after AND t.checkpoint_count > 1 THEN 'compact'
+                WHEN t.checkpoint_count > p_keep_latest THEN 'prune'
+            END AS action,
+            t.last_checkpoint_at
+        FROM checkpoint_threads t
+        WHERE t.last_checkpoint_at < now() - p_idle_after
+    ) candidates
+    WHERE action IS NOT NULL
+    ORDER BY last_checkpoint_at
+    LIMIT p_batch_size;
+
+    GET DIAGNOSTICS v_selected = ROW_COUNT;
+    IF v_selected = 0 THEN
+        RETURN jsonb_build_object('selected_threads', 0, 'has_more', false);
+    END IF;
+
+    SELECT
+        count(*) FILTER (WHERE action = 'expire'),
+        count(*) FILTER (WHERE action = 'compact'),
+        count(*) FILTER (WHERE action = 'prune')
+    INTO v_expired, v_compacted, v_pruned
+    FROM _checkpoint_lifecycle_threads;
+
+    -- Expire whole threads
+    DELETE FROM checkpoint_writes w
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND w.thread_id = t.thread_id AND w.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_writes := v_deleted_writes + v_rows;
+
+    DELETE FROM checkpoint_blobs b
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND b.thread_id = t.thread_id AND b.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_blobs := v_deleted_blobs + v_rows;
+
+    DELETE FROM checkpoints c
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_checkpoints := v_deleted_checkpoints + v_rows;
+
+    -- Compact (keep 1) / prune (keep p_keep_latest); checkpoint ids are uuid6,
+    -- so they sort by creation time
+    WITH ranked AS (
+        SELECT
+            c.thread_id,
+            c.checkpoint_ns,
+            c.checkpoint_id,
+            row_number() OVER (
+                PARTITION BY c.thread_id, c.checkpoint_ns
+                ORDER BY c.checkpoint_id DESC
+            ) AS rn,
+            CASE t.action WHEN 'compact' THEN 1 ELSE p_keep_latest END AS keep
+        FROM checkpoints c
+        JOIN _checkpoint_lifecycle_threads t
+          ON c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns
+        WHERE t.action IN ('compact', 'prune')
+    )
+    DELETE FROM checkpoints c
+    USING ranked r
+    WHERE r.rn > r.keep
+      AND c.thread_id = r.thread_id
+      AND c.checkpoint_ns = r.checkpoint_ns
+      AND c.checkpoint_id = r.checkpoint_id;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_checkpoints := v_deleted_checkpoints + v_rows;
+
+    DELETE FROM checkpoint_writes w
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action IN ('compact', 'prune')
+      AND w.thread_id = t.thread_id AND w.checkpoint_ns = t.checkpoint_ns
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = w.thread_id
+            AND c.checkpoint_ns = w.checkpoint_ns
+            AND c.checkpoint_id = w.checkpoint_id
+      );
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_writes := v_deleted_writes + v_rows;
+
+    DELETE FROM checkpoint_blobs b
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action IN ('compact', 'prune')
+      AND b.thread_id = t.thread_id AND b.checkpoint_ns = t.checkpoint_ns
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = b.thread_id
+            AND c.checkpoint_ns = b.checkpoint_ns
+            AND c.checkpoint->'channel_versions'->>b.channel = b.version
+      );
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    v_deleted_blobs := v_deleted_blobs + v_rows;
+
+    UPDATE checkpoints c
+    SET metadata = c.metadata || jsonb_build_object('compacted', true, 'compacted_at', now())
+    FROM _checkpoint_lifecycle_threads t
+    WHERE t.action = 'compact'
+      AND c.thread_id = t.thread_id AND c.checkpoint_ns = t.checkpoint_ns;
+
+    -- Keep the summary in line (the trigger only counts inserts)
+    DELETE FROM checkpoint_threads s
+    USING _checkpoint_lifecycle_threads t
+    WHERE t.action = 'expire'
+      AND s.thread_id = t.thread_id AND s.checkpoint_ns = t.checkpoint_ns;
+
+    UPDATE checkpoint_threads s
+    SET checkpoint_count = (
+        SELECT count(*) FROM checkpoints c
+        WHERE c.thread_id = s.thread_id AND c.checkpoint_ns = s.checkpoint_ns
+    )
+    FROM _checkpoint_lifecycle_threads t
+    WHERE t.action IN ('compact', 'prune')
+      AND s.thread_id = t.thread_id AND s.checkpoint_ns = t.checkpoint_ns;
+
+    RETURN jsonb_build_object(
+        'selected_threads', v_selected,
+        'expired_threads', v_expired,
+        'compacted_threads', v_compacted,
+        'pruned_threads', v_pruned,
+        'deleted_checkpoints', v_deleted_checkpoints,
+        'deleted_writes', v_deleted_writes,
+        'deleted_blobs', v_deleted_blobs,
+        'has_more', v_selected = p_batch_size
+    );
+END;
+$$;
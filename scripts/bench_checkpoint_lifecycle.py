@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Checkpoint Lifecycle Benchmark
+
+Seeds a synthetic LangGraph checkpoint dataset (default 1M checkpoints spread
+over 10k threads, last activity between 0 and 60 days ago), then reports table
+size and latest-checkpoint read latency before and after a full
+checkpoint_lifecycle_batch run.
+
+WARNING: the lifecycle function is global; run this against a local or staging
+database, never production.
+
+Usage:
+    python scripts/bench_checkpoint_lifecycle.py [--threads 10000] [--per-thread 100]
+
+Environment Variables Required:
+    SUPABASE_DB_HOST, SUPABASE_DB_PORT, SUPABASE_DB_NAME,
+    SUPABASE_DB_USER, SUPABASE_DB_PASSWORD
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.deps.runtime_prod import (  # noqa: E402
+    close_postgres_checkpointer,
+    get_checkpointer_pool,
+    get_postgres_checkpointer,
+)
+
+THREAD_PREFIX = "bench-lifecycle-"
+
+SEED_SQL = """
+INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata)
+SELECT
+    %(prefix)s || t,
+    '',
+    format('00000000-0000-6000-8000-%%s', lpad(s::text, 12, '0')),
+    CASE WHEN s > 1 THEN format('00000000-0000-6000-8000-%%s', lpad((s - 1)::text, 12, '0')) END,
+    NULL,
+    jsonb_build_object(
+        'v', 1,
+        'id', format('00000000-0000-6000-8000-%%s', lpad(s::text, 12, '0')),
+        'ts', now() - make_interval(days => t %% 60) - make_interval(secs => %(per_thread)s - s),
+        'channel_values', '{}'::jsonb,
+        'channel_versions', '{}'::jsonb,
+        'versions_seen', '{}'::jsonb,
+        'pending_sends', '[]'::jsonb
+    ),
+    jsonb_build_object('source', 'loop', 'step', s)
+FROM generate_series(1, %(threads)s) AS t, generate_series(1, %(per_thread)s) AS s
+"""
+
+
+def stats(conn) -> dict:
+    return next(iter(conn.execute("SELECT checkpoint_storage_stats()").fetchone().values()))
+
+
+def read_latency_ms(checkpointer, threads: int, samples: int = 500) -> tuple:
+    latencies = []
+    for _ in range(samples):
+        thread_id = f"{THREAD_PREFIX}{random.randint(1, threads)}"
+        start = time.perf_counter()
+        checkpointer.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=10000)
+    parser.add_argument("--per-thread", type=int, default=100)
+    args = parser.parse_args()
+
+    checkpointer = get_postgres_checkpointer()
+    pool = get_checkpointer_pool()
+
+    try:
+        with pool.connection() as conn:
+            print(f"Seeding {args.threads * args.per_thread} checkpoints...")
+            conn.execute(
+                SEED_SQL,
+                {"prefix": THREAD_PREFIX, "threads": args.threads, "per_thread": args.per_thread},
+            )
+            conn.execute("ANALYZE checkpoints")
+
+            before = stats(conn)
+            p50, p95 = read_latency_ms(checkpointer, args.threads)
+            print(f"before: {before} read p50={p50:.2f}ms p95={p95:.2f}ms")
+
+            start = time.perf_counter()
+            batches = 0
+            while True:
+                result = next(iter(conn.execute(
+                    "SELECT checkpoint_lifecycle_batch()"
+                ).fetchone().values()))
+                batches += 1
+                if not result.get("has_more"):
+                    break
+            elapsed = time.perf_counter() - start
+            conn.execute("VACUUM ANALYZE checkpoints")
+
+            after = stats(conn)
+            p50, p95 = read_latency_ms(checkpointer, args.threads)
+            print(f"after:  {after} read p50={p50:.2f}ms p95={p95:.2f}ms")
+            print(f"lifecycle: {batches} batches in {elapsed:.1f}s")
+
+            conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id LIKE %s", (f"{THREAD_PREFIX}%",)
+            )
+    finally:
+        close_postgres_checkpointer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Checkpointer Benchmark
+
+Measures LangGraph Postgres checkpoint put/get throughput through the pooled
+checkpointer with 1, 8 and 64 concurrent conversations (one thread each).
+
+Usage:
+    python scripts/bench_checkpointer.py [--ops 50] [--concurrency 1 8 64]
+
+Environment Variables Required:
+    SUPABASE_DB_HOST, SUPABASE_DB_PORT, SUPABASE_DB_NAME,
+    SUPABASE_DB_USER, SUPABASE_DB_PASSWORD
+    CHECKPOINTER_POOL_MAX_SIZE (optional, default 10)
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from langgraph.checkpoint.base import empty_checkpoint  # noqa: E402
+
+from app.deps.runtime_prod import (  # noqa: E402
+    close_postgres_checkpointer,
+    get_checkpointer_pool_stats,
+    get_postgres_checkpointer,
+)
+
+
+def run_conversation(checkpointer, thread_id: str, ops: int) -> list:
+    """Alternate put/get on one thread, return per-op latencies (seconds)"""
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    latencies = []
+    for step in range(ops):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": [f"message {step}"]}
+
+        start = time.perf_counter()
+        config = checkpointer.put(config, checkpoint, {"source": "loop", "step": step}, {})
+        checkpointer.get_tuple(config)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def cleanup(checkpointer, thread_ids: list) -> None:
+    for thread_id in thread_ids:
+        checkpointer.delete_thread(thread_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=50, help="put+get per conversation")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    checkpointer = get_postgres_checkpointer()
+    print(f"{'conv':>6} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+
+    try:
+        for concurrency in args.concurrency:
+            thread_ids = [f"bench-{uuid.uuid4()}" for _ in range(concurrency)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(
+                    executor.map(
+                        lambda tid: run_conversation(checkpointer, tid, args.ops),
+                        thread_ids,
+                    )
+                )
+            elapsed = time.perf_counter() - start
+
+            latencies = sorted(lat for result in results for lat in result)
+            p50 = statistics.median(latencies) * 1000
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            # Each op is one put and one get
+            throughput = 2 * len(latencies) / elapsed
+            print(f"{concurrency:>6} {throughput:>10.1f} {p50:>10.1f} {p95:>10.1f}")
+
+            cleanup(checkpointer, thread_ids)
+
+        print(f"pool: {get_checkpointer_pool_stats()}")
+    finally:
+        close_postgres_checkpointer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Scheduled Posts Claim Benchmark
+
+Claim of a backlog of due scheduled posts (default 10k), former per-post
+claim vs the claim_due_scheduled_posts RPC (migration 027).
+
+Needs a disposable local Supabase with migration 027 applied: every queued
+post due is claimed, not only the bench ones. The bench seeds a
+throwaway user, social account and --posts queued posts due now, then:
+- legacy: the former enqueue_due_posts claim, one SELECT of the due posts
+  then one conditional UPDATE (status queued -> publishing) per post
+- new: claim_due_scheduled_posts in batches of --claim-batch, as
+  enqueue_due_posts does
+- concurrent: --workers schedulers calling the RPC at the same time; checks
+  that every post is claimed exactly once (SKIP LOCKED)
+Posts are set back to queued between runs; nothing is enqueued to Celery.
+The tenant is deleted at the end.
+
+Usage:
+    python scripts/bench_claim_due_posts.py [--posts 10000] [--claim-batch 500]
+        [--workers 4] [--skip-legacy]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.session import get_db  # noqa: E402
+
+PLATFORM = "whatsapp"
+INSERT_BATCH = 1000
+
+
+def seed_tenant(db, posts: int) -> Dict[str, Any]:
+    email = f"bench-claim-{uuid.uuid4().hex[:8]}@example.com"
+    user = db.auth.admin.create_user({"email": email, "password": uuid.uuid4().hex, "email_confirm": True})
+    user_id = user.user.id
+    db.table("users").upsert({"id": user_id, "email": email}).execute()
+    account = db.table("social_accounts").insert({
+        "user_id": user_id,
+        "platform": PLATFORM,
+        "account_id": f"bench{uuid.uuid4().hex[:10]}",
+        "username": "bench",
+    }).execute().data[0]
+
+    # Due over the last hour, so the claim order (publish_at) is meaningful
+    now = datetime.now(timezone.utc)
+    post_ids: List[str] = []
+    for start in range(0, posts, INSERT_BATCH):
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "channel_id": account["id"],
+                "platform": PLATFORM,
+                "content_json": {"text": f"bench post {start + i}"},
+                "publish_at": (now - timedelta(seconds=(start + i) % 3600)).isoformat(),
+                "status": "queued",
+                "retry_count": 0,
+            }
+            for i in range(min(INSERT_BATCH, posts - start))
+        ]
+        db.table("scheduled_posts").insert(rows).execute()
+        post_ids.extend(row["id"] for row in rows)
+    return {"user_id": user_id, "post_ids": post_ids}
+
+
+def requeue(db, post_ids: List[str]) -> None:
+    for start in range(0, len(post_ids), INSERT_BATCH):
+        db.table("scheduled_posts").update({"status": "queued"}).in_(
+            "id", post_ids[start:start + INSERT_BATCH]
+        ).execute()
+
+
+def legacy_claim(db) -> Dict[str, Any]:
+    """Former enqueue_due_posts: SELECT, then one conditional UPDATE per post"""
+    now = datetime.now(timezone.utc)
+    round_trips = 1
+    due = (
+        db.table("scheduled_posts")
+        .select("id, platform")
+        .eq("status", "queued")
+        .lte("publish_at", now.isoformat())
+        .execute()
+    ).data or []
+    claimed = 0
+    for post in due:
+        result = (
+            db.table("scheduled_posts")
+            .update({"status": "publishing", "updated_at": now.isoformat()})
+            .eq("id", post["id"])
+            .eq("status", "queued")
+            .execute()
+        )
+        round_trips += 1
+        claimed += bool(result.data)
+    return {"claimed": claimed, "round_trips": round_trips}
+
+
+def rpc_claim(db, claim_batch: int) -> List[str]:
+    """enqueue_due_posts loop: RPC batches until a short batch"""
+    claimed: List[str] = []
+    while True:
+        batch = db.rpc(
+            "claim_due_scheduled_posts", {"claim_limit": claim_batch, "lead_seconds": 0}
+        ).execute().data or []
+        claimed.extend(row["id"] for row in batch)
+        if len(batch) < claim_batch:
+            return claimed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--claim-batch", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--skip-legacy", action="store_true", help="The legacy claim makes one request per post")
+    args = parser.parse_args()
+
+    db = get_db()
+    print(f"Seeding {args.posts} due posts ...")
+    tenant = seed_tenant(db, args.posts)
+    post_ids = tenant["post_ids"]
+
+    try:
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            legacy = legacy_claim(db)
+            elapsed = time.perf_counter() - start
+            # PostgREST caps the SELECT (max rows): the rest waits for the next beat
+            print(
+                f"legacy   {legacy['claimed']}/{args.posts} posts claimed in {elapsed:.2f}s, "
+                f"{legacy['round_trips']} round trips ({legacy['claimed'] / max(elapsed, 1e-6):.0f} posts/s)"
+            )
+            requeue(db, post_ids)
+
+        start = time.perf_counter()
+        claimed = rpc_claim(db, args.claim_batch)
+        elapsed = time.perf_counter() - start
+        round_trips = len(claimed) // args.claim_batch + 1
+        print(
+            f"new      {len(claimed)}/{args.posts} posts claimed in {elapsed:.2f}s, "
+            f"{round_trips} round trips ({len(claimed) / max(elapsed, 1e-6):.0f} posts/s)"
+        )
+        requeue(db, post_ids)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(lambda _: rpc_claim(get_db(), args.claim_batch), range(args.workers)))
+        elapsed = time.perf_counter() - start
+        counts = Counter(post_id for result in results for post_id in result)
+        duplicates = sum(1 for count in counts.values() if count > 1)
+        print(
+            f"new x{args.workers} {len(counts)}/{args.posts} posts claimed in {elapsed:.2f}s, "
+            f"per worker {[len(result) for result in results]}, {duplicates} claimed twice"
+        )
+    finally:
+        db.table("scheduled_posts").delete().eq("user_id", tenant["user_id"]).execute()
+        db.table("social_accounts").delete().eq("user_id", tenant["user_id"]).execute()
+        db.auth.admin.delete_user(tenant["user_id"])
+
+
+if __name__ == "__main__":
+    main()
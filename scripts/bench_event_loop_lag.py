@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Event Loop Lag Benchmark (sync vs async Supabase client)
+
+Simulates N concurrent webhooks on one event loop. Each webhook runs the
+queries of the hot path (credentials lookup, conversation lookup, message
+insert + delete) either with the sync client of get_db() (former path) or
+through the async repositories of app/db/repositories.py.
+
+A monitor coroutine sleeps 10 ms in a loop; the overshoot of each sleep is
+the event-loop lag every other request would have suffered.
+
+Reports: event-loop lag p50/p95/p99/max, webhook latency p50/p95, total time.
+
+Usage:
+    python scripts/bench_event_loop_lag.py --mode sync|async \\
+        --platform instagram --account-id <id> --customer-id <id> [--concurrency 50] [--rounds 5]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.repositories import (  # noqa: E402
+    conversation_messages_repo,
+    conversations_repo,
+    social_accounts_repo,
+)
+from app.db.session import get_db  # noqa: E402
+
+MONITOR_INTERVAL = 0.01
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[max(0, int(len(values) * pct) - 1)] if values else 0.0
+
+
+def message_payload(conversation_id: str, i: int) -> dict:
+    return {
+        "conversation_id": conversation_id,
+        "direction": "inbound",
+        "content": f"bench event loop lag {i}",
+        "message_type": "text",
+        "metadata": {"bench": True},
+    }
+
+
+async def webhook_sync(args, i: int):
+    """Former path: sync client called directly from the coroutine"""
+    db = get_db()
+    account = (
+        db.table("social_accounts").select("*")
+        .eq("platform", args.platform).eq("account_id", args.account_id)
+        .eq("is_active", True).limit(1).execute()
+    ).data[0]
+    conversation = (
+        db.table("conversations").select("id")
+        .eq("social_account_id", account["id"])
+        .eq("customer_identifier", args.customer_id)
+        .order("created_at", desc=True).limit(1).execute()
+    ).data[0]
+    row = db.table("conversation_messages").insert(
+        message_payload(conversation["id"], i)
+    ).execute().data[0]
+    db.table("conversation_messages").delete().eq("id", row["id"]).execute()
+
+
+async def webhook_async(args, i: int):
+    account = await social_accounts_repo.get_active_by_platform_account(
+        args.platform, args.account_id
+    )
+    conversation_id = await conversations_repo.find_latest_id(
+        account["id"], args.customer_id
+    )
+    row = await conversation_messages_repo.insert(message_payload(conversation_id, i))
+    await conversation_messages_repo.delete(row["id"])
+
+
+async def monitor(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(MONITOR_INTERVAL)
+        lags.append((time.perf_counter() - start - MONITOR_INTERVAL) * 1000)
+
+
+async def run(args):
+    webhook = webhook_sync if args.mode == "sync" else webhook_async
+    # Warm-up: client creation and connection setup are not measured
+    await webhook(args, -1)
+
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    monitor_task = asyncio.create_task(monitor(lags, stop))
+
+    async def timed(i):
+        start = time.perf_counter()
+        await webhook(args, i)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for r in range(args.rounds):
+        await asyncio.gather(
+            *(timed(r * args.concurrency + i) for i in range(args.concurrency))
+        )
+    total = time.perf_counter() - start
+    stop.set()
+    await monitor_task
+
+    print(f"mode={args.mode} concurrency={args.concurrency} rounds={args.rounds}")
+    print(
+        f"event loop lag: p50={statistics.median(lags):.1f}ms "
+        f"p95={percentile(lags, 0.95):.1f}ms p99={percentile(lags, 0.99):.1f}ms "
+        f"max={max(lags):.1f}ms ({len(lags)} samples)"
+    )
+    print(
+        f"webhook latency: p50={statistics.median(latencies):.0f}ms "
+        f"p95={percentile(latencies, 0.95):.0f}ms"
+    )
+    print(f"total: {total:.2f}s ({len(latencies) / total:.1f} webhooks/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], required=True)
+    parser.add_argument("--platform", default="instagram")
+    parser.add_argument("--account-id", required=True)
+    parser.add_argument("--customer-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Inbox Latency Benchmark
+
+Latency of one inbox page at 50 and 500 conversations, former 2N+1 queries
+vs ConversationService.get_user_conversations (migration 028: a single
+keyset-paginated query on the denormalized inbox columns).
+
+Needs a local Supabase with migration 028 applied. The bench seeds a
+throwaway user with one social account and --conversations conversations
+(--messages-per-conversation messages each, inbound and outbound
+alternating; the inbox columns are filled by the migration 028 trigger),
+then for each page size:
+- legacy: the former get_user_conversations: conversations query, then per
+  conversation one last-message query and one last-inbound query
+- new: get_user_conversations(user_id, limit=page size)
+and reports p50/p95 over --runs runs and the round trips per page. The
+tenant is deleted at the end.
+
+Usage:
+    python scripts/bench_inbox_latency.py [--conversations 500]
+        [--messages-per-conversation 4] [--page-sizes 50,500] [--runs 20]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.session import get_db  # noqa: E402
+from app.services.conversation_service import ConversationService  # noqa: E402
+
+PLATFORM = "instagram"
+INSERT_BATCH = 1000
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def seed_tenant(db, conversations: int, messages_per_conversation: int) -> Dict[str, Any]:
+    email = f"bench-inbox-{uuid.uuid4().hex[:8]}@example.com"
+    user = db.auth.admin.create_user({"email": email, "password": uuid.uuid4().hex, "email_confirm": True})
+    user_id = user.user.id
+    db.table("users").upsert({"id": user_id, "email": email}).execute()
+    account = db.table("social_accounts").insert({
+        "user_id": user_id,
+        "platform": PLATFORM,
+        "account_id": f"bench{uuid.uuid4().hex[:10]}",
+        "username": "bench",
+    }).execute().data[0]
+
+    rows = [
+        {"id": str(uuid.uuid4()), "social_account_id": account["id"], "customer_identifier": f"c{i}"}
+        for i in range(conversations)
+    ]
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.table("conversations").insert(rows[start:start + INSERT_BATCH]).execute()
+
+    messages = [
+        {
+            "conversation_id": row["id"],
+            "external_message_id": f"bench-{uuid.uuid4().hex}",
+            "direction": "inbound" if m % 2 == 0 else "outbound",
+            "content": f"message {m} of {row['customer_identifier']}",
+            "message_type": "text",
+        }
+        for m in range(messages_per_conversation)
+        for row in rows
+    ]
+    for start in range(0, len(messages), INSERT_BATCH):
+        db.table("conversation_messages").insert(messages[start:start + INSERT_BATCH]).execute()
+    return {"user_id": user_id, "conversation_ids": [row["id"] for row in rows]}
+
+
+def legacy_inbox(db, user_id: str, limit: int) -> int:
+    """Former get_user_conversations; returns the number of round trips"""
+    rows = (
+        db.table("conversations")
+        .select("id, last_message_at, social_accounts: social_account_id (id, platform, user_id)")
+        .eq("social_accounts.user_id", user_id)
+        .order("last_message_at", desc=True)
+        .limit(limit * 2)
+        .execute()
+    ).data or []
+    round_trips = 1
+    for row in rows:
+        db.table("conversation_messages").select("content, message_type, direction").eq(
+            "conversation_id", row["id"]
+        ).order("created_at", desc=True).limit(1).execute()
+        db.table("conversation_messages").select("created_at, content").eq(
+            "conversation_id", row["id"]
+        ).eq("direction", "inbound").order("created_at", desc=True).limit(1).execute()
+        round_trips += 2
+    return round_trips
+
+
+def measure(run: Callable[[], Any], runs: int) -> List[float]:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--messages-per-conversation", type=int, default=4)
+    parser.add_argument("--page-sizes", default="50,500")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    db = get_db()
+    print(f"Seeding {args.conversations} conversations ...")
+    tenant = seed_tenant(db, args.conversations, args.messages_per_conversation)
+    user_id = tenant["user_id"]
+    service = ConversationService(db)
+
+    try:
+        for page_size in (int(size) for size in args.page_sizes.split(",")):
+            round_trips = legacy_inbox(db, user_id, page_size)
+            legacy = measure(lambda: legacy_inbox(db, user_id, page_size), args.runs)
+            new = measure(lambda: service.get_user_conversations(user_id, limit=page_size), args.runs)
+            print(
+                f"page {page_size:>4}  legacy p50 {statistics.median(legacy):8.1f}ms "
+                f"p95 {percentile(legacy, 0.95):8.1f}ms ({round_trips} round trips)  "
+                f"new p50 {statistics.median(new):6.1f}ms p95 {percentile(new, 0.95):6.1f}ms (1 round trip)"
+            )
+    finally:
+        ids = tenant["conversation_ids"]
+        for start in range(0, len(ids), 200):
+            batch = ids[start:start + 200]
+            db.table("conversation_messages").delete().in_("conversation_id", batch).execute()
+            db.table("conversations").delete().in_("id", batch).execute()
+        db.table("social_accounts").delete().eq("user_id", user_id).execute()
+        db.auth.admin.delete_user(user_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Instagram Post Import Benchmark
+
+Imports 50 / 500 / 5,000-post fixtures served by a local fake Graph API
+(httpx.MockTransport, /{ig_user_id}/media with cursor pagination and a fixed
+per-request latency) into monitored_posts, with:
+- legacy: one upsert per post, one update per auto-monitored post
+- bulk:   MonitoringService.sync_instagram_posts (streamed pages, batched
+          upserts, one auto-monitoring update, cursor checkpoints)
+
+Reports import time, Graph API requests and posts imported/monitored.
+Fixture posts (platform_post_id 'bench_...') are deleted after each run.
+
+Usage:
+    python scripts/bench_instagram_import.py --user-id <uuid> --social-account-id <uuid> \\
+        [--sizes 50,500,5000] [--graph-latency-ms 150] [--skip-legacy-above 500]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+    (the social account must be an Instagram account with a token and account_id;
+    the token is never sent to Meta)
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.session import get_db  # noqa: E402
+from app.services import instagram_connector  # noqa: E402
+from app.services.instagram_service import InstagramService  # noqa: E402
+from app.services.monitoring_service import MonitoringService  # noqa: E402
+
+
+class FakeGraphAPI:
+    """Serves /{ig_user_id}/media pages of a fixture, most recent first"""
+
+    def __init__(self, size: int, latency_ms: float):
+        prefix = f"bench_{uuid.uuid4().hex[:8]}"
+        now = datetime.now(timezone.utc)
+        self.media = [
+            {
+                "id": f"{prefix}_{i}",
+                "caption": f"Bench post {i}",
+                "media_type": "IMAGE",
+                "media_url": f"https://example.com/{prefix}_{i}.jpg",
+                "timestamp": (now - timedelta(hours=i)).isoformat(),
+            }
+            for i in range(size)
+        ]
+        self.latency = latency_ms / 1000
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        limit = int(request.url.params.get("limit", 25))
+        offset = int(request.url.params.get("after", 0))
+        page = self.media[offset:offset + limit]
+        end = offset + len(page)
+        paging = {"cursors": {"before": str(offset), "after": str(end)}}
+        if end < len(self.media):
+            paging["next"] = f"{request.url}&after={end}"
+        return httpx.Response(200, json={"data": page, "paging": paging})
+
+
+def install_fake_graph_api(fake: FakeGraphAPI):
+    """Route every InstagramService built by the connector to the fake API"""
+
+    def service_factory(access_token, page_id):
+        service = InstagramService(access_token, page_id)
+        service.client = httpx.AsyncClient(
+            base_url=service.api_url, transport=httpx.MockTransport(fake.handler)
+        )
+        return service
+
+    instagram_connector.InstagramService = service_factory
+
+
+async def legacy_import(service: MonitoringService, social_account_id: str, fake: FakeGraphAPI):
+    """Former path: one upsert per post, enable_monitoring per post"""
+    connector = instagram_connector.InstagramConnector("bench", "bench")
+    imported = 0
+    async for page, _ in connector.iter_user_media(max_items=len(fake.media)):
+        for media in page:
+            result = service.supabase.table("monitored_posts") \
+                .upsert(service._imported_post_row(social_account_id, media),
+                        on_conflict="user_id,platform_post_id") \
+                .execute()
+            if result.data:
+                imported += 1
+
+    rules = await service.get_rules(social_account_id)
+    posts = service.supabase.table("monitored_posts") \
+        .select("id") \
+        .eq("user_id", service.user_id) \
+        .eq("social_account_id", social_account_id) \
+        .eq("monitoring_enabled", False) \
+        .order("posted_at", desc=True) \
+        .limit(rules.auto_monitor_count) \
+        .execute()
+    for post in posts.data or []:
+        await service.enable_monitoring(post["id"], rules.monitoring_duration_days)
+    return imported, len(posts.data or [])
+
+
+async def bulk_import(service: MonitoringService, social_account_id: str, fake: FakeGraphAPI):
+    result = await service.sync_instagram_posts(social_account_id, limit=len(fake.media))
+    return result["posts_imported"], result["posts_monitored"]
+
+
+def cleanup(db, user_id: str, fake: FakeGraphAPI):
+    prefix = fake.media[0]["id"].rsplit("_", 1)[0] if fake.media else None
+    if prefix:
+        db.table("monitored_posts").delete() \
+            .eq("user_id", user_id) \
+            .like("platform_post_id", f"{prefix}_%") \
+            .execute()
+
+
+async def run(args):
+    db = get_db()
+    service = MonitoringService(db, args.user_id)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"{'size':>6s} {'path':8s} {'time':>9s} {'graph req':>10s} {'imported':>9s} {'monitored':>10s}")
+    for size in sizes:
+        for label, fn in (("legacy", legacy_import), ("bulk", bulk_import)):
+            if label == "legacy" and size > args.skip_legacy_above:
+                print(f"{size:6d} {label:8s} {'skipped':>9s}")
+                continue
+            fake = FakeGraphAPI(size, args.graph_latency_ms)
+            install_fake_graph_api(fake)
+            start = time.perf_counter()
+            try:
+                imported, monitored = await fn(service, args.social_account_id, fake)
+            finally:
+                elapsed = time.perf_counter() - start
+                cleanup(db, args.user_id, fake)
+            print(
+                f"{size:6d} {label:8s} {elapsed:8.2f}s {fake.requests:10d} "
+                f"{imported:9d} {monitored:10d}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--social-account-id", required=True)
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--graph-latency-ms", type=float, default=150)
+    parser.add_argument("--skip-legacy-above", type=int, default=500,
+                        help="The legacy path does one round trip per post")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - LLM Router Tail Latency Benchmark
+
+Sends N agent-turn LLM calls, C at a time, to a fake provider with injected
+latency spikes and errors, through:
+- legacy: the former RAGAgent._call_llm loop (same model, 3 attempts,
+          2 s / 4 s sleeps between failures)
+- router: LLMRouter (latency budget, hedging, circuit breakers, fallback
+          chain)
+
+The primary model degrades during an incident window (a share of its calls
+take spike_ms, some fail); the fallback models stay healthy. A call counts as
+dropped past the 30 s BatchScanner timeout. Reports latency p50/p95/p99/max,
+dropped calls, provider calls per request (cost of hedging) and which model
+answered.
+
+No network: the provider is a sleep. --time-scale shrinks every latency,
+budget and timeout (0.1: a 20 s spike lasts 2 s) to keep runs short; the
+reported latencies are scaled back to real seconds.
+
+Usage:
+    python scripts/bench_llm_router.py [--requests 2000] [--concurrency 50]
+        [--time-scale 0.1] [--spike-share 0.15] [--spike-ms 20000]
+        [--error-share 0.05] [--incident 0.3:0.7] [--budget-s 8]
+
+Environment Variables Required:
+    None
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.services.llm_router import CircuitBreakers, LLMRouter, LLMUnavailableError  # noqa: E402
+
+PRIMARY = "x-ai/grok-4-fast"
+FALLBACKS = ["openai/gpt-4o-mini", "google/gemini-2.5-flash"]
+BATCH_TIMEOUT_S = 30.0
+
+
+class ProviderError(Exception):
+    pass
+
+
+@dataclass
+class ModelProfile:
+    base_ms: float
+    jitter_ms: float
+
+
+class FakeProvider:
+    """Per-model latency; the primary degrades during the incident window"""
+
+    def __init__(self, time_scale: float, spike_share: float, spike_ms: float,
+                 error_share: float, incident: Tuple[float, float], duration_s: float):
+        self.time_scale = time_scale
+        self.spike_share = spike_share
+        self.spike_ms = spike_ms
+        self.error_share = error_share
+        self.incident = incident
+        self.duration_s = duration_s
+        self.profiles: Dict[str, ModelProfile] = {
+            PRIMARY: ModelProfile(1500, 800),
+            "openai/gpt-4o-mini": ModelProfile(2000, 1000),
+            "google/gemini-2.5-flash": ModelProfile(1200, 600),
+        }
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def in_incident(self) -> bool:
+        progress = (time.perf_counter() - self._started) / max(self.duration_s, 1e-6)
+        return self.incident[0] <= progress <= self.incident[1]
+
+    def call(self, model: str) -> str:
+        with self._lock:
+            self.calls[model] += 1
+        profile = self.profiles[model]
+        latency_ms = profile.base_ms + random.uniform(0, profile.jitter_ms)
+        failing = False
+        if model == PRIMARY and self.in_incident():
+            roll = random.random()
+            if roll < self.spike_share:
+                latency_ms = self.spike_ms
+            elif roll < self.spike_share + self.error_share:
+                latency_ms = random.uniform(200, 1500)
+                failing = True
+        time.sleep(latency_ms / 1000 * self.time_scale)
+        if failing:
+            raise ProviderError(f"{model}: 502 from upstream provider")
+        return model
+
+
+def legacy_call(provider: FakeProvider, time_scale: float) -> Tuple[Optional[str], int]:
+    """Former _call_llm: same model, 3 attempts, 2 s * 2^attempt sleeps"""
+    for attempt in range(3):
+        try:
+            return provider.call(PRIMARY), attempt + 1
+        except ProviderError:
+            if attempt < 2:
+                time.sleep(2 * (2 ** attempt) * time_scale)
+    return None, 3
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def run(mode: str, args) -> Dict[str, object]:
+    scale = args.time_scale
+    # Duration estimate: requests / concurrency * ~2 s per call
+    duration_s = args.requests / args.concurrency * 2.0 * scale
+    provider = FakeProvider(
+        scale, args.spike_share, args.spike_ms, args.error_share, args.incident, duration_s
+    )
+    router = LLMRouter(
+        breakers=CircuitBreakers(args.breaker_failures, args.breaker_cooldown_s * scale),
+        deadline_seconds=args.deadline_s * scale,
+        max_in_flight=2,
+        max_attempts=3,
+        budget=lambda model: args.budget_s * scale,
+        threads=args.concurrency * 3,
+    )
+    chain = [PRIMARY, *FALLBACKS]
+    latencies: List[float] = []
+    answered_by: Counter = Counter()
+    dropped = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal dropped
+        start = time.perf_counter()
+        model: Optional[str] = None
+        try:
+            if mode == "legacy":
+                model, _ = legacy_call(provider, scale)
+            else:
+                model, _ = router.invoke(chain, provider.call, purpose="bench")
+        except LLMUnavailableError:
+            model = None
+        elapsed = (time.perf_counter() - start) / scale
+        with lock:
+            if model is None or elapsed > BATCH_TIMEOUT_S:
+                dropped += 1
+            else:
+                latencies.append(elapsed)
+                answered_by[model] += 1
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(one, range(args.requests)))
+
+    return {
+        "mode": mode,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies) if latencies else 0.0,
+        "dropped": dropped,
+        "calls_per_request": sum(provider.calls.values()) / args.requests,
+        "answered_by": dict(answered_by),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--time-scale", type=float, default=0.1)
+    parser.add_argument("--spike-share", type=float, default=0.15, help="Share of primary calls spiking during the incident")
+    parser.add_argument("--spike-ms", type=float, default=20000.0)
+    parser.add_argument("--error-share", type=float, default=0.05, help="Share of primary calls failing during the incident")
+    parser.add_argument("--incident", default="0.3:0.7", help="Incident window, as fractions of the run")
+    parser.add_argument("--budget-s", type=float, default=8.0)
+    parser.add_argument("--deadline-s", type=float, default=25.0)
+    parser.add_argument("--breaker-failures", type=int, default=5)
+    parser.add_argument("--breaker-cooldown-s", type=float, default=30.0)
+    args = parser.parse_args()
+    start, end = (float(x) for x in args.incident.split(":"))
+    args.incident = (start, end)
+
+    print(
+        f"{args.requests} calls, concurrency {args.concurrency}, primary {PRIMARY}: "
+        f"{args.spike_share:.0%} spikes of {args.spike_ms / 1000:.0f}s and "
+        f"{args.error_share:.0%} errors during the incident ({start:.0%}-{end:.0%} of the run)"
+    )
+    print(f"{'mode':8s} {'p50':>7s} {'p95':>7s} {'p99':>7s} {'max':>7s} {'dropped':>8s} {'calls/req':>10s}  answered by")
+    for mode in ("legacy", "router"):
+        r = run(mode, args)
+        print(
+            f"{r['mode']:8s} {r['p50']:6.1f}s {r['p95']:6.1f}s {r['p99']:6.1f}s {r['max']:6.1f}s "
+            f"{r['dropped']:8d} {r['calls_per_request']:10.2f}  {r['answered_by']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
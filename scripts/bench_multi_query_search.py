@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Multi-Query Document Search Benchmark
+
+Compares, for the same set of unified_search queries, the former document
+search path (one hybrid_knowledge_chunks_search_v2 RPC per query, contents
+concatenated) with the batched path (one hybrid_knowledge_chunks_multi_search
+RPC, RRF fusion + dedup in SQL, token-budget packing).
+
+Reports per search: RPC count, payload bytes (request + response JSON),
+context tokens, duplicate chunks and latency.
+
+Usage:
+    python scripts/bench_multi_query_search.py --user-id <uuid> [--runs 20]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, GEMINI_API_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.session import get_db  # noqa: E402
+from app.services.token_accounting import count_text_tokens  # noqa: E402
+from app.services.unified_search import QueryItem, UnifiedSearchService  # noqa: E402
+
+QUERY_SETS = [
+    [
+        {"query": "prix livraison Douala", "lang": "french"},
+        {"query": "frais de livraison", "lang": "french"},
+        {"query": "delivery cost Douala", "lang": "english"},
+    ],
+    [
+        {"query": "horaires d'ouverture", "lang": "french"},
+        {"query": "heures d'ouverture boutique", "lang": "french"},
+        {"query": "opening hours", "lang": "english"},
+    ],
+    [
+        {"query": "politique de remboursement", "lang": "french"},
+        {"query": "retour produit remboursement", "lang": "french"},
+        {"query": "refund policy", "lang": "english"},
+        {"query": "return an item", "lang": "english"},
+    ],
+]
+
+
+def legacy_search(service: UnifiedSearchService, queries, embeddings) -> dict:
+    """Former path: one RPC per query, no dedup, no budget"""
+    db = get_db()
+    rpc_count = 0
+    payload_bytes = 0
+    ids = []
+    contents = []
+    for query, embedding in zip(queries, embeddings):
+        params = {
+            "p_user_id": service.user_id,
+            "query_text": " | ".join(query.query.split()),
+            "query_embedding": embedding,
+            "query_lang": query.lang,
+            "match_count": 10,
+            "rrf_k": 10,
+        }
+        rows = db.rpc("hybrid_knowledge_chunks_search_v2", params).execute().data or []
+        rpc_count += 1
+        payload_bytes += len(json.dumps(params)) + len(json.dumps(rows, default=str))
+        ids.extend(row.get("id") for row in rows)
+        contents.extend(row["content"] for row in rows)
+
+    return {
+        "rpc_count": rpc_count,
+        "payload_bytes": payload_bytes,
+        "context_tokens": sum(count_text_tokens(c) for c in contents),
+        "duplicates": len(ids) - len(set(ids)),
+    }
+
+
+def batched_search(service: UnifiedSearchService, queries, embeddings) -> dict:
+    rows, payload_bytes = service._search_multi_query(queries, embeddings)
+    chunks, context_tokens = service._pack_chunks(rows, 2000)
+    ids = [row.get("id") for row in rows]
+    return {
+        "rpc_count": 1,
+        "payload_bytes": payload_bytes,
+        "context_tokens": context_tokens,
+        "duplicates": len(ids) - len(set(ids)),
+    }
+
+
+def run(label: str, fn, service, prepared, runs: int):
+    latencies, results = [], []
+    for i in range(runs):
+        queries, embeddings = prepared[i % len(prepared)]
+        start = time.perf_counter()
+        results.append(fn(service, queries, embeddings))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(
+        f"{label:8s} rpc/search={statistics.mean(r['rpc_count'] for r in results):.1f} "
+        f"bytes/search={statistics.mean(r['payload_bytes'] for r in results):.0f} "
+        f"context_tokens={statistics.mean(r['context_tokens'] for r in results):.0f} "
+        f"duplicates={statistics.mean(r['duplicates'] for r in results):.1f} "
+        f"p50={statistics.median(latencies):.0f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    service = UnifiedSearchService(args.user_id)
+
+    # Embeddings are computed once: both paths share the same vectors
+    prepared = []
+    for query_set in QUERY_SETS:
+        queries = [QueryItem(**q) for q in query_set]
+        prepared.append((queries, service.retriever.embed_texts([q.query for q in queries])))
+
+    run("legacy", legacy_search, service, prepared, args.runs)
+    run("batched", batched_search, service, prepared, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Multi Tool Call Benchmark
+
+Runs multi-intent questions through the RAGAgent and reports, per question,
+the number of LLM turns and the latency with parallel tool calls enabled
+(several unified_search calls executed at once by handle_tool_call) versus
+disabled (parallel_tool_calls=False: one tool call per LLM turn).
+
+Usage:
+    python scripts/bench_multi_tool_calls.py --user-id <uuid> [--model x-ai/grok-4-fast]
+
+Environment Variables Required:
+    OPENROUTER_API_KEY, OPENAI_API_KEY, REDIS_URL,
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+from app.services.rag_agent import create_rag_agent  # noqa: E402
+
+MULTI_QUESTION_FIXTURE = [
+    "Quels sont vos horaires d'ouverture et est-ce que vous livrez à Lyon ?",
+    "Combien coûte la livraison, quels moyens de paiement acceptez-vous et puis-je retourner un article ?",
+    "Do you have a store in Paris, and what is your warranty policy?",
+    "Est-ce que le produit existe en bleu ? Et quel est le délai de fabrication ?",
+]
+
+
+def run_question(user_id: str, model: str, question: str, parallel: bool) -> tuple:
+    agent = create_rag_agent(
+        user_id=user_id,
+        conversation_id=f"bench-{uuid.uuid4()}",
+        model_name=model,
+        test_mode=True,
+        parallel_tool_calls=parallel,
+    )
+
+    start = time.perf_counter()
+    result = agent.graph.invoke(
+        {"messages": [HumanMessage(content=question)]},
+        config={"configurable": {"thread_id": f"bench-{uuid.uuid4()}"}},
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    llm_turns = sum(1 for m in result["messages"] if isinstance(m, AIMessage))
+    return llm_turns, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--model", default="x-ai/grok-4-fast")
+    args = parser.parse_args()
+
+    for parallel in (False, True):
+        mode = "parallel" if parallel else "sequential"
+        turns, latencies = [], []
+        for question in MULTI_QUESTION_FIXTURE:
+            llm_turns, elapsed_ms = run_question(args.user_id, args.model, question, parallel)
+            turns.append(llm_turns)
+            latencies.append(elapsed_ms)
+            print(f"[{mode}] turns={llm_turns} {elapsed_ms:.0f}ms  {question[:60]}")
+        print(
+            f"[{mode}] mean turns={statistics.mean(turns):.2f} "
+            f"median latency={statistics.median(latencies):.0f}ms\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
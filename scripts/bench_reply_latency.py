@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Reply Latency Benchmark
+
+Compares RAGAgent reply latency (p50/p95) with the speculative pre-guardrail
+mode on and off. Uses the test-mode agent (Redis checkpointer, no escalation
+tool) and a fresh thread per run.
+
+Usage:
+    python scripts/bench_reply_latency.py --user-id <uuid> [--runs 30] [--model x-ai/grok-4-fast]
+
+Environment Variables Required:
+    OPENROUTER_API_KEY, OPENAI_API_KEY, REDIS_URL,
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from app.services.rag_agent import create_rag_agent  # noqa: E402
+
+QUESTIONS = [
+    "Bonjour, quels sont vos horaires d'ouverture ?",
+    "Est-ce que vous livrez à l'international ?",
+    "Comment puis-je retourner un produit ?",
+]
+
+
+def run(user_id: str, model: str, runs: int, speculative: bool) -> list:
+    latencies = []
+    for i in range(runs):
+        agent = create_rag_agent(
+            user_id=user_id,
+            conversation_id=f"bench-{uuid.uuid4()}",
+            model_name=model,
+            test_mode=True,
+            speculative_pre_check=speculative,
+        )
+        config = {"configurable": {"thread_id": f"bench-{uuid.uuid4()}"}}
+        start = time.perf_counter()
+        agent.graph.invoke(
+            {"messages": [HumanMessage(content=QUESTIONS[i % len(QUESTIONS)])]},
+            config=config,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--model", default="x-ai/grok-4-fast")
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'p50 ms':>10} {'p95 ms':>10}")
+    for speculative in (False, True):
+        latencies = run(args.user_id, args.model, args.runs, speculative)
+        p50 = statistics.median(latencies)
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        mode = "speculative" if speculative else "sequential"
+        print(f"{mode:>12} {p50:>10.0f} {p95:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Delivery/Read Status Pipeline Benchmark
+
+Feeds N status webhooks (default 100,000: sent, delivered and read events of
+N/3 outbound messages, slightly out of order) through:
+- legacy:   the former in-memory status store (one dict entry per event,
+            never evicted, nothing written to the database)
+- pipeline: StatusStore (Redis Stream + bounded LRU), then StatusStore.flush
+
+Reports the Python memory growth of the webhook process (tracemalloc) and,
+for the pipeline, the DB writes of the flush (apply_message_statuses calls
+and rows) versus one UPDATE per event. The flush writes are counted, not
+sent: no Postgres is needed. Redis calls go to a real Redis (REDIS_URL), on a
+dedicated stream deleted at the end.
+
+Usage:
+    python scripts/bench_status_pipeline.py [--events 100000] [--concurrency 200]
+
+Environment Variables Required:
+    REDIS_URL
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict, List
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.services.status_store import StatusStore  # noqa: E402
+
+BENCH_STREAM = "bench:message_statuses"
+
+
+class LegacyStatusStore:
+    """Former app/services/status_store.py (module-level dict)"""
+
+    def __init__(self):
+        self._message_statuses: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add_status(self, message_id: str, status: str, payload: Dict[str, Any]) -> None:
+        entry = {"status": status, "timestamp": time.time(), "payload": payload}
+        self._message_statuses.setdefault(message_id, []).append(entry)
+
+
+class CountingStatusStore(StatusStore):
+    """StatusStore whose batch writes are counted instead of sent to Postgres"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rows_written = 0
+
+    def _write_batch(self, db, statuses):
+        self.rows_written += len(statuses)
+        return len(statuses), []
+
+
+def make_events(count: int) -> List[Dict[str, Any]]:
+    """sent/delivered/read per message, shuffled within small windows"""
+    events = []
+    base = time.time()
+    for i in range(count // 3):
+        message_id = f"wamid.{uuid.uuid4().hex}"
+        for offset, status in enumerate(("sent", "delivered", "read")):
+            events.append({
+                "id": message_id,
+                "status": status,
+                "timestamp": str(int(base + i * 0.01 + offset)),
+                "recipient_id": "33600000000",
+            })
+    for start in range(0, len(events), 50):
+        window = events[start:start + 50]
+        random.shuffle(window)
+        events[start:start + 50] = window
+    return events
+
+
+def run_legacy(events):
+    store = LegacyStatusStore()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for event in events:
+        store.add_status(event["id"], event["status"], event)
+    elapsed = time.perf_counter() - start
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(
+        f"legacy   events={len(events)} time={elapsed:6.2f}s "
+        f"memory_growth={growth / 1024 / 1024:7.2f}MB db_writes=0 (never persisted)"
+    )
+
+
+async def run_pipeline(events, args):
+    store = CountingStatusStore(stream=BENCH_STREAM)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(event):
+        async with semaphore:
+            await store.add_status(event["id"], event["status"], timestamp=event["timestamp"])
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    await asyncio.gather(*(one(event) for event in events))
+    ingest_elapsed = time.perf_counter() - start
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    totals = {"events": 0, "db_writes": 0}
+    while True:
+        stats = await asyncio.to_thread(store.flush, None, "bench")
+        if not stats["events"]:
+            break
+        totals["events"] += stats["events"]
+        totals["db_writes"] += stats["db_writes"]
+    flush_elapsed = time.perf_counter() - start
+
+    print(
+        f"pipeline events={len(events)} time={ingest_elapsed:6.2f}s "
+        f"memory_growth={growth / 1024 / 1024:7.2f}MB (lru={store.lru_size})"
+    )
+    print(
+        f"flush    events={totals['events']} time={flush_elapsed:6.2f}s "
+        f"db_writes={totals['db_writes']} rows={store.rows_written} "
+        f"(one UPDATE per event: {len(events)})"
+    )
+
+
+async def main_async(args):
+    events = make_events(args.events)
+    run_legacy(events)
+    store = StatusStore(stream=BENCH_STREAM)
+    try:
+        await run_pipeline(events, args)
+    finally:
+        redis_client = await store.get_redis()
+        await redis_client.delete(BENCH_STREAM)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
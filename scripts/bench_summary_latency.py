@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Summarization Threshold Benchmark
+
+Measures the latency of RAGAgent turns that cross the summarization threshold.
+A thread is seeded with a synthetic history just below max_tokens_before_summary,
+then one turn is timed. The background summary duration is reported too: with
+the former synchronous summarization the customer waited for both.
+
+Usage:
+    python scripts/bench_summary_latency.py --user-id <uuid> [--runs 10] [--max-tokens 8000]
+
+Environment Variables Required:
+    OPENROUTER_API_KEY, OPENAI_API_KEY, REDIS_URL,
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+from app.services.rag_agent import create_rag_agent  # noqa: E402
+from app.services.token_accounting import messages_token_count  # noqa: E402
+
+
+def seed_history(agent, config, target_tokens: int) -> None:
+    history = []
+    turn = 0
+    while messages_token_count(history) < target_tokens:
+        history.append(HumanMessage(content=f"Question {turn}: pouvez-vous me donner des détails sur la commande {turn} ?", id=str(uuid.uuid4())))
+        history.append(AIMessage(content=f"Réponse {turn}: " + "la commande est en préparation et sera expédiée sous 48h. " * 8, id=str(uuid.uuid4())))
+        turn += 1
+    agent.graph.update_state(
+        config,
+        {"messages": history, "history_tokens": messages_token_count(history)},
+        as_node="guardrails_post_check",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-tokens", type=int, default=8000)
+    parser.add_argument("--model", default="x-ai/grok-4-fast")
+    args = parser.parse_args()
+
+    turn_ms, summary_ms = [], []
+    for _ in range(args.runs):
+        agent = create_rag_agent(
+            user_id=args.user_id,
+            conversation_id=f"bench-{uuid.uuid4()}",
+            model_name=args.model,
+            max_tokens=args.max_tokens,
+            test_mode=True,
+        )
+        config = {"configurable": {"thread_id": f"bench-{uuid.uuid4()}"}}
+        seed_history(agent, config, agent.max_tokens_before_summary - 50)
+
+        start = time.perf_counter()
+        agent.graph.invoke(
+            {"messages": [HumanMessage(content="Et pour la livraison express ?")]},
+            config=config,
+        )
+        turn_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        thread_key = (config["configurable"]["thread_id"], "")
+        agent._summarize_history(config, thread_key)
+        summary_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"turn crossing threshold: p50={statistics.median(turn_ms):.0f}ms max={max(turn_ms):.0f}ms")
+    print(f"background summary:      p50={statistics.median(summary_ms):.0f}ms max={max(summary_ms):.0f}ms")
+    print(
+        "former synchronous path ≈ turn + summary: "
+        f"p50={statistics.median(t + s for t, s in zip(turn_ms, summary_ms)):.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
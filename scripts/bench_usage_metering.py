@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Usage Metering Throughput Benchmark
+
+Pushes N LLM calls (default 10,000, grouped in batches of --calls-per-batch
+for --users users, --concurrency batches at a time) through:
+- legacy:  per call feature access + model access + credits check, per batch
+           a Redis lock + credits deduction (the former CreditTracker /
+           deduct_with_lock path)
+- metered: CreditTracker with an entitlement snapshot per batch and usage
+           counted in Redis (one HINCRBY pipeline per batch)
+
+The credits service is the open-source stub, instant: each of its calls
+sleeps --hop-ms to stand for the network round trip of a real billing
+backend. Redis calls go to a real Redis (REDIS_URL).
+
+Reports: calls/min, network hops per call, per-call overhead p50/p95.
+The usage counters of the benchmark users are deleted from Redis at the end
+(never flushed to Postgres).
+
+Usage:
+    python scripts/bench_usage_metering.py [--calls 10000] [--users 200] \\
+        [--calls-per-batch 4] [--concurrency 100] [--hop-ms 3]
+
+Environment Variables Required:
+    REDIS_URL
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.deps.credit_tracker import CreditTracker  # noqa: E402
+from app.services.credits_service import CreditsService  # noqa: E402
+from app.services.usage_metering import current_period, usage_meter  # noqa: E402
+
+MODELS = ["google/gemini-2.5-flash", "openai/gpt-4o-mini"]
+
+
+class RemoteCreditsService(CreditsService):
+    """Open-source credits service with a simulated network hop per call"""
+
+    def __init__(self, hop_seconds: float):
+        super().__init__(db=None)
+        self.hop_seconds = hop_seconds
+        self.hops = 0
+
+    async def _hop(self):
+        self.hops += 1
+        await asyncio.sleep(self.hop_seconds)
+
+    async def get_feature_access(self, user_id):
+        await self._hop()
+        return await super().get_feature_access(user_id)
+
+    async def can_use_model(self, user_id, model_name):
+        await self._hop()
+        return await super().can_use_model(user_id, model_name)
+
+    async def check_credits_available(self, user_id, cost, operation="unknown"):
+        await self._hop()
+        return await super().check_credits_available(user_id, cost, operation)
+
+    async def get_credits_balance(self, user_id):
+        await self._hop()
+        return await super().get_credits_balance(user_id)
+
+    async def deduct_credits(self, user_id, **kwargs):
+        await self._hop()
+        return await super().deduct_credits(user_id, **kwargs)
+
+
+async def legacy_batch(service: RemoteCreditsService, user_id: str, calls: int, overheads, counters):
+    redis_client = await usage_meter.get_redis()
+    total = 0.0
+    for i in range(calls):
+        model = MODELS[i % len(MODELS)]
+        start = time.perf_counter()
+        await service.get_feature_access(user_id)
+        await service.can_use_model(user_id, model)
+        await service.check_credits_available(user_id, total + 0.2)
+        overheads.append((time.perf_counter() - start) * 1000)
+        total += 0.2
+
+    # deduct_with_lock: SET NX lock, deduction, release
+    lock_key = f"bench:credits:lock:{user_id}"
+    lock_value = uuid.uuid4().hex
+    while not await redis_client.set(lock_key, lock_value, nx=True, ex=5):
+        await asyncio.sleep(0.005)
+    try:
+        await service.deduct_credits(user_id, credits_to_deduct=total, reason="bench")
+    finally:
+        await redis_client.delete(lock_key)
+    counters["redis_hops"] += 2
+
+
+async def metered_batch(service: RemoteCreditsService, user_id: str, calls: int, overheads, counters):
+    tracker = CreditTracker(user_id, service)
+    for i in range(calls):
+        start = time.perf_counter()
+        await tracker.track_ai_call(MODELS[i % len(MODELS)], 0.2)
+        overheads.append((time.perf_counter() - start) * 1000)
+    await tracker.finalize_batch()
+    counters["redis_hops"] += 1
+
+
+async def run(label, batch_fn, args, user_ids):
+    service = RemoteCreditsService(args.hop_ms / 1000)
+    overheads, counters = [], {"redis_hops": 0}
+    batches = args.calls // args.calls_per_batch
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await batch_fn(service, user_ids[i % len(user_ids)], args.calls_per_batch, overheads, counters)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(batches)))
+    elapsed = time.perf_counter() - start
+
+    calls = batches * args.calls_per_batch
+    overheads.sort()
+    print(
+        f"{label:8s} calls={calls} time={elapsed:6.2f}s "
+        f"throughput={calls / elapsed * 60:9.0f} calls/min "
+        f"hops/call={(service.hops + counters['redis_hops']) / calls:5.2f} "
+        f"overhead p50={statistics.median(overheads):6.2f}ms "
+        f"p95={overheads[int(len(overheads) * 0.95) - 1]:6.2f}ms"
+    )
+
+
+async def main_async(args):
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    # Entitlement checks of the open-source service are unlimited: the
+    # benchmark measures the hops, not the decisions
+    try:
+        await run("legacy", legacy_batch, args, user_ids)
+        await run("metered", metered_batch, args, user_ids)
+    finally:
+        # Random user ids must never reach the flusher
+        redis_client = await usage_meter.get_redis()
+        period = current_period()
+        await redis_client.srem(usage_meter._dirty_key(period), *user_ids)
+        await redis_client.delete(*(usage_meter._usage_key(period, u) for u in user_ids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--calls-per-batch", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--hop-ms", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
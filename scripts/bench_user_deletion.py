@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - User Data Deletion Benchmark
+
+Deletion of a tenant with many conversations (default 100k), former code vs
+UserDataDeletionService.
+
+Redis (always, needs a disposable Redis db: --redis-url is flushed):
+- populates the batching/cache keys of the tenant's conversations next to
+  --noise-keys keys of other tenants
+- legacy: one KEYS conv:*:{conversation_id} per conversation (measured on
+  --legacy-sample conversations, extrapolated to the tenant)
+- new: SCAN MATCH/COUNT + UNLINK batches, as in the cache and conversations
+  phases of the job
+- a probe thread PINGs Redis during each run: p99/max PING latency is how
+  long other clients (webhooks, batch scanner) were blocked
+
+Database (--with-db, needs a local Supabase with migration 038 applied):
+- seeds a throwaway tenant (auth user, social account, conversations with one
+  message each) in bulk inserts
+- legacy: the former single query .in_("conversation_id", ids) with every id
+  in the URL
+- new: runs the deletion job end to end and reports duration and rows/s
+
+Usage:
+    python scripts/bench_user_deletion.py [--conversations 100000]
+        [--noise-keys 200000] [--legacy-sample 200] [--redis-url redis://localhost:6379/15]
+        [--with-db] [--messages-per-conversation 1]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY (--with-db only)
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List
+
+import redis
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.services.user_data_deletion_service import (  # noqa: E402
+    DELETION_CONVERSATION_PAGE,
+    UserDataDeletionService,
+)
+
+PLATFORM = "instagram"
+ACCOUNT_ID = "17841400000000000"
+BATCH_SUFFIXES = ("msgs", "deadline", "conversation_id", "lock")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+class PingProbe:
+    """PING every millisecond in a thread, latencies in ms"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self.latencies: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            self.client.ping()
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.001)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def populate(client: redis.Redis, social_account_id: str, conversations: int, noise_keys: int) -> List[str]:
+    """Keys of the tenant's conversations and of other tenants; returns conversation ids"""
+    client.flushdb()
+    conversation_ids = []
+    pipe = client.pipeline(transaction=False)
+    for i in range(conversations):
+        cid = str(uuid.uuid4())
+        contact = f"contact{i}"
+        conversation_ids.append(cid)
+        base = f"conv:{PLATFORM}:{ACCOUNT_ID}:{contact}"
+        for suffix in BATCH_SUFFIXES:
+            pipe.set(f"{base}:{suffix}", cid if suffix == "conversation_id" else "x")
+        pipe.zadd("conv:deadlines", {f"{PLATFORM}:{ACCOUNT_ID}:{contact}": time.time()})
+        pipe.set(f"conversation:{social_account_id}:{contact}", cid)
+        pipe.set(f"latency:{cid}", "x")
+        pipe.set(f"messages:latest:{cid}", "x")
+        if i % 5000 == 4999:
+            pipe.execute()
+    for i in range(noise_keys):
+        pipe.set(f"conv:{PLATFORM}:other{i % 1000}:c{i}:msgs", "x")
+        if i % 5000 == 4999:
+            pipe.execute()
+    pipe.execute()
+    return conversation_ids
+
+
+def bench_redis(args) -> None:
+    url = args.redis_url
+    client = redis.Redis.from_url(url, decode_responses=True)
+    probe_client = redis.Redis.from_url(url, decode_responses=True)
+    social_account_id = str(uuid.uuid4())
+
+    print(f"Populating {args.conversations} conversations + {args.noise_keys} noise keys in {url} ...")
+    conversation_ids = populate(client, social_account_id, args.conversations, args.noise_keys)
+    print(f"  {client.dbsize()} keys")
+
+    # Legacy: KEYS conv:*:{id} per conversation (blocking full keyspace scan each time)
+    sample = conversation_ids[: args.legacy_sample]
+    with PingProbe(probe_client) as probe:
+        start = time.perf_counter()
+        for cid in sample:
+            keys = client.keys(f"conv:*:{cid}")
+            if keys:
+                client.delete(*keys)
+        legacy_s = time.perf_counter() - start
+    legacy_total_s = legacy_s / max(len(sample), 1) * args.conversations
+    print(
+        f"legacy   KEYS x {len(sample)}: {legacy_s:.2f}s "
+        f"-> {legacy_total_s:.0f}s extrapolated to {args.conversations} conversations; "
+        f"PING p99 {percentile(probe.latencies, 0.99):.1f}ms max {max(probe.latencies or [0]):.1f}ms"
+    )
+
+    conversation_ids = populate(client, social_account_id, args.conversations, args.noise_keys)
+    service = UserDataDeletionService(
+        db=None, job={"id": "bench", "user_id": "bench"}, redis_client=client
+    )
+    with PingProbe(probe_client) as probe:
+        start = time.perf_counter()
+        # cache phase: patterns of the account
+        removed = service._unlink_matching(f"conv:{PLATFORM}:{ACCOUNT_ID}:*")
+        members = [m for m, _ in client.zscan_iter("conv:deadlines", match=f"{PLATFORM}:{ACCOUNT_ID}:*", count=1000)]
+        for i in range(0, len(members), 500):
+            removed += client.zrem("conv:deadlines", *members[i:i + 500])
+        removed += service._unlink_matching(f"conversation:{social_account_id}:*")
+        # conversations phase: per-conversation keys, page by page
+        for i in range(0, len(conversation_ids), DELETION_CONVERSATION_PAGE):
+            page = conversation_ids[i:i + DELETION_CONVERSATION_PAGE]
+            removed += service._unlink([f"latency:{c}" for c in page] + [f"messages:latest:{c}" for c in page])
+        new_s = time.perf_counter() - start
+    print(
+        f"new      SCAN+UNLINK: {new_s:.2f}s for {removed} keys; "
+        f"PING p99 {percentile(probe.latencies, 0.99):.1f}ms max {max(probe.latencies or [0]):.1f}ms"
+    )
+    print(f"  {client.dbsize()} keys left (noise keys: {args.noise_keys})")
+    client.flushdb()
+
+
+def seed_tenant(db, conversations: int, messages_per_conversation: int) -> Dict[str, Any]:
+    email = f"bench-deletion-{uuid.uuid4().hex[:8]}@example.com"
+    user = db.auth.admin.create_user({"email": email, "password": uuid.uuid4().hex, "email_confirm": True})
+    user_id = user.user.id
+    db.table("users").upsert({"id": user_id, "email": email}).execute()
+    account = db.table("social_accounts").insert({
+        "user_id": user_id,
+        "platform": PLATFORM,
+        "account_id": f"bench{uuid.uuid4().hex[:10]}",
+        "username": "bench",
+    }).execute().data[0]
+
+    conversation_ids: List[str] = []
+    batch = 1000
+    for start in range(0, conversations, batch):
+        rows = [
+            {"id": str(uuid.uuid4()), "social_account_id": account["id"], "customer_identifier": f"c{start + i}"}
+            for i in range(min(batch, conversations - start))
+        ]
+        db.table("conversations").insert(rows).execute()
+        conversation_ids.extend(row["id"] for row in rows)
+        messages = [
+            {
+                "conversation_id": row["id"],
+                "external_message_id": f"bench-{uuid.uuid4().hex}",
+                "direction": "inbound",
+                "content": "hello",
+                "message_type": "text",
+            }
+            for row in rows
+            for _ in range(messages_per_conversation)
+        ]
+        for m_start in range(0, len(messages), batch):
+            db.table("conversation_messages").insert(messages[m_start:m_start + batch]).execute()
+        if (start // batch) % 10 == 9:
+            print(f"  {start + batch} conversations seeded")
+    return {"user_id": user_id, "conversation_ids": conversation_ids}
+
+
+def bench_db(args) -> None:
+    from app.db.session import get_db
+    from app.services.user_data_deletion_service import create_deletion_job
+
+    db = get_db()
+    print(f"Seeding {args.conversations} conversations ...")
+    start = time.perf_counter()
+    tenant = seed_tenant(db, args.conversations, args.messages_per_conversation)
+    print(f"  seeded in {time.perf_counter() - start:.0f}s (user {tenant['user_id']})")
+
+    # Legacy: every conversation id in one PostgREST URL
+    ids = tenant["conversation_ids"]
+    try:
+        db.table("conversation_messages").select("id", count="exact").in_("conversation_id", ids).limit(1).execute()
+        print(f"legacy   .in_() with {len(ids)} ids: accepted")
+    except Exception as e:
+        print(f"legacy   .in_() with {len(ids)} ids: failed ({type(e).__name__}: {str(e)[:120]})")
+
+    job = create_deletion_job(db, tenant["user_id"])
+    service = UserDataDeletionService(db, job)
+    start = time.perf_counter()
+    while job["status"] != "completed":
+        job = service.run(time_budget_seconds=240)
+    elapsed = time.perf_counter() - start
+    rows = sum(v for k, v in job["deleted"].items() if k not in ("cache_keys", "storage_objects"))
+    print(f"new      job: {elapsed:.1f}s, {rows} rows ({rows / max(elapsed, 1e-6):.0f} rows/s): {job['deleted']}")
+    db.auth.admin.delete_user(tenant["user_id"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=100_000)
+    parser.add_argument("--noise-keys", type=int, default=200_000)
+    parser.add_argument("--legacy-sample", type=int, default=200)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15", help="Flushed by the bench")
+    parser.add_argument("--with-db", action="store_true")
+    parser.add_argument("--messages-per-conversation", type=int, default=1)
+    args = parser.parse_args()
+
+    bench_redis(args)
+    if args.with_db:
+        bench_db(args)
+
+
+if __name__ == "__main__":
+    main()
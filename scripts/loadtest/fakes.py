@@ -0,0 +1,387 @@
+"""
+SocialSync AI - Load test stand-ins for the external APIs
+
+In-process FastAPI servers answering like the real services, with a
+configurable latency (base + uniform jitter, in ms):
+- FakeGraph:  Meta Graph API (WhatsApp Cloud API, Instagram, Messenger):
+              message sends, typing/read actions, comment replies, media
+              lookup/download, profiles, comment listing. Every send is
+              recorded (recipient, time) for the reply latency report.
+- FakeLLM:    OpenAI-compatible /v1/chat/completions (plain answers, tool
+              calls, structured output) and /v1/moderations.
+- FakeGemini: Gemini embedContent / batchEmbedContents (deterministic
+              768-dimension vectors).
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+MODERATION_CATEGORIES = [
+    "harassment", "harassment/threatening", "hate", "hate/threatening",
+    "illicit", "illicit/violent", "self-harm", "self-harm/instructions",
+    "self-harm/intent", "sexual", "sexual/minors", "violence", "violence/graphic",
+]
+
+CANNED_ANSWER = (
+    "Merci pour votre message ! Nos horaires sont du lundi au vendredi, "
+    "de 9h à 18h. N'hésitez pas si vous avez d'autres questions."
+)
+
+
+@dataclass
+class Latency:
+    """Simulated service time: base_ms + uniform(0, jitter_ms)"""
+
+    base_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    async def wait(self) -> None:
+        delay = self.base_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+@dataclass
+class SendEvent:
+    kind: str  # dm, comment_reply
+    recipient: str
+    at: float  # time.time()
+
+
+@dataclass
+class CallCounter:
+    counts: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class FakeServer:
+    """Run a FastAPI app with uvicorn in a background thread"""
+
+    def __init__(self, app: FastAPI, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "FakeServer":
+        self.thread.start()
+        deadline = time.time() + timeout
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError(f"Fake server on :{self.port} did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class FakeGraph:
+    """Meta Graph API stand-in (graph.facebook.com and graph.instagram.com)"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = CallCounter()
+        self.sends: List[SendEvent] = []
+        self._sends_lock = threading.Lock()
+        self.app = self._build_app()
+
+    def _record(self, kind: str, recipient: str) -> None:
+        with self._sends_lock:
+            self.sends.append(SendEvent(kind=kind, recipient=recipient, at=time.time()))
+
+    def sends_since(self, index: int) -> List[SendEvent]:
+        with self._sends_lock:
+            return self.sends[index:]
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/{version}/{node_id}/messages")
+        async def messages(version: str, node_id: str, request: Request):
+            body = await request.json()
+            await self.latency.wait()
+
+            # WhatsApp Cloud API
+            if body.get("messaging_product") == "whatsapp":
+                if body.get("status") == "read":
+                    self.calls.inc("whatsapp.typing")
+                    return {"success": True}
+                self.calls.inc("whatsapp.send")
+                self._record("dm", body.get("to", ""))
+                return {
+                    "messaging_product": "whatsapp",
+                    "contacts": [{"input": body.get("to"), "wa_id": body.get("to")}],
+                    "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}],
+                }
+
+            # Instagram / Messenger Send API
+            recipient = (body.get("recipient") or {}).get("id", "")
+            if body.get("sender_action"):
+                self.calls.inc("messaging.sender_action")
+                return {"recipient_id": recipient}
+            self.calls.inc("messaging.send")
+            self._record("dm", recipient)
+            message_id = f"mid.{uuid.uuid4().hex}"
+            return {"recipient_id": recipient, "id": message_id, "message_id": message_id}
+
+        @app.post("/{version}/{comment_id}/replies")
+        async def comment_reply(version: str, comment_id: str):
+            await self.latency.wait()
+            self.calls.inc("comments.reply")
+            self._record("comment_reply", comment_id)
+            return {"id": f"reply_{uuid.uuid4().hex[:16]}"}
+
+        @app.get("/{version}/{node_id}/comments")
+        async def comments(version: str, node_id: str):
+            await self.latency.wait()
+            self.calls.inc("comments.list")
+            return {"data": [], "paging": {}}
+
+        @app.get("/media-download/{media_id}")
+        async def media_download(media_id: str):
+            await self.latency.wait()
+            self.calls.inc("media.download")
+            return Response(content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048, media_type="image/png")
+
+        @app.get("/{version}/{node_id}")
+        async def node(version: str, node_id: str, request: Request):
+            await self.latency.wait()
+            self.calls.inc("node.get")
+            base = str(request.base_url).rstrip("/")
+            return {
+                "id": node_id,
+                "name": f"Load Test {node_id[-6:]}",
+                "username": f"loadtest_{node_id[-6:]}",
+                "profile_pic": None,
+                # Media lookup (WhatsApp media id)
+                "url": f"{base}/media-download/{node_id}",
+                "mime_type": "image/png",
+                "file_size": 2056,
+            }
+
+        return app
+
+
+def _schema_example(schema: Dict[str, Any], defs: Dict[str, Any], hint: str = "") -> Any:
+    """Minimal value matching a JSON schema (structured output requests)"""
+    if "$ref" in schema:
+        return _schema_example(defs.get(schema["$ref"].split("/")[-1], {}), defs, hint)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return _schema_example(options[0], defs, hint)
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "string")
+    if schema_type == "object" or "properties" in schema:
+        return {
+            name: _schema_example(prop, defs, name)
+            for name, prop in (schema.get("properties") or {}).items()
+        }
+    if schema_type == "array":
+        return [_schema_example(schema.get("items") or {}, defs, hint)]
+    if schema_type == "integer":
+        return 1
+    if schema_type == "number":
+        return 0.9
+    if schema_type == "boolean":
+        return True
+    return CANNED_ANSWER if "answer" in hint else f"loadtest {hint}".strip()
+
+
+class FakeLLM:
+    """OpenAI-compatible chat completions + moderation stand-in"""
+
+    def __init__(self, latency: Latency, tool_call_ratio: float = 0.5, flagged_ratio: float = 0.0):
+        self.latency = latency
+        self.tool_call_ratio = tool_call_ratio
+        self.flagged_ratio = flagged_ratio
+        self.calls = CallCounter()
+        self.app = self._build_app()
+
+    @staticmethod
+    def _usage(messages: List[Dict[str, Any]], completion: str) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        completion_tokens = max(len(completion) // 4, 1)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _completion(self, model: str, message: Dict[str, Any], finish_reason: str, usage) -> Dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        }
+
+    def _answer(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body.get("model", "loadtest")
+        messages = body.get("messages") or []
+        tools = body.get("tools") or []
+        tool_choice = body.get("tool_choice")
+        response_format = body.get("response_format") or {}
+
+        # Structured output, json_schema method
+        if response_format.get("type") == "json_schema":
+            self.calls.inc("chat.structured")
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            content = json.dumps(_schema_example(schema, schema.get("$defs", {})))
+            return self._completion(
+                model, {"role": "assistant", "content": content}, "stop",
+                self._usage(messages, content),
+            )
+
+        # Structured output, function calling method (forced tool)
+        forced = tool_choice.get("function", {}).get("name") if isinstance(tool_choice, dict) else None
+        # Agent tool call on the first turn (last message from the user)
+        last_role = messages[-1].get("role") if messages else None
+        if not forced and tools and last_role == "user" and random.random() < self.tool_call_ratio:
+            forced = tools[0]["function"]["name"]
+
+        if forced:
+            self.calls.inc("chat.tool_call")
+            tool = next((t for t in tools if t["function"]["name"] == forced), tools[0])
+            parameters = tool["function"].get("parameters") or {}
+            arguments = _schema_example(parameters, parameters.get("$defs", {}))
+            if "query" in arguments and messages:
+                arguments["query"] = str(messages[-1].get("content") or "")[:200]
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": forced, "arguments": json.dumps(arguments)},
+                }],
+            }
+            return self._completion(model, message, "tool_calls", self._usage(messages, json.dumps(arguments)))
+
+        self.calls.inc("chat.answer")
+        return self._completion(
+            model, {"role": "assistant", "content": CANNED_ANSWER}, "stop",
+            self._usage(messages, CANNED_ANSWER),
+        )
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            await self.latency.wait()
+            if body.get("stream"):
+                return JSONResponse({"error": {"message": "streaming not supported"}}, status_code=400)
+            return self._answer(body)
+
+        @app.post("/v1/moderations")
+        async def moderations(request: Request):
+            body = await request.json()
+            await self.latency.wait()
+            self.calls.inc("moderation")
+            flagged = random.random() < self.flagged_ratio
+            inputs = body.get("input")
+            count = len(inputs) if isinstance(inputs, list) and inputs and isinstance(inputs[0], str) else 1
+            result = {
+                "flagged": flagged,
+                "categories": {name: flagged and name == "harassment" for name in MODERATION_CATEGORIES},
+                "category_scores": {name: 0.9 if flagged and name == "harassment" else 0.001
+                                    for name in MODERATION_CATEGORIES},
+                "category_applied_input_types": {name: ["text"] for name in MODERATION_CATEGORIES},
+            }
+            return {
+                "id": f"modr-{uuid.uuid4().hex}",
+                "model": body.get("model", "omni-moderation-latest"),
+                "results": [result] * count,
+            }
+
+        return app
+
+
+def fake_embedding(text: str, dimensions: int = 768) -> List[float]:
+    """Deterministic unit vector of a text"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    values = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class FakeGemini:
+    """Gemini embedding API stand-in"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = CallCounter()
+        self.app = self._build_app()
+
+    @staticmethod
+    def _text(content: Optional[Dict[str, Any]]) -> str:
+        parts = (content or {}).get("parts") or []
+        return " ".join(str(p.get("text", "")) for p in parts)
+
+    @staticmethod
+    def _dimensions(request: Dict[str, Any]) -> int:
+        return int(request.get("outputDimensionality") or request.get("output_dimensionality") or 768)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/{version}/models/{model_action}")
+        async def models(version: str, model_action: str, request: Request):
+            body = await request.json()
+            await self.latency.wait()
+            if model_action.endswith(":batchEmbedContents"):
+                requests = body.get("requests") or []
+                self.calls.inc("embed.batch")
+                self.calls.inc("embed.texts", len(requests))
+                return {"embeddings": [
+                    {"values": fake_embedding(self._text(r.get("content")), self._dimensions(r))}
+                    for r in requests
+                ]}
+            if model_action.endswith(":embedContent"):
+                self.calls.inc("embed.single")
+                self.calls.inc("embed.texts")
+                return {"embedding": {
+                    "values": fake_embedding(self._text(body.get("content")), self._dimensions(body))
+                }}
+            return JSONResponse({"error": {"message": f"unsupported: {model_action}"}}, status_code=404)
+
+        return app
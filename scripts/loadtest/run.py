@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Offline End-to-End Load Test
+
+Runs the real message path (webhooks → API → Redis batching → Celery workers →
+RAG agent → platform send) against local stand-ins of Meta, OpenRouter,
+OpenAI moderation and Gemini (fakes.py), on a local Supabase stack and Redis.
+
+Scenarios:
+- dm_burst:      contacts sending bursts of DMs (WhatsApp + Instagram)
+- comment_storm: Instagram comment webhooks on monitored posts
+- ingestion:     knowledge documents processed by the ingest worker
+- replay:        a recorded trace (--trace, see traces.py for the format)
+
+Reports per scenario: webhook throughput and ack latency, reply latency
+p50/p95/p99 (webhook → send received by the fake Graph API), replies missing
+at the end of the drain period, calls made to each fake, and CPU/RSS of the
+API, workers and beat plus Redis peak memory.
+
+Usage:
+    python scripts/loadtest/run.py dm_burst [--contacts 200] [--messages-per-contact 3]
+    python scripts/loadtest/run.py comment_storm [--comments 500] [--seconds 60]
+    python scripts/loadtest/run.py ingestion [--documents 20] [--paragraphs 40]
+    python scripts/loadtest/run.py replay --trace trace.jsonl [--rate 50]
+
+    Common: [--rate N] (webhooks/s, overrides trace timing)
+            [--llm-latency-ms 800] [--llm-jitter-ms 400] [--graph-latency-ms 80]
+            [--embed-latency-ms 60] [--drain-seconds 60] [--save-trace out.jsonl]
+            [--no-stack] [--cleanup] [--json report.json]
+
+    --no-stack uses an API and workers already running with the fake
+    endpoints (the environment to give them is printed).
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, SUPABASE_ANON_KEY,
+    SUPABASE_JWT_SECRET (local stack: `supabase status`), REDIS_URL
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from supabase import create_client  # noqa: E402
+
+import seed  # noqa: E402
+import traces  # noqa: E402
+from fakes import FakeGemini, FakeGraph, FakeLLM, FakeServer, Latency  # noqa: E402
+from stack import ResourceSampler, Stack, fake_env  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def fmt_ms(value: Optional[float]) -> str:
+    return "     -" if value is None else f"{value:6.0f}"
+
+
+def sign(body: bytes, secret: str) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def replay(api_url: str, events: List[traces.TraceEvent], secret: str,
+                 concurrency: int) -> Dict[str, Any]:
+    """POST the trace to the API on schedule; first delivery time per expected reply"""
+    first_sent: Dict[str, float] = {}
+    ack_ms: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=30) as client:
+        async def deliver(event: traces.TraceEvent):
+            nonlocal errors
+            body = json.dumps(event.body).encode()
+            async with semaphore:
+                sent_at = time.time()
+                start = time.perf_counter()
+                try:
+                    resp = await client.post(event.path, content=body, headers={
+                        "Content-Type": "application/json",
+                        "X-Hub-Signature-256": sign(body, secret),
+                    })
+                    ok = resp.status_code < 400 and resp.json().get("status") != "error"
+                except (httpx.HTTPError, ValueError):
+                    ok = False
+                ack_ms.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors += 1
+            elif event.expect:
+                key = f"{event.expect['kind']}:{event.expect['key']}"
+                first_sent[key] = min(first_sent.get(key, sent_at), sent_at)
+
+        start = time.perf_counter()
+        tasks = []
+        for event in events:
+            delay = event.t - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(deliver(event)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {"first_sent": first_sent, "ack_ms": ack_ms, "errors": errors, "elapsed": elapsed}
+
+
+async def wait_replies(graph: FakeGraph, first_sent: Dict[str, float], start_index: int,
+                       drain_seconds: float) -> Dict[str, float]:
+    """Reply latency (ms) per expected reply, waiting up to drain_seconds for the missing ones"""
+    latencies: Dict[str, float] = {}
+    deadline = time.time() + drain_seconds
+    while True:
+        for send in graph.sends_since(start_index):
+            key = f"{send.kind}:{send.recipient}"
+            if key in first_sent and key not in latencies:
+                latencies[key] = (send.at - first_sent[key]) * 1000
+        if len(latencies) >= len(first_sent) or time.time() > deadline:
+            return latencies
+        await asyncio.sleep(0.5)
+
+
+def run_ingestion(db, celery_app, user_id: str, args) -> Dict[str, Any]:
+    """Enqueue process_document for fresh documents, time each one until indexed/failed"""
+    document_ids = seed.create_documents(db, user_id, args.documents, args.paragraphs)
+    queued_at = {doc_id: time.time() for doc_id in document_ids}
+    for doc_id in document_ids:
+        celery_app.send_task("app.workers.ingest.process_document", args=[doc_id])
+
+    done: Dict[str, float] = {}
+    statuses: Dict[str, str] = {}
+    deadline = time.time() + args.drain_seconds
+    while len(done) < len(document_ids) and time.time() < deadline:
+        pending = [d for d in document_ids if d not in done]
+        rows = db.table("knowledge_documents").select("id,status").in_("id", pending).execute().data
+        for row in rows or []:
+            if row["status"] in ("indexed", "failed"):
+                done[row["id"]] = (time.time() - queued_at[row["id"]]) * 1000
+                statuses[row["id"]] = row["status"]
+        time.sleep(0.5)
+
+    chunks = (
+        db.table("knowledge_chunks").select("id", count="exact")
+        .in_("document_id", document_ids).execute().count or 0
+    )
+    return {
+        "documents": len(document_ids),
+        "indexed": sum(1 for s in statuses.values() if s == "indexed"),
+        "failed": sum(1 for s in statuses.values() if s == "failed"),
+        "chunks": chunks,
+        "latencies_ms": list(done.values()),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print()
+    print(f"=== {report['scenario']} ===")
+    if "webhooks" in report:
+        w = report["webhooks"]
+        print(
+            f"webhooks   sent={w['sent']} errors={w['errors']} "
+            f"throughput={w['per_second']:7.1f}/s ack p50={fmt_ms(w['ack_p50'])}ms "
+            f"p95={fmt_ms(w['ack_p95'])}ms"
+        )
+    if "replies" in report:
+        r = report["replies"]
+        print(
+            f"replies    expected={r['expected']} received={r['received']} missing={r['missing']} "
+            f"throughput={r['per_second']:7.2f}/s"
+        )
+        print(
+            f"latency    p50={fmt_ms(r['p50'])}ms p95={fmt_ms(r['p95'])}ms "
+            f"p99={fmt_ms(r['p99'])}ms max={fmt_ms(r['max'])}ms"
+        )
+    if "ingestion" in report:
+        i = report["ingestion"]
+        print(
+            f"ingestion  documents={i['documents']} indexed={i['indexed']} failed={i['failed']} "
+            f"chunks={i['chunks']} docs/min={i['per_minute']:6.1f} "
+            f"p50={fmt_ms(i['p50'])}ms p95={fmt_ms(i['p95'])}ms"
+        )
+    print("fake calls " + json.dumps(report["fake_calls"], sort_keys=True))
+    resources = report.get("resources")
+    if resources:
+        for name, usage in resources["processes"].items():
+            print(f"  {name:24s} cpu={usage['cpu_cores']:5.2f} cores peak_rss={usage['peak_rss_mb']:7.1f}MB")
+        print(f"  {'redis':24s} peak_used_memory={resources['redis_peak_mb']:7.1f}MB")
+
+
+def build_events(args, accounts: Dict[str, Any]) -> List[traces.TraceEvent]:
+    if args.scenario == "replay":
+        events = traces.load_trace(args.trace)
+    elif args.scenario == "dm_burst":
+        events = traces.dm_burst(accounts, args.contacts, args.messages_per_contact)
+    else:
+        events = traces.comment_storm(accounts, args.comments, args.seconds)
+    if args.rate:
+        events = traces.retime(events, args.rate)
+    if args.save_trace:
+        traces.save_trace(events, args.save_trace)
+    return events
+
+
+async def main_async(args) -> Dict[str, Any]:
+    db = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_ROLE_KEY"])
+    accounts = seed.seed(db)
+
+    graph = FakeGraph(Latency(args.graph_latency_ms, args.graph_jitter_ms))
+    llm = FakeLLM(Latency(args.llm_latency_ms, args.llm_jitter_ms), tool_call_ratio=args.tool_call_ratio)
+    gemini = FakeGemini(Latency(args.embed_latency_ms, args.embed_jitter_ms))
+    servers = [
+        FakeServer(graph.app, args.fake_port_base).start(),
+        FakeServer(llm.app, args.fake_port_base + 1).start(),
+        FakeServer(gemini.app, args.fake_port_base + 2).start(),
+    ]
+    env = fake_env(servers[0].url, servers[1].url, servers[2].url)
+    os.environ.update(env)  # Celery client of the ingestion scenario
+
+    stack = Stack(env=env, api_port=args.api_port)
+    report: Dict[str, Any] = {"scenario": args.scenario}
+    try:
+        if args.no_stack:
+            print("Using the running stack; it must run with:")
+            for key, value in env.items():
+                print(f"  {key}={value}")
+            api_url = args.api_url
+        else:
+            print("Starting API, workers and beat...")
+            stack.start()
+            api_url = stack.api_url
+
+        sampler = ResourceSampler(stack.processes, os.environ["REDIS_URL"]).start() if stack.processes else None
+        start = time.time()
+
+        if args.scenario == "ingestion":
+            from app.workers.celery_app import celery
+
+            result = await asyncio.to_thread(run_ingestion, db, celery, accounts["user_id"], args)
+            elapsed = time.time() - start
+            latencies = result.pop("latencies_ms")
+            report["ingestion"] = {
+                **result,
+                "per_minute": len(latencies) / elapsed * 60 if elapsed else 0.0,
+                "p50": percentile(latencies, 0.5),
+                "p95": percentile(latencies, 0.95),
+            }
+        else:
+            events = build_events(args, accounts)
+            sends_before = len(graph.sends_since(0))
+            print(f"Replaying {len(events)} webhooks over {events[-1].t if events else 0:.1f}s...")
+            delivered = await replay(api_url, events, env["META_APP_SECRET"], args.concurrency)
+            latencies = await wait_replies(graph, delivered["first_sent"], sends_before, args.drain_seconds)
+            elapsed = time.time() - start
+            values = list(latencies.values())
+            report["webhooks"] = {
+                "sent": len(events),
+                "errors": delivered["errors"],
+                "per_second": len(events) / delivered["elapsed"] if delivered["elapsed"] else 0.0,
+                "ack_p50": percentile(delivered["ack_ms"], 0.5),
+                "ack_p95": percentile(delivered["ack_ms"], 0.95),
+            }
+            report["replies"] = {
+                "expected": len(delivered["first_sent"]),
+                "received": len(values),
+                "missing": len(delivered["first_sent"]) - len(values),
+                "per_second": len(values) / elapsed if elapsed else 0.0,
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": max(values) if values else None,
+                "mean": statistics.fmean(values) if values else None,
+            }
+
+        if sampler:
+            report["resources"] = sampler.stop()
+        report["fake_calls"] = {
+            "graph": graph.calls.snapshot(),
+            "llm": llm.calls.snapshot(),
+            "gemini": gemini.calls.snapshot(),
+        }
+        return report
+    finally:
+        stack.stop()
+        for server in servers:
+            server.stop()
+        if args.cleanup:
+            seed.cleanup(db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", choices=["dm_burst", "comment_storm", "ingestion", "replay"])
+    parser.add_argument("--trace", help="Trace to replay (JSONL)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Webhooks/s (0: trace timing)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Webhooks in flight")
+    parser.add_argument("--contacts", type=int, default=200)
+    parser.add_argument("--messages-per-contact", type=int, default=3)
+    parser.add_argument("--comments", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=400.0)
+    parser.add_argument("--tool-call-ratio", type=float, default=0.5)
+    parser.add_argument("--graph-latency-ms", type=float, default=80.0)
+    parser.add_argument("--graph-jitter-ms", type=float, default=40.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=60.0)
+    parser.add_argument("--embed-jitter-ms", type=float, default=30.0)
+    parser.add_argument("--drain-seconds", type=float, default=60.0)
+    parser.add_argument("--fake-port-base", type=int, default=18080)
+    parser.add_argument("--api-port", type=int, default=8010)
+    parser.add_argument("--no-stack", action="store_true")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--save-trace")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the load test user afterwards")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if args.scenario == "replay" and not args.trace:
+        parser.error("replay needs --trace")
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
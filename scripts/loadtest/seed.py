@@ -0,0 +1,153 @@
+"""
+SocialSync AI - Load test fixtures
+
+Creates, in the Supabase project of SUPABASE_URL (a local stack, see
+docs/technical/LOAD_TESTING.md), the load test user and what the scenarios
+address:
+- a WhatsApp and an Instagram social account (tokens are fake, the Graph API
+  calls go to the fake Graph server)
+- ai_settings with AI replies on
+- monitored Instagram posts (comment storm)
+- knowledge documents uploaded to the `kb` bucket (ingestion)
+
+Fixtures are reused across runs (lookups by email / account id); cleanup()
+deletes the user, its rows follow by cascade.
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from supabase import Client
+
+LOADTEST_EMAIL = "loadtest@socialsync.local"
+WHATSAPP_PHONE_NUMBER_ID = "loadtest-phone-1"
+INSTAGRAM_ACCOUNT_ID = "17840000000000001"
+LOADTEST_MODEL = "loadtest/fake-model"
+
+DOCUMENT_TEXT = (
+    "Nos boutiques sont ouvertes du lundi au samedi de 9h à 19h. "
+    "La livraison est offerte dès 50 euros d'achat en France métropolitaine. "
+    "Les retours sont acceptés sous 30 jours, produit non porté et étiqueté. "
+)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def ensure_user(db: Client) -> str:
+    users = db.auth.admin.list_users()
+    for user in users:
+        if getattr(user, "email", None) == LOADTEST_EMAIL:
+            return user.id
+    created = db.auth.admin.create_user({
+        "email": LOADTEST_EMAIL,
+        "password": uuid.uuid4().hex,
+        "email_confirm": True,
+        "user_metadata": {"is_test_account": True},
+    })
+    return created.user.id
+
+
+def _ensure_account(db: Client, user_id: str, platform: str, account_id: str, username: str) -> str:
+    existing = (
+        db.table("social_accounts").select("id")
+        .eq("platform", platform).eq("account_id", account_id).limit(1).execute()
+    )
+    if existing.data:
+        return existing.data[0]["id"]
+    row = db.table("social_accounts").insert({
+        "user_id": user_id,
+        "platform": platform,
+        "account_id": account_id,
+        "username": username,
+        "display_name": f"Load Test {platform}",
+        "access_token": f"loadtest-{platform}-token",
+        "is_active": True,
+        "created_at": _now(),
+        "updated_at": _now(),
+    }).execute()
+    return row.data[0]["id"]
+
+
+def _ensure_ai_settings(db: Client, user_id: str) -> None:
+    db.table("ai_settings").upsert({
+        "user_id": user_id,
+        "ai_model": LOADTEST_MODEL,
+        "ai_enabled_for_conversations": True,
+        "system_prompt": "Tu es l'assistant de la boutique de test de charge.",
+    }, on_conflict="user_id").execute()
+
+
+def _ensure_monitored_posts(db: Client, user_id: str, social_account_id: str, count: int) -> List[str]:
+    media_ids = [f"1790000000000{i:04d}" for i in range(count)]
+    ends_at = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
+    db.table("monitored_posts").upsert([
+        {
+            "user_id": user_id,
+            "social_account_id": social_account_id,
+            "platform_post_id": media_id,
+            "platform": "instagram",
+            "caption": "Nouvelle collection 🌿",
+            "posted_at": _now(),
+            "source": "imported",
+            "monitoring_enabled": True,
+            "monitoring_started_at": _now(),
+            "monitoring_ends_at": ends_at,
+        }
+        for media_id in media_ids
+    ], on_conflict="user_id,platform_post_id").execute()
+    return media_ids
+
+
+def seed(db: Client, monitored_posts: int = 20) -> Dict[str, Any]:
+    """Create (or reuse) the load test fixtures; returns the scenario addresses"""
+    user_id = ensure_user(db)
+    _ensure_account(db, user_id, "whatsapp", WHATSAPP_PHONE_NUMBER_ID, "+15550000000")
+    instagram_id = _ensure_account(db, user_id, "instagram", INSTAGRAM_ACCOUNT_ID, "loadtest_shop")
+    _ensure_ai_settings(db, user_id)
+    media_ids = _ensure_monitored_posts(db, user_id, instagram_id, monitored_posts)
+    return {
+        "user_id": user_id,
+        "whatsapp_phone_number_id": WHATSAPP_PHONE_NUMBER_ID,
+        "instagram_account_id": INSTAGRAM_ACCOUNT_ID,
+        "monitored_media_ids": media_ids,
+    }
+
+
+def create_documents(db: Client, user_id: str, count: int, paragraphs: int) -> List[str]:
+    """Upload `count` text documents to the kb bucket; returns their ids"""
+    document_ids = []
+    content = ("\n\n".join(DOCUMENT_TEXT * 3 for _ in range(paragraphs))).encode("utf-8")
+    for i in range(count):
+        object_name = f"{user_id}/loadtest-{uuid.uuid4().hex[:8]}-{i}.txt"
+        db.storage.from_("kb").upload(object_name, content, {"content-type": "text/plain"})
+
+        # A storage trigger may already have created the row
+        existing = (
+            db.table("knowledge_documents").select("id")
+            .eq("object_name", object_name).limit(1).execute()
+        )
+        if existing.data:
+            document_ids.append(existing.data[0]["id"])
+            continue
+        row = db.table("knowledge_documents").insert({
+            "user_id": user_id,
+            "title": f"Load test document {i}",
+            "bucket_id": "kb",
+            "object_name": object_name,
+            "status": "pending",
+        }).execute()
+        document_ids.append(row.data[0]["id"])
+    return document_ids
+
+
+def cleanup(db: Client) -> None:
+    """Delete the load test user (rows cascade)"""
+    for user in db.auth.admin.list_users():
+        if getattr(user, "email", None) == LOADTEST_EMAIL:
+            db.auth.admin.delete_user(user.id)
@@ -0,0 +1,189 @@
+"""
+SocialSync AI - Load test process stack
+
+Starts the system under test as in .devcontainer/docker-compose.yml, with the
+external APIs pointed at the fake servers:
+- API:      uvicorn app.main:app
+- workers:  batching (solo pool), comments + ingest, maintenance
+- beat:     periodic tasks (500 ms batch scan, status flush, ...)
+
+ResourceSampler samples CPU and RSS of each process tree (psutil) and the
+Redis memory while a scenario runs.
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import psutil
+import redis
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+WORKERS = {
+    "worker-batching": ["-Q", "batching", "--pool=solo", "--concurrency=1", "-n", "lt-batching@%h"],
+    "worker-comments-ingest": ["-Q", "comments,ingest", "--concurrency=4", "-n", "lt-comments@%h"],
+    "worker-maintenance": ["-Q", "maintenance", "--concurrency=1", "-n", "lt-maintenance@%h"],
+}
+
+
+def fake_env(graph_url: str, llm_url: str, gemini_url: str) -> Dict[str, str]:
+    """Environment overrides sending every external call to the fakes"""
+    return {
+        "META_GRAPH_BASE_URL": graph_url,
+        "INSTAGRAM_GRAPH_BASE_URL": graph_url,
+        "OPENROUTER_BASE_URL": f"{llm_url}/v1",
+        "OPENROUTER_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+        "OPENAI_API_KEY": "loadtest",
+        "GEMINI_API_BASE_URL": gemini_url,
+        "GEMINI_API_KEY": "loadtest",
+        "META_APP_SECRET": os.getenv("META_APP_SECRET") or "loadtest-app-secret",
+        "COMMENT_WEBHOOKS_ENABLED": "true",
+        "LANGSMITH_TRACING": "false",
+        "TRACING_ENABLED": "false",
+    }
+
+
+@dataclass
+class Stack:
+    env: Dict[str, str]
+    api_port: int = 8010
+    log_dir: str = "loadtest-logs"
+    processes: Dict[str, subprocess.Popen] = field(default_factory=dict)
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self.api_port}"
+
+    def _spawn(self, name: str, args: List[str], extra_env: Optional[Dict[str, str]] = None) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+        env = {**os.environ, **self.env, **(extra_env or {})}
+        self.processes[name] = subprocess.Popen(
+            args, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+
+    def start(self, timeout: float = 60.0) -> None:
+        self._spawn("api", [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(self.api_port), "--log-level", "warning",
+        ], {"CELERY_WORKER_QUEUES": ""})
+        for name, worker_args in WORKERS.items():
+            queues = worker_args[worker_args.index("-Q") + 1]
+            self._spawn(name, [
+                sys.executable, "-m", "celery", "-A", "app.workers.celery_app", "worker",
+                "-l", "warning", *worker_args,
+            ], {"CELERY_WORKER_QUEUES": queues})
+        self._spawn("beat", [
+            sys.executable, "-m", "celery", "-A", "app.workers.celery_app", "beat",
+            "-l", "warning", "-s", os.path.join(os.path.abspath(self.log_dir), "celerybeat-schedule"),
+        ], {"CELERY_WORKER_QUEUES": ""})
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for name, process in self.processes.items():
+                if process.poll() is not None:
+                    raise RuntimeError(f"{name} exited at startup, see {self.log_dir}/{name}.log")
+            try:
+                if httpx.get(f"{self.api_url}/api/health", timeout=2).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"API not healthy after {timeout:.0f}s, see {self.log_dir}/api.log")
+
+    def stop(self) -> None:
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+class ResourceSampler:
+    """CPU (cores used) and RSS per process tree, Redis memory, sampled in a thread"""
+
+    def __init__(self, processes: Dict[str, subprocess.Popen], redis_url: str, interval: float = 0.5):
+        self.processes = {name: psutil.Process(p.pid) for name, p in processes.items()}
+        self.redis_client = redis.Redis.from_url(redis_url)
+        self.interval = interval
+        self.peak_rss: Dict[str, int] = {name: 0 for name in self.processes}
+        self.cpu_seconds: Dict[str, float] = {name: 0.0 for name in self.processes}
+        self.redis_peak_bytes = 0
+        self._start_cpu: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started_at = 0.0
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _tree(process: psutil.Process) -> List[psutil.Process]:
+        try:
+            return [process, *process.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return []
+
+    def _cpu_total(self, process: psutil.Process) -> float:
+        total = 0.0
+        for p in self._tree(process):
+            try:
+                times = p.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def _sample(self) -> None:
+        for name, process in self.processes.items():
+            rss = 0
+            for p in self._tree(process):
+                try:
+                    rss += p.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            self.peak_rss[name] = max(self.peak_rss[name], rss)
+            self.cpu_seconds[name] = self._cpu_total(process) - self._start_cpu.get(name, 0.0)
+        try:
+            used = int(self.redis_client.info("memory").get("used_memory", 0))
+            self.redis_peak_bytes = max(self.redis_peak_bytes, used)
+        except redis.RedisError:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "ResourceSampler":
+        self._start_cpu = {name: self._cpu_total(p) for name, p in self.processes.items()}
+        self._started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, object]:
+        """{"processes": {name: {cpu_cores, peak_rss_mb}}, "redis_peak_mb": ...}"""
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._sample()
+        self.elapsed = time.time() - self._started_at
+        return {
+            "processes": {
+                name: {
+                    "cpu_cores": self.cpu_seconds[name] / self.elapsed if self.elapsed else 0.0,
+                    "peak_rss_mb": self.peak_rss[name] / 1024 / 1024,
+                }
+                for name in self.processes
+            },
+            "redis_peak_mb": self.redis_peak_bytes / 1024 / 1024,
+        }
@@ -0,0 +1,180 @@
+"""
+SocialSync AI - Load test webhook traces
+
+A trace is a JSONL file, one webhook delivery per line:
+    {"t": 0.125, "path": "/api/whatsapp/webhook", "body": {...},
+     "expect": {"kind": "dm", "key": "<recipient or comment id>"}}
+
+- t:      offset (seconds) from the start of the replay
+- path:   webhook route of the API
+- body:   payload as delivered by Meta (signed at replay time)
+- expect: reply the pipeline should send to the fake Graph API (optional);
+          used to measure reply latency
+
+Traces recorded from real traffic (payloads of the "Webhook received" logs)
+can be replayed as is; the generators below build synthetic ones for the
+standard scenarios, addressed to the accounts created by seed.py.
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+QUESTIONS = [
+    "Bonjour, quels sont vos horaires d'ouverture ?",
+    "Est-ce que vous livrez à l'international ?",
+    "Comment puis-je retourner un produit ?",
+    "Quel est le délai de livraison pour Paris ?",
+    "Vous avez ce modèle en taille M ?",
+    "Je n'ai pas reçu ma commande, que faire ?",
+]
+
+COMMENTS = [
+    "Trop beau ! C'est dispo en noir ?",
+    "Prix ?",
+    "Vous livrez en Belgique ?",
+    "J'adore 😍",
+    "Comment on commande ?",
+]
+
+
+@dataclass
+class TraceEvent:
+    t: float
+    path: str
+    body: Dict[str, Any]
+    expect: Optional[Dict[str, str]] = None
+
+    def to_json(self) -> str:
+        return json.dumps({"t": self.t, "path": self.path, "body": self.body, "expect": self.expect})
+
+
+def load_trace(path: str) -> List[TraceEvent]:
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                events.append(TraceEvent(data["t"], data["path"], data["body"], data.get("expect")))
+    return sorted(events, key=lambda e: e.t)
+
+
+def save_trace(events: List[TraceEvent], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(event.to_json() + "\n")
+
+
+def retime(events: List[TraceEvent], rate: float) -> List[TraceEvent]:
+    """Replay at `rate` webhooks/s, keeping the order (bursts become evenly spaced)"""
+    return [TraceEvent(i / rate, e.path, e.body, e.expect) for i, e in enumerate(events)]
+
+
+def _whatsapp_message(phone_number_id: str, contact: str, text: str) -> Dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": f"waba-{phone_number_id}",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "15550000000", "phone_number_id": phone_number_id},
+                    "contacts": [{"profile": {"name": f"Client {contact[-4:]}"}, "wa_id": contact}],
+                    "messages": [{
+                        "from": contact,
+                        "id": f"wamid.{uuid.uuid4().hex}",
+                        "timestamp": str(int(time.time())),
+                        "type": "text",
+                        "text": {"body": text},
+                    }],
+                },
+            }],
+        }],
+    }
+
+
+def _instagram_message(ig_account_id: str, sender: str, text: str) -> Dict[str, Any]:
+    now_ms = int(time.time() * 1000)
+    return {
+        "object": "instagram",
+        "entry": [{
+            "id": ig_account_id,
+            "time": now_ms,
+            "messaging": [{
+                "sender": {"id": sender},
+                "recipient": {"id": ig_account_id},
+                "timestamp": now_ms,
+                "message": {"mid": f"mid.{uuid.uuid4().hex}", "text": text},
+            }],
+        }],
+    }
+
+
+def _instagram_comment(ig_account_id: str, media_id: str, comment_id: str, text: str) -> Dict[str, Any]:
+    author = f"fan_{uuid.uuid4().hex[:8]}"
+    return {
+        "object": "instagram",
+        "entry": [{
+            "id": ig_account_id,
+            "time": int(time.time()),
+            "changes": [{
+                "field": "comments",
+                "value": {
+                    "id": comment_id,
+                    "text": text,
+                    "from": {"id": f"ig_{author}", "username": author},
+                    "media": {"id": media_id, "media_product_type": "FEED"},
+                },
+            }],
+        }],
+    }
+
+
+def dm_burst(accounts: Dict[str, Any], contacts: int, messages_per_contact: int,
+             burst_seconds: float = 2.0, instagram_share: float = 0.3) -> List[TraceEvent]:
+    """
+    DM bursts: each contact sends `messages_per_contact` messages within
+    `burst_seconds` (one batch, one reply expected per contact, timed from
+    its first message)
+    """
+    events = []
+    for _ in range(contacts):
+        on_instagram = random.random() < instagram_share
+        contact = f"ig_{uuid.uuid4().hex[:12]}" if on_instagram else f"3360{random.randint(1000000, 9999999)}"
+        start = random.uniform(0, max(contacts / 50.0, 1.0))
+        for _ in range(messages_per_contact):
+            text = random.choice(QUESTIONS)
+            if on_instagram:
+                path = "/api/instagram/webhook"
+                body = _instagram_message(accounts["instagram_account_id"], contact, text)
+            else:
+                path = "/api/whatsapp/webhook"
+                body = _whatsapp_message(accounts["whatsapp_phone_number_id"], contact, text)
+            events.append(TraceEvent(
+                start + random.uniform(0, burst_seconds), path, body, {"kind": "dm", "key": contact}
+            ))
+    return sorted(events, key=lambda e: e.t)
+
+
+def comment_storm(accounts: Dict[str, Any], comments: int, seconds: float) -> List[TraceEvent]:
+    """Comments spread over the monitored posts, `comments` in `seconds`"""
+    media_ids = accounts["monitored_media_ids"]
+    events = []
+    for _ in range(comments):
+        comment_id = f"{random.randint(10**16, 10**17 - 1)}"
+        body = _instagram_comment(
+            accounts["instagram_account_id"], random.choice(media_ids), comment_id, random.choice(COMMENTS)
+        )
+        events.append(TraceEvent(
+            random.uniform(0, seconds), "/api/instagram/webhook", body,
+            {"kind": "comment_reply", "key": comment_id},
+        ))
+    return sorted(events, key=lambda e: e.t)
+
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Startup Profiling (API and Celery workers)
+
+Measures, for the API and each worker type, the cold start of a fresh Python
+process loading exactly what that process loads at startup:
+- API: app.main
+- worker <queue>: app.workers.celery_app with CELERY_WORKER_QUEUES=<queue>,
+  then the worker's task modules (as `celery worker` does)
+
+For each target: wall time, peak RSS and the heaviest top-level imports
+(python -X importtime, cumulative).
+
+To compare before/after a change, run it on both checkouts:
+    git stash / git checkout <ref> && python scripts/profile_startup.py
+
+Usage:
+    python scripts/profile_startup.py [--targets api,batching,ingest] [--top 15] [--runs 3]
+
+Environment Variables Required:
+    The backend .env (imports read settings; no connection is opened)
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+WORKER_QUEUES = {
+    "batching": "batching",
+    "ingest": "ingest",
+    "scheduler": "scheduler,notifications",
+    "comments": "comments",
+    "topics": "topics,maintenance",
+    "beat": "",
+}
+
+API_CODE = "import app.main"
+WORKER_CODE = (
+    "from app.workers.celery_app import celery\n"
+    "celery.loader.import_default_modules()"
+)
+# Printed last by the child: peak RSS in kB (Linux ru_maxrss unit)
+RSS_CODE = "\nimport resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def run_target(name: str, with_importtime: bool):
+    env = dict(os.environ)
+    if name == "api":
+        code = API_CODE
+        env.pop("CELERY_WORKER_QUEUES", None)
+    else:
+        code = WORKER_CODE
+        env["CELERY_WORKER_QUEUES"] = WORKER_QUEUES[name]
+
+    cmd = [sys.executable]
+    if with_importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", "import time\n_t = time.perf_counter()\n" + code
+            + "\nprint(time.perf_counter() - _t)" + RSS_CODE]
+
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name}: {proc.stderr.strip().splitlines()[-1:]}")
+
+    lines = proc.stdout.strip().splitlines()
+    return float(lines[-2]), int(lines[-1]), proc.stderr
+
+
+def heaviest_imports(importtime_output: str, top: int):
+    """Cumulative import time per top-level package, in ms"""
+    per_package = defaultdict(int)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue  # header
+        module = parts[2]
+        # Only the outermost import of a package (no indentation) is cumulative
+        if module.startswith("  "):
+            continue
+        per_package[module.strip().split(".")[0]] += cumulative
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+    return [(package, us / 1000) for package, us in ranked[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", default="api," + ",".join(WORKER_QUEUES))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    summary = []
+    for name in targets:
+        wall, rss = [], []
+        for _ in range(args.runs):
+            seconds, rss_kb, _ = run_target(name, with_importtime=False)
+            wall.append(seconds)
+            rss.append(rss_kb)
+        _, _, importtime = run_target(name, with_importtime=True)
+
+        print(f"\n=== {name} ===")
+        print(f"cold start: {statistics.median(wall) * 1000:.0f} ms (median of {args.runs})")
+        print(f"peak RSS:   {statistics.median(rss) / 1024:.1f} MB")
+        print("heaviest imports (cumulative):")
+        for package, ms in heaviest_imports(importtime, args.top):
+            print(f"  {package:30s} {ms:8.1f} ms")
+        summary.append((name, statistics.median(wall) * 1000, statistics.median(rss) / 1024))
+
+    print("\n=== summary ===")
+    print(f"{'target':12s} {'cold start':>12s} {'peak RSS':>10s}")
+    for name, ms, mb in summary:
+        print(f"{name:12s} {ms:10.0f}ms {mb:8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
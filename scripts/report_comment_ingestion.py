@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+SocialSync AI - Comment Ingestion Report (webhook vs polling)
+
+Over the last N hours:
+- comment-to-reply latency (comments.replied_at - comments.created_at) per
+  ingestion path (comments.ingested_via: webhook / poll), p50/p95/max
+- Graph API calls per hour made by the comment poller, per ingestion mode
+  (Redis counters comments:graph_calls:{mode}:{hour}, see comment_ingestion.py)
+
+To compare both modes, run a period with COMMENT_WEBHOOKS_ENABLED=false and a
+period with it on, then report each period.
+
+Usage:
+    python scripts/report_comment_ingestion.py [--hours 24] [--user-id <uuid>]
+
+Environment Variables Required:
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, REDIS_URL
+
+Author: SocialSync AI Team
+License: AGPL v3.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add backend to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.db.session import get_db  # noqa: E402
+from app.services.comment_ingestion import get_graph_calls_per_hour  # noqa: E402
+
+PAGE_SIZE = 1000
+
+
+def parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def fetch_replied_comments(db, since: datetime, user_id: str = None):
+    select = "created_at, replied_at, ingested_via"
+    if user_id:
+        select += ", monitored_posts!inner(user_id)"
+    rows, offset = [], 0
+    while True:
+        query = db.table("comments").select(select).gte("replied_at", since.isoformat())
+        if user_id:
+            query = query.eq("monitored_posts.user_id", user_id)
+        page = query.range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[max(0, int(len(values) * pct) - 1)] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--user-id")
+    args = parser.parse_args()
+
+    since = datetime.now(timezone.utc) - timedelta(hours=args.hours)
+    rows = fetch_replied_comments(get_db(), since, args.user_id)
+
+    print(f"=== comment-to-reply latency (last {args.hours}h) ===")
+    for path in ("webhook", "poll"):
+        latencies = [
+            (parse_ts(r["replied_at"]) - parse_ts(r["created_at"])).total_seconds()
+            for r in rows
+            if r.get("ingested_via", "poll") == path and r.get("created_at")
+        ]
+        if not latencies:
+            print(f"{path:8s} no replied comments")
+            continue
+        print(
+            f"{path:8s} n={len(latencies):5d} p50={statistics.median(latencies):7.1f}s "
+            f"p95={percentile(latencies, 0.95):7.1f}s max={max(latencies):7.1f}s"
+        )
+
+    print(f"\n=== poller Graph API calls per hour (last {args.hours}h) ===")
+    for mode in ("webhook", "poll"):
+        per_hour = get_graph_calls_per_hour(mode, args.hours)
+        active = [count for count in per_hour.values() if count]
+        if not active:
+            print(f"{mode:8s} no calls recorded")
+            continue
+        print(
+            f"{mode:8s} hours={len(active):3d} mean={statistics.mean(active):8.1f}/h "
+            f"max={max(active):6d}/h total={sum(active)}"
+        )
+
+
+if __name__ == "__main__":
+    main()